@@ -9,6 +9,7 @@ import { Label } from '@/components/ui/label'
 import { useToast } from '@/components/ui/use-toast'
 import { Smartphone, Plus, Trash2, QrCode, CheckCircle2, XCircle, Loader2 } from 'lucide-react'
 import { motion } from 'framer-motion'
+import { useWaStatusEvents, WaStatusDelta } from '@/components/wa-web/use-wa-status-events'
 
 interface Session {
   id: string
@@ -41,14 +42,31 @@ export default function MultiSessionPage() {
     }
   }
 
+  // SSE delta'sını listedeki session'a uygula
+  const applyStatus = (delta: WaStatusDelta) => {
+    setSessions(prev => prev.map(session => {
+      if (session.session_name !== delta.sessionName) return session
+
+      const next = { ...session }
+      if (delta.status) next.status = delta.status as Session['status']
+      if (delta.qrCode !== undefined) next.qr_code = delta.qrCode || undefined
+      if (delta.phone !== undefined) next.phone_number = delta.phone || undefined
+      return next
+    }))
+  }
+
   useEffect(() => {
     loadSessions()
-    
-    // Her 5 saniyede bir güncelle
-    const interval = setInterval(loadSessions, 5000)
-    return () => clearInterval(interval)
   }, [])
 
+  // Durum değişiklikleri SSE ile gelir; SSE kullanılamazsa 5 saniyede bir yeniden yüklenir
+  useWaStatusEvents(null, {
+    onSnapshot: (snapshot) => snapshot.forEach(applyStatus),
+    onStatus: applyStatus,
+    onRemoved: (sessionName) => setSessions(prev => prev.filter(s => s.session_name !== sessionName)),
+    onFallbackPoll: loadSessions
+  })
+
   // Yeni session ekle
   const handleAddSession = async () => {
     if (!newSessionName.trim()) {
@@ -110,7 +128,6 @@ export default function MultiSessionPage() {
           title: 'Bağlantı Başlatıldı',
           description: 'QR kod için bekleyin...'
         })
-        setTimeout(loadSessions, 2000)
       } else {
         const error = await response.json()
         throw new Error(error.error)
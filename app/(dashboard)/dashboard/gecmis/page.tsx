@@ -1,39 +1,79 @@
 'use client'
 
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { Input } from '@/components/ui/input'
+import { Button } from '@/components/ui/button'
 import { Card, CardContent } from '@/components/ui/card'
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs'
 import { MessageHistory } from '@/types'
-import { Search, History as HistoryIcon, Phone, MessageSquare, Image as ImageIcon, Video, Music, File, Calendar } from 'lucide-react'
+import { Search, History as HistoryIcon, Phone, MessageSquare, Image as ImageIcon, Video, Music, File, Calendar, Loader2 } from 'lucide-react'
 import { formatDate } from '@/lib/utils'
 import { motion } from 'framer-motion'
 
+const PAGE_SIZE = 50
+// Sayaçlar listeden daha seyrek yenilenir (her biri ayrı bir count sorgusu)
+const COUNTS_REFRESH_MS = 60000
+
 export default function HistoryPage() {
   const [history, setHistory] = useState<MessageHistory[]>([])
-  const [filteredHistory, setFilteredHistory] = useState<MessageHistory[]>([])
-  const [todayHistory, setTodayHistory] = useState<MessageHistory[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [counts, setCounts] = useState({ total: 0, sent: 0, failed: 0 })
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [searchQuery, setSearchQuery] = useState('')
+  const [debouncedQuery, setDebouncedQuery] = useState('')
   const [activeTab, setActiveTab] = useState<'all' | 'today'>('today')
+  // Kullanıcı daha fazla sayfa yüklediyse otomatik yenileme listeyi sıfırlamaz
+  const loadedBeyondFirstPage = useRef(false)
+  const countsFetchedAt = useRef(0)
+
+  // Aktif sekme ve arama için sunucu filtreleri
+  const buildFilters = () => {
+    const params = new URLSearchParams()
+    if (activeTab === 'today') {
+      const today = new Date()
+      today.setHours(0, 0, 0, 0)
+      params.set('startDate', today.toISOString())
+    }
+    if (debouncedQuery) params.set('q', debouncedQuery)
+    return params
+  }
+
+  const fetchCounts = async (filters: URLSearchParams) => {
+    // Filtresiz sayım tüm tabloyu tarar; tarih/arama yoksa planlayıcı tahmini yeterli
+    const estimated = !filters.has('startDate') && !filters.has('q')
+    const countFor = async (status?: string) => {
+      const params = new URLSearchParams(filters)
+      if (status) params.set('status', status)
+      if (estimated) params.set('mode', 'estimated')
+      const response = await fetch(`/api/message-history/count?${params}`)
+      return response.ok ? (await response.json()).count || 0 : 0
+    }
+
+    const [total, sent, failed] = await Promise.all([countFor(), countFor('sent'), countFor('failed')])
+    setCounts({ total, sent, failed })
+    countsFetchedAt.current = Date.now()
+  }
 
-  const fetchHistory = async () => {
+  const fetchHistory = async (refresh = false) => {
     try {
-      const response = await fetch('/api/message-history')
-      if (response.ok) {
-        const data = await response.json()
-        setHistory(data)
-        setFilteredHistory(data)
-        
-        // Bugünün mesajlarını filtrele
-        const today = new Date()
-        today.setHours(0, 0, 0, 0)
-        const todayMessages = data.filter((msg: MessageHistory) => {
-          const msgDate = new Date(msg.sent_at)
-          msgDate.setHours(0, 0, 0, 0)
-          return msgDate.getTime() === today.getTime()
-        })
-        setTodayHistory(todayMessages)
+      const filters = buildFilters()
+      const keepItems = refresh && loadedBeyondFirstPage.current
+
+      if (!keepItems) {
+        const params = new URLSearchParams(filters)
+        params.set('limit', String(PAGE_SIZE))
+        const response = await fetch(`/api/message-history?${params}`)
+        if (response.ok) {
+          const data = await response.json()
+          setHistory(data.items)
+          setNextCursor(data.next_cursor)
+          loadedBeyondFirstPage.current = false
+        }
+      }
+
+      if (!refresh || Date.now() - countsFetchedAt.current >= COUNTS_REFRESH_MS) {
+        await fetchCounts(filters)
       }
     } catch (error) {
       console.error('Fetch history error:', error)
@@ -42,28 +82,45 @@ export default function HistoryPage() {
     }
   }
 
+  const loadMore = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    try {
+      const params = buildFilters()
+      params.set('limit', String(PAGE_SIZE))
+      params.set('cursor', nextCursor)
+      const response = await fetch(`/api/message-history?${params}`)
+      if (response.ok) {
+        const data = await response.json()
+        loadedBeyondFirstPage.current = true
+        setHistory(prev => [...prev, ...data.items])
+        setNextCursor(data.next_cursor)
+      }
+    } catch (error) {
+      console.error('Load more history error:', error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
+  // Arama kutusu her tuşta istek atmasın
   useEffect(() => {
-    fetchHistory()
-    
-    // Her 10 saniyede bir otomatik yenile (live güncelleme için)
-    const interval = setInterval(fetchHistory, 10000)
-    return () => clearInterval(interval)
-  }, [])
+    const timeout = setTimeout(() => setDebouncedQuery(searchQuery.trim()), 300)
+    return () => clearTimeout(timeout)
+  }, [searchQuery])
 
   useEffect(() => {
-    const dataToFilter = activeTab === 'today' ? todayHistory : history
-    if (searchQuery) {
-      const filtered = dataToFilter.filter(
-        (item) =>
-          item.phone.includes(searchQuery) ||
-          item.message.toLowerCase().includes(searchQuery.toLowerCase()) ||
-          item.contact_name?.toLowerCase().includes(searchQuery.toLowerCase())
-      )
-      setFilteredHistory(filtered)
-    } else {
-      setFilteredHistory(dataToFilter)
-    }
-  }, [searchQuery, history, todayHistory, activeTab])
+    setLoading(true)
+    fetchHistory()
+
+    // Her 10 saniyede bir otomatik yenile (live güncelleme için, sekme görünürken)
+    const interval = setInterval(() => {
+      if (document.visibilityState === 'visible') {
+        fetchHistory(true)
+      }
+    }, 10000)
+    return () => clearInterval(interval)
+  }, [activeTab, debouncedQuery])
 
   return (
     <div className="space-y-6">
@@ -97,7 +154,7 @@ export default function HistoryPage() {
                 </div>
                 <div>
                   <p className="text-2xl font-bold">
-                    {activeTab === 'today' ? todayHistory.length : history.length}
+                    {counts.total}
                   </p>
                   <p className="text-sm text-muted-foreground">Toplam Mesaj</p>
                 </div>
@@ -112,7 +169,7 @@ export default function HistoryPage() {
                 </div>
                 <div>
                   <p className="text-2xl font-bold">
-                    {(activeTab === 'today' ? todayHistory : history).filter((h) => h.status === 'sent').length}
+                    {counts.sent}
                   </p>
                   <p className="text-sm text-muted-foreground">Başarılı</p>
                 </div>
@@ -127,7 +184,7 @@ export default function HistoryPage() {
                 </div>
                 <div>
                   <p className="text-2xl font-bold">
-                    {(activeTab === 'today' ? todayHistory : history).filter((h) => h.status === 'failed').length}
+                    {counts.failed}
                   </p>
                   <p className="text-sm text-muted-foreground">Başarısız</p>
                 </div>
@@ -154,7 +211,7 @@ export default function HistoryPage() {
               Yükleniyor...
             </CardContent>
           </Card>
-        ) : filteredHistory.length === 0 ? (
+        ) : history.length === 0 ? (
           <Card>
             <CardContent className="py-12">
               <div className="text-center text-muted-foreground">
@@ -172,12 +229,12 @@ export default function HistoryPage() {
           </Card>
         ) : (
           <div className="space-y-3">
-            {filteredHistory.map((item, index) => (
+            {history.map((item, index) => (
               <motion.div
                 key={item.id}
                 initial={{ opacity: 0, y: 10 }}
                 animate={{ opacity: 1, y: 0 }}
-                transition={{ delay: index * 0.03 }}
+                transition={{ delay: (index % PAGE_SIZE) * 0.03 }}
               >
                 <Card className="hover:shadow-md transition-shadow">
                   <CardContent className="p-4">
@@ -238,6 +295,14 @@ export default function HistoryPage() {
                 </Card>
               </motion.div>
             ))}
+            {nextCursor && (
+              <div className="flex justify-center pt-2">
+                <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore && <Loader2 className="h-4 w-4 mr-2 animate-spin" />}
+                  Daha Fazla Yükle
+                </Button>
+              </div>
+            )}
           </div>
         )}
       </Tabs>
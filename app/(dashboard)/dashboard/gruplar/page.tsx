@@ -17,7 +17,7 @@ import {
 import { Checkbox } from '@/components/ui/checkbox'
 import { useToast } from '@/components/ui/use-toast'
 import { Group, Contact } from '@/types'
-import { Plus, Trash2, Edit, Users, UserPlus } from 'lucide-react'
+import { Plus, Trash2, Edit, Users, UserPlus, FileDown } from 'lucide-react'
 import { motion } from 'framer-motion'
 
 export default function GroupsPage() {
@@ -359,6 +359,11 @@ export default function GroupsPage() {
                       >
                         <Edit className="h-4 w-4" />
                       </Button>
+                      <Button size="sm" variant="outline" asChild>
+                        <a href={`/api/contacts/export?group=${group.id}`} download title="Grup kişilerini CSV olarak indir">
+                          <FileDown className="h-4 w-4" />
+                        </a>
+                      </Button>
                       <Button
                         size="sm"
                         variant="outline"
@@ -188,6 +188,12 @@ export default function ContactsPage() {
             <Upload className="h-4 w-4" />
             CSV İçe Aktar
           </Button>
+          <Button variant="outline" className="gap-2" asChild>
+            <a href="/api/contacts/export" download>
+              <FileDown className="h-4 w-4" />
+              CSV Dışa Aktar
+            </a>
+          </Button>
           <Button
             onClick={() => {
               setSelectedContact(null)
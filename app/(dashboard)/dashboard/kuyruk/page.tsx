@@ -85,16 +85,25 @@ export default function QueuePage() {
 
     initQueue()
 
-    // Auto-refresh every 10 seconds
+    // Auto-refresh every 10 seconds (sekme arka plandayken istek atılmaz)
     const interval = setInterval(() => {
-      if (isMounted) {
+      if (isMounted && document.visibilityState === 'visible') {
         fetchQueue()
       }
     }, 10000)
 
+    // Sekmeye geri dönüldüğünde hemen yenile
+    const handleVisibility = () => {
+      if (isMounted && document.visibilityState === 'visible') {
+        fetchQueue()
+      }
+    }
+    document.addEventListener('visibilitychange', handleVisibility)
+
     return () => {
       isMounted = false
       clearInterval(interval)
+      document.removeEventListener('visibilitychange', handleVisibility)
     }
   }, [])
 
@@ -18,6 +18,8 @@ import { useToast } from '@/components/ui/use-toast'
 import { Contact, Template } from '@/types'
 import { Send, Users, FileText, Upload, X, Image as ImageIcon, Video, Music, File, Smartphone, Clock } from 'lucide-react'
 import { formatPhoneNumber, delay } from '@/lib/utils'
+import { uploadMedia } from '@/lib/media-upload'
+import { renderTemplate } from '@/lib/template-engine'
 import { motion } from 'framer-motion'
 
 type SendMode = 'single' | 'multiple'
@@ -306,26 +308,10 @@ export default function SendMessagePage() {
     }> = []
 
     try {
+      // Aynı dosyalar tekrar gönderimlerde yeniden yüklenmez; içerik hash'i sunucuda da tekilleştirilir
       for (const file of mediaFiles) {
-        const formData = new FormData()
-        formData.append('file', file)
-
-        const response = await fetch('/api/upload', {
-          method: 'POST',
-          body: formData,
-        })
-
-        if (!response.ok) {
-          const error = await response.json()
-          throw new Error(`${file.name}: ${error.error || 'Yüklenemedi'}`)
-        }
-
-        const data = await response.json()
-        results.push({
-          url: data.url,
-          type: data.type,
-          filename: data.filename,
-        })
+        const { url, type, filename } = await uploadMedia(file)
+        results.push({ url, type, filename })
       }
 
       setUploadedMedia(results)
@@ -605,11 +591,13 @@ export default function SendMessagePage() {
       // Medya yükleme (varsa)
       const mediaItems = await uploadMediaFiles()
 
-      let finalMessage = message.replace(/{name}/g, firstName)
-      finalMessage = finalMessage.replace(/{surname}/g, lastName)
-      finalMessage = finalMessage.replace(/{email}/g, email)
-      finalMessage = finalMessage.replace(/{address}/g, address)
-      finalMessage = finalMessage.replace(/{company}/g, company)
+      let finalMessage = renderTemplate(message, {
+        name: firstName,
+        surname: lastName,
+        email,
+        address,
+        company
+      })
 
       // Link ekle (varsa)
       if (linkUrl) {
@@ -957,11 +945,7 @@ export default function SendMessagePage() {
       })
       
       // Mesajı hazırla
-      let finalMessage = message.replace(/{name}/g, name)
-      finalMessage = finalMessage.replace(/{surname}/g, surname || '')
-      finalMessage = finalMessage.replace(/{email}/g, email || '')
-      finalMessage = finalMessage.replace(/{address}/g, address || '')
-      finalMessage = finalMessage.replace(/{company}/g, company || '')
+      let finalMessage = renderTemplate(message, { name, surname, email, address, company })
       
       // Link ekle (varsa)
       if (linkUrl) {
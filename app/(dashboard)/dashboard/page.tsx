@@ -5,6 +5,8 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/com
 import { Users, FileText, Send, Clock } from 'lucide-react'
 import { motion } from 'framer-motion'
 import Link from 'next/link'
+import type { DashboardSummary } from '@/lib/dashboard-summary'
+import { formatDate } from '@/lib/utils'
 
 const quickActions = [
   {
@@ -32,7 +34,9 @@ export default function DashboardPage() {
     contacts: 0,
     templates: 0,
     messages: 0,
-    queue: 0,
+    messagesToday: 0,
+    queue: null as number | null,
+    recentMessages: [] as DashboardSummary['recentMessages'],
     loading: true,
   })
   const fetchingRef = useRef(false)
@@ -48,24 +52,19 @@ export default function DashboardPage() {
       fetchingRef.current = true
 
       try {
-        // Fetch all stats in parallel
-        const [contactsRes, templatesRes, messagesRes, queueRes] = await Promise.all([
-          fetch('/api/contacts', { cache: 'no-store' }),
-          fetch('/api/templates', { cache: 'no-store' }),
-          fetch('/api/message-history', { cache: 'no-store' }),
-          fetch('/api/yoncu/queue', { cache: 'no-store' }).catch(() => ({ ok: false })), // Queue optional
-        ])
-
-        const contacts = contactsRes.ok ? await contactsRes.json() : []
-        const templates = templatesRes.ok ? await templatesRes.json() : []
-        const messages = messagesRes.ok ? await messagesRes.json() : []
-        const queueData = queueRes.ok && 'json' in queueRes ? await queueRes.json() : { count: 0 }
+        // Tüm sayımlar tek istekte, sunucuda önbelleklenmiş olarak gelir
+        const res = await fetch('/api/dashboard/summary', { cache: 'no-store' })
+        const data = res.ok ? await res.json() : null
+        if (!data?.success) throw new Error(data?.error || 'Özet alınamadı')
 
+        const summary: DashboardSummary = data.summary
         setStats({
-          contacts: Array.isArray(contacts) ? contacts.length : 0,
-          templates: Array.isArray(templates) ? templates.length : 0,
-          messages: Array.isArray(messages) ? messages.length : 0,
-          queue: queueData.count || 0,
+          contacts: summary.contacts,
+          templates: summary.templates,
+          messages: summary.messages.total,
+          messagesToday: summary.messages.today,
+          queue: summary.queue,
+          recentMessages: summary.recentMessages,
           loading: false,
         })
       } catch (error) {
@@ -87,16 +86,25 @@ export default function DashboardPage() {
 
     initStats()
 
-    // Refresh every 30 seconds
+    // Refresh every 30 seconds (sekme arka plandayken istek atılmaz)
     const interval = setInterval(() => {
-      if (isMounted) {
+      if (isMounted && document.visibilityState === 'visible') {
         fetchStats()
       }
     }, 30000)
 
+    // Sekmeye geri dönüldüğünde hemen yenile
+    const handleVisibility = () => {
+      if (isMounted && document.visibilityState === 'visible') {
+        fetchStats()
+      }
+    }
+    document.addEventListener('visibilitychange', handleVisibility)
+
     return () => {
       isMounted = false
       clearInterval(interval)
+      document.removeEventListener('visibilitychange', handleVisibility)
     }
   }, [])
 
@@ -122,7 +130,7 @@ export default function DashboardPage() {
     {
       title: 'Gönderilen Mesajlar',
       value: stats.loading ? '...' : stats.messages.toString(),
-      description: 'Toplam gönderim',
+      description: stats.loading ? 'Toplam gönderim' : `Toplam gönderim, bugün ${stats.messagesToday}`,
       icon: Send,
       href: '/dashboard/gecmis',
       color: 'text-green-500',
@@ -130,7 +138,7 @@ export default function DashboardPage() {
     },
     {
       title: 'Kuyruktaki Mesajlar',
-      value: stats.loading ? '...' : stats.queue.toString(),
+      value: stats.loading ? '...' : stats.queue === null ? '-' : stats.queue.toString(),
       description: 'Bekleyen mesaj',
       icon: Clock,
       href: '/dashboard/kuyruk',
@@ -203,6 +211,35 @@ export default function DashboardPage() {
         })}
       </div>
 
+      {/* Son Mesajlar */}
+      {stats.recentMessages.length > 0 && (
+        <Card>
+          <CardHeader>
+            <CardTitle className="text-base">Son Mesajlar</CardTitle>
+          </CardHeader>
+          <CardContent className="space-y-2">
+            {stats.recentMessages.map((message) => (
+              <Link key={message.id} href="/dashboard/gecmis">
+                <div className="flex items-center justify-between p-2 rounded-lg hover:bg-muted/50 text-sm">
+                  <div>
+                    <span className="font-mono">{message.phone}</span>
+                    {message.contact_name && (
+                      <span className="text-muted-foreground ml-2">{message.contact_name}</span>
+                    )}
+                  </div>
+                  <div className="flex items-center gap-3">
+                    <span className="text-xs text-muted-foreground">{formatDate(message.sent_at)}</span>
+                    <span className={message.status === 'sent' ? 'text-green-600 text-xs' : 'text-red-600 text-xs'}>
+                      {message.status === 'sent' ? 'Gönderildi' : 'Başarısız'}
+                    </span>
+                  </div>
+                </div>
+              </Link>
+            ))}
+          </CardContent>
+        </Card>
+      )}
+
       {/* Quick Actions */}
       <div>
         <h2 className="text-xl font-semibold mb-4">Hızlı İşlemler</h2>
@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useParams } from 'next/navigation'
 import { Card } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
@@ -13,12 +13,23 @@ import {
   CheckCircle2,
   XCircle,
   Clock,
-  Download
+  Download,
+  RotateCcw
 } from 'lucide-react'
 import { Campaign, SendJob } from '@/types'
 import { motion } from 'framer-motion'
 import Link from 'next/link'
 
+const ERROR_CLASS_LABELS: Record<string, string> = {
+  transient: 'geçici hata',
+  session: 'oturum hatası',
+  permanent: 'kalıcı hata'
+}
+
+// Job listesi sayfa boyutu (keyset sayfalama) ve CSV dışa aktarımında kullanılan sayfa boyutu
+const JOBS_PAGE_SIZE = 100
+const EXPORT_PAGE_SIZE = 1000
+
 export default function CampaignReportPage() {
   const params = useParams()
   const { toast } = useToast()
@@ -26,13 +37,20 @@ export default function CampaignReportPage() {
 
   const [report, setReport] = useState<any>(null)
   const [loading, setLoading] = useState(false)
+  const [jobs, setJobs] = useState<SendJob[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [exporting, setExporting] = useState(false)
+  const [requeueing, setRequeueing] = useState(false)
+  // Kullanıcı ilk sayfanın ötesini yüklediyse periyodik yenileme listeyi sıfırlamaz
+  const loadedBeyondFirstPage = useRef(false)
 
   // Rapor verilerini getir
   const fetchReport = async () => {
     setLoading(true)
     try {
-      console.log('[Frontend] Rapor alınıyor, campaignId:', campaignId)
-      const res = await fetch(`/api/campaigns/${campaignId}/report`)
+      const keepJobs = loadedBeyondFirstPage.current
+      const res = await fetch(`/api/campaigns/${campaignId}/report?limit=${keepJobs ? 0 : JOBS_PAGE_SIZE}`)
       
       if (!res.ok) {
         const errorText = await res.text()
@@ -41,10 +59,13 @@ export default function CampaignReportPage() {
       }
       
       const data = await res.json()
-      console.log('[Frontend] Rapor verisi alındı:', data)
 
       if (data.success) {
         setReport(data.report)
+        if (!keepJobs) {
+          setJobs(data.report.jobs)
+          setNextCursor(data.report.next_cursor)
+        }
       } else {
         toast({
           title: 'Hata',
@@ -64,27 +85,107 @@ export default function CampaignReportPage() {
     }
   }
 
-  // CSV Export
-  const handleExportCSV = () => {
-    if (!report || !report.jobs) return
-
-    const csvHeader = 'Alıcı,Telefon,Durum,Hata,Gönderim Zamanı\n'
-    const csvRows = report.jobs.map((job: SendJob) => {
-      return `"${job.recipient_name || ''}","${job.recipient_phone}","${job.status}","${job.last_error || ''}","${job.sent_at || ''}"`
-    }).join('\n')
-
-    const csv = csvHeader + csvRows
-    const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' })
-    const url = URL.createObjectURL(blob)
-    const link = document.createElement('a')
-    link.href = url
-    link.download = `kampanya-rapor-${campaignId}.csv`
-    link.click()
-
-    toast({
-      title: 'Başarılı',
-      description: 'Rapor CSV olarak indirildi'
-    })
+  // Job listesinin sonraki sayfasını getir
+  const fetchJobsPage = async (cursor: string | null, limit: number) => {
+    const query = new URLSearchParams({ limit: String(limit) })
+    if (cursor) query.set('cursor', cursor)
+
+    const res = await fetch(`/api/campaigns/${campaignId}/jobs?${query}`)
+    const data = await res.json()
+    if (!data.success) throw new Error(data.error || 'Gönderim listesi alınamadı')
+    return data as { jobs: SendJob[]; next_cursor: string | null }
+  }
+
+  const handleLoadMore = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    try {
+      const page = await fetchJobsPage(nextCursor, JOBS_PAGE_SIZE)
+      loadedBeyondFirstPage.current = true
+      setJobs(prev => [...prev, ...page.jobs])
+      setNextCursor(page.next_cursor)
+    } catch (error: any) {
+      toast({
+        title: 'Hata',
+        description: error.message,
+        variant: 'destructive'
+      })
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
+  // Başarısız (dead-letter) job'ları toplu olarak yeniden kuyruğa al
+  const handleRequeueFailed = async () => {
+    if (!confirm('Başarısız mesajlar yeniden kuyruğa alınsın mı? Geçersiz numara ve kara liste gibi kalıcı hatalar hariç tutulur.')) {
+      return
+    }
+
+    setRequeueing(true)
+    try {
+      const res = await fetch(`/api/campaigns/${campaignId}/requeue`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ include_permanent: false })
+      })
+      const data = await res.json()
+      if (!data.success) throw new Error(data.error || 'Yeniden kuyruğa alınamadı')
+
+      toast({
+        title: 'Başarılı',
+        description: data.message
+      })
+      loadedBeyondFirstPage.current = false
+      await fetchReport()
+    } catch (error: any) {
+      toast({
+        title: 'Hata',
+        description: error.message,
+        variant: 'destructive'
+      })
+    } finally {
+      setRequeueing(false)
+    }
+  }
+
+  // CSV Export (tüm job'lar sayfa sayfa çekilir)
+  const handleExportCSV = async () => {
+    if (!report) return
+
+    setExporting(true)
+    try {
+      const csvRows: string[] = []
+      let cursor: string | null = null
+      do {
+        const page = await fetchJobsPage(cursor, EXPORT_PAGE_SIZE)
+        page.jobs.forEach((job: SendJob) => {
+          csvRows.push(`"${job.recipient_name || ''}","${job.recipient_phone}","${job.status}","${job.last_error || ''}","${job.sent_at || ''}"`)
+        })
+        cursor = page.next_cursor
+      } while (cursor)
+
+      const csvHeader = 'Alıcı,Telefon,Durum,Hata,Gönderim Zamanı\n'
+      const csv = csvHeader + csvRows.join('\n')
+      const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' })
+      const url = URL.createObjectURL(blob)
+      const link = document.createElement('a')
+      link.href = url
+      link.download = `kampanya-rapor-${campaignId}.csv`
+      link.click()
+
+      toast({
+        title: 'Başarılı',
+        description: 'Rapor CSV olarak indirildi'
+      })
+    } catch (error: any) {
+      toast({
+        title: 'Hata',
+        description: error.message || 'CSV oluşturulamadı',
+        variant: 'destructive'
+      })
+    } finally {
+      setExporting(false)
+    }
   }
 
   // Status badge
@@ -128,7 +229,7 @@ export default function CampaignReportPage() {
     )
   }
 
-  const { campaign, summary, jobs, errors } = report
+  const { campaign, summary, errors } = report
 
   return (
     <div className="p-6 space-y-6">
@@ -149,10 +250,26 @@ export default function CampaignReportPage() {
           </div>
         </div>
 
-        <Button onClick={handleExportCSV}>
-          <Download className="w-4 h-4 mr-2" />
-          CSV İndir
-        </Button>
+        <div className="flex items-center space-x-2">
+          {summary.failed > 0 && (
+            <Button variant="outline" onClick={handleRequeueFailed} disabled={requeueing}>
+              {requeueing ? (
+                <Loader2 className="w-4 h-4 mr-2 animate-spin" />
+              ) : (
+                <RotateCcw className="w-4 h-4 mr-2" />
+              )}
+              Başarısızları Yeniden Dene
+            </Button>
+          )}
+          <Button onClick={handleExportCSV} disabled={exporting}>
+            {exporting ? (
+              <Loader2 className="w-4 h-4 mr-2 animate-spin" />
+            ) : (
+              <Download className="w-4 h-4 mr-2" />
+            )}
+            CSV İndir
+          </Button>
+        </div>
       </div>
 
       {/* İstatistikler */}
@@ -191,7 +308,7 @@ export default function CampaignReportPage() {
           <div className="flex items-center justify-between">
             <div>
               <p className="text-sm text-muted-foreground">Bekliyor</p>
-              <p className="text-3xl font-bold text-yellow-600">{summary.pending}</p>
+              <p className="text-3xl font-bold text-yellow-600">{summary.pending + (summary.processing || 0)}</p>
             </div>
             <Clock className="w-8 h-8 text-yellow-500" />
           </div>
@@ -225,7 +342,7 @@ export default function CampaignReportPage() {
 
       {/* Job Listesi */}
       <Card className="p-6">
-        <h3 className="font-semibold mb-4">Gönderim Detayları ({jobs.length})</h3>
+        <h3 className="font-semibold mb-4">Gönderim Detayları ({jobs.length} / {summary.total})</h3>
         <div className="space-y-2 max-h-[600px] overflow-y-auto">
           {jobs.map((job: SendJob) => (
             <motion.div
@@ -238,7 +355,10 @@ export default function CampaignReportPage() {
                 <p className="font-medium">{job.recipient_name || 'İsimsiz'}</p>
                 <p className="text-sm text-muted-foreground">{job.recipient_phone}</p>
                 {job.last_error && (
-                  <p className="text-xs text-red-600 mt-1">{job.last_error}</p>
+                  <p className="text-xs text-red-600 mt-1">
+                    {job.last_error}
+                    {job.error_class && ` (${ERROR_CLASS_LABELS[job.error_class]}${job.status === 'pending' ? ', tekrar denenecek' : ''})`}
+                  </p>
                 )}
               </div>
               <div className="flex items-center space-x-3">
@@ -252,6 +372,14 @@ export default function CampaignReportPage() {
             </motion.div>
           ))}
         </div>
+        {nextCursor && (
+          <div className="flex justify-center mt-4">
+            <Button variant="outline" onClick={handleLoadMore} disabled={loadingMore}>
+              {loadingMore && <Loader2 className="w-4 h-4 mr-2 animate-spin" />}
+              Daha Fazla Yükle
+            </Button>
+          </div>
+        )}
       </Card>
     </div>
   )
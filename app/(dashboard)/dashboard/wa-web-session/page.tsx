@@ -5,6 +5,7 @@ import { Card } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
 import { useToast } from '@/components/ui/use-toast'
 import { Smartphone, QrCode, CheckCircle2, XCircle, Loader2, Send, Users, UsersRound, Download } from 'lucide-react'
+import { useWaStatusEvents, WaStatusDelta } from '@/components/wa-web/use-wa-status-events'
 
 export default function WaWebSessionPage() {
   const { toast } = useToast()
@@ -16,7 +17,39 @@ export default function WaWebSessionPage() {
   const [testPhone, setTestPhone] = useState('')
   const [testMessage, setTestMessage] = useState('Merhaba, bu bir test mesajıdır.')
   const [testMediaUrl, setTestMediaUrl] = useState('')
-  const pollRef = useRef<NodeJS.Timeout | null>(null)
+  // Bağlan'a basıldıktan sonra "ready" bekleniyor mu?
+  const waitingRef = useRef(false)
+  const timeoutRef = useRef<NodeJS.Timeout | null>(null)
+
+  // Sunucudan gelen durum (SSE delta'sı veya status yanıtı) ile state'i güncelle
+  const applyStatus = (delta: WaStatusDelta) => {
+    if (delta.connected !== undefined) setConnected(delta.connected)
+    if (delta.phone !== undefined) setPhone(delta.phone)
+
+    if (delta.qrCode) {
+      setQrCode(delta.qrCode)
+      console.log('[Frontend] QR kod alındı')
+    } else if (delta.qrCode === null || delta.connected) {
+      setQrCode(null)
+    }
+
+    if (delta.connected && waitingRef.current) {
+      waitingRef.current = false
+      if (timeoutRef.current) clearTimeout(timeoutRef.current)
+      console.log('[Frontend] Bağlantı kuruldu!')
+      toast({ 
+        title: 'Bağlantı Kuruldu!', 
+        description: `WhatsApp bağlantısı başarıyla kuruldu. Telefon: ${delta.phone ? '+' + delta.phone : 'Bilinmiyor'}` 
+      })
+    }
+  }
+
+  // Durum değişiklikleri SSE ile gelir; SSE kullanılamazsa checkStatus ile polling yapılır
+  useWaStatusEvents('default', {
+    onSnapshot: (sessions) => sessions.forEach(applyStatus),
+    onStatus: applyStatus,
+    onFallbackPoll: () => checkStatus()
+  })
 
   // Status kontrolü
   const checkStatus = async () => {
@@ -25,29 +58,12 @@ export default function WaWebSessionPage() {
       const data = await res.json()
 
       if (data.success) {
-        setConnected(data.connected)
-        setPhone(data.phone)
-        
-        if (data.qrCode) {
-          // QR kod zaten varsa tekrar set etme (gereksiz re-render önleme)
-          if (qrCode !== data.qrCode) {
-            setQrCode(data.qrCode)
-            console.log('[Frontend] QR kod alındı')
-          }
-        } else if (data.connected) {
-          setQrCode(null)
-          console.log('[Frontend] Bağlantı kuruldu!')
-        }
-
-        // Bağlandıysa polling'i durdur
-        if (data.connected && pollRef.current) {
-          clearInterval(pollRef.current)
-          pollRef.current = null
-          toast({ 
-            title: 'Bağlantı Kuruldu!', 
-            description: `WhatsApp bağlantısı başarıyla kuruldu. Telefon: ${data.phone ? '+' + data.phone : 'Bilinmiyor'}` 
-          })
-        }
+        applyStatus({
+          sessionName: 'default',
+          connected: data.connected,
+          phone: data.phone,
+          qrCode: data.qrCode
+        })
       } else {
         console.error('[Frontend] Status API hatası:', data.error)
       }
@@ -98,20 +114,17 @@ export default function WaWebSessionPage() {
         toast({ title: 'Bağlantı başlatıldı', description: 'QR kodu bekleniyor...' })
         console.log('[Frontend] Bağlantı başlatıldı, QR kod bekleniyor...')
 
-        // Hemen bir kez kontrol et (500ms sonra)
+        // QR ve bağlantı durumu SSE ile gelecek; mevcut QR için bir kez kontrol et
+        waitingRef.current = true
         setTimeout(() => {
           checkStatus()
         }, 500)
 
-        // Polling başlat (2 saniye aralıkla - QR kod görününce daha yavaş)
-        if (pollRef.current) clearInterval(pollRef.current)
-        pollRef.current = setInterval(checkStatus, 2000)
-
-        // 3 dakika sonra polling'i durdur
-        setTimeout(() => {
-          if (pollRef.current && !connected) {
-            clearInterval(pollRef.current)
-            pollRef.current = null
+        // 3 dakika içinde bağlanmazsa uyar
+        if (timeoutRef.current) clearTimeout(timeoutRef.current)
+        timeoutRef.current = setTimeout(() => {
+          if (waitingRef.current) {
+            waitingRef.current = false
             toast({ title: 'Zaman aşımı', description: 'Bağlantı kurulamadı. Lütfen tekrar deneyin.', variant: 'destructive' })
           }
         }, 180000)
@@ -291,7 +304,7 @@ export default function WaWebSessionPage() {
   useEffect(() => {
     checkStatus()
     return () => {
-      if (pollRef.current) clearInterval(pollRef.current)
+      if (timeoutRef.current) clearTimeout(timeoutRef.current)
     }
   }, [])
 
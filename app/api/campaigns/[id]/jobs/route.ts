@@ -0,0 +1,36 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getCampaignJobsPage } from '@/lib/db/campaigns';
+import { SendJob } from '@/types';
+
+export const dynamic = 'force-dynamic';
+
+const JOB_STATUSES: SendJob['status'][] = ['pending', 'processing', 'sent', 'failed', 'blocked'];
+
+// GET: Kampanya job'ları, keyset sayfalama (?cursor= bir önceki yanıtın next_cursor değeri)
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ id: string }> | { id: string } }
+) {
+  try {
+    const { id } = params instanceof Promise ? await params : params;
+    const searchParams = request.nextUrl.searchParams;
+    const status = searchParams.get('status') as SendJob['status'] | null;
+
+    const page = await getCampaignJobsPage(id, {
+      limit: parseInt(searchParams.get('limit') || '100', 10) || 100,
+      status: status && JOB_STATUSES.includes(status) ? status : null,
+      cursor: searchParams.get('cursor')
+    });
+
+    return NextResponse.json({
+      success: true,
+      ...page
+    });
+  } catch (error: any) {
+    console.error('Kampanya job listesi hatası:', error);
+    return NextResponse.json(
+      { success: false, error: error.message },
+      { status: 500 }
+    );
+  }
+}
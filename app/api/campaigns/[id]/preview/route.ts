@@ -1,21 +1,9 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { getCampaignById } from '@/lib/db/campaigns';
-import { getContactById } from '@/lib/db/contacts';
-import { getGroupById } from '@/lib/db/groups';
-import { CampaignPreview } from '@/types';
+import { CampaignPreview, Contact } from '@/types';
 import { checkCampaignCompliance } from '@/lib/compliance-service';
-
-/**
- * Mesajdaki placeholder'ları doldurur
- */
-function renderMessage(template: string, contact: any): string {
-  return template
-    .replace(/\{name\}/g, contact.name || '')
-    .replace(/\{surname\}/g, contact.surname || '')
-    .replace(/\{email\}/g, contact.email || '')
-    .replace(/\{address\}/g, contact.address || '')
-    .replace(/\{company\}/g, contact.company || '');
-}
+import { streamCampaignRecipients } from '@/lib/recipient-resolver';
+import { compileTemplate } from '@/lib/template-engine';
 
 // POST: Kampanya önizleme
 export async function POST(
@@ -32,48 +20,27 @@ export async function POST(
       );
     }
 
-    // Hedef kitleyi belirle
-    let recipients: any[] = [];
+    // Hedef kitleyi sayfa sayfa çöz; önizleme için ilk 10 alıcı render edilir,
+    // uyum kontrolü için sadece numara ve consent bilgisi tutulur
+    const previewLimit = 10;
+    const template = compileTemplate(campaign.message_template);
+    const previews: CampaignPreview[] = [];
+    const recipients: Contact[] = [];
 
-    if (campaign.target_type === 'contacts' && campaign.target_contacts) {
-      // Kişiler
-      for (const contactId of campaign.target_contacts) {
-        const contact = await getContactById(contactId);
-        if (contact) recipients.push(contact);
-      }
-    } else if (campaign.target_type === 'groups' && campaign.target_groups) {
-      // Gruplar
-      for (const groupId of campaign.target_groups) {
-        const group = await getGroupById(groupId);
-        if (group) {
-          const groupContacts = await import('@/lib/db/groups').then(m => m.getGroupContacts(groupId));
-          if (groupContacts && groupContacts.length > 0) recipients.push(...groupContacts);
+    for await (const page of streamCampaignRecipients(campaign)) {
+      for (const recipient of page) {
+        if (previews.length < previewLimit) {
+          previews.push({
+            recipient_phone: recipient.phone,
+            recipient_name: recipient.name + (recipient.surname ? ' ' + recipient.surname : ''),
+            rendered_message: template.render(recipient),
+            media_url: campaign.media_url,
+            media_type: campaign.media_type,
+            media_filename: campaign.media_filename
+          });
         }
+        recipients.push({ phone: recipient.phone, consent: recipient.consent } as Contact);
       }
-    } else if (campaign.target_type === 'manual' && campaign.target_manual_phones) {
-      // Manuel numara listesi
-      recipients = campaign.target_manual_phones.map(phone => ({
-        id: phone,
-        phone,
-        name: phone,
-        surname: ''
-      }));
-    }
-
-    // İlk 10 alıcı için preview oluştur
-    const previewLimit = Math.min(10, recipients.length);
-    const previews: CampaignPreview[] = [];
-
-    for (let i = 0; i < previewLimit; i++) {
-      const recipient = recipients[i];
-      previews.push({
-        recipient_phone: recipient.phone,
-        recipient_name: recipient.name + (recipient.surname ? ' ' + recipient.surname : ''),
-        rendered_message: renderMessage(campaign.message_template, recipient),
-        media_url: campaign.media_url,
-        media_type: campaign.media_type,
-        media_filename: campaign.media_filename
-      });
     }
 
     // Uyum kontrolü
@@ -1,16 +1,24 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { getCampaignReport } from '@/lib/db/campaigns';
+import { getCampaignReport, updateCampaignStats } from '@/lib/db/campaigns';
 
-// GET: Kampanya raporu
+export const dynamic = 'force-dynamic';
+
+// GET: Kampanya raporu (özet + hata dağılımı + job listesinin ilk sayfası)
+// ?limit=0 yalnızca özet ve hataları döner, ?reconcile=1 sayaçları önce send_jobs'tan yeniden hesaplar
 export async function GET(
   request: NextRequest,
   { params }: { params: Promise<{ id: string }> | { id: string } }
 ) {
   try {
     const { id } = params instanceof Promise ? await params : params;
-    console.log('[API] Rapor isteniyor, campaignId:', id);
-    const report = await getCampaignReport(id);
-    console.log('[API] Rapor alındı:', report ? 'Başarılı' : 'Bulunamadı');
+    const limitParam = request.nextUrl.searchParams.get('limit');
+    const limit = limitParam !== null ? Math.max(0, parseInt(limitParam, 10) || 0) : undefined;
+
+    if (request.nextUrl.searchParams.get('reconcile') === '1') {
+      await updateCampaignStats(id);
+    }
+
+    const report = await getCampaignReport(id, { limit });
 
     return NextResponse.json({
       success: true,
@@ -24,4 +32,3 @@ export async function GET(
     );
   }
 }
-
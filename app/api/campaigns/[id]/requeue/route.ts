@@ -0,0 +1,53 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getCampaignById, requeueDeadLetterJobs, updateCampaign } from '@/lib/db/campaigns';
+import { startDispatcher } from '@/lib/send-dispatcher';
+
+export const dynamic = 'force-dynamic';
+
+// POST: Başarısız (dead-letter) job'ları toplu olarak yeniden kuyruğa al
+// Body: { include_permanent?: boolean } - kalıcı hatalar (geçersiz numara, kara liste) varsayılan olarak hariç
+export async function POST(
+  request: NextRequest,
+  { params }: { params: Promise<{ id: string }> | { id: string } }
+) {
+  try {
+    const { id } = params instanceof Promise ? await params : params;
+    const body = await request.json().catch(() => ({}));
+    const campaign = await getCampaignById(id);
+
+    if (!campaign) {
+      return NextResponse.json(
+        { success: false, error: 'Kampanya bulunamadı' },
+        { status: 404 }
+      );
+    }
+
+    if (campaign.status === 'draft') {
+      return NextResponse.json(
+        { success: false, error: 'Kampanya henüz gönderilmedi' },
+        { status: 400 }
+      );
+    }
+
+    const requeued = await requeueDeadLetterJobs(id, { includePermanent: body.include_permanent === true });
+
+    // Biten kampanya yeniden çalışır; duraklatılmış kampanya devam ettirilene kadar bekler
+    if (requeued > 0 && (campaign.status === 'completed' || campaign.status === 'failed')) {
+      await updateCampaign(id, { status: 'running' });
+    }
+
+    if (requeued > 0) startDispatcher();
+
+    return NextResponse.json({
+      success: true,
+      requeued,
+      message: `${requeued} mesaj yeniden kuyruğa alındı`
+    });
+  } catch (error: any) {
+    console.error('Kampanya yeniden kuyruğa alma hatası:', error);
+    return NextResponse.json(
+      { success: false, error: error.message },
+      { status: 500 }
+    );
+  }
+}
@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { getCampaignById, updateCampaign } from '@/lib/db/campaigns';
+import { startDispatcher } from '@/lib/send-dispatcher';
 
 // POST: Kampanyayı devam ettir
 export async function POST(
@@ -24,6 +25,7 @@ export async function POST(
     }
 
     await updateCampaign(params.id, { status: 'running' });
+    startDispatcher();
 
     return NextResponse.json({
       success: true,
@@ -1,20 +1,17 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { getCampaignById, updateCampaign, createSendJobsBulk } from '@/lib/db/campaigns';
-import { getContactById } from '@/lib/db/contacts';
-import { getGroupById, getGroupContacts } from '@/lib/db/groups';
+import {
+  getCampaignById,
+  createSendJobsBulk,
+  claimDraftCampaign,
+  scheduleClaimedCampaign,
+  releaseDraftCampaign,
+  deletePendingSendJobs
+} from '@/lib/db/campaigns';
+import { getBlacklistedPhones } from '@/lib/db/blacklist';
 import { SendJob } from '@/types';
-
-/**
- * Mesajdaki placeholder'ları doldurur
- */
-function renderMessage(template: string, contact: any): string {
-  return template
-    .replace(/\{name\}/g, contact.name || '')
-    .replace(/\{surname\}/g, contact.surname || '')
-    .replace(/\{email\}/g, contact.email || '')
-    .replace(/\{address\}/g, contact.address || '')
-    .replace(/\{company\}/g, contact.company || '');
-}
+import { startDispatcher } from '@/lib/send-dispatcher';
+import { streamCampaignRecipients } from '@/lib/recipient-resolver';
+import { renderRecipientPages } from '@/lib/template-engine';
 
 // POST: Kampanyayı gönderime başlat (enqueue)
 export async function POST(
@@ -31,82 +28,97 @@ export async function POST(
       );
     }
 
-    if (campaign.status === 'running') {
+    // Yalnızca taslak kampanya başlatılabilir; zamanlanmış/duraklatılmış/tamamlanmış kampanyayı
+    // tekrar göndermek tüm alıcıları yeniden kuyruğa eklerdi
+    if (campaign.status !== 'draft') {
       return NextResponse.json(
-        { success: false, error: 'Kampanya zaten çalışıyor' },
+        { success: false, error: campaign.status === 'running' ? 'Kampanya zaten çalışıyor' : 'Kampanya zaten başlatılmış' },
         { status: 400 }
       );
     }
 
-    // Hedef kitleyi belirle
-    let recipients: any[] = [];
+    // Kuyruğa eklemeden önce kampanyayı sahiplen (çift tıklamada ikinci istek burada durur)
+    const claimedAt = await claimDraftCampaign(campaign.id);
+    if (!claimedAt) {
+      return NextResponse.json(
+        { success: false, error: 'Kampanya şu anda kuyruğa ekleniyor' },
+        { status: 409 }
+      );
+    }
 
-    if (campaign.target_type === 'contacts' && campaign.target_contacts) {
-      for (const contactId of campaign.target_contacts) {
-        const contact = await getContactById(contactId);
-        if (contact) recipients.push(contact);
-      }
-    } else if (campaign.target_type === 'groups' && campaign.target_groups) {
-      for (const groupId of campaign.target_groups) {
-        const groupContacts = await getGroupContacts(groupId);
-        if (groupContacts && groupContacts.length > 0) recipients.push(...groupContacts);
+    // Hedef kitleyi sayfa sayfa çöz ve her sayfanın job'larını hemen kuyruğa ekle.
+    // Kampanya taslakta kaldığı sürece dispatcher bu job'ları almaz.
+    const now = new Date();
+    let total = 0;
+    let blocked = 0;
+
+    try {
+      // Önceki denemede yarıda kalan job'lar varsa temizle; aksi halde alıcılar iki kez kuyruğa girer
+      await deletePendingSendJobs(campaign.id);
+
+      const pages = renderRecipientPages(campaign.message_template, streamCampaignRecipients(campaign));
+
+      for await (const page of pages) {
+        // Blacklist'teki (STOP/İPTAL) numaralar kuyruğa hiç eklenmez
+        const blacklisted = await getBlacklistedPhones(page.map(({ recipient }) => recipient.phone));
+        const allowed = page.filter(({ recipient }) => !blacklisted.has(recipient.phone));
+        blocked += page.length - allowed.length;
+        if (allowed.length === 0) continue;
+
+        const jobs: Partial<SendJob>[] = allowed.map(({ recipient, message }, i) => {
+          // Hız limitleri gönderim anında zamanlayıcıda uygulanır (lib/send-scheduler);
+          // burada yalnızca alıcı sırası korunur
+          const scheduledAt = new Date(now.getTime() + total + i);
+
+          return {
+            campaign_id: campaign.id,
+            recipient_phone: recipient.phone,
+            recipient_name: recipient.name + (recipient.surname ? ' ' + recipient.surname : ''),
+            recipient_contact_id: recipient.id !== recipient.phone ? recipient.id : undefined,
+            message_content: message,
+            media_url: campaign.media_url,
+            media_type: campaign.media_type,
+            status: 'pending',
+            attempts: 0,
+            max_attempts: 3,
+            scheduled_at: scheduledAt.toISOString()
+          };
+        });
+
+        // Job'ları database'e ekle
+        await createSendJobsBulk(jobs);
+        total += jobs.length;
       }
-    } else if (campaign.target_type === 'manual' && campaign.target_manual_phones) {
-      recipients = campaign.target_manual_phones.map(phone => ({
-        id: phone,
-        phone,
-        name: phone,
-        surname: ''
-      }));
+    } catch (error) {
+      await releaseDraftCampaign(campaign.id, claimedAt).catch(() => undefined);
+      throw error;
     }
 
-    if (recipients.length === 0) {
+    if (total === 0) {
+      await releaseDraftCampaign(campaign.id, claimedAt);
       return NextResponse.json(
-        { success: false, error: 'Alıcı bulunamadı' },
+        { success: false, error: blocked > 0 ? 'Tüm alıcılar blacklist\'te' : 'Alıcı bulunamadı' },
         { status: 400 }
       );
     }
 
-    // Send job'ları oluştur
-    const now = new Date();
-    const jobs: Partial<SendJob>[] = [];
-
-    for (let i = 0; i < recipients.length; i++) {
-      const recipient = recipients[i];
-
-      // Her mesaj için kademeli zamanla (rate limiting)
-      const delayMs = i * (campaign.delay_min_ms + Math.random() * (campaign.delay_max_ms - campaign.delay_min_ms));
-      const scheduledAt = new Date(now.getTime() + delayMs);
-
-      jobs.push({
-        campaign_id: campaign.id,
-        recipient_phone: recipient.phone,
-        recipient_name: recipient.name + (recipient.surname ? ' ' + recipient.surname : ''),
-        recipient_contact_id: recipient.id !== recipient.phone ? recipient.id : undefined,
-        message_content: renderMessage(campaign.message_template, recipient),
-        media_url: campaign.media_url,
-        media_type: campaign.media_type,
-        status: 'pending',
-        attempts: 0,
-        max_attempts: 3,
-        scheduled_at: scheduledAt.toISOString()
-      });
+    // Kampanya durumunu güncelle (draft -> scheduled)
+    if (!(await scheduleClaimedCampaign(campaign.id, claimedAt, total))) {
+      return NextResponse.json(
+        { success: false, error: 'Kampanya kuyruğa eklenirken başka bir istek tarafından değiştirildi' },
+        { status: 409 }
+      );
     }
 
-    // Job'ları database'e ekle
-    await createSendJobsBulk(jobs);
-
-    // Kampanya durumunu güncelle
-    await updateCampaign(campaign.id, {
-      status: 'scheduled',
-      total_recipients: recipients.length,
-      started_at: new Date().toISOString()
-    });
+    // Kuyruğu sunucu tarafında tüketmeye başla
+    startDispatcher();
 
     return NextResponse.json({
       success: true,
-      message: `Kampanya başlatıldı. ${recipients.length} mesaj kuyruğa eklendi.`,
-      total_jobs: jobs.length
+      message: `Kampanya başlatıldı. ${total} mesaj kuyruğa eklendi.` +
+        (blocked > 0 ? ` ${blocked} alıcı blacklist'te olduğu için atlandı.` : ''),
+      total_jobs: total,
+      blocked_count: blocked
     });
   } catch (error: any) {
     console.error('Kampanya gönderimi başlatma hatası:', error);
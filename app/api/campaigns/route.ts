@@ -46,8 +46,9 @@ export async function POST(request: NextRequest) {
       rate_limit_per_second: body.rate_limit_per_second || 1,
       rate_limit_per_minute: body.rate_limit_per_minute || 20,
       add_random_delay: body.add_random_delay !== false,
-      delay_min_ms: body.delay_min_ms || 2000,
-      delay_max_ms: body.delay_max_ms || 5000,
+      // 0 geçerli bir değer (beklemesiz gönderim); yalnızca gönderilmediyse varsayılan kullanılır
+      delay_min_ms: body.delay_min_ms ?? 2000,
+      delay_max_ms: body.delay_max_ms ?? 5000,
       require_consent: body.require_consent !== false,
       content_quality_check: body.content_quality_check !== false,
       status: 'draft',
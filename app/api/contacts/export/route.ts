@@ -0,0 +1,47 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { streamContactPages } from '@/lib/db/contacts'
+import { createExportStream, exportResponse, parseExportFormat, ExportColumn } from '@/lib/export-stream'
+import { Contact } from '@/types'
+
+export const dynamic = 'force-dynamic'
+
+const COLUMNS: ExportColumn<Contact>[] = [
+  { header: 'Ad', key: 'name', value: (c) => c.name },
+  { header: 'Soyad', key: 'surname', value: (c) => c.surname },
+  { header: 'Telefon', key: 'phone', value: (c) => c.phone },
+  { header: 'Email', key: 'email', value: (c) => c.email },
+  { header: 'Adres', key: 'address', value: (c) => c.address },
+  { header: 'Şirket', key: 'company', value: (c) => c.company },
+  { header: 'İzin', key: 'consent', value: (c) => c.consent },
+  { header: 'İzin Tarihi', key: 'consent_date', value: (c) => c.consent_date },
+  { header: 'Oluşturulma', key: 'created_at', value: (c) => c.created_at },
+]
+
+// GET: ?format=csv|ndjson&group=<grup id>&consent=true|false&since=&until=
+export async function GET(request: NextRequest) {
+  try {
+    const { searchParams } = new URL(request.url)
+    const format = parseExportFormat(searchParams.get('format'))
+    const consent = searchParams.get('consent')
+    const groupId = searchParams.get('group')
+
+    const pages = streamContactPages({
+      groupId,
+      consent: consent === 'true' ? true : consent === 'false' ? false : null,
+      since: searchParams.get('since'),
+      until: searchParams.get('until'),
+    })
+
+    return exportResponse(
+      createExportStream(pages, COLUMNS, format),
+      groupId ? `kisiler-grup-${groupId}` : 'kisiler',
+      format
+    )
+  } catch (error) {
+    console.error('Export contacts error:', error)
+    return NextResponse.json(
+      { error: 'Kişiler dışa aktarılırken bir hata oluştu' },
+      { status: 500 }
+    )
+  }
+}
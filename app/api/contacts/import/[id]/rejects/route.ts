@@ -0,0 +1,32 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { createReadStream, promises as fs } from 'fs'
+import { Readable } from 'stream'
+import { getRejectsFilePath } from '@/lib/contact-import'
+
+export const dynamic = 'force-dynamic'
+
+// GET: İçe aktarmada reddedilen satırlar (CSV, hata nedeni ile)
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ id: string }> | { id: string } }
+) {
+  const { id } = params instanceof Promise ? await params : params
+  const filePath = getRejectsFilePath(id)
+
+  try {
+    if (!filePath) throw new Error('Geçersiz içe aktarma kimliği')
+    await fs.access(filePath)
+  } catch {
+    return NextResponse.json(
+      { error: 'Hatalı satır dosyası bulunamadı veya süresi doldu' },
+      { status: 404 }
+    )
+  }
+
+  return new Response(Readable.toWeb(createReadStream(filePath)) as ReadableStream, {
+    headers: {
+      'Content-Type': 'text/csv; charset=utf-8',
+      'Content-Disposition': `attachment; filename="hatali-satirlar-${id}.csv"`,
+    },
+  })
+}
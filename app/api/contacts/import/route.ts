@@ -0,0 +1,48 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { importContactsCsv } from '@/lib/contact-import'
+
+export const dynamic = 'force-dynamic'
+
+/**
+ * CSV dosyasını istek gövdesi olarak akış halinde içe aktarır.
+ * Yanıt NDJSON'dur: her chunk sonrası { type: 'progress', ... }, sonunda { type: 'done', ... }
+ */
+export async function POST(request: NextRequest) {
+  if (!request.body) {
+    return NextResponse.json(
+      { error: 'CSV dosyası gönderilmedi' },
+      { status: 400 }
+    )
+  }
+
+  const fileName = request.nextUrl.searchParams.get('filename') || ''
+  if (fileName && !fileName.toLowerCase().endsWith('.csv')) {
+    return NextResponse.json(
+      { error: 'Desteklenmeyen dosya formatı. Sadece CSV destekleniyor.' },
+      { status: 400 }
+    )
+  }
+
+  const body = request.body
+  const encoder = new TextEncoder()
+  const stream = new ReadableStream({
+    async start(controller) {
+      const send = (event: object) => controller.enqueue(encoder.encode(JSON.stringify(event) + '\n'))
+
+      try {
+        const result = await importContactsCsv(body, {
+          onProgress: (progress) => send({ type: 'progress', ...progress }),
+        })
+        send({ type: 'done', success: true, ...result })
+      } catch (error: any) {
+        console.error('Import contacts error:', error)
+        send({ type: 'done', success: false, error: error.message || 'Dosya içe aktarılırken bir hata oluştu' })
+      }
+      controller.close()
+    },
+  })
+
+  return new Response(stream, {
+    headers: { 'Content-Type': 'application/x-ndjson; charset=utf-8' },
+  })
+}
@@ -0,0 +1,18 @@
+import { NextResponse } from 'next/server';
+import { getDashboardSummary } from '@/lib/dashboard-summary';
+
+export const dynamic = 'force-dynamic';
+
+// GET: Gösterge paneli sayımları ve son mesajlar (kısa süreli sunucu önbelleği)
+export async function GET() {
+  try {
+    const summary = await getDashboardSummary();
+    return NextResponse.json({ success: true, summary });
+  } catch (error: any) {
+    console.error('Dashboard özeti hatası:', error);
+    return NextResponse.json(
+      { success: false, error: error.message || 'Özet alınamadı' },
+      { status: 500 }
+    );
+  }
+}
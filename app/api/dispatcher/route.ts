@@ -0,0 +1,54 @@
+import { NextResponse } from 'next/server';
+
+export const dynamic = 'force-dynamic';
+
+// GET: Dispatcher durumu
+export async function GET() {
+  try {
+    const { getDispatcher } = await import('@/lib/send-dispatcher');
+    const { getSendScheduler } = await import('@/lib/send-scheduler');
+    const dispatcher = getDispatcher();
+
+    return NextResponse.json({
+      success: true,
+      stats: dispatcher ? dispatcher.getStats() : null,
+      scheduler: getSendScheduler().getStats()
+    });
+  } catch (error: any) {
+    console.error('[API] Dispatcher durum hatası:', error);
+    return NextResponse.json({ success: false, error: error.message }, { status: 500 });
+  }
+}
+
+// POST: Dispatcher'ı başlat / durdur ({ action: 'start' | 'stop' })
+export async function POST(request: Request) {
+  try {
+    const body = await request.json().catch(() => ({}));
+    const action = body.action || 'start';
+    const { startDispatcher, stopDispatcher, getDispatcher } = await import('@/lib/send-dispatcher');
+
+    if (action === 'stop') {
+      await stopDispatcher();
+    } else if (action === 'start') {
+      if (!startDispatcher()) {
+        return NextResponse.json(
+          { success: false, error: 'Dispatcher devre dışı (SEND_DISPATCHER_ENABLED=false)' },
+          { status: 400 }
+        );
+      }
+    } else {
+      return NextResponse.json(
+        { success: false, error: 'Geçersiz işlem' },
+        { status: 400 }
+      );
+    }
+
+    return NextResponse.json({
+      success: true,
+      stats: getDispatcher()?.getStats() || null
+    });
+  } catch (error: any) {
+    console.error('[API] Dispatcher işlem hatası:', error);
+    return NextResponse.json({ success: false, error: error.message }, { status: 500 });
+  }
+}
@@ -0,0 +1,22 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getInboundQueue } from '@/lib/inbound-ingest';
+import { getRecentInboundMessages } from '@/lib/db/inbound-messages';
+
+export const dynamic = 'force-dynamic';
+
+// GET: Son gelen mesajlar ve süreç içi gelen mesaj kuyruğunun durumu
+export async function GET(request: NextRequest) {
+  try {
+    const limit = Math.min(Math.max(parseInt(request.nextUrl.searchParams.get('limit') || '50', 10) || 50, 1), 500);
+    const messages = await getRecentInboundMessages(limit);
+
+    return NextResponse.json({
+      success: true,
+      messages,
+      stats: getInboundQueue().getStats()
+    });
+  } catch (error: any) {
+    console.error('[API] Gelen mesajlar hatası:', error);
+    return NextResponse.json({ success: false, error: error.message }, { status: 500 });
+  }
+}
@@ -0,0 +1,30 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { countMessageHistory } from '@/lib/db/message-history'
+
+export const dynamic = 'force-dynamic'
+
+// GET: ?q=&startDate=&endDate=&status=&mode=exact|estimated
+export async function GET(request: NextRequest) {
+  try {
+    const { searchParams } = new URL(request.url)
+    const mode = searchParams.get('mode') === 'estimated' ? 'estimated' : 'exact'
+
+    const count = await countMessageHistory(
+      {
+        q: searchParams.get('q'),
+        startDate: searchParams.get('startDate'),
+        endDate: searchParams.get('endDate'),
+        status: searchParams.get('status'),
+      },
+      mode
+    )
+
+    return NextResponse.json({ count, estimated: mode === 'estimated' })
+  } catch (error) {
+    console.error('Count message history error:', error)
+    return NextResponse.json(
+      { error: 'Mesaj sayısı alınırken bir hata oluştu' },
+      { status: 500 }
+    )
+  }
+}
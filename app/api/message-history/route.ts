@@ -1,25 +1,29 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { getMessageHistory, searchMessageHistory, filterMessageHistoryByDate, createMessageHistory } from '@/lib/db/message-history'
+import { getMessageHistoryPage, createMessageHistory } from '@/lib/db/message-history'
 
+export const dynamic = 'force-dynamic'
+
+// GET: ?q=&startDate=&endDate=&status=&limit=&cursor=
+// Yanıt: { items, next_cursor } — sonraki sayfa için next_cursor, cursor olarak gönderilir
 export async function GET(request: NextRequest) {
   try {
     const { searchParams } = new URL(request.url)
-    const query = searchParams.get('q')
-    const startDate = searchParams.get('startDate')
-    const endDate = searchParams.get('endDate')
     const limit = searchParams.get('limit')
 
-    let history
-
-    if (startDate && endDate) {
-      history = await filterMessageHistoryByDate(startDate, endDate)
-    } else if (query) {
-      history = await searchMessageHistory(query)
-    } else {
-      history = await getMessageHistory(limit ? parseInt(limit) : undefined)
-    }
+    const page = await getMessageHistoryPage(
+      {
+        q: searchParams.get('q'),
+        startDate: searchParams.get('startDate'),
+        endDate: searchParams.get('endDate'),
+        status: searchParams.get('status'),
+      },
+      {
+        limit: limit ? parseInt(limit) : undefined,
+        cursor: searchParams.get('cursor'),
+      }
+    )
 
-    return NextResponse.json(history)
+    return NextResponse.json(page)
   } catch (error) {
     console.error('Get message history error:', error)
     return NextResponse.json(
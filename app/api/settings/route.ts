@@ -1,5 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { getSettings, updateSettings } from '@/lib/db/settings'
+import { invalidateYoncuClient } from '@/lib/yoncu-api'
+import { resumeParkedSendJobs } from '@/lib/db/campaigns'
 
 export async function GET(request: NextRequest) {
   try {
@@ -18,6 +20,12 @@ export async function POST(request: NextRequest) {
   try {
     const body = await request.json()
     const settings = await updateSettings(body)
+    // Yeni Service ID / token ile client bir sonraki istekte yeniden oluşturulur
+    invalidateYoncuClient()
+    // Eksik/yanlış ayar yüzünden park edilmiş job'lar yeni ayarlarla hemen denensin
+    await resumeParkedSendJobs().catch((error) => {
+      console.error('Park edilmiş job\'lar kuyruğa alınamadı:', error.message)
+    })
     return NextResponse.json(settings)
   } catch (error) {
     console.error('Update settings error:', error)
@@ -1,5 +1,6 @@
 import { NextRequest } from 'next/server'
 import { validateTwilioWebhook } from '@/lib/twilio'
+import { getInboundQueue } from '@/lib/inbound-ingest'
 
 function toRecord(formData: FormData): Record<string, string> {
   const out: Record<string, string> = {}
@@ -23,15 +24,18 @@ export async function POST(request: NextRequest) {
     return new Response('Invalid signature', { status: 403 })
   }
 
-  // Burada gelen mesajı DB'ye kaydedebilir / bir queue'ya atabilirsiniz.
-  // Şimdilik sadece logluyoruz.
-  console.log('[Twilio] webhook message received:', {
-    from: params.From,
-    to: params.To,
-    body: params.Body,
-    messageSid: params.MessageSid,
-    numMedia: params.NumMedia,
-  })
+  // Mesaj süreç içi kuyruğa atılır ve hemen yanıt dönülür; toplu yazma ve
+  // STOP/İPTAL -> blacklist işlemleri arka planda yapılır (lib/inbound-ingest)
+  if (params.From) {
+    getInboundQueue().enqueue({
+      channel: 'twilio',
+      from: params.From,
+      to: params.To,
+      body: params.Body,
+      externalId: params.MessageSid,
+      numMedia: parseInt(params.NumMedia || '0', 10) || 0,
+    })
+  }
 
   // Twilio webhook: 200 + TwiML (boş Response yeterli)
   return new Response('<?xml version="1.0" encoding="UTF-8"?><Response></Response>', {
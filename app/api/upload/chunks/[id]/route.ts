@@ -0,0 +1,71 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { completeChunkUpload, getChunkUpload, writeChunk } from '@/lib/media-store'
+
+export const dynamic = 'force-dynamic'
+
+type RouteParams = { params: Promise<{ id: string }> | { id: string } }
+
+// GET: Oturum durumu; alınmış parçalar listelenir, istemci eksik olanlardan devam eder
+export async function GET(request: NextRequest, { params }: RouteParams) {
+  const { id } = params instanceof Promise ? await params : params
+  const upload = await getChunkUpload(id)
+
+  if (!upload) {
+    return NextResponse.json(
+      { error: 'Yükleme oturumu bulunamadı veya süresi doldu' },
+      { status: 404 }
+    )
+  }
+
+  return NextResponse.json({ success: true, ...upload })
+}
+
+// PUT: Tek parça yükle (?index=n, ham gövde)
+export async function PUT(request: NextRequest, { params }: RouteParams) {
+  try {
+    const { id } = params instanceof Promise ? await params : params
+    const index = Number(request.nextUrl.searchParams.get('index'))
+
+    if (!request.body) {
+      return NextResponse.json({ error: 'Parça bulunamadı' }, { status: 400 })
+    }
+
+    const upload = await writeChunk(id, index, request.body)
+    return NextResponse.json({
+      success: true,
+      received: upload.received.length,
+      totalChunks: upload.totalChunks,
+    })
+  } catch (error: any) {
+    console.error('Chunk upload error:', error)
+    return NextResponse.json(
+      { error: error.message || 'Parça yüklenemedi' },
+      { status: 400 }
+    )
+  }
+}
+
+// POST: Parçaları birleştirip yüklemeyi tamamla
+export async function POST(request: NextRequest, { params }: RouteParams) {
+  try {
+    const { id } = params instanceof Promise ? await params : params
+    const media = await completeChunkUpload(id)
+
+    return NextResponse.json({
+      success: true,
+      url: media.url,
+      path: media.path,
+      type: media.media_type,
+      filename: media.filename,
+      sha256: media.sha256,
+      size: media.size_bytes,
+      deduplicated: media.deduplicated,
+    })
+  } catch (error: any) {
+    console.error('Chunk upload complete error:', error)
+    return NextResponse.json(
+      { error: error.message || 'Yükleme tamamlanamadı' },
+      { status: 500 }
+    )
+  }
+}
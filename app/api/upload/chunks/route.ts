@@ -0,0 +1,38 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { isAllowedMimeType } from '@/lib/storage'
+import { createChunkUpload, UploadTooLargeError } from '@/lib/media-store'
+
+export const dynamic = 'force-dynamic'
+
+// POST: Parçalı (devam ettirilebilir) yükleme oturumu başlat
+export async function POST(request: NextRequest) {
+  try {
+    const { filename, size, type } = await request.json()
+
+    if (!filename || !Number.isFinite(size) || size <= 0) {
+      return NextResponse.json(
+        { error: 'filename ve size gerekli' },
+        { status: 400 }
+      )
+    }
+
+    if (!isAllowedMimeType(type || '')) {
+      return NextResponse.json(
+        { error: 'Desteklenmeyen dosya tipi' },
+        { status: 400 }
+      )
+    }
+
+    const upload = await createChunkUpload({ filename, mimeType: type, size })
+    return NextResponse.json({ success: true, ...upload })
+  } catch (error: any) {
+    if (error instanceof UploadTooLargeError) {
+      return NextResponse.json({ error: error.message }, { status: 400 })
+    }
+    console.error('Chunk upload init error:', error)
+    return NextResponse.json(
+      { error: error.message || 'Yükleme başlatılamadı' },
+      { status: 500 }
+    )
+  }
+}
@@ -1,20 +1,93 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { uploadFile, validateFileSize, validateFileType } from '@/lib/storage'
+import { isAllowedMimeType } from '@/lib/storage'
+import {
+  findMediaByHash,
+  isSha256,
+  MAX_UPLOAD_BYTES,
+  MediaObject,
+  storeMediaStream,
+  UploadTooLargeError,
+} from '@/lib/media-store'
 
+export const dynamic = 'force-dynamic'
+
+function mediaPayload(media: MediaObject & { deduplicated?: boolean }, filename: string) {
+  return {
+    success: true,
+    url: media.url,
+    path: media.path,
+    type: media.media_type,
+    filename,
+    sha256: media.sha256,
+    size: media.size_bytes,
+    deduplicated: media.deduplicated ?? true,
+  }
+}
+
+// Hash ile önceden yüklenmiş dosyayı sorgula (varsa byte göndermeye gerek yok)
+export async function GET(request: NextRequest) {
+  try {
+    const sha256 = request.nextUrl.searchParams.get('sha256')?.toLowerCase()
+    if (!isSha256(sha256)) {
+      return NextResponse.json({ error: 'Geçersiz sha256' }, { status: 400 })
+    }
+
+    const media = await findMediaByHash(sha256)
+    if (!media) {
+      return NextResponse.json({ success: true, exists: false })
+    }
+
+    const filename = request.nextUrl.searchParams.get('filename') || media.filename || ''
+    return NextResponse.json({ ...mediaPayload(media, filename), exists: true })
+  } catch (error: any) {
+    console.error('Upload lookup error:', error)
+    return NextResponse.json(
+      { error: error.message || 'Dosya sorgulanırken bir hata oluştu' },
+      { status: 500 }
+    )
+  }
+}
+
+// Dosya yükle: ham gövde (?filename=, Content-Type) akışla, multipart/form-data geriye uyumluluk için
 export async function POST(request: NextRequest) {
   try {
-    const formData = await request.formData()
-    const file = formData.get('file') as File
+    const contentType = request.headers.get('content-type') || ''
+    let body: ReadableStream<Uint8Array> | null
+    let filename: string
+    let mimeType: string
+    let declaredSize: number
 
-    if (!file) {
-      return NextResponse.json(
-        { error: 'Dosya bulunamadı' },
-        { status: 400 }
-      )
+    if (contentType.startsWith('multipart/form-data')) {
+      const formData = await request.formData()
+      const file = formData.get('file') as File
+
+      if (!file) {
+        return NextResponse.json(
+          { error: 'Dosya bulunamadı' },
+          { status: 400 }
+        )
+      }
+
+      body = file.stream()
+      filename = file.name
+      mimeType = file.type
+      declaredSize = file.size
+    } else {
+      body = request.body
+      filename = request.nextUrl.searchParams.get('filename') || ''
+      mimeType = contentType.split(';')[0].trim()
+      declaredSize = Number(request.headers.get('content-length') || 0)
+
+      if (!body || !filename) {
+        return NextResponse.json(
+          { error: 'Dosya bulunamadı' },
+          { status: 400 }
+        )
+      }
     }
 
-    // Dosya boyutu kontrolü (50MB)
-    if (!validateFileSize(file, 50)) {
+    // Dosya boyutu kontrolü (50MB); akış sırasında da sayılır
+    if (declaredSize > MAX_UPLOAD_BYTES) {
       return NextResponse.json(
         { error: 'Dosya boyutu 50MB\'dan büyük olamaz' },
         { status: 400 }
@@ -22,24 +95,19 @@ export async function POST(request: NextRequest) {
     }
 
     // Dosya tipi kontrolü
-    if (!validateFileType(file)) {
+    if (!isAllowedMimeType(mimeType)) {
       return NextResponse.json(
         { error: 'Desteklenmeyen dosya tipi' },
         { status: 400 }
       )
     }
 
-    // Dosyayı yükle
-    const result = await uploadFile(file, 'uploads')
-
-    return NextResponse.json({
-      success: true,
-      url: result.url,
-      path: result.path,
-      type: result.type,
-      filename: file.name,
-    })
+    const media = await storeMediaStream(body, { filename, mimeType })
+    return NextResponse.json(mediaPayload(media, filename))
   } catch (error: any) {
+    if (error instanceof UploadTooLargeError) {
+      return NextResponse.json({ error: error.message }, { status: 400 })
+    }
     console.error('Upload error:', error)
     return NextResponse.json(
       { error: error.message || 'Dosya yüklenirken bir hata oluştu' },
@@ -2,11 +2,16 @@ import { NextResponse } from 'next/server';
 
 export const dynamic = 'force-dynamic';
 
-export async function POST() {
+export async function POST(request: Request) {
   try {
-    console.log('[API] Connect isteği alındı...');
-    const { initializeClient } = await import('@/lib/wa-web-service');
-    const result = await initializeClient();
+    const { searchParams } = new URL(request.url);
+    const sessionName = searchParams.get('session') || undefined;
+
+    console.log('[API] Connect isteği alındı...', sessionName || 'default');
+    const { initializeClient, whenSessionsRestored } = await import('@/lib/wa-web-service');
+    // Açılışta geri yüklenen client yarıda kapatılmasın
+    await whenSessionsRestored(sessionName);
+    const result = await initializeClient(sessionName);
 
     if (result.success) {
       console.log('[API] Client başlatıldı, QR kod bekleniyor...');
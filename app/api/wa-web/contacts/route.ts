@@ -2,11 +2,14 @@ import { NextResponse } from 'next/server';
 
 export const dynamic = 'force-dynamic';
 
-export async function GET() {
+export async function GET(request: Request) {
   try {
+    const { searchParams } = new URL(request.url);
+    const sessionName = searchParams.get('session') || undefined;
+
     const { getContacts } = await import('@/lib/wa-web-service');
 
-    const contacts = await getContacts();
+    const contacts = await getContacts(sessionName);
 
     return NextResponse.json({
       success: true,
@@ -0,0 +1,26 @@
+import { NextResponse } from 'next/server';
+import { subscribeSessionStatus } from '@/lib/wa-status-events';
+
+export const dynamic = 'force-dynamic';
+
+// GET: Oturum durumları için SSE akışı (ilk mesaj snapshot, sonrası sadece delta)
+export async function GET(request: Request) {
+  const { searchParams } = new URL(request.url);
+  const stream = subscribeSessionStatus(searchParams.get('session'));
+
+  if (!stream) {
+    return NextResponse.json(
+      { success: false, error: 'Çok fazla açık durum bağlantısı, polling kullanın' },
+      { status: 503 }
+    );
+  }
+
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      Connection: 'keep-alive',
+      'X-Accel-Buffering': 'no'
+    }
+  });
+}
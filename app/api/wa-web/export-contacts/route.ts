@@ -1,27 +1,33 @@
 import { NextResponse } from 'next/server';
+import { createExportStream, exportResponse, parseExportFormat, ExportColumn } from '@/lib/export-stream';
 
 export const dynamic = 'force-dynamic';
 
-export async function GET() {
-  try {
-    const { getContacts } = await import('@/lib/wa-web-service');
-
-    const contacts = await getContacts();
+const COLUMNS: ExportColumn<{ name: string; phone: string }>[] = [
+  { header: 'İsim', key: 'name', value: (c) => c.name },
+  { header: 'Numara', key: 'phone', value: (c) => c.phone }
+];
 
-    // CSV formatına dönüştür
-    const csvHeader = 'İsim,Numara\n';
-    const csvRows = contacts.map((c: any) => 
-      `"${c.name || ''}","${c.phone || ''}"`
-    ).join('\n');
+// GET: ?format=csv|ndjson&session=
+export async function GET(request: Request) {
+  try {
+    const { searchParams } = new URL(request.url);
+    const format = parseExportFormat(searchParams.get('format'));
+    const { iterateContactPages } = await import('@/lib/wa-web-service');
 
-    const csv = csvHeader + csvRows;
+    // İlk sayfa yanıt başlamadan alınır: bağlantı yoksa düzgün bir JSON hatası dönülür
+    const pages = iterateContactPages(searchParams.get('session') || undefined);
+    const first = await pages.next();
+    async function* allPages() {
+      if (!first.done) yield first.value;
+      yield* pages;
+    }
 
-    return new NextResponse(csv, {
-      headers: {
-        'Content-Type': 'text/csv; charset=utf-8',
-        'Content-Disposition': 'attachment; filename="whatsapp-contacts.csv"'
-      }
-    });
+    return exportResponse(
+      createExportStream(allPages(), COLUMNS, format),
+      'whatsapp-contacts',
+      format
+    );
   } catch (error: any) {
     console.error('Kişileri export hatası:', error);
     return NextResponse.json(
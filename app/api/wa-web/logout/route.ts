@@ -2,15 +2,18 @@ import { NextResponse } from 'next/server';
 
 export const dynamic = 'force-dynamic';
 
-export async function POST() {
+export async function POST(request: Request) {
   try {
+    const { searchParams } = new URL(request.url);
+    const sessionName = searchParams.get('session') || 'default';
+
     const { logoutWaWeb } = await import('@/lib/wa-web-service');
     const { updateSessionStatus } = await import('@/lib/db/wa-web-sessions');
 
-    await logoutWaWeb();
+    await logoutWaWeb(sessionName);
 
     // Database'i güncelle
-    await updateSessionStatus('default', 'disconnected', undefined);
+    await updateSessionStatus(sessionName, 'disconnected', null);
 
     return NextResponse.json({
       success: true,
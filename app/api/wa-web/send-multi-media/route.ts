@@ -9,6 +9,8 @@ export async function POST(request: Request) {
   try {
     const body = await request.json();
     const { phone, message, mediaItems, linkUrl, linkText } = body;
+    const { searchParams } = new URL(request.url);
+    const sessionName = searchParams.get('session') || body.sessionName || undefined;
 
     if (!phone) {
       return NextResponse.json(
@@ -33,16 +35,9 @@ export async function POST(request: Request) {
       finalMessage += linkMessage;
     }
 
-    const { sendMessage, sendMessageWithMultipleMedia, getStatus } = await import('@/lib/wa-web-service');
-    
-    // Önce bağlantı durumunu kontrol et
-    const status = await getStatus();
-    if (!status.connected) {
-      return NextResponse.json(
-        { success: false, error: 'WhatsApp bağlı değil. Lütfen önce bağlantı kurun.' },
-        { status: 400 }
-      );
-    }
+    // Bağlantı kontrolü serviste: açılış geri yüklemesi sürerken beklenir, yeniden başlatılan
+    // oturum gönderimi sıraya alır; gerçekten bağlı oturum yoksa "WhatsApp bağlı değil" döner
+    const { sendMessage, sendMessageWithMultipleMedia } = await import('@/lib/wa-web-service');
     
     // Çoklu medya var mı?
     if (mediaItems && mediaItems.length > 0) {
@@ -50,7 +45,9 @@ export async function POST(request: Request) {
       const result = await sendMessageWithMultipleMedia(
         phone,
         finalMessage,
-        mediaItems
+        mediaItems,
+        undefined,
+        sessionName
       );
 
       if (result.success) {
@@ -69,7 +66,7 @@ export async function POST(request: Request) {
     } else {
       // Sadece metin mesajı
       console.log('[API] Metin mesajı gönderiliyor');
-      const result = await sendMessage(phone, finalMessage);
+      const result = await sendMessage(phone, finalMessage, undefined, sessionName);
 
       if (result.success) {
         return NextResponse.json({ 
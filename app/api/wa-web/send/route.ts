@@ -6,6 +6,8 @@ export async function POST(request: Request) {
   try {
     const body = await request.json();
     const { phone, message, media } = body;
+    const { searchParams } = new URL(request.url);
+    const sessionName = searchParams.get('session') || body.sessionName || undefined;
 
     if (!phone) {
       return NextResponse.json(
@@ -42,7 +44,8 @@ export async function POST(request: Request) {
     const result = await sendMessage(
       phone, 
       message || '', 
-      mediaObj
+      mediaObj,
+      sessionName
     );
 
     if (result.success) {
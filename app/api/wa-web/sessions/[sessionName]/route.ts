@@ -14,7 +14,9 @@ export async function DELETE(
       )
     }
     
+    const { removeSession } = await import('@/lib/wa-web-service')
     const { deleteSession } = await import('@/lib/db/wa-web-sessions')
+    await removeSession(sessionName)
     await deleteSession(sessionName)
     
     return NextResponse.json({ success: true })
@@ -2,24 +2,38 @@ import { NextResponse } from 'next/server';
 
 export const dynamic = 'force-dynamic';
 
-export async function GET() {
+export async function GET(request: Request) {
   try {
-    const { getStatus } = await import('@/lib/wa-web-service');
-    const status = await getStatus();
+    const { searchParams } = new URL(request.url);
+    const sessionName = searchParams.get('session') || undefined;
 
-    console.log('[API] Status:', {
-      connected: status.connected,
-      hasQR: status.hasQR,
-      hasQrCode: !!status.qrCode,
-      phone: status.phone
-    });
+    const { getStatus, listSessions, getMediaCacheStats, getTransportName, getBootStatus } = await import('@/lib/wa-web-service');
+    const status = await getStatus(sessionName);
+    const metrics = listSessions().find(s => s.sessionName === (sessionName || 'default'));
 
     return NextResponse.json({
       success: true,
       connected: status.connected,
       phone: status.phone,
       hasQR: status.hasQR,
-      qrCode: status.qrCode
+      qrCode: status.qrCode,
+      transport: getTransportName(),
+      metrics: metrics
+        ? {
+            state: metrics.state,
+            messages: metrics.messages,
+            cdpCalls: metrics.cdpCalls,
+            cdpCallsPerMessage: metrics.cdpCallsPerMessage,
+            inboundLookups: metrics.inboundLookups,
+            rssBytes: metrics.rssBytes,
+            // Yeniden başlatılırken connected=false olur ama gönderimler şeritte sıraya alınır
+            recycling: metrics.recycling,
+            recycles: metrics.recycles,
+            phases: metrics.phases
+          }
+        : null,
+      boot: getBootStatus(),
+      mediaCache: getMediaCacheStats()
     });
   } catch (error: any) {
     console.error('[API] Status hatası:', error);
@@ -1,20 +1,33 @@
 import { NextResponse } from 'next/server';
-import { createClient } from '@/lib/supabase';
+import { syncWaContacts, ContactSyncProgress } from '@/lib/contact-sync';
 
 export const dynamic = 'force-dynamic';
 
+function toStats(progress: ContactSyncProgress) {
+  return {
+    total: progress.total,
+    added: progress.added,
+    updated: progress.updated,
+    unchanged: progress.unchanged,
+    errors: progress.errors,
+    chunks: progress.totalChunks,
+    roundTrips: progress.roundTrips
+  };
+}
+
 /**
  * WhatsApp'tan kişileri çekip veritabanına kaydet
  */
 export async function POST(request: Request) {
   try {
     console.log('[API] WhatsApp kişileri senkronize ediliyor...');
+    const { searchParams } = new URL(request.url);
     
     const { getContacts } = await import('@/lib/wa-web-service');
     
     let waContacts: any[] = [];
     try {
-      waContacts = await getContacts();
+      waContacts = await getContacts(searchParams.get('session') || undefined);
       console.log(`[API] ${waContacts.length} kişi WhatsApp'tan alındı`);
     } catch (error: any) {
       console.error('[API] WhatsApp kişileri alınamadı:', error);
@@ -31,82 +44,41 @@ export async function POST(request: Request) {
       }, { status: 400 });
     }
 
-    const supabase = createClient();
-    let addedCount = 0;
-    let updatedCount = 0;
-    let errorCount = 0;
-
-    for (const contact of waContacts) {
-      try {
-        // Telefon numarasını formatla (90 ile başlasın)
-        let phone = contact.phone;
-        if (!phone.startsWith('90')) {
-          phone = '90' + phone;
-        }
-
-        // İsmi parse et (genelde "Ad Soyad" formatında)
-        const nameParts = contact.name.split(' ');
-        const firstName = nameParts[0] || contact.name;
-        const lastName = nameParts.slice(1).join(' ') || '';
-
-        // Önce kişinin var olup olmadığını kontrol et
-        const { data: existing } = await supabase
-          .from('contacts')
-          .select('id')
-          .eq('phone', phone)
-          .single();
+    // Chunk'lı senkronizasyon; ?stream=1 ile her chunk sonrası ilerleme NDJSON olarak akıtılır
+    if (searchParams.get('stream') === '1') {
+      const encoder = new TextEncoder();
+      const stream = new ReadableStream({
+        async start(controller) {
+          const send = (event: object) => controller.enqueue(encoder.encode(JSON.stringify(event) + '\n'));
 
-        if (existing) {
-          // Güncelle
-          const { error } = await supabase
-            .from('contacts')
-            .update({
-              name: firstName,
-              surname: lastName,
-              updated_at: new Date().toISOString()
-            })
-            .eq('id', existing.id);
-
-          if (!error) {
-            updatedCount++;
-          } else {
-            errorCount++;
-            console.error('[Sync] Güncelleme hatası:', phone, error);
-          }
-        } else {
-          // Yeni ekle
-          const { error } = await supabase
-            .from('contacts')
-            .insert({
-              name: firstName,
-              surname: lastName,
-              phone: phone
+          try {
+            const stats = await syncWaContacts(waContacts, {
+              onProgress: (progress) => send({ type: 'progress', ...progress })
             });
-
-          if (!error) {
-            addedCount++;
-          } else {
-            errorCount++;
-            console.error('[Sync] Ekleme hatası:', phone, error);
+            send({ type: 'done', success: true, stats: toStats(stats) });
+          } catch (error: any) {
+            // Yanıt başlığı gönderildi; hata akışa olay olarak yazılır, istemci yarım akışta beklemez
+            console.error('[API] Sync contacts akış hatası:', error);
+            send({ type: 'error', success: false, error: error.message || 'Kişiler senkronize edilemedi' });
+          } finally {
+            controller.close();
           }
         }
-      } catch (error: any) {
-        console.error('[Sync] Kişi işleme hatası:', error);
-        errorCount++;
-      }
+      });
+
+      return new Response(stream, {
+        headers: { 'Content-Type': 'application/x-ndjson; charset=utf-8' }
+      });
     }
 
-    console.log(`[API] Senkronizasyon tamamlandı: ${addedCount} yeni, ${updatedCount} güncellendi, ${errorCount} hata`);
+    const stats = await syncWaContacts(waContacts);
+
+    console.log(`[API] Senkronizasyon tamamlandı: ${stats.added} yeni, ${stats.updated} güncellendi, ${stats.errors} hata (${stats.roundTrips} DB isteği)`);
 
     return NextResponse.json({
       success: true,
       message: 'Kişiler başarıyla senkronize edildi',
-      stats: {
-        total: waContacts.length,
-        added: addedCount,
-        updated: updatedCount,
-        errors: errorCount
-      }
+      stats: toStats(stats)
     });
   } catch (error: any) {
     console.error('[API] Sync contacts hatası:', error);
@@ -1,7 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { getSettings } from '@/lib/db/settings'
-import { sendMessage } from '@/lib/yoncu-api'
+import { getYoncuClient } from '@/lib/yoncu-api'
 import { createMessageHistory } from '@/lib/db/message-history'
+import { getSendScheduler } from '@/lib/send-scheduler'
 
 export async function POST(request: NextRequest) {
   try {
@@ -15,28 +15,25 @@ export async function POST(request: NextRequest) {
       )
     }
 
-    // Get settings
-    const settings = await getSettings()
-    if (!settings || !settings.service_id || !settings.auth_token) {
+    // Ayarlardan oluşturulan paylaşılan client (ayarlar önbellekte tutulur)
+    const client = await getYoncuClient()
+    if (!client) {
       return NextResponse.json(
         { error: 'API ayarları yapılandırılmamış. Lütfen ayarlar sayfasından yapılandırın.' },
         { status: 400 }
       )
     }
 
+    // Hesap, kanal ve global hız limitleri (zamanlayıcı profil aralığında bekletir)
+    await getSendScheduler().acquire({ channel: 'business_api', session: 'yoncu' })
+
     // Send message via Yoncu API (media ile)
-    const [success, responseData] = await sendMessage(
-      {
-        serviceId: settings.service_id,
-        authToken: settings.auth_token,
-      },
-      {
-        Phone: phone,
-        Message: message,
-        MediaUrl: mediaUrl,
-        MediaType: mediaType,
-      }
-    )
+    const [success, responseData] = await client.send({
+      Phone: phone,
+      Message: message,
+      MediaUrl: mediaUrl,
+      MediaType: mediaType,
+    })
 
     if (success) {
       // Save to message history as successful (media bilgisi ile)
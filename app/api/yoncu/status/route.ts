@@ -1,21 +1,17 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { getSettings } from '@/lib/db/settings'
-import { getServiceStatus } from '@/lib/yoncu-api'
+import { getYoncuClient } from '@/lib/yoncu-api'
 
 export async function GET(request: NextRequest) {
   try {
-    const settings = await getSettings()
-    if (!settings || !settings.service_id || !settings.auth_token) {
+    const client = await getYoncuClient()
+    if (!client) {
       return NextResponse.json(
         { error: 'API ayarları yapılandırılmamış' },
         { status: 400 }
       )
     }
 
-    const [success, statusData] = await getServiceStatus({
-      serviceId: settings.service_id,
-      authToken: settings.auth_token,
-    })
+    const [success, statusData] = await client.getStatus()
 
     if (success) {
       // status "1" string olarak geliyor
@@ -25,6 +21,7 @@ export async function GET(request: NextRequest) {
         status: statusData.status,
         isActive,
         message: isActive ? 'Servis aktif' : 'Servis pasif',
+        metrics: client.getMetrics(),
       })
     } else {
       return NextResponse.json(
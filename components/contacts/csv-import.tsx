@@ -10,7 +10,7 @@ import {
   DialogHeader,
   DialogTitle,
 } from '@/components/ui/dialog'
-import { parseContactsFile, downloadCSVTemplate } from '@/lib/csv-parser'
+import { downloadCSVTemplate } from '@/lib/csv-parser'
 import { Upload, Download, AlertCircle, CheckCircle2 } from 'lucide-react'
 import { useToast } from '@/components/ui/use-toast'
 
@@ -20,77 +20,109 @@ interface CSVImportProps {
   onSuccess: () => void
 }
 
+interface ImportResult {
+  importId: string
+  rows: number
+  added: number
+  updated: number
+  duplicates: number
+  invalid: number
+  errors: number
+  rejectsAvailable?: boolean
+}
+
 export function CSVImport({ open, onOpenChange, onSuccess }: CSVImportProps) {
   const { toast } = useToast()
   const [file, setFile] = useState<File | null>(null)
   const [parsing, setParsing] = useState(false)
-  const [result, setResult] = useState<{
-    valid: number
-    invalid: number
-    errors: Array<{ row: number; error: string }>
-  } | null>(null)
+  const [progress, setProgress] = useState<ImportResult | null>(null)
+  const [result, setResult] = useState<ImportResult | null>(null)
 
   const handleFileChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     const selectedFile = e.target.files?.[0]
     if (selectedFile) {
       setFile(selectedFile)
       setResult(null)
+      setProgress(null)
     }
   }
 
   const handleImport = async () => {
     if (!file) return
 
+    if (file.name.split('.').pop()?.toLowerCase() !== 'csv') {
+      toast({
+        title: 'Hata!',
+        description: 'Desteklenmeyen dosya formatı. Sadece CSV destekleniyor.',
+        variant: 'destructive',
+      })
+      return
+    }
+
     setParsing(true)
+    setProgress(null)
     try {
-      const parseResult = await parseContactsFile(file)
-
-      if (parseResult.valid.length > 0) {
-        // Bulk create contacts
-        const response = await fetch('/api/contacts', {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify(parseResult.valid),
-        })
+      // Dosya olduğu gibi gönderilir; ayrıştırma ve kayıt sunucuda akış halinde yapılır
+      const response = await fetch(`/api/contacts/import?filename=${encodeURIComponent(file.name)}`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'text/csv',
+        },
+        body: file,
+      })
+
+      if (!response.ok || !response.body) {
+        throw new Error('İçe aktarma başarısız')
+      }
+
+      // NDJSON ilerleme akışı
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      let done: any = null
 
-        if (!response.ok) {
-          throw new Error('İçe aktarma başarısız')
+      while (true) {
+        const { value, done: streamDone } = await reader.read()
+        if (streamDone) break
+        buffer += decoder.decode(value, { stream: true })
+
+        const lines = buffer.split('\n')
+        buffer = lines.pop() || ''
+        for (const line of lines) {
+          if (!line.trim()) continue
+          const event = JSON.parse(line)
+          if (event.type === 'progress') {
+            setProgress(event)
+          } else if (event.type === 'done') {
+            done = event
+          }
         }
+      }
 
-        setResult({
-          valid: parseResult.valid.length,
-          invalid: parseResult.invalid.length,
-          errors: parseResult.invalid.map((item) => ({
-            row: item.row,
-            error: item.error,
-          })),
-        })
+      if (!done || !done.success) {
+        throw new Error(done?.error || 'İçe aktarma başarısız')
+      }
+
+      setResult(done)
+      const imported = done.added + done.updated
 
+      if (imported > 0) {
         toast({
           title: 'Başarılı!',
-          description: `${parseResult.valid.length} kişi başarıyla içe aktarıldı.`,
+          description: `${imported} kişi başarıyla içe aktarıldı.`,
         })
 
-        if (parseResult.invalid.length === 0) {
+        if (done.invalid === 0 && done.errors === 0) {
           setTimeout(() => {
             onSuccess()
             onOpenChange(false)
             setFile(null)
             setResult(null)
           }, 2000)
+        } else {
+          onSuccess()
         }
       } else {
-        setResult({
-          valid: 0,
-          invalid: parseResult.invalid.length,
-          errors: parseResult.invalid.map((item) => ({
-            row: item.row,
-            error: item.error,
-          })),
-        })
-
         toast({
           title: 'Hata!',
           description: 'Geçerli kişi bulunamadı.',
@@ -155,7 +187,7 @@ export function CSVImport({ open, onOpenChange, onSuccess }: CSVImportProps) {
                   disabled={parsing}
                 >
                   {parsing ? (
-                    'İşleniyor...'
+                    progress ? `İşleniyor... (${progress.rows} satır)` : 'İşleniyor...'
                   ) : (
                     <>
                       <Upload className="mr-2 h-4 w-4" />
@@ -177,33 +209,32 @@ export function CSVImport({ open, onOpenChange, onSuccess }: CSVImportProps) {
                 <div className="flex items-center gap-2 p-3 bg-green-500/10 text-green-700 dark:text-green-400 rounded-lg">
                   <CheckCircle2 className="h-5 w-5" />
                   <div>
-                    <p className="font-semibold">{result.valid}</p>
+                    <p className="font-semibold">{result.added + result.updated}</p>
                     <p className="text-xs">Başarılı</p>
                   </div>
                 </div>
                 <div className="flex items-center gap-2 p-3 bg-red-500/10 text-red-700 dark:text-red-400 rounded-lg">
                   <AlertCircle className="h-5 w-5" />
                   <div>
-                    <p className="font-semibold">{result.invalid}</p>
+                    <p className="font-semibold">{result.invalid + result.errors}</p>
                     <p className="text-xs">Hatalı</p>
                   </div>
                 </div>
               </div>
 
-              {result.errors.length > 0 && (
-                <div className="space-y-2">
-                  <p className="font-medium text-sm">Hatalar:</p>
-                  <div className="max-h-48 overflow-y-auto space-y-1">
-                    {result.errors.map((error, index) => (
-                      <div
-                        key={index}
-                        className="text-xs p-2 bg-destructive/10 text-destructive rounded"
-                      >
-                        Satır {error.row}: {error.error}
-                      </div>
-                    ))}
-                  </div>
-                </div>
+              <p className="text-xs text-muted-foreground">
+                {result.rows} satır okundu: {result.added} yeni, {result.updated} güncellendi
+                {result.duplicates > 0 && `, ${result.duplicates} tekrar eden numara atlandı`}
+                {result.errors > 0 && `, ${result.errors} kayıt veritabanına yazılamadı`}
+              </p>
+
+              {result.rejectsAvailable && (
+                <Button variant="outline" size="sm" asChild>
+                  <a href={`/api/contacts/import/${result.importId}/rejects`} download>
+                    <Download className="mr-2 h-4 w-4" />
+                    Hatalı Satırları İndir
+                  </a>
+                </Button>
               )}
             </div>
           )}
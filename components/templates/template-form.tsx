@@ -19,6 +19,7 @@ import { Template } from '@/types'
 import { useState, useEffect } from 'react'
 import { Upload, X, FileText, Image as ImageIcon, Video, Music, Link2 } from 'lucide-react'
 import { useToast } from '@/components/ui/use-toast'
+import { uploadMedia as uploadMediaFile } from '@/lib/media-upload'
 
 const templateSchema = z.object({
   name: z.string().min(1, 'Şablon adı gereklidir'),
@@ -171,20 +172,7 @@ export function TemplateForm({ open, onOpenChange, template, onSuccess }: Templa
 
     setUploading(true)
     try {
-      const formData = new FormData()
-      formData.append('file', mediaFile)
-
-      const response = await fetch('/api/upload', {
-        method: 'POST',
-        body: formData,
-      })
-
-      if (!response.ok) {
-        const error = await response.json()
-        throw new Error(error.error || 'Dosya yüklenemedi')
-      }
-
-      const data = await response.json()
+      const data = await uploadMediaFile(mediaFile)
       return {
         url: data.url,
         type: data.type,
@@ -0,0 +1,88 @@
+'use client'
+
+import { useEffect, useRef } from 'react'
+
+export interface WaStatusDelta {
+  sessionName: string
+  status?: string
+  state?: string | null
+  connected?: boolean
+  phone?: string | null
+  qrCode?: string | null
+}
+
+interface Handlers {
+  // İlk bağlantıda gelen tam durum
+  onSnapshot?: (sessions: WaStatusDelta[]) => void
+  // Sonraki değişiklikler (sadece değişen alanlar)
+  onStatus?: (delta: WaStatusDelta) => void
+  onRemoved?: (sessionName: string) => void
+  // SSE kullanılamıyorsa (bağlantı sınırı, proxy vb.) çağrılır
+  onFallbackPoll?: () => void
+}
+
+const FALLBACK_POLL_MS = 5000
+const MAX_RETRIES = 3
+
+/**
+ * /api/wa-web/events SSE akışına abone olur.
+ * Bağlantı tekrar tekrar koparsa polling'e (FALLBACK_POLL_MS) geri döner.
+ */
+export function useWaStatusEvents(sessionName: string | null, handlers: Handlers) {
+  const handlersRef = useRef(handlers)
+  handlersRef.current = handlers
+
+  useEffect(() => {
+    let source: EventSource | null = null
+    let pollTimer: ReturnType<typeof setInterval> | null = null
+    let failures = 0
+    let closed = false
+
+    const startPolling = () => {
+      if (pollTimer || closed) return
+      handlersRef.current.onFallbackPoll?.()
+      pollTimer = setInterval(() => handlersRef.current.onFallbackPoll?.(), FALLBACK_POLL_MS)
+    }
+
+    const connect = () => {
+      if (typeof EventSource === 'undefined') {
+        startPolling()
+        return
+      }
+
+      const url = sessionName
+        ? `/api/wa-web/events?session=${encodeURIComponent(sessionName)}`
+        : '/api/wa-web/events'
+      source = new EventSource(url)
+
+      source.addEventListener('snapshot', (event) => {
+        failures = 0
+        const data = JSON.parse((event as MessageEvent).data)
+        handlersRef.current.onSnapshot?.(data.sessions || [])
+      })
+      source.addEventListener('status', (event) => {
+        handlersRef.current.onStatus?.(JSON.parse((event as MessageEvent).data))
+      })
+      source.addEventListener('removed', (event) => {
+        handlersRef.current.onRemoved?.(JSON.parse((event as MessageEvent).data).sessionName)
+      })
+      source.onerror = () => {
+        // 503 (bağlantı sınırı) gibi durumlarda EventSource kendini kapatır
+        failures++
+        if (source?.readyState === EventSource.CLOSED || failures >= MAX_RETRIES) {
+          source?.close()
+          source = null
+          startPolling()
+        }
+      }
+    }
+
+    connect()
+
+    return () => {
+      closed = true
+      source?.close()
+      if (pollTimer) clearInterval(pollTimer)
+    }
+  }, [sessionName])
+}
@@ -0,0 +1,153 @@
+-- Campaign Aggregates Migration
+-- Kampanya sayaçlarını ve rapor istatistiklerini veritabanında hesaplar;
+-- raporlar artık tüm send_jobs satırlarını Node'a çekmez.
+-- Supabase SQL Editor'da çalıştırın
+
+-- 1. Durum bazlı sayaçlar (total_recipients, sent_count, failed_count zaten var)
+ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS pending_count INTEGER DEFAULT 0;
+ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS processing_count INTEGER DEFAULT 0;
+ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS blocked_count INTEGER DEFAULT 0;
+
+-- 2. Rapor sorguları ve keyset sayfalama için index'ler
+CREATE INDEX IF NOT EXISTS idx_send_jobs_campaign_status ON send_jobs(campaign_id, status);
+CREATE INDEX IF NOT EXISTS idx_send_jobs_campaign_created_id ON send_jobs(campaign_id, created_at, id);
+
+-- 3. Sayaç değişikliklerini kampanyalara uygula
+-- delta: (campaign_id, status, adet) satırları; adet negatif olabilir
+CREATE OR REPLACE FUNCTION apply_campaign_job_deltas(p_deltas JSONB)
+RETURNS VOID AS $$
+BEGIN
+  UPDATE campaigns c
+  SET total_recipients = GREATEST(0, COALESCE(c.total_recipients, 0) + d.total),
+      pending_count    = GREATEST(0, COALESCE(c.pending_count, 0) + d.pending),
+      processing_count = GREATEST(0, COALESCE(c.processing_count, 0) + d.processing),
+      sent_count       = GREATEST(0, COALESCE(c.sent_count, 0) + d.sent),
+      failed_count     = GREATEST(0, COALESCE(c.failed_count, 0) + d.failed),
+      blocked_count    = GREATEST(0, COALESCE(c.blocked_count, 0) + d.blocked)
+  FROM (
+    SELECT (x->>'campaign_id')::UUID AS campaign_id,
+           COALESCE(SUM((x->>'n')::INTEGER) FILTER (WHERE x->>'kind' = 'total'), 0) AS total,
+           COALESCE(SUM((x->>'n')::INTEGER) FILTER (WHERE x->>'kind' = 'pending'), 0) AS pending,
+           COALESCE(SUM((x->>'n')::INTEGER) FILTER (WHERE x->>'kind' = 'processing'), 0) AS processing,
+           COALESCE(SUM((x->>'n')::INTEGER) FILTER (WHERE x->>'kind' = 'sent'), 0) AS sent,
+           COALESCE(SUM((x->>'n')::INTEGER) FILTER (WHERE x->>'kind' = 'failed'), 0) AS failed,
+           COALESCE(SUM((x->>'n')::INTEGER) FILTER (WHERE x->>'kind' = 'blocked'), 0) AS blocked
+    FROM jsonb_array_elements(p_deltas) x
+    GROUP BY 1
+  ) d
+  WHERE c.id = d.campaign_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. Statement seviyesinde trigger'lar: toplu insert/update tek bir UPDATE ile sayılır
+-- (her satır için kampanya satırını kilitlemek yerine transition table'lar gruplanır)
+CREATE OR REPLACE FUNCTION send_jobs_counters_after_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM apply_campaign_job_deltas(COALESCE((
+    SELECT jsonb_agg(jsonb_build_object('campaign_id', campaign_id, 'kind', kind, 'n', n))
+    FROM (
+      SELECT campaign_id, status AS kind, COUNT(*) AS n FROM new_rows GROUP BY 1, 2
+      UNION ALL
+      SELECT campaign_id, 'total', COUNT(*) FROM new_rows GROUP BY 1
+    ) s
+  ), '[]'::JSONB));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION send_jobs_counters_after_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM apply_campaign_job_deltas(COALESCE((
+    SELECT jsonb_agg(jsonb_build_object('campaign_id', campaign_id, 'kind', kind, 'n', n))
+    FROM (
+      SELECT o.campaign_id, o.status AS kind, -COUNT(*) AS n
+      FROM old_rows o JOIN new_rows n ON n.id = o.id
+      WHERE o.status IS DISTINCT FROM n.status
+      GROUP BY 1, 2
+      UNION ALL
+      SELECT n.campaign_id, n.status, COUNT(*)
+      FROM old_rows o JOIN new_rows n ON n.id = o.id
+      WHERE o.status IS DISTINCT FROM n.status
+      GROUP BY 1, 2
+    ) s
+  ), '[]'::JSONB));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION send_jobs_counters_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM apply_campaign_job_deltas(COALESCE((
+    SELECT jsonb_agg(jsonb_build_object('campaign_id', campaign_id, 'kind', kind, 'n', -n))
+    FROM (
+      SELECT campaign_id, status AS kind, COUNT(*) AS n FROM old_rows GROUP BY 1, 2
+      UNION ALL
+      SELECT campaign_id, 'total', COUNT(*) FROM old_rows GROUP BY 1
+    ) s
+  ), '[]'::JSONB));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS send_jobs_counters_insert ON send_jobs;
+CREATE TRIGGER send_jobs_counters_insert
+  AFTER INSERT ON send_jobs
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION send_jobs_counters_after_insert();
+
+DROP TRIGGER IF EXISTS send_jobs_counters_update ON send_jobs;
+CREATE TRIGGER send_jobs_counters_update
+  AFTER UPDATE ON send_jobs
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION send_jobs_counters_after_update();
+
+DROP TRIGGER IF EXISTS send_jobs_counters_delete ON send_jobs;
+CREATE TRIGGER send_jobs_counters_delete
+  AFTER DELETE ON send_jobs
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION send_jobs_counters_after_delete();
+
+-- 5. Durum bazlı job sayıları (GROUP BY, satırlar Node'a taşınmaz)
+CREATE OR REPLACE FUNCTION campaign_job_status_counts(p_campaign_id UUID)
+RETURNS TABLE(status TEXT, count BIGINT) AS $$
+  SELECT sj.status, COUNT(*)
+  FROM send_jobs sj
+  WHERE sj.campaign_id = p_campaign_id
+  GROUP BY sj.status;
+$$ LANGUAGE sql STABLE;
+
+-- 6. last_error histogramı (en sık görülen hatalar önce)
+CREATE OR REPLACE FUNCTION campaign_error_histogram(p_campaign_id UUID, p_limit INTEGER DEFAULT 20)
+RETURNS TABLE(error TEXT, count BIGINT) AS $$
+  SELECT sj.last_error, COUNT(*)
+  FROM send_jobs sj
+  WHERE sj.campaign_id = p_campaign_id
+    AND sj.last_error IS NOT NULL
+  GROUP BY sj.last_error
+  ORDER BY COUNT(*) DESC, sj.last_error
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- 7. Mevcut kampanyaların sayaçlarını bir kez doldur
+UPDATE campaigns c
+SET total_recipients = COALESCE(s.total, 0),
+    pending_count    = COALESCE(s.pending, 0),
+    processing_count = COALESCE(s.processing, 0),
+    sent_count       = COALESCE(s.sent, 0),
+    failed_count     = COALESCE(s.failed, 0),
+    blocked_count    = COALESCE(s.blocked, 0)
+FROM (
+  SELECT campaign_id,
+         COUNT(*) AS total,
+         COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+         COUNT(*) FILTER (WHERE status = 'processing') AS processing,
+         COUNT(*) FILTER (WHERE status = 'sent') AS sent,
+         COUNT(*) FILTER (WHERE status = 'failed') AS failed,
+         COUNT(*) FILTER (WHERE status = 'blocked') AS blocked
+  FROM send_jobs
+  GROUP BY campaign_id
+) s
+WHERE c.id = s.campaign_id;
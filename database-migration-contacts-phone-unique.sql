@@ -0,0 +1,51 @@
+-- Contacts - Telefon Numarası Tekilliği
+-- Toplu senkronizasyon upsert(..., { onConflict: 'phone' }) kullanır,
+-- bunun için contacts.phone üzerinde unique constraint gerekir.
+-- Supabase SQL Editor'da çalıştırın
+
+-- 1. Aynı telefon numarasına sahip tekrar eden kayıtları bul (en eski kayıt kalır)
+DROP TABLE IF EXISTS contact_duplicates;
+CREATE TEMP TABLE contact_duplicates AS
+SELECT c.id AS duplicate_id, keep.id AS keep_id
+FROM contacts c
+JOIN LATERAL (
+  SELECT d.id
+  FROM contacts d
+  WHERE d.phone = c.phone
+  ORDER BY d.created_at, d.id
+  LIMIT 1
+) keep ON keep.id <> c.id;
+
+-- 2. Silinecek kayıtların ilişkilerini kalan kayda taşı
+-- (group_contacts ON DELETE CASCADE ile grup üyelikleri kaybolmasın,
+--  send_jobs.recipient_contact_id ON DELETE SET NULL ile boşalmasın)
+INSERT INTO group_contacts (group_id, contact_id, added_at)
+SELECT gc.group_id, m.keep_id, gc.added_at
+FROM group_contacts gc
+JOIN contact_duplicates m ON m.duplicate_id = gc.contact_id
+ON CONFLICT DO NOTHING;
+
+UPDATE send_jobs sj
+SET recipient_contact_id = m.keep_id
+FROM contact_duplicates m
+WHERE sj.recipient_contact_id = m.duplicate_id;
+
+-- 3. Tekrar eden kayıtları sil
+DELETE FROM contacts c
+USING contact_duplicates m
+WHERE c.id = m.duplicate_id;
+
+DROP TABLE contact_duplicates;
+
+-- 4. Unique constraint ekle
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'contacts_phone_key'
+    ) THEN
+        ALTER TABLE contacts ADD CONSTRAINT contacts_phone_key UNIQUE (phone);
+        RAISE NOTICE 'contacts_phone_key eklendi';
+    ELSE
+        RAISE NOTICE 'contacts_phone_key zaten mevcut';
+    END IF;
+END $$;
@@ -0,0 +1,28 @@
+-- Inbound Messages Migration
+-- WA Web ve Twilio'dan gelen mesajlar (STOP/İPTAL ile otomatik blacklist)
+-- Supabase SQL Editor'da çalıştırın
+
+CREATE TABLE IF NOT EXISTS inbound_messages (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  channel TEXT NOT NULL CHECK (channel IN ('wa_web', 'twilio')),
+  phone TEXT NOT NULL,
+  to_phone TEXT,
+  body TEXT NOT NULL DEFAULT '',
+  -- WA mesaj id'si veya Twilio MessageSid; webhook tekrarları çift kayıt oluşturmaz
+  external_id TEXT,
+  session_name TEXT,
+  num_media INTEGER NOT NULL DEFAULT 0,
+  is_opt_out BOOLEAN NOT NULL DEFAULT false,
+  received_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_inbound_messages_channel_external_id
+  ON inbound_messages(channel, external_id);
+CREATE INDEX IF NOT EXISTS idx_inbound_messages_received_at ON inbound_messages(received_at DESC);
+CREATE INDEX IF NOT EXISTS idx_inbound_messages_phone ON inbound_messages(phone);
+
+ALTER TABLE inbound_messages ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Enable all operations" ON inbound_messages;
+CREATE POLICY "Enable all operations" ON inbound_messages FOR ALL USING (true);
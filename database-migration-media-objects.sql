@@ -0,0 +1,20 @@
+-- Media Objects Migration
+-- Yüklenen medya dosyalarının içerik hash'i (SHA-256) -> URL indeksi.
+-- Aynı dosya tekrar yüklendiğinde byte aktarılmadan mevcut URL döner.
+-- Supabase SQL Editor'da çalıştırın
+
+CREATE TABLE IF NOT EXISTS media_objects (
+  sha256 TEXT PRIMARY KEY CHECK (sha256 ~ '^[0-9a-f]{64}$'),
+  path TEXT NOT NULL,
+  url TEXT NOT NULL,
+  size_bytes BIGINT NOT NULL,
+  mime_type TEXT,
+  media_type TEXT CHECK (media_type IN ('image', 'video', 'document', 'audio')),
+  filename TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE media_objects ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Enable all operations" ON media_objects;
+CREATE POLICY "Enable all operations" ON media_objects FOR ALL USING (true);
@@ -0,0 +1,20 @@
+-- Message History Search Migration
+-- Mesaj geçmişinde keyset sayfalama ve index destekli arama için
+-- Supabase SQL Editor'da çalıştırın
+
+-- 1. Keyset sayfalama: (sent_at, id) sırası tek bir index taramasıyla okunur
+CREATE INDEX IF NOT EXISTS idx_message_history_sent_at_id ON message_history(sent_at DESC, id DESC);
+
+-- 2. Durum bazlı sayımlar (Başarılı / Başarısız kartları)
+CREATE INDEX IF NOT EXISTS idx_message_history_status_sent_at ON message_history(status, sent_at);
+
+-- 3. Trigram index'leri: '%arama%' biçimindeki ILIKE sorguları artık index kullanır
+-- (phone / message / contact_name üzerindeki OR aramasında BitmapOr ile birleşir)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_message_history_phone_trgm ON message_history USING GIN (phone gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_message_history_message_trgm ON message_history USING GIN (message gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_message_history_contact_name_trgm ON message_history USING GIN (contact_name gin_trgm_ops);
+
+-- 4. Planlayıcı tahminlerinin (count=estimated) güncel olması için istatistikleri yenile
+ANALYZE message_history;
@@ -0,0 +1,56 @@
+-- Send Jobs Dispatcher Migration
+-- Sunucu tarafı dispatcher'ın send_jobs kuyruğunu atomik olarak tüketmesi için
+-- Supabase SQL Editor'da çalıştırın
+
+-- 1. Job'u hangi worker'ın aldığını tut
+ALTER TABLE send_jobs ADD COLUMN IF NOT EXISTS claimed_by TEXT;
+ALTER TABLE send_jobs ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP WITH TIME ZONE;
+
+-- 2. Bekleyen job taraması için bileşik index
+CREATE INDEX IF NOT EXISTS idx_send_jobs_status_scheduled_at ON send_jobs(status, scheduled_at);
+
+-- 3. Zamanı gelmiş job'ları atomik olarak sahiplen
+-- FOR UPDATE SKIP LOCKED sayesinde iki worker aynı job'u asla alamaz.
+-- Sadece 'scheduled' veya 'running' durumundaki kampanyaların job'ları alınır
+-- (duraklatılmış kampanyalar atlanır).
+CREATE OR REPLACE FUNCTION claim_send_jobs(p_limit INTEGER, p_worker_id TEXT)
+RETURNS SETOF send_jobs AS $$
+BEGIN
+  RETURN QUERY
+  UPDATE send_jobs sj
+  SET status = 'processing',
+      claimed_by = p_worker_id,
+      claimed_at = NOW(),
+      processed_at = NOW()
+  WHERE sj.id IN (
+    SELECT j.id
+    FROM send_jobs j
+    JOIN campaigns c ON c.id = j.campaign_id
+    WHERE j.status = 'pending'
+      AND j.scheduled_at <= NOW()
+      AND c.status IN ('scheduled', 'running')
+    ORDER BY j.scheduled_at ASC
+    LIMIT p_limit
+    FOR UPDATE OF j SKIP LOCKED
+  )
+  RETURNING sj.*;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. Çöken worker'ların 'processing' durumunda bıraktığı job'ları kuyruğa geri al
+CREATE OR REPLACE FUNCTION release_stale_send_jobs(p_timeout_seconds INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+  released INTEGER;
+BEGIN
+  UPDATE send_jobs
+  SET status = 'pending',
+      claimed_by = NULL,
+      claimed_at = NULL
+  WHERE status = 'processing'
+    AND claimed_at < NOW() - make_interval(secs => p_timeout_seconds);
+
+  GET DIAGNOSTICS released = ROW_COUNT;
+  RETURN released;
+END;
+$$ LANGUAGE plpgsql;
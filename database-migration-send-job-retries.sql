@@ -0,0 +1,20 @@
+-- Send Job Retries Migration
+-- Başarısız gönderimlerin sınıflandırılması, tekrar denenmesi ve dead-letter takibi
+-- Supabase SQL Editor'da çalıştırın
+
+-- 1. Son hatanın sınıfı: transient (tekrar denenir), session (oturum hazır olana kadar park),
+--    permanent (geçersiz numara, kara liste; tekrar denenmez)
+ALTER TABLE send_jobs ADD COLUMN IF NOT EXISTS error_class TEXT
+  CHECK (error_class IN ('transient', 'session', 'permanent'));
+
+-- 2. Deneme hakkı bitmiş veya kalıcı hata almış job'lar 'failed' durumunda dead-letter'dır
+ALTER TABLE send_jobs ADD COLUMN IF NOT EXISTS dead_lettered_at TIMESTAMP WITH TIME ZONE;
+
+UPDATE send_jobs
+SET dead_lettered_at = COALESCE(last_error_at, processed_at, created_at)
+WHERE status = 'failed' AND dead_lettered_at IS NULL;
+
+-- 3. Oturum hazır olduğunda park edilmiş job'ları hızlı bulmak için
+CREATE INDEX IF NOT EXISTS idx_send_jobs_parked
+  ON send_jobs(scheduled_at)
+  WHERE status = 'pending' AND error_class = 'session';
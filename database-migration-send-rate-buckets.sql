@@ -0,0 +1,82 @@
+-- Send Rate Buckets Migration
+-- Hiyerarşik token bucket hız limitleri (global -> kanal -> oturum -> kampanya).
+-- Kovalar bu tabloda tutulur; birden çok Node süreci aynı limiti paylaşır.
+-- Supabase SQL Editor'da çalıştırın
+
+CREATE TABLE IF NOT EXISTS send_rate_buckets (
+  key TEXT PRIMARY KEY,
+  tokens DOUBLE PRECISION NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  -- Mesajlar arası jitter'lı bekleme: bu zamandan önce token verilmez
+  next_at TIMESTAMP WITH TIME ZONE
+);
+
+ALTER TABLE send_rate_buckets ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Enable all operations" ON send_rate_buckets;
+CREATE POLICY "Enable all operations" ON send_rate_buckets FOR ALL USING (true);
+
+-- p_buckets: [{ "key": "session:wa_web:default:s", "capacity": 1, "refill_per_sec": 1, "gap_ms": 3200 }, ...]
+-- Tüm kovalarda token varsa hepsinden birer token düşer ve 0 döner.
+-- Yoksa hiçbir kovaya dokunmadan beklenmesi gereken süre (ms) döner.
+CREATE OR REPLACE FUNCTION take_send_tokens(p_buckets JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_now TIMESTAMP WITH TIME ZONE := clock_timestamp();
+  v_spec RECORD;
+  v_bucket send_rate_buckets%ROWTYPE;
+  v_available DOUBLE PRECISION;
+  v_wait_ms INTEGER := 0;
+BEGIN
+  INSERT INTO send_rate_buckets (key, tokens, updated_at)
+  SELECT b->>'key', (b->>'capacity')::DOUBLE PRECISION, v_now
+  FROM jsonb_array_elements(p_buckets) b
+  ORDER BY b->>'key'
+  ON CONFLICT (key) DO NOTHING;
+
+  -- Satırlar her zaman anahtar sırasıyla kilitlenir (eşzamanlı worker'larda deadlock olmaz)
+  FOR v_spec IN
+    SELECT b->>'key' AS key,
+           (b->>'capacity')::DOUBLE PRECISION AS capacity,
+           (b->>'refill_per_sec')::DOUBLE PRECISION AS refill
+    FROM jsonb_array_elements(p_buckets) b
+    ORDER BY b->>'key'
+  LOOP
+    SELECT * INTO v_bucket FROM send_rate_buckets WHERE key = v_spec.key FOR UPDATE;
+
+    v_available := LEAST(
+      v_spec.capacity,
+      v_bucket.tokens + EXTRACT(EPOCH FROM (v_now - v_bucket.updated_at)) * v_spec.refill
+    );
+
+    IF v_available < 1 THEN
+      v_wait_ms := GREATEST(v_wait_ms, CEIL((1 - v_available) / v_spec.refill * 1000)::INTEGER);
+    END IF;
+
+    IF v_bucket.next_at IS NOT NULL AND v_bucket.next_at > v_now THEN
+      v_wait_ms := GREATEST(v_wait_ms, CEIL(EXTRACT(EPOCH FROM (v_bucket.next_at - v_now)) * 1000)::INTEGER);
+    END IF;
+  END LOOP;
+
+  IF v_wait_ms > 0 THEN
+    RETURN v_wait_ms;
+  END IF;
+
+  UPDATE send_rate_buckets r
+  SET tokens = LEAST(s.capacity, r.tokens + EXTRACT(EPOCH FROM (v_now - r.updated_at)) * s.refill) - 1,
+      updated_at = v_now,
+      next_at = CASE WHEN s.gap_ms IS NOT NULL THEN v_now + s.gap_ms * INTERVAL '1 millisecond' ELSE r.next_at END
+  FROM (
+    SELECT b->>'key' AS key,
+           (b->>'capacity')::DOUBLE PRECISION AS capacity,
+           (b->>'refill_per_sec')::DOUBLE PRECISION AS refill,
+           (b->>'gap_ms')::INTEGER AS gap_ms
+    FROM jsonb_array_elements(p_buckets) b
+  ) s
+  WHERE r.key = s.key;
+
+  RETURN 0;
+END;
+$$;
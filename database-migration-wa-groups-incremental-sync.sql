@@ -0,0 +1,24 @@
+-- WA Groups - Artımlı Grup Senkronizasyonu
+-- Değişmemiş grupları atlamak ve WhatsApp grubunu yerel gruba bağlamak için
+-- Supabase SQL Editor'da çalıştırın
+
+-- 1. Katılımcı kümesinin özeti (değişmediyse grup atlanır)
+ALTER TABLE wa_groups ADD COLUMN IF NOT EXISTS participants_hash TEXT;
+
+-- 2. WhatsApp grubunun bağlı olduğu yerel grup (isimle tekrar aramaya gerek kalmaz)
+ALTER TABLE wa_groups ADD COLUMN IF NOT EXISTS local_group_id UUID REFERENCES groups(id) ON DELETE SET NULL;
+
+-- 2a. Tek seferlik eşleştirme: önceki sürüm grupları isimle bağlıyordu. Bağlantısı olmayan
+-- WhatsApp grupları, ismi her iki tarafta da tek olan yerel gruba bağlanır; aksi halde ilk
+-- senkronizasyon tüm grupları ve üyelikleri yeniden oluştururdu. Belirsiz isimler bağlanmaz.
+UPDATE wa_groups w
+SET local_group_id = g.id
+FROM groups g
+WHERE w.local_group_id IS NULL
+  AND g.name = w.name
+  AND (SELECT COUNT(*) FROM groups g2 WHERE g2.name = w.name) = 1
+  AND (SELECT COUNT(*) FROM wa_groups w2 WHERE w2.name = w.name) = 1;
+
+-- 3. Senkronizasyonun eklediği üyelikler; yalnızca bunlar WhatsApp'tan çıkınca silinir,
+-- elle eklenen üyeler korunur
+ALTER TABLE group_contacts ADD COLUMN IF NOT EXISTS synced_from_wa BOOLEAN NOT NULL DEFAULT false;
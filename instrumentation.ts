@@ -0,0 +1,25 @@
+/**
+ * Sunucu açılış kancası (Next.js instrumentation)
+ * - send_jobs dispatcher'ı başlatılır (SEND_DISPATCHER_ENABLED=false ile kapatılır); deploy veya
+ *   çökme sonrası running/scheduled kampanyalar kimse bir şeye tıklamadan gönderilmeye devam eder.
+ * - WA_RESTORE_ON_BOOT=true ise ./.wwebjs_auth altında kayıtlı WhatsApp Web oturumları
+ *   paralel olarak geri yüklenir; gönderim route'ları oturumlar hazır olana kadar bekler.
+ */
+export async function register() {
+  // Edge derlemesine whatsapp-web.js / child_process girmesin diye import'lar bu blokta kalmalı
+  if (process.env.NEXT_RUNTIME === 'nodejs') {
+    if (process.env.SEND_DISPATCHER_ENABLED !== 'false') {
+      const { startDispatcher } = await import('./lib/send-dispatcher');
+      startDispatcher();
+    }
+
+    if (process.env.WA_RESTORE_ON_BOOT !== 'true') return;
+
+    const { restoreSavedSessions } = await import('./lib/wa-web-service');
+
+    // Sunucu açılışı beklemesin; istekler whenSessionsRestored ile bekler
+    restoreSavedSessions().catch((error) => {
+      console.error('[WA] Açılışta oturum geri yükleme hatası:', error.message);
+    });
+  }
+}
@@ -1,5 +1,5 @@
 import { Contact } from '@/types';
-import { isPhoneBlacklisted } from './db/blacklist';
+import { getBlacklistedPhones } from './db/blacklist';
 
 /**
  * Uyum kontrolü sonuçları
@@ -8,6 +8,7 @@ export interface ComplianceCheckResult {
   passed: boolean;
   errors: string[];
   warnings: string[];
+  blockedPhones?: string[];
 }
 
 /**
@@ -94,14 +95,11 @@ export async function checkRecipientsCompliance(
     }
   }
 
-  // Blacklist kontrolü
-  const blacklistedPhones: string[] = [];
-  for (const recipient of recipients) {
-    const isBlacklisted = await isPhoneBlacklisted(recipient.phone);
-    if (isBlacklisted) {
-      blacklistedPhones.push(recipient.phone);
-    }
-  }
+  // Blacklist kontrolü (tüm liste için toplu)
+  const blacklisted = await getBlacklistedPhones(recipients.map(r => r.phone));
+  const blacklistedPhones = recipients
+    .map(r => r.phone)
+    .filter(phone => blacklisted.has(phone));
 
   if (blacklistedPhones.length > 0) {
     errors.push(
@@ -121,7 +119,8 @@ export async function checkRecipientsCompliance(
   return {
     passed: errors.length === 0,
     errors,
-    warnings
+    warnings,
+    blockedPhones: Array.from(new Set(blacklistedPhones))
   };
 }
 
@@ -248,7 +247,8 @@ export async function checkCampaignCompliance(
   return {
     passed: allErrors.length === 0,
     errors: allErrors,
-    warnings: allWarnings
+    warnings: allWarnings,
+    blockedPhones: recipientsCheck.blockedPhones
   };
 }
 
@@ -0,0 +1,234 @@
+import { createWriteStream, promises as fs, WriteStream } from 'fs';
+import { randomUUID } from 'crypto';
+import os from 'os';
+import path from 'path';
+import { Readable } from 'stream';
+import Papa from 'papaparse';
+import { createClient } from './supabase';
+import { mapContactRow } from './csv-parser';
+import { Contact } from '@/types';
+
+const REJECTS_DIR = path.join(os.tmpdir(), 'contact-import-rejects');
+// Reddedilen satır dosyaları bu süreden sonra silinir
+const REJECTS_TTL_MS = 60 * 60 * 1000;
+
+/**
+ * İçe aktarma ilerleme bilgisi (her chunk yazıldıktan sonra bildirilir)
+ */
+export interface ContactImportProgress {
+  importId: string;
+  rows: number;
+  added: number;
+  updated: number;
+  duplicates: number;
+  invalid: number;
+  errors: number;
+  chunks: number;
+}
+
+export interface ContactImportOptions {
+  chunkSize?: number;
+  onProgress?: (progress: ContactImportProgress) => void;
+  client?: ReturnType<typeof createClient>;
+}
+
+type ContactRow = Omit<Contact, 'id' | 'created_at'>;
+
+interface PendingRow {
+  rowNumber: number;
+  row: Record<string, any>;
+  contact: ContactRow;
+}
+
+/**
+ * Satırları dolu alanlarına göre gruplar. Toplu upsert'te sütunlar tüm satırların birleşimi
+ * olduğundan, boş hücreli satırlar mevcut e-posta/adres/şirket bilgisini NULL'lardı;
+ * her grup yalnızca kendi dolu sütunlarıyla yazılır.
+ */
+function groupByColumns(rows: PendingRow[]): PendingRow[][] {
+  const groups = new Map<string, PendingRow[]>();
+  for (const item of rows) {
+    Object.keys(item.contact).forEach(key => {
+      const value = (item.contact as any)[key];
+      if (value === undefined || value === '') delete (item.contact as any)[key];
+    });
+    const key = Object.keys(item.contact).sort().join(',');
+    if (!groups.has(key)) groups.set(key, []);
+    groups.get(key)!.push(item);
+  }
+  return Array.from(groups.values());
+}
+
+/**
+ * Reddedilen satırları CSV olarak diske yazar (satırlar bellekte tutulmaz)
+ */
+class RejectsWriter {
+  private stream: WriteStream | null = null;
+  private columns: string[] = [];
+
+  constructor(private readonly filePath: string) {}
+
+  async write(rowNumber: number, row: Record<string, any>, error: string): Promise<void> {
+    if (!this.stream) {
+      await fs.mkdir(REJECTS_DIR, { recursive: true });
+      this.stream = createWriteStream(this.filePath, { encoding: 'utf8' });
+      this.columns = Object.keys(row);
+      // Excel'in Türkçe karakterleri doğru açması için BOM
+      this.stream.write('\uFEFF' + Papa.unparse([['Satır', 'Hata', ...this.columns]]) + '\n');
+    }
+
+    const line = Papa.unparse([[rowNumber, error, ...this.columns.map(column => row[column] ?? '')]]) + '\n';
+    if (!this.stream.write(line)) {
+      await new Promise(resolve => this.stream!.once('drain', resolve));
+    }
+  }
+
+  close(): Promise<void> {
+    const stream = this.stream;
+    if (!stream) return Promise.resolve();
+    return new Promise((resolve, reject) => {
+      stream.once('error', reject);
+      stream.end(resolve);
+    });
+  }
+}
+
+export function getRejectsFilePath(importId: string): string | null {
+  // importId dosya adına dönüşür; yalnızca UUID kabul edilir
+  if (!/^[0-9a-f-]{36}$/i.test(importId)) return null;
+  return path.join(REJECTS_DIR, `${importId}.csv`);
+}
+
+async function removeExpiredRejects(): Promise<void> {
+  try {
+    const now = Date.now();
+    for (const name of await fs.readdir(REJECTS_DIR)) {
+      const filePath = path.join(REJECTS_DIR, name);
+      const stat = await fs.stat(filePath);
+      if (now - stat.mtimeMs > REJECTS_TTL_MS) await fs.unlink(filePath);
+    }
+  } catch {
+    // Klasör henüz yok
+  }
+}
+
+/**
+ * CSV akışını satır satır okuyup kişileri chunk'lar halinde contacts tablosuna yazar.
+ * Aynı başlık eşlemeleri (Ad/Name, Telefon/Phone, ...) kullanılır; telefon numarası
+ * normalize edilip dosya içinde tekilleştirilir, mevcut numaralar güncellenir (upsert).
+ * Dosyanın tamamı belleğe alınmaz; hatalı ve yazılamayan satırlar ayrı bir CSV dosyasına yazılır.
+ * Boş hücreler mevcut kişinin bilgisini silmez.
+ */
+export async function importContactsCsv(
+  input: ReadableStream<Uint8Array>,
+  options: ContactImportOptions = {}
+): Promise<ContactImportProgress & { rejectsAvailable: boolean }> {
+  const supabase = options.client || createClient();
+  const chunkSize = options.chunkSize || 500;
+  const importId = randomUUID();
+  const rejects = new RejectsWriter(getRejectsFilePath(importId)!);
+
+  await removeExpiredRejects();
+
+  const progress: ContactImportProgress = {
+    importId,
+    rows: 0,
+    added: 0,
+    updated: 0,
+    duplicates: 0,
+    invalid: 0,
+    errors: 0,
+    chunks: 0
+  };
+
+  // Dosya içi tekilleştirme için yalnızca normalize telefonlar tutulur
+  const seenPhones = new Set<string>();
+  let batch: PendingRow[] = [];
+
+  const flush = async () => {
+    if (batch.length === 0) return;
+    const chunk = batch;
+    batch = [];
+    progress.chunks++;
+
+    const fail = async (rows: PendingRow[], error: any) => {
+      console.error(`[Import] Chunk ${progress.chunks} hatası:`, error.message);
+      progress.errors += rows.length;
+      for (const item of rows) {
+        await rejects.write(item.rowNumber, item.row, `Kaydedilemedi: ${error.message}`);
+      }
+    };
+
+    const { data: existing, error: selectError } = await supabase
+      .from('contacts')
+      .select('phone')
+      .in('phone', chunk.map(item => item.contact.phone));
+
+    if (selectError) {
+      await fail(chunk, selectError);
+    } else {
+      const existingPhones = new Set((existing || []).map((row: any) => row.phone));
+
+      for (const group of groupByColumns(chunk)) {
+        const { error: upsertError } = await supabase
+          .from('contacts')
+          .upsert(group.map(item => item.contact), { onConflict: 'phone' });
+
+        if (upsertError) {
+          await fail(group, upsertError);
+          continue;
+        }
+
+        const existingCount = group.filter(item => existingPhones.has(item.contact.phone)).length;
+        progress.added += group.length - existingCount;
+        progress.updated += existingCount;
+      }
+    }
+
+    options.onProgress?.({ ...progress });
+  };
+
+  const parser = Papa.parse(Papa.NODE_STREAM_INPUT, {
+    header: true,
+    skipEmptyLines: true,
+    transformHeader: (header: string) => header.replace(/^\uFEFF/, '').trim()
+  });
+
+  // Byte akışı UTF-8 olarak çözülür (çok baytlı karakterler chunk sınırında bölünmez)
+  const source = Readable.fromWeb(input.pipeThrough(new TextDecoderStream()) as any);
+  source.on('error', (error) => parser.destroy(error));
+  source.pipe(parser);
+
+  for await (const row of parser) {
+    progress.rows++;
+    const rowNumber = progress.rows + 1; // başlık 1. satır
+
+    const result = mapContactRow(row);
+    if (result.error !== undefined) {
+      progress.invalid++;
+      await rejects.write(rowNumber, row, result.error);
+      continue;
+    }
+
+    if (seenPhones.has(result.contact.phone)) {
+      progress.duplicates++;
+      continue;
+    }
+    seenPhones.add(result.contact.phone);
+
+    batch.push({ rowNumber, row, contact: result.contact });
+    if (batch.length >= chunkSize) {
+      await flush();
+    }
+  }
+
+  await flush();
+  await rejects.close();
+
+  console.log(
+    `[Import] Tamamlandı: ${progress.rows} satır, ${progress.added} yeni, ${progress.updated} güncellendi, ` +
+    `${progress.duplicates} tekrar, ${progress.invalid} hatalı, ${progress.errors} yazılamadı`
+  );
+
+  return { ...progress, rejectsAvailable: progress.invalid + progress.errors > 0 };
+}
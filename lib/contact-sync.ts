@@ -0,0 +1,124 @@
+import type { createClient } from './supabase';
+
+/**
+ * Senkronizasyon ilerleme bilgisi (her chunk sonunda bildirilir)
+ */
+export interface ContactSyncProgress {
+  chunk: number;
+  totalChunks: number;
+  processed: number;
+  total: number;
+  added: number;
+  updated: number;
+  unchanged: number;
+  errors: number;
+  roundTrips: number;
+}
+
+export interface ContactSyncOptions {
+  chunkSize?: number;
+  onProgress?: (progress: ContactSyncProgress) => void;
+  client?: ReturnType<typeof createClient>;
+}
+
+/**
+ * WhatsApp numarasını contacts tablosundaki biçime getirir (90 ile başlasın)
+ */
+export function normalizeWaPhone(phone: string): string {
+  const digits = (phone || '').replace(/\D/g, '');
+  return digits.startsWith('90') ? digits : '90' + digits;
+}
+
+/**
+ * "Ad Soyad" biçimindeki ismi ad ve soyada ayırır
+ */
+export function splitName(fullName: string): { name: string; surname: string } {
+  const nameParts = (fullName || '').trim().split(' ');
+  return {
+    name: nameParts[0] || fullName,
+    surname: nameParts.slice(1).join(' ') || ''
+  };
+}
+
+/**
+ * WhatsApp kişilerini contacts tablosuna chunk'lar halinde senkronize eder.
+ * Her chunk için bir .in('phone') sorgusu ve (gerekirse) bir upsert yapılır;
+ * değişmemiş kayıtlara yazılmaz, bu yüzden tekrar çalıştırmak güvenlidir.
+ */
+export async function syncWaContacts(
+  waContacts: Array<{ name: string; phone: string }>,
+  options: ContactSyncOptions = {}
+): Promise<ContactSyncProgress> {
+  // Benchmark betiği kendi client'ını verir; modül Next.js dışında da yüklenebilsin diye tembel import
+  const supabase = options.client || (await import('./supabase')).createClient();
+  const chunkSize = options.chunkSize || 500;
+
+  // Numaraları bir kez normalize et ve tekilleştir (aynı numara için son kayıt geçerli)
+  const byPhone = new Map<string, { name: string; surname: string; phone: string }>();
+  for (const contact of waContacts) {
+    if (!contact.phone) continue;
+    const phone = normalizeWaPhone(contact.phone);
+    byPhone.set(phone, { ...splitName(contact.name || contact.phone), phone });
+  }
+
+  const rows = Array.from(byPhone.values());
+  const totalChunks = Math.ceil(rows.length / chunkSize);
+  const progress: ContactSyncProgress = {
+    chunk: 0,
+    totalChunks,
+    processed: 0,
+    total: rows.length,
+    added: 0,
+    updated: 0,
+    unchanged: 0,
+    errors: 0,
+    roundTrips: 0
+  };
+
+  for (let i = 0; i < rows.length; i += chunkSize) {
+    const chunk = rows.slice(i, i + chunkSize);
+    progress.chunk++;
+
+    try {
+      const { data: existing, error: selectError } = await supabase
+        .from('contacts')
+        .select('phone, name, surname')
+        .in('phone', chunk.map(row => row.phone));
+      progress.roundTrips++;
+
+      if (selectError) throw selectError;
+
+      const existingByPhone = new Map((existing || []).map((row: any) => [row.phone, row]));
+      const changed = chunk.filter(row => {
+        const current = existingByPhone.get(row.phone);
+        return !current || current.name !== row.name || current.surname !== row.surname;
+      });
+
+      if (changed.length > 0) {
+        const { error: upsertError } = await supabase
+          .from('contacts')
+          .upsert(changed, { onConflict: 'phone' });
+        progress.roundTrips++;
+
+        if (upsertError) throw upsertError;
+      }
+
+      const added = changed.filter(row => !existingByPhone.has(row.phone)).length;
+      progress.added += added;
+      progress.updated += changed.length - added;
+      progress.unchanged += chunk.length - changed.length;
+    } catch (error: any) {
+      console.error(`[Sync] Chunk ${progress.chunk}/${totalChunks} hatası:`, error.message);
+      progress.errors += chunk.length;
+    }
+
+    progress.processed += chunk.length;
+    console.log(
+      `[Sync] Chunk ${progress.chunk}/${totalChunks}: ${progress.processed}/${progress.total} ` +
+      `(${progress.added} yeni, ${progress.updated} güncellendi, ${progress.unchanged} değişmedi)`
+    );
+    options.onProgress?.({ ...progress });
+  }
+
+  return progress;
+}
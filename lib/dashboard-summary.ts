@@ -0,0 +1,139 @@
+import { supabase } from './supabase';
+import { MediaCache } from './media-cache';
+import { MessageHistory } from '@/types';
+
+/**
+ * Gösterge paneli özeti: sayımlar ve son gönderimler
+ */
+export interface DashboardSummary {
+  contacts: number;
+  templates: number;
+  messages: {
+    total: number;
+    today: number;
+    failedToday: number;
+  };
+  runningCampaigns: number;
+  queue: number | null;
+  recentMessages: Array<Pick<MessageHistory, 'id' | 'phone' | 'contact_name' | 'status' | 'sent_at'>>;
+  generatedAt: string;
+}
+
+const RECENT_MESSAGES_LIMIT = 5;
+
+function envNumber(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+// Global önbellekler (Next.js module re-import sorununu çözmek için)
+declare global {
+  var dashboardSummaryCache: MediaCache<DashboardSummary> | undefined;
+  var yoncuQueueCountCache: MediaCache<number | null> | undefined;
+}
+
+/**
+ * Özet önbelleği; aynı anda gelen istekler tek bir sorgu setinde birleşir.
+ * DASHBOARD_SUMMARY_TTL_MS (varsayılan 5 sn)
+ */
+function getSummaryCache(): MediaCache<DashboardSummary> {
+  if (!global.dashboardSummaryCache) {
+    global.dashboardSummaryCache = new MediaCache<DashboardSummary>(
+      1,
+      envNumber('DASHBOARD_SUMMARY_TTL_MS', 5000)
+    );
+  }
+  return global.dashboardSummaryCache;
+}
+
+/**
+ * Dış servise (YoncuAPI) giden kuyruk sorgusu daha uzun süre önbellekte tutulur.
+ * DASHBOARD_QUEUE_TTL_MS (varsayılan 30 sn)
+ */
+function getQueueCache(): MediaCache<number | null> {
+  if (!global.yoncuQueueCountCache) {
+    global.yoncuQueueCountCache = new MediaCache<number | null>(
+      1,
+      envNumber('DASHBOARD_QUEUE_TTL_MS', 30000)
+    );
+  }
+  return global.yoncuQueueCountCache;
+}
+
+async function countRows(
+  table: string,
+  options: { estimated?: boolean; filter?: (query: any) => any } = {}
+): Promise<number> {
+  let query: any = supabase
+    .from(table)
+    .select('id', { count: options.estimated ? 'estimated' : 'exact', head: true });
+
+  if (options.filter) query = options.filter(query);
+
+  const { count, error } = await query;
+  if (error) throw error;
+  return count || 0;
+}
+
+/**
+ * YoncuAPI kuyruğundaki mesaj sayısı; API yapılandırılmamışsa veya erişilemiyorsa null
+ */
+async function loadYoncuQueueCount(): Promise<number | null> {
+  try {
+    const { getYoncuClient, parseYoncuQueue } = await import('./yoncu-api');
+    const client = await getYoncuClient();
+    if (!client) return null;
+
+    const [success, queueData] = await client.getQueue();
+    return success ? parseYoncuQueue(queueData).count : null;
+  } catch (error: any) {
+    console.warn('[Dashboard] Kuyruk durumu alınamadı:', error.message);
+    return null;
+  }
+}
+
+async function computeSummary(): Promise<DashboardSummary> {
+  const today = new Date();
+  today.setHours(0, 0, 0, 0);
+  const todayIso = today.toISOString();
+
+  const [contacts, templates, total, todayCount, failedToday, runningCampaigns, recent, queue] = await Promise.all([
+    countRows('contacts', { estimated: true }),
+    countRows('templates'),
+    countRows('message_history', { estimated: true }),
+    countRows('message_history', { filter: q => q.gte('sent_at', todayIso) }),
+    countRows('message_history', { filter: q => q.gte('sent_at', todayIso).eq('status', 'failed') }),
+    countRows('campaigns', { filter: q => q.in('status', ['scheduled', 'running']) }),
+    supabase
+      .from('message_history')
+      .select('id, phone, contact_name, status, sent_at')
+      .order('sent_at', { ascending: false })
+      .order('id', { ascending: false })
+      .limit(RECENT_MESSAGES_LIMIT),
+    getQueueCache().getOrLoad('queue', loadYoncuQueueCount, () => 1)
+  ]);
+
+  if (recent.error) throw recent.error;
+
+  return {
+    contacts,
+    templates,
+    messages: { total, today: todayCount, failedToday },
+    runningCampaigns,
+    queue,
+    recentMessages: recent.data || [],
+    generatedAt: new Date().toISOString()
+  };
+}
+
+/**
+ * Önbellekteki özeti döner; TTL dolduysa tek bir hesaplama başlatır ve
+ * o sırada gelen diğer istekler aynı sonucu bekler
+ */
+export function getDashboardSummary(): Promise<DashboardSummary> {
+  return getSummaryCache().getOrLoad('summary', computeSummary, () => 1);
+}
+
+export function getDashboardSummaryCacheStats() {
+  return getSummaryCache().getStats();
+}
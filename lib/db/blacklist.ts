@@ -1,10 +1,83 @@
 import { supabase } from '../supabase';
 import { Blacklist } from '@/types';
 
+const IN_CHUNK_SIZE = 500;
+const PAGE_SIZE = 1000;
+// Bu sayıdan büyük alıcı listelerinde tüm blacklist bir kez belleğe alınır
+const SNAPSHOT_MIN_RECIPIENTS = 1000;
+const SNAPSHOT_TTL_MS = 5 * 60 * 1000;
+
+/**
+ * Süreç içi blacklist anlık görüntüsü: sıralı numara dizisi (ikili arama ile kontrol)
+ */
+interface BlacklistSnapshot {
+  phones: string[];
+  loadedAt: number;
+}
+
+// Global snapshot (Next.js module re-import sorununu çözmek için)
+declare global {
+  var blacklistSnapshot: BlacklistSnapshot | null;
+}
+
+if (typeof global.blacklistSnapshot === 'undefined') global.blacklistSnapshot = null;
+
+/**
+ * Blacklist snapshot'ını geçersiz kılar (ekleme/çıkarma sonrası)
+ */
+export function invalidateBlacklistSnapshot(): void {
+  global.blacklistSnapshot = null;
+}
+
+function sortedIncludes(sorted: string[], value: string): boolean {
+  let low = 0;
+  let high = sorted.length - 1;
+  while (low <= high) {
+    const mid = (low + high) >>> 1;
+    if (sorted[mid] === value) return true;
+    if (sorted[mid] < value) low = mid + 1;
+    else high = mid - 1;
+  }
+  return false;
+}
+
+/**
+ * Tüm blacklist numaralarını sayfalayarak yükler ve snapshot'ı günceller
+ */
+async function loadBlacklistSnapshot(): Promise<BlacklistSnapshot> {
+  const phones: string[] = [];
+
+  for (let from = 0; ; from += PAGE_SIZE) {
+    const { data, error } = await supabase
+      .from('blacklist')
+      .select('phone')
+      .order('phone', { ascending: true })
+      .range(from, from + PAGE_SIZE - 1);
+
+    if (error) throw error;
+    (data || []).forEach((row: any) => phones.push(row.phone));
+    if (!data || data.length < PAGE_SIZE) break;
+  }
+
+  // Postgres collation sırası JS karşılaştırmasından farklı olabilir, JS'e göre sırala
+  phones.sort();
+  global.blacklistSnapshot = { phones, loadedAt: Date.now() };
+  return global.blacklistSnapshot;
+}
+
+function getFreshSnapshot(): BlacklistSnapshot | null {
+  const snapshot = global.blacklistSnapshot;
+  if (snapshot && Date.now() - snapshot.loadedAt < SNAPSHOT_TTL_MS) return snapshot;
+  return null;
+}
+
 /**
  * Telefon numarasının blacklist'te olup olmadığını kontrol eder
  */
 export async function isPhoneBlacklisted(phone: string): Promise<boolean> {
+  const snapshot = getFreshSnapshot();
+  if (snapshot) return sortedIncludes(snapshot.phones, phone);
+
   const { data, error } = await supabase
     .from('blacklist')
     .select('id')
@@ -15,6 +88,41 @@ export async function isPhoneBlacklisted(phone: string): Promise<boolean> {
   return data !== null;
 }
 
+/**
+ * Verilen numaralardan blacklist'te olanları toplu olarak döner.
+ * Snapshot güncelse bellekten, büyük listelerde snapshot yüklenerek,
+ * küçük listelerde chunk'lı .in() sorgularıyla kontrol edilir.
+ */
+export async function getBlacklistedPhones(phones: string[]): Promise<Set<string>> {
+  const unique = Array.from(new Set(phones.filter(Boolean)));
+  const blocked = new Set<string>();
+  if (unique.length === 0) return blocked;
+
+  let snapshot = getFreshSnapshot();
+  if (!snapshot && unique.length >= SNAPSHOT_MIN_RECIPIENTS) {
+    snapshot = await loadBlacklistSnapshot();
+  }
+
+  if (snapshot) {
+    unique.forEach(phone => {
+      if (sortedIncludes(snapshot!.phones, phone)) blocked.add(phone);
+    });
+    return blocked;
+  }
+
+  for (let i = 0; i < unique.length; i += IN_CHUNK_SIZE) {
+    const { data, error } = await supabase
+      .from('blacklist')
+      .select('phone')
+      .in('phone', unique.slice(i, i + IN_CHUNK_SIZE));
+
+    if (error) throw error;
+    (data || []).forEach((row: any) => blocked.add(row.phone));
+  }
+
+  return blocked;
+}
+
 /**
  * Blacklist'e ekler
  */
@@ -26,6 +134,7 @@ export async function addToBlacklist(phone: string, reason = 'user_requested'):
     .single();
 
   if (error) throw error;
+  invalidateBlacklistSnapshot();
   return data;
 }
 
@@ -39,6 +148,7 @@ export async function removeFromBlacklist(phone: string): Promise<void> {
     .eq('phone', phone);
 
   if (error) throw error;
+  invalidateBlacklistSnapshot();
 }
 
 /**
@@ -53,4 +163,3 @@ export async function getAllBlacklist(): Promise<Blacklist[]> {
   if (error) throw error;
   return data || [];
 }
-
@@ -1,5 +1,5 @@
 import { supabase } from '../supabase';
-import { Campaign, SendJob } from '@/types';
+import { Campaign, CampaignReport, SendJob } from '@/types';
 
 /**
  * Tüm kampanyaları getirir
@@ -60,6 +60,71 @@ export async function updateCampaign(id: string, updates: Partial<Campaign>): Pr
   return data;
 }
 
+/**
+ * Taslak kampanyayı kuyruğa ekleme için sahiplenir: started_at yalnızca boşsa (veya önceki
+ * deneme yarıda kalıp bayatladıysa) doldurulur. Aynı anda gelen ikinci istek ya da
+ * taslak olmayan kampanya için null döner; başarılıysa sahiplik zaman damgasını döner.
+ */
+export async function claimDraftCampaign(id: string, staleAfterMs = 10 * 60 * 1000): Promise<string | null> {
+  const claimedAt = new Date().toISOString();
+  const staleBefore = new Date(Date.now() - staleAfterMs).toISOString();
+
+  const { data, error } = await supabase
+    .from('campaigns')
+    .update({ started_at: claimedAt })
+    .eq('id', id)
+    .eq('status', 'draft')
+    .or(`started_at.is.null,started_at.lt.${staleBefore}`)
+    .select('id');
+
+  if (error) throw error;
+  return data && data.length > 0 ? claimedAt : null;
+}
+
+/**
+ * Sahiplenilmiş taslak kampanyayı gönderime açar (draft -> scheduled)
+ */
+export async function scheduleClaimedCampaign(id: string, claimedAt: string, totalRecipients: number): Promise<boolean> {
+  const { data, error } = await supabase
+    .from('campaigns')
+    .update({ status: 'scheduled', total_recipients: totalRecipients })
+    .eq('id', id)
+    .eq('status', 'draft')
+    .eq('started_at', claimedAt)
+    .select('id');
+
+  if (error) throw error;
+  return !!data && data.length > 0;
+}
+
+/**
+ * Kuyruğa ekleme başarısız olduysa sahipliği bırakır (kampanya taslak kalır)
+ */
+export async function releaseDraftCampaign(id: string, claimedAt: string): Promise<void> {
+  const { error } = await supabase
+    .from('campaigns')
+    .update({ started_at: null })
+    .eq('id', id)
+    .eq('status', 'draft')
+    .eq('started_at', claimedAt);
+
+  if (error) throw error;
+}
+
+/**
+ * Taslak kampanyanın önceki (yarıda kalmış) kuyruğa ekleme denemesinden kalan bekleyen job'ları siler
+ */
+export async function deletePendingSendJobs(campaignId: string): Promise<number> {
+  const { count, error } = await supabase
+    .from('send_jobs')
+    .delete({ count: 'exact' })
+    .eq('campaign_id', campaignId)
+    .eq('status', 'pending');
+
+  if (error) throw error;
+  return count || 0;
+}
+
 /**
  * Kampanya siler
  */
@@ -131,93 +196,234 @@ export async function updateSendJob(id: string, updates: Partial<SendJob>): Prom
 }
 
 /**
- * Kampanya istatistiklerini günceller
+ * Kampanyadaki job'ların durum bazlı sayılarını veritabanında gruplayarak getirir
  */
-export async function updateCampaignStats(campaignId: string): Promise<void> {
-  // Job'ları say
-  const { data: jobs, error: jobsError } = await supabase
-    .from('send_jobs')
-    .select('status')
-    .eq('campaign_id', campaignId);
+export async function getCampaignJobStatusCounts(campaignId: string): Promise<Record<SendJob['status'], number>> {
+  const { data, error } = await supabase
+    .rpc('campaign_job_status_counts', { p_campaign_id: campaignId });
+
+  if (error) throw error;
+
+  const counts: Record<SendJob['status'], number> = { pending: 0, processing: 0, sent: 0, failed: 0, blocked: 0 };
+  (data || []).forEach((row: { status: SendJob['status']; count: number }) => {
+    counts[row.status] = Number(row.count);
+  });
+  return counts;
+}
+
+/**
+ * Kampanyadaki hataları last_error'a göre gruplar (en sık olan önce)
+ */
+export async function getCampaignErrorHistogram(
+  campaignId: string,
+  limit = 20
+): Promise<Array<{ error: string; count: number }>> {
+  const { data, error } = await supabase
+    .rpc('campaign_error_histogram', { p_campaign_id: campaignId, p_limit: limit });
 
-  if (jobsError) throw jobsError;
+  if (error) throw error;
+  return (data || []).map((row: { error: string; count: number }) => ({
+    error: row.error,
+    count: Number(row.count)
+  }));
+}
 
-  const total = jobs?.length || 0;
-  const sent = jobs?.filter(j => j.status === 'sent').length || 0;
-  const failed = jobs?.filter(j => j.status === 'failed').length || 0;
+/**
+ * Kampanya istatistiklerini günceller.
+ * Sayaçlar send_jobs trigger'ları ile artımlı tutulur; bu fonksiyon onları
+ * gruplanmış sayımla yeniden hesaplayıp uzlaştırır.
+ */
+export async function updateCampaignStats(campaignId: string): Promise<void> {
+  const counts = await getCampaignJobStatusCounts(campaignId);
+  const total = Object.values(counts).reduce((sum, n) => sum + n, 0);
 
-  // Campaign'i güncelle
   await updateCampaign(campaignId, {
     total_recipients: total,
-    sent_count: sent,
-    failed_count: failed
+    sent_count: counts.sent,
+    failed_count: counts.failed,
+    pending_count: counts.pending,
+    processing_count: counts.processing,
+    blocked_count: counts.blocked
   });
 }
 
+export interface SendJobPage {
+  jobs: SendJob[];
+  next_cursor: string | null;
+}
+
+// Keyset imleci: son satırın (created_at, id) değeri, URL'de taşınabilir biçimde
+function encodeJobCursor(job: SendJob): string {
+  return Buffer.from(JSON.stringify([job.created_at, job.id])).toString('base64url');
+}
+
+function decodeJobCursor(cursor: string): [string, string] | null {
+  try {
+    const value = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    return Array.isArray(value) && value.length === 2 ? [String(value[0]), String(value[1])] : null;
+  } catch {
+    return null;
+  }
+}
+
 /**
- * Kampanya raporu oluşturur
+ * Kampanya job'larını (created_at, id) sırasına göre keyset sayfalama ile getirir
  */
-export async function getCampaignReport(campaignId: string): Promise<{
-  campaign: Campaign;
-  jobs: SendJob[];
-  summary: {
-    total: number;
-    sent: number;
-    failed: number;
-    pending: number;
-    blocked: number;
-    success_rate: number;
-  };
-  errors: Array<{ error: string; count: number }>;
-}> {
-  // Campaign'i getir
-  const campaign = await getCampaignById(campaignId);
-  if (!campaign) throw new Error('Kampanya bulunamadı');
+export async function getCampaignJobsPage(
+  campaignId: string,
+  options: { limit?: number; cursor?: string | null; status?: SendJob['status'] | null } = {}
+): Promise<SendJobPage> {
+  const limit = Math.min(Math.max(options.limit ?? 100, 1), 1000);
 
-  // Job'ları getir
-  const { data: jobs, error: jobsError } = await supabase
+  let query = supabase
     .from('send_jobs')
     .select('*')
     .eq('campaign_id', campaignId)
-    .order('created_at', { ascending: true });
+    .order('created_at', { ascending: true })
+    .order('id', { ascending: true })
+    .limit(limit + 1);
 
-  if (jobsError) throw jobsError;
+  if (options.status) {
+    query = query.eq('status', options.status);
+  }
 
-  const jobsList = jobs || [];
+  const after = options.cursor ? decodeJobCursor(options.cursor) : null;
+  if (after) {
+    const [createdAt, id] = after;
+    query = query.or(`created_at.gt."${createdAt}",and(created_at.eq."${createdAt}",id.gt.${id})`);
+  }
 
-  // İstatistikler
-  const total = jobsList.length;
-  const sent = jobsList.filter(j => j.status === 'sent').length;
-  const failed = jobsList.filter(j => j.status === 'failed').length;
-  const pending = jobsList.filter(j => j.status === 'pending').length;
-  const blocked = jobsList.filter(j => j.status === 'blocked').length;
-  const success_rate = total > 0 ? (sent / total) * 100 : 0;
+  const { data, error } = await query;
+  if (error) throw error;
+
+  const rows = data || [];
+  const jobs = rows.slice(0, limit);
+  return {
+    jobs,
+    next_cursor: rows.length > limit ? encodeJobCursor(jobs[jobs.length - 1]) : null
+  };
+}
+
+/**
+ * Kampanya raporu oluşturur.
+ * Özet kampanya sayaçlarından, hata dağılımı veritabanında gruplanarak gelir;
+ * job listesi yalnızca ilk sayfa olarak döner (devamı getCampaignJobsPage ile).
+ */
+export async function getCampaignReport(
+  campaignId: string,
+  options: { limit?: number } = {}
+): Promise<CampaignReport> {
+  // Campaign'i getir
+  const campaign = await getCampaignById(campaignId);
+  if (!campaign) throw new Error('Kampanya bulunamadı');
 
-  // Hata grupları
-  const errorMap = new Map<string, number>();
-  jobsList
-    .filter(j => j.last_error)
-    .forEach(j => {
-      const error = j.last_error!;
-      errorMap.set(error, (errorMap.get(error) || 0) + 1);
-    });
+  const [errors, page] = await Promise.all([
+    getCampaignErrorHistogram(campaignId),
+    options.limit === 0
+      ? Promise.resolve<SendJobPage>({ jobs: [], next_cursor: null })
+      : getCampaignJobsPage(campaignId, { limit: options.limit })
+  ]);
 
-  const errors = Array.from(errorMap.entries())
-    .map(([error, count]) => ({ error, count }))
-    .sort((a, b) => b.count - a.count);
+  const total = campaign.total_recipients || 0;
+  const sent = campaign.sent_count || 0;
+  const success_rate = total > 0 ? (sent / total) * 100 : 0;
 
   return {
     campaign,
-    jobs: jobsList,
+    jobs: page.jobs,
+    next_cursor: page.next_cursor,
     summary: {
       total,
       sent,
-      failed,
-      pending,
-      blocked,
+      failed: campaign.failed_count || 0,
+      pending: campaign.pending_count || 0,
+      processing: campaign.processing_count || 0,
+      blocked: campaign.blocked_count || 0,
       success_rate: Math.round(success_rate * 100) / 100
     },
     errors
   };
 }
 
+/**
+ * Zamanı gelmiş bekleyen job'ları atomik olarak sahiplenir (claim_send_jobs RPC)
+ */
+export async function claimDueSendJobs(limit: number, workerId: string): Promise<SendJob[]> {
+  const { data, error } = await supabase
+    .rpc('claim_send_jobs', { p_limit: limit, p_worker_id: workerId });
+
+  if (error) throw error;
+  return data || [];
+}
+
+/**
+ * Uzun süredir 'processing' durumunda kalan job'ları kuyruğa geri alır
+ */
+export async function releaseStaleSendJobs(timeoutSeconds: number): Promise<number> {
+  const { data, error } = await supabase
+    .rpc('release_stale_send_jobs', { p_timeout_seconds: timeoutSeconds });
+
+  if (error) throw error;
+  return data || 0;
+}
+
+/**
+ * Kampanyada henüz tamamlanmamış (pending/processing) job sayısını getirir
+ */
+export async function countOpenSendJobs(campaignId: string): Promise<number> {
+  const { count, error } = await supabase
+    .from('send_jobs')
+    .select('id', { count: 'exact', head: true })
+    .eq('campaign_id', campaignId)
+    .in('status', ['pending', 'processing']);
+
+  if (error) throw error;
+  return count || 0;
+}
+
+/**
+ * Oturum hatası nedeniyle park edilmiş job'ları hemen tekrar denenecek şekilde öne alır
+ * (WA Web oturumu hazır olduğunda veya sağlayıcı ayarları kaydedildiğinde çağrılır)
+ */
+export async function resumeParkedSendJobs(): Promise<number> {
+  const { count, error } = await supabase
+    .from('send_jobs')
+    .update({ scheduled_at: new Date().toISOString() }, { count: 'exact' })
+    .eq('status', 'pending')
+    .eq('error_class', 'session')
+    .gt('scheduled_at', new Date().toISOString());
+
+  if (error) throw error;
+  return count || 0;
+}
+
+/**
+ * Dead-letter'daki (failed) job'ları toplu olarak kuyruğa geri alır.
+ * Kalıcı hatalar (geçersiz numara, kara liste) varsayılan olarak dahil edilmez.
+ */
+export async function requeueDeadLetterJobs(
+  campaignId: string,
+  options: { includePermanent?: boolean } = {}
+): Promise<number> {
+  let query = supabase
+    .from('send_jobs')
+    .update({
+      status: 'pending',
+      attempts: 0,
+      error_class: null,
+      dead_lettered_at: null,
+      claimed_by: null,
+      claimed_at: null,
+      scheduled_at: new Date().toISOString()
+    }, { count: 'exact' })
+    .eq('campaign_id', campaignId)
+    .eq('status', 'failed');
+
+  if (!options.includePermanent) {
+    query = query.or('error_class.is.null,error_class.neq.permanent');
+  }
+
+  const { count, error } = await query;
+  if (error) throw error;
+  return count || 0;
+}
@@ -84,3 +84,46 @@ export async function searchContacts(query: string): Promise<Contact[]> {
   return data || []
 }
 
+
+export interface ContactExportFilters {
+  groupId?: string | null
+  consent?: boolean | null
+  since?: string | null
+  until?: string | null
+}
+
+/**
+ * Kişileri id üzerinden keyset sayfalama ile sayfa sayfa üretir (dışa aktarma için).
+ * groupId verilirse group_contacts ile join yapılır; tablo hiçbir zaman tamamen okunmaz.
+ */
+export async function* streamContactPages(
+  filters: ContactExportFilters = {},
+  pageSize = 1000
+): AsyncGenerator<Contact[]> {
+  let lastId: string | null = null
+
+  while (true) {
+    let query: any = supabase
+      .from('contacts')
+      .select(filters.groupId ? '*, group_contacts!inner(group_id)' : '*')
+      .order('id', { ascending: true })
+      .limit(pageSize)
+
+    if (filters.groupId) query = query.eq('group_contacts.group_id', filters.groupId)
+    if (filters.consent === true) query = query.eq('consent', true)
+    if (filters.consent === false) query = query.or('consent.is.null,consent.eq.false')
+    if (filters.since) query = query.gte('created_at', filters.since)
+    if (filters.until) query = query.lte('created_at', filters.until)
+    if (lastId) query = query.gt('id', lastId)
+
+    const { data, error } = await query
+
+    if (error) throw error
+    if (!data || data.length === 0) return
+
+    yield data.map(({ group_contacts, ...contact }: any) => contact)
+
+    if (data.length < pageSize) return
+    lastId = data[data.length - 1].id
+  }
+}
@@ -0,0 +1,29 @@
+import { supabase } from '../supabase';
+import { InboundMessage } from '@/types';
+
+/**
+ * Gelen mesajları tek istekte toplu yazar; aynı (channel, external_id) tekrar yazılmaz
+ */
+export async function insertInboundMessages(messages: InboundMessage[]): Promise<void> {
+  if (messages.length === 0) return;
+
+  const { error } = await supabase
+    .from('inbound_messages')
+    .upsert(messages, { onConflict: 'channel,external_id', ignoreDuplicates: true });
+
+  if (error) throw error;
+}
+
+/**
+ * Son gelen mesajları getirir
+ */
+export async function getRecentInboundMessages(limit = 50): Promise<InboundMessage[]> {
+  const { data, error } = await supabase
+    .from('inbound_messages')
+    .select('*')
+    .order('received_at', { ascending: false })
+    .limit(limit);
+
+  if (error) throw error;
+  return data || [];
+}
@@ -1,20 +1,114 @@
 import { supabase } from '@/lib/supabase'
 import { MessageHistory } from '@/types'
 
-export async function getMessageHistory(limit?: number): Promise<MessageHistory[]> {
-  let query = supabase
-    .from('message_history')
-    .select('*')
-    .order('sent_at', { ascending: false })
+export interface MessageHistoryFilters {
+  q?: string | null
+  startDate?: string | null
+  endDate?: string | null
+  status?: string | null
+}
+
+export interface MessageHistoryPage {
+  items: MessageHistory[]
+  next_cursor: string | null
+}
+
+// PostgREST filtre değerini tırnak içine alır (virgül, parantez ve nokta güvenli olur)
+function quoteFilterValue(value: string): string {
+  return `"${value.replace(/\\/g, '\\\\').replace(/"/g, '\\"')}"`
+}
+
+// ILIKE joker karakterlerini (% ve _) aranan metinde düz karakter olarak kullan
+function escapeLikePattern(value: string): string {
+  return value.replace(/[\\%_]/g, (char) => `\\${char}`)
+}
+
+function applyFilters(query: any, filters: MessageHistoryFilters) {
+  const search = filters.q?.trim()
+  if (search) {
+    const pattern = quoteFilterValue(`%${escapeLikePattern(search)}%`)
+    query = query.or(`phone.ilike.${pattern},message.ilike.${pattern},contact_name.ilike.${pattern}`)
+  }
+  if (filters.startDate) {
+    query = query.gte('sent_at', filters.startDate)
+  }
+  if (filters.endDate) {
+    query = query.lte('sent_at', filters.endDate)
+  }
+  if (filters.status) {
+    query = query.eq('status', filters.status)
+  }
+  return query
+}
+
+// Keyset imleci: son satırın (sent_at, id) değeri
+function encodeCursor(item: MessageHistory): string {
+  return Buffer.from(JSON.stringify([item.sent_at, item.id])).toString('base64url')
+}
+
+function decodeCursor(cursor: string): [string, string] | null {
+  try {
+    const value = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'))
+    return Array.isArray(value) && value.length === 2 ? [String(value[0]), String(value[1])] : null
+  } catch {
+    return null
+  }
+}
+
+/**
+ * Mesaj geçmişini en yeniden eskiye (sent_at, id) keyset sayfalama ile getirir
+ */
+export async function getMessageHistoryPage(
+  filters: MessageHistoryFilters = {},
+  options: { limit?: number; cursor?: string | null } = {}
+): Promise<MessageHistoryPage> {
+  const limit = Math.min(Math.max(options.limit ?? 50, 1), 500)
 
-  if (limit) {
-    query = query.limit(limit)
+  let query = applyFilters(
+    supabase
+      .from('message_history')
+      .select('*')
+      .order('sent_at', { ascending: false })
+      .order('id', { ascending: false })
+      .limit(limit + 1),
+    filters
+  )
+
+  const after = options.cursor ? decodeCursor(options.cursor) : null
+  if (after) {
+    const [sentAt, id] = after
+    query = query.or(`sent_at.lt.${quoteFilterValue(sentAt)},and(sent_at.eq.${quoteFilterValue(sentAt)},id.lt.${id})`)
   }
 
   const { data, error } = await query
 
   if (error) throw error
-  return data || []
+
+  const rows: MessageHistory[] = data || []
+  const items = rows.slice(0, limit)
+  return {
+    items,
+    next_cursor: rows.length > limit ? encodeCursor(items[items.length - 1]) : null
+  }
+}
+
+/**
+ * Filtreye uyan mesaj sayısı (satırlar okunmaz, HEAD isteği).
+ * estimated: büyük tablolarda planlayıcı tahmini kullanılır, küçüklerde kesin sayım.
+ */
+export async function countMessageHistory(
+  filters: MessageHistoryFilters = {},
+  mode: 'exact' | 'estimated' = 'exact'
+): Promise<number> {
+  const { count, error } = await applyFilters(
+    supabase
+      .from('message_history')
+      .select('id', { count: mode, head: true }),
+    filters
+  )
+
+  if (error) throw error
+  return count || 0
 }
 
 export async function createMessageHistory(
@@ -29,30 +123,3 @@ export async function createMessageHistory(
   if (error) throw error
   return data
 }
-
-export async function searchMessageHistory(query: string): Promise<MessageHistory[]> {
-  const { data, error } = await supabase
-    .from('message_history')
-    .select('*')
-    .or(`phone.ilike.%${query}%,message.ilike.%${query}%,contact_name.ilike.%${query}%`)
-    .order('sent_at', { ascending: false })
-
-  if (error) throw error
-  return data || []
-}
-
-export async function filterMessageHistoryByDate(
-  startDate: string,
-  endDate: string
-): Promise<MessageHistory[]> {
-  const { data, error } = await supabase
-    .from('message_history')
-    .select('*')
-    .gte('sent_at', startDate)
-    .lte('sent_at', endDate)
-    .order('sent_at', { ascending: false })
-
-  if (error) throw error
-  return data || []
-}
-
@@ -45,7 +45,7 @@ export async function upsertSession(session: Partial<WaWebSession>): Promise<WaW
 export async function updateSessionStatus(
   sessionName: string,
   status: string,
-  qrCode?: string,
+  qrCode?: string | null,
   phoneNumber?: string
 ): Promise<void> {
   const updates: any = { 
@@ -0,0 +1,96 @@
+/**
+ * Dışa aktarma biçimi: CSV (Excel uyumlu, BOM'lu) veya satır başına bir JSON nesnesi
+ */
+export type ExportFormat = 'csv' | 'ndjson';
+
+export interface ExportColumn<T> {
+  header: string;
+  key: string;
+  value: (row: T) => unknown;
+}
+
+/**
+ * CSV alanını RFC 4180'e göre kaçışlar: virgül, tırnak veya satır sonu içeren
+ * alanlar tırnağa alınır, içteki tırnaklar ikilenir. =, +, -, @ (veya sekme/CR) ile
+ * başlayan metinlerin önüne ' eklenir; Excel bunları formül olarak çalıştırmaz.
+ */
+export function csvEscape(value: unknown): string {
+  if (value === null || value === undefined) return '';
+  let text = value instanceof Date ? value.toISOString() : String(value);
+  if (typeof value === 'string' && /^[=+\-@\t\r]/.test(text)) text = `'${text}`;
+  return /[",\r\n]/.test(text) || text !== text.trim()
+    ? `"${text.replace(/"/g, '""')}"`
+    : text;
+}
+
+export function parseExportFormat(value: string | null): ExportFormat {
+  return value === 'ndjson' ? 'ndjson' : 'csv';
+}
+
+/**
+ * Sayfa kaynağını (her adımda bir satır dizisi üreten async iterator) kodlanmış bir
+ * ReadableStream'e çevirir. Başlık hemen gönderilir; sonraki sayfa ancak tüketici
+ * okudukça (pull) kaynaktan çekilir, böylece ilk byte süresi ve bellek kullanımı
+ * toplam satır sayısından bağımsızdır.
+ */
+export function createExportStream<T>(
+  pages: AsyncIterable<T[]>,
+  columns: ExportColumn<T>[],
+  format: ExportFormat
+): ReadableStream<Uint8Array> {
+  const encoder = new TextEncoder();
+  const iterator = pages[Symbol.asyncIterator]();
+  let cancelled = false;
+
+  const encodeRow = (row: T): string => {
+    if (format === 'ndjson') {
+      const record: Record<string, unknown> = {};
+      for (const column of columns) record[column.key] = column.value(row) ?? null;
+      return JSON.stringify(record) + '\n';
+    }
+    return columns.map(column => csvEscape(column.value(row))).join(',') + '\r\n';
+  };
+
+  return new ReadableStream<Uint8Array>({
+    start(controller) {
+      if (format === 'csv') {
+        controller.enqueue(encoder.encode('\uFEFF' + columns.map(c => csvEscape(c.header)).join(',') + '\r\n'));
+      }
+    },
+
+    async pull(controller) {
+      try {
+        const next = await iterator.next();
+        if (cancelled) return;
+        if (next.done) {
+          controller.close();
+          return;
+        }
+        controller.enqueue(encoder.encode(next.value.map(encodeRow).join('')));
+      } catch (error) {
+        if (cancelled) return;
+        console.error('[Export] Dışa aktarma kaynağı hatası:', error);
+        controller.error(error);
+      }
+    },
+
+    async cancel() {
+      cancelled = true;
+      // İstemci bağlantıyı kapattıysa kaynağı da kapat (sayfalı sorgular durur)
+      await iterator.return?.();
+    }
+  });
+}
+
+/**
+ * Akışı indirilebilir dosya olarak döner
+ */
+export function exportResponse(stream: ReadableStream<Uint8Array>, baseName: string, format: ExportFormat): Response {
+  return new Response(stream, {
+    headers: {
+      'Content-Type': format === 'csv' ? 'text/csv; charset=utf-8' : 'application/x-ndjson; charset=utf-8',
+      'Content-Disposition': `attachment; filename="${baseName}.${format === 'csv' ? 'csv' : 'ndjson'}"`,
+      'Cache-Control': 'no-store'
+    }
+  });
+}
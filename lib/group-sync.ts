@@ -0,0 +1,295 @@
+import { createHash, randomUUID } from 'crypto';
+import { createClient } from './supabase';
+import { normalizeWaPhone, splitName } from './contact-sync';
+
+/**
+ * WhatsApp'tan gelen grup özeti (katılımcı isimleri çözülmemiş)
+ */
+export interface WaGroupSummary {
+  id: string;
+  name: string;
+  participants: Array<{ id: string; phone: string; isAdmin?: boolean; isSuperAdmin?: boolean }>;
+}
+
+export interface GroupSyncStats {
+  totalGroups: number;
+  skippedGroups: number;
+  addedGroups: number;
+  updatedGroups: number;
+  addedContacts: number;
+  addedGroupMembers: number;
+  removedGroupMembers: number;
+  errors: number;
+  roundTrips: number;
+}
+
+export interface GroupSyncOptions {
+  // Değişmemiş grupları da yeniden işle
+  force?: boolean;
+  // Bu süreden yakın zamanda senkronize edilen gruplar atlanır
+  minIntervalMs?: number;
+  chunkSize?: number;
+  // Yeni kişilerin isimlerini çözmek için (WA id -> isim)
+  resolveNames?: (contactIds: string[]) => Promise<Map<string, string>>;
+  client?: ReturnType<typeof createClient>;
+}
+
+const PAGE_SIZE = 1000;
+
+/**
+ * Grubun katılımcı kümesinin özeti; değişmemiş grupları atlamak için kullanılır
+ */
+export function participantsHash(group: WaGroupSummary): string {
+  const phones = group.participants.map(p => normalizeWaPhone(p.phone)).sort();
+  return createHash('sha256').update(group.name + '\n' + phones.join(',')).digest('hex');
+}
+
+function chunks<T>(items: T[], size: number): T[][] {
+  const out: T[][] = [];
+  for (let i = 0; i < items.length; i += size) {
+    out.push(items.slice(i, i + size));
+  }
+  return out;
+}
+
+/**
+ * WhatsApp gruplarını groups / group_contacts tablolarına artımlı olarak senkronize eder.
+ * Katılımcı kümesi değişmemiş gruplar wa_groups.participants_hash ve last_sync_at ile atlanır;
+ * değişen gruplarda sadece eklenen/çıkan üyeler toplu olarak yazılır.
+ */
+export async function syncWaGroups(
+  waGroups: WaGroupSummary[],
+  options: GroupSyncOptions = {}
+): Promise<GroupSyncStats> {
+  const supabase = options.client || createClient();
+  const chunkSize = options.chunkSize || 500;
+  const minIntervalMs = options.minIntervalMs ?? 0;
+  const stats: GroupSyncStats = {
+    totalGroups: waGroups.length,
+    skippedGroups: 0,
+    addedGroups: 0,
+    updatedGroups: 0,
+    addedContacts: 0,
+    addedGroupMembers: 0,
+    removedGroupMembers: 0,
+    errors: 0,
+    roundTrips: 0
+  };
+
+  // 1. Önceki senkronizasyon kayıtları
+  const previous = new Map<string, any>();
+  for (const part of chunks(waGroups.map(g => g.id), chunkSize)) {
+    const { data, error } = await supabase
+      .from('wa_groups')
+      .select('wa_id, participants_hash, last_sync_at, local_group_id')
+      .in('wa_id', part);
+    stats.roundTrips++;
+    if (error) throw error;
+    (data || []).forEach((row: any) => previous.set(row.wa_id, row));
+  }
+
+  // 2. Değişmemiş grupları atla
+  const now = Date.now();
+  const changed = waGroups
+    .map(group => ({ group, hash: participantsHash(group), previous: previous.get(group.id) }))
+    .filter(({ hash, previous: prev }) => {
+      if (options.force || !prev) return true;
+      if (prev.participants_hash === hash) return false;
+      const lastSync = prev.last_sync_at ? new Date(prev.last_sync_at).getTime() : 0;
+      return now - lastSync >= minIntervalMs;
+    });
+  stats.skippedGroups = waGroups.length - changed.length;
+
+  if (changed.length === 0) {
+    console.log(`[Sync] Tüm gruplar güncel (${stats.skippedGroups} grup atlandı)`);
+    return stats;
+  }
+
+  // 3. Yerel grup kayıtları: WhatsApp grubu wa_groups.local_group_id ile bağlıdır. Bağlı olmayan
+  // gruplar için yeni yerel grup açılır (isimle eşleştirme, aynı isimli başka bir grubu ezerdi)
+  // ve bağlantı hemen yazılır ki grup işlenirken hata olsa da tekrar oluşturulmasın.
+  const localGroupIds = new Map<string, string>();
+  const unlinked = changed.filter(c => !c.previous?.local_group_id);
+  changed
+    .filter(c => c.previous?.local_group_id)
+    .forEach(c => localGroupIds.set(c.group.id, c.previous.local_group_id));
+
+  for (const part of chunks(unlinked, chunkSize)) {
+    const rows = part.map(c => ({
+      id: randomUUID(),
+      name: c.group.name,
+      description: `WhatsApp'tan senkronize edildi (${c.group.participants.length} üye)`
+    }));
+
+    const { error } = await supabase.from('groups').insert(rows);
+    stats.roundTrips++;
+    if (error) throw error;
+
+    const { error: linkError } = await supabase
+      .from('wa_groups')
+      .upsert(part.map((c, i) => ({
+        wa_id: c.group.id,
+        name: c.group.name,
+        local_group_id: rows[i].id,
+        // Üyeler yazılana kadar grup "senkronize edilmemiş" sayılır
+        last_sync_at: null
+      })), { onConflict: 'wa_id' });
+    stats.roundTrips++;
+    if (linkError) throw linkError;
+
+    part.forEach((c, i) => localGroupIds.set(c.group.id, rows[i].id));
+    stats.addedGroups += rows.length;
+  }
+  stats.updatedGroups = changed.length - stats.addedGroups;
+
+  // 4. Katılımcı kişileri: mevcut olanları toplu bul, eksikleri toplu ekle
+  const participantByPhone = new Map<string, { id: string; phone: string }>();
+  changed.forEach(({ group }) => group.participants.forEach(p => {
+    participantByPhone.set(normalizeWaPhone(p.phone), p);
+  }));
+
+  const contactIdByPhone = new Map<string, string>();
+  const allPhones = Array.from(participantByPhone.keys());
+  for (const part of chunks(allPhones, chunkSize)) {
+    const { data, error } = await supabase
+      .from('contacts')
+      .select('id, phone')
+      .in('phone', part);
+    stats.roundTrips++;
+    if (error) throw error;
+    (data || []).forEach((row: any) => contactIdByPhone.set(row.phone, row.id));
+  }
+
+  const missingPhones = allPhones.filter(phone => !contactIdByPhone.has(phone));
+  let contactErrors = false;
+  if (missingPhones.length > 0) {
+    const names = options.resolveNames
+      ? await options.resolveNames(missingPhones.map(phone => participantByPhone.get(phone)!.id))
+      : new Map<string, string>();
+
+    for (const part of chunks(missingPhones, chunkSize)) {
+      const rows = part.map(phone => {
+        const participant = participantByPhone.get(phone)!;
+        return { ...splitName(names.get(participant.id) || participant.phone), phone };
+      });
+
+      const { data, error } = await supabase
+        .from('contacts')
+        .upsert(rows, { onConflict: 'phone' })
+        .select('id, phone');
+      stats.roundTrips++;
+      if (error) {
+        console.error('[Sync] Kişi ekleme hatası:', error.message);
+        stats.errors += part.length;
+        contactErrors = true;
+        continue;
+      }
+      (data || []).forEach((row: any) => contactIdByPhone.set(row.phone, row.id));
+      stats.addedContacts += data?.length || 0;
+    }
+  }
+
+  // 5. Üyelik farkı: sadece eklenen ve çıkan üyeler yazılır. Yalnızca senkronizasyonun eklediği
+  // (synced_from_wa) üyelikler silinir; elle eklenen üyeler korunur.
+  const membershipsToAdd: Array<{ group_id: string; contact_id: string; synced_from_wa: boolean }> = [];
+  const syncedRows: any[] = [];
+
+  for (const { group, hash } of changed) {
+    const groupId = localGroupIds.get(group.id);
+    if (!groupId) {
+      stats.errors++;
+      continue;
+    }
+
+    try {
+      const existing = new Set<string>();
+      const syncedMembers = new Set<string>();
+      for (let from = 0; ; from += PAGE_SIZE) {
+        const { data, error } = await supabase
+          .from('group_contacts')
+          .select('contact_id, synced_from_wa')
+          .eq('group_id', groupId)
+          .range(from, from + PAGE_SIZE - 1);
+        stats.roundTrips++;
+        if (error) throw error;
+        (data || []).forEach((row: any) => {
+          existing.add(row.contact_id);
+          if (row.synced_from_wa) syncedMembers.add(row.contact_id);
+        });
+        if (!data || data.length < PAGE_SIZE) break;
+      }
+
+      const desired = new Set<string>();
+      let complete = true;
+      group.participants.forEach(p => {
+        const contactId = contactIdByPhone.get(normalizeWaPhone(p.phone));
+        if (contactId) desired.add(contactId);
+        else complete = false;
+      });
+
+      desired.forEach(contactId => {
+        if (!existing.has(contactId)) {
+          membershipsToAdd.push({ group_id: groupId, contact_id: contactId, synced_from_wa: true });
+        }
+      });
+
+      // Katılımcı listesi eksik çözüldüyse (kişi yazılamadı) silme yapılmaz; aksi halde geçici
+      // bir veritabanı hatası gerçek üyelikleri silerdi
+      const toRemove = complete && !contactErrors
+        ? Array.from(syncedMembers).filter(contactId => !desired.has(contactId))
+        : [];
+      for (const part of chunks(toRemove, chunkSize)) {
+        const { error } = await supabase
+          .from('group_contacts')
+          .delete()
+          .eq('group_id', groupId)
+          .in('contact_id', part);
+        stats.roundTrips++;
+        if (error) throw error;
+        stats.removedGroupMembers += part.length;
+      }
+
+      syncedRows.push({
+        wa_id: group.id,
+        name: group.name,
+        participant_count: group.participants.length,
+        // Eksik kalan üye varsa hash yazılmaz, grup bir sonraki çalıştırmada tekrar işlenir
+        participants_hash: complete ? hash : null,
+        local_group_id: groupId,
+        last_sync_at: new Date().toISOString()
+      });
+    } catch (error: any) {
+      console.error('[Sync] Grup işleme hatası:', group.name, error.message);
+      stats.errors++;
+    }
+  }
+
+  const failedGroupIds = new Set<string>();
+  for (const part of chunks(membershipsToAdd, chunkSize)) {
+    const { error } = await supabase
+      .from('group_contacts')
+      .upsert(part, { onConflict: 'group_id,contact_id', ignoreDuplicates: true });
+    stats.roundTrips++;
+    if (error) {
+      console.error('[Sync] Grup üyesi ekleme hatası:', error.message);
+      stats.errors += part.length;
+      part.forEach(row => failedGroupIds.add(row.group_id));
+      continue;
+    }
+    stats.addedGroupMembers += part.length;
+  }
+  syncedRows
+    .filter(row => failedGroupIds.has(row.local_group_id))
+    .forEach(row => { row.participants_hash = null; });
+
+  // 6. Senkronizasyon kaydını güncelle (bir sonraki çalıştırmada değişmemiş gruplar atlanır)
+  for (const part of chunks(syncedRows, chunkSize)) {
+    const { error } = await supabase
+      .from('wa_groups')
+      .upsert(part, { onConflict: 'wa_id' });
+    stats.roundTrips++;
+    if (error) throw error;
+  }
+
+  return stats;
+}
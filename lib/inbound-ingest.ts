@@ -0,0 +1,304 @@
+import { InboundMessage } from '@/types';
+import { formatPhoneNumber } from './utils';
+
+/**
+ * Kuyruğa eklenen ham gelen mesaj (kanal olay işleyicisinden)
+ */
+export interface InboundEvent {
+  channel: InboundMessage['channel'];
+  // WA: '905xxxxxxxxx@c.us' veya '@lid' kimliği, Twilio: 'whatsapp:+905xxxxxxxxx'
+  from: string;
+  to?: string | null;
+  body?: string | null;
+  externalId?: string | null;
+  sessionName?: string | null;
+  numMedia?: number;
+  receivedAt?: number;
+}
+
+export interface InboundQueueOptions {
+  batchSize?: number;
+  flushIntervalMs?: number;
+  maxQueued?: number;
+  optOutKeywords?: string[];
+  // Test/benchmark için: varsayılan Supabase yazıcıları yerine
+  persist?: (messages: InboundMessage[]) => Promise<void>;
+  blacklist?: (phones: string[]) => Promise<number>;
+}
+
+export interface InboundQueueStats {
+  queued: number;
+  enqueued: number;
+  persisted: number;
+  dropped: number;
+  optOuts: number;
+  blacklisted: number;
+  pendingOptOuts: number;
+  flushes: number;
+  failedFlushes: number;
+  lastFlushAt: string | null;
+  lastError: string | null;
+}
+
+const DEFAULT_OPT_OUT_KEYWORDS = ['STOP', 'İPTAL', 'IPTAL'];
+
+function envNumber(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+function envKeywords(): string[] {
+  const raw = process.env.INBOUND_OPT_OUT_KEYWORDS;
+  if (!raw) return DEFAULT_OPT_OUT_KEYWORDS;
+  return raw.split(',').map(keyword => keyword.trim().toLocaleUpperCase('tr-TR')).filter(Boolean);
+}
+
+/**
+ * Mesajın abonelikten çıkma isteği olup olmadığını kontrol eder.
+ * Yalnızca kısa mesajlarda ilk kelimeye bakılır ("STOP", "iptal lütfen");
+ * uzun cümlelerin içinde geçen kelimeler (ör. "iptal olan sipariş") sayılmaz.
+ */
+export function isOptOutMessage(body: string, keywords: string[] = DEFAULT_OPT_OUT_KEYWORDS): boolean {
+  const words = body
+    .toLocaleUpperCase('tr-TR')
+    .replace(/[^\p{L}\p{N}\s]/gu, ' ')
+    .split(/\s+/)
+    .filter(Boolean);
+
+  return words.length > 0 && words.length <= 3 && keywords.includes(words[0]);
+}
+
+/**
+ * Kanal kimliğini telefon numarasına çevirir; numaraya çevrilemeyen kimlikler (WA @lid) null
+ */
+function toPhone(from: string): string | null {
+  const id = from.replace(/^whatsapp:/, '');
+  if (id.includes('@') && !id.endsWith('@c.us')) return null;
+  const digits = id.replace(/@c\.us$/, '');
+  return /^\+?\d{7,15}$/.test(digits) ? formatPhoneNumber(digits) : null;
+}
+
+/**
+ * Gelen mesajlar için süreç içi kuyruk. Webhook ve WA olay işleyicileri yalnızca
+ * enqueue eder (senkron, veritabanı beklemez); kuyruk dolunca veya kısa bir aralıkla
+ * mesajlar tek toplu insert ile yazılır. STOP/İPTAL gönderen numaralar aynı flush'ta
+ * blacklist'e eklenir. Yazma hatasında batch kuyruğun başına geri konur; blacklist'e
+ * eklenemeyen numaralar bekletilir ve sonraki flush'ta (veya kısa bir beklemeyle) tekrar denenir.
+ */
+export class InboundQueue {
+  private readonly batchSize: number;
+  private readonly flushIntervalMs: number;
+  private readonly maxQueued: number;
+  private readonly optOutKeywords: string[];
+  private readonly persist: (messages: InboundMessage[]) => Promise<void>;
+  private readonly blacklist: (phones: string[]) => Promise<number>;
+
+  private queue: InboundMessage[] = [];
+  // Blacklist'e eklenemeyen opt-out numaraları (tekrar denenecek)
+  private pendingOptOuts = new Set<string>();
+  private optOutTimer: ReturnType<typeof setTimeout> | null = null;
+  private timer: ReturnType<typeof setTimeout> | null = null;
+  private flushing: Promise<void> | null = null;
+  private stats: InboundQueueStats = {
+    queued: 0,
+    enqueued: 0,
+    persisted: 0,
+    dropped: 0,
+    optOuts: 0,
+    blacklisted: 0,
+    pendingOptOuts: 0,
+    flushes: 0,
+    failedFlushes: 0,
+    lastFlushAt: null,
+    lastError: null
+  };
+
+  constructor(options: InboundQueueOptions = {}) {
+    this.batchSize = options.batchSize ?? envNumber('INBOUND_BATCH_SIZE', 200);
+    this.flushIntervalMs = options.flushIntervalMs ?? envNumber('INBOUND_FLUSH_INTERVAL_MS', 500);
+    this.maxQueued = options.maxQueued ?? envNumber('INBOUND_MAX_QUEUED', 50000);
+    this.optOutKeywords = options.optOutKeywords || envKeywords();
+    this.persist = options.persist || persistInboundMessages;
+    this.blacklist = options.blacklist || blacklistOptOuts;
+  }
+
+  getStats(): InboundQueueStats {
+    return { ...this.stats, queued: this.queue.length, pendingOptOuts: this.pendingOptOuts.size };
+  }
+
+  /**
+   * Olayı kuyruğa ekler ve hemen döner
+   */
+  enqueue(event: InboundEvent): void {
+    if (this.queue.length >= this.maxQueued) {
+      // Veritabanı uzun süre erişilemezse bellek sınırsız büyümesin
+      this.stats.dropped++;
+      if (this.stats.dropped % 1000 === 1) {
+        console.error('[Inbound] Kuyruk dolu, gelen mesaj düşürüldü. Toplam düşen:', this.stats.dropped);
+      }
+      return;
+    }
+
+    const body = event.body || '';
+    const phone = toPhone(event.from);
+    const isOptOut = !!phone && isOptOutMessage(body, this.optOutKeywords);
+
+    this.queue.push({
+      channel: event.channel,
+      phone: phone || event.from,
+      to_phone: event.to || null,
+      body,
+      external_id: event.externalId || null,
+      session_name: event.sessionName || null,
+      num_media: event.numMedia || 0,
+      is_opt_out: isOptOut,
+      received_at: new Date(event.receivedAt || Date.now()).toISOString()
+    });
+    this.stats.enqueued++;
+    if (isOptOut) this.stats.optOuts++;
+
+    if (this.queue.length >= this.batchSize) {
+      this.flushSoon(0);
+    } else {
+      this.flushSoon(this.flushIntervalMs);
+    }
+  }
+
+  /**
+   * Kuyrukta bekleyen her şeyi yazar (kapanışta veya testte)
+   */
+  async drain(): Promise<void> {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    while (this.flushing || this.queue.length > 0) {
+      if (this.flushing) {
+        await this.flushing;
+        continue;
+      }
+      const before = this.stats.failedFlushes;
+      await this.flush();
+      if (this.stats.failedFlushes > before) break;
+    }
+    if (this.pendingOptOuts.size > 0) await this.blacklistOptOuts([]);
+  }
+
+  private flushSoon(delayMs: number): void {
+    if (this.flushing) return;
+    if (this.timer) {
+      if (delayMs > 0) return;
+      clearTimeout(this.timer);
+    }
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.flush();
+    }, delayMs);
+  }
+
+  private flush(): Promise<void> {
+    if (this.flushing || this.queue.length === 0) return this.flushing || Promise.resolve();
+
+    const batch = this.queue.splice(0, this.batchSize);
+    this.flushing = this.writeBatch(batch).finally(() => {
+      this.flushing = null;
+      if (this.queue.length > 0) {
+        // Hata sonrası veritabanını zorlamamak için bekleyerek devam et
+        this.flushSoon(this.stats.lastError ? this.flushIntervalMs * 4 : 0);
+      }
+    });
+    return this.flushing;
+  }
+
+  private async writeBatch(batch: InboundMessage[]): Promise<void> {
+    this.stats.flushes++;
+    try {
+      await this.persist(batch);
+      this.stats.persisted += batch.length;
+      this.stats.lastError = null;
+    } catch (error: any) {
+      this.stats.failedFlushes++;
+      this.stats.lastError = error.message;
+      console.error('[Inbound] Gelen mesajlar yazılamadı, tekrar denenecek:', error.message);
+      this.queue.unshift(...batch);
+      return;
+    } finally {
+      this.stats.lastFlushAt = new Date().toISOString();
+    }
+
+    await this.blacklistOptOuts(batch.filter(m => m.is_opt_out).map(m => m.phone));
+  }
+
+  /**
+   * Yeni ve önceden eklenemeyen opt-out numaralarını blacklist'e ekler.
+   * Hata durumunda numaralar bekletilir ve kısa bir beklemeyle tekrar denenir.
+   */
+  private async blacklistOptOuts(phones: string[]): Promise<void> {
+    phones.forEach(phone => this.pendingOptOuts.add(phone));
+    if (this.pendingOptOuts.size === 0) return;
+    if (this.optOutTimer) {
+      clearTimeout(this.optOutTimer);
+      this.optOutTimer = null;
+    }
+
+    const pending = Array.from(this.pendingOptOuts);
+    try {
+      const added = await this.blacklist(pending);
+      pending.forEach(phone => this.pendingOptOuts.delete(phone));
+      this.stats.blacklisted += added;
+      if (added > 0) console.log('[Inbound] STOP/İPTAL ile blacklist\'e eklendi:', added);
+    } catch (error: any) {
+      console.error('[Inbound] Blacklist ekleme hatası, tekrar denenecek:', pending.length, error.message);
+      if (!this.optOutTimer) {
+        this.optOutTimer = setTimeout(() => {
+          this.optOutTimer = null;
+          this.blacklistOptOuts([]);
+        }, this.flushIntervalMs * 4);
+      }
+    }
+  }
+}
+
+async function persistInboundMessages(messages: InboundMessage[]): Promise<void> {
+  const { insertInboundMessages } = await import('./db/inbound-messages');
+  await insertInboundMessages(messages);
+}
+
+/**
+ * Henüz listede olmayan numaraları blacklist'e ekler, eklenen sayısını döner
+ */
+async function blacklistOptOuts(phones: string[]): Promise<number> {
+  const { addToBlacklist, getBlacklistedPhones, invalidateBlacklistSnapshot } = await import('./db/blacklist');
+  const existing = await getBlacklistedPhones(phones);
+  let added = 0;
+
+  for (const phone of phones) {
+    if (existing.has(phone)) continue;
+    try {
+      await addToBlacklist(phone, 'opt_out');
+      added++;
+    } catch (error: any) {
+      // Aynı anda başka bir süreç eklediyse (unique ihlali) sorun değil
+      if (error.code !== '23505') throw error;
+    }
+  }
+
+  // Sonraki kampanya uyum kontrolü yeni numaraları görsün
+  invalidateBlacklistSnapshot();
+  return added;
+}
+
+// Global kuyruk (Next.js module re-import sorununu çözmek için)
+declare global {
+  var inboundQueue: InboundQueue | undefined;
+}
+
+/**
+ * Süreç içi gelen mesaj kuyruğunu getirir
+ */
+export function getInboundQueue(): InboundQueue {
+  if (!global.inboundQueue) {
+    global.inboundQueue = new InboundQueue();
+  }
+  return global.inboundQueue;
+}
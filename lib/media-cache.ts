@@ -0,0 +1,159 @@
+import { createHash } from 'crypto';
+
+/**
+ * Medya önbelleği istatistikleri
+ */
+export interface MediaCacheStats {
+  entries: number;
+  bytes: number;
+  maxBytes: number;
+  ttlMs: number;
+  hits: number;
+  misses: number;
+  evictions: number;
+  expirations: number;
+}
+
+interface CacheEntry<T> {
+  value: T;
+  bytes: number;
+  expiresAt: number;
+}
+
+/**
+ * Byte sınırlı ve TTL'li LRU önbellek.
+ * Aynı anahtar için eşzamanlı yüklemeler tek bir yüklemede birleştirilir.
+ */
+export class MediaCache<T> {
+  private entries = new Map<string, CacheEntry<T>>();
+  private inFlight = new Map<string, Promise<T>>();
+  private bytes = 0;
+  private stats = { hits: 0, misses: 0, evictions: 0, expirations: 0 };
+
+  constructor(
+    private readonly maxBytes: number,
+    private readonly ttlMs: number
+  ) {}
+
+  /**
+   * Anahtar önbellekteyse döner, değilse loader ile üretip önbelleğe koyar
+   */
+  async getOrLoad(key: string, loader: () => Promise<T>, sizeOf: (value: T) => number): Promise<T> {
+    const cached = this.get(key);
+    if (cached !== undefined) return cached;
+
+    const pending = this.inFlight.get(key);
+    if (pending) {
+      this.stats.hits++;
+      return pending;
+    }
+
+    this.stats.misses++;
+    const load = loader()
+      .then(value => {
+        this.set(key, value, sizeOf(value));
+        return value;
+      })
+      .finally(() => {
+        this.inFlight.delete(key);
+      });
+
+    this.inFlight.set(key, load);
+    return load;
+  }
+
+  private get(key: string): T | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+
+    if (entry.expiresAt <= Date.now()) {
+      this.delete(key);
+      this.stats.expirations++;
+      return undefined;
+    }
+
+    // LRU: erişilen kaydı en sona taşı
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.stats.hits++;
+    return entry.value;
+  }
+
+  private set(key: string, value: T, bytes: number): void {
+    // Sınırdan büyük kayıtlar önbelleğe alınmaz
+    if (bytes > this.maxBytes) return;
+
+    this.delete(key);
+    this.entries.set(key, { value, bytes, expiresAt: Date.now() + this.ttlMs });
+    this.bytes += bytes;
+
+    // En eski kayıtlardan başlayarak sınırın altına in
+    for (const oldestKey of Array.from(this.entries.keys())) {
+      if (this.bytes <= this.maxBytes) break;
+      this.delete(oldestKey);
+      this.stats.evictions++;
+    }
+  }
+
+  private delete(key: string): void {
+    const entry = this.entries.get(key);
+    if (entry) {
+      this.bytes -= entry.bytes;
+      this.entries.delete(key);
+    }
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.bytes = 0;
+  }
+
+  getStats(): MediaCacheStats {
+    return {
+      entries: this.entries.size,
+      bytes: this.bytes,
+      maxBytes: this.maxBytes,
+      ttlMs: this.ttlMs,
+      ...this.stats
+    };
+  }
+}
+
+// Aynı base64 string'i arka arkaya hash'lememek için son hesaplanan değer
+let lastHashedData: string | null = null;
+let lastHash = '';
+
+/**
+ * İçerik hash'i (sha256). Toplu gönderimde aynı string tekrar geldiğinde yeniden hesaplanmaz.
+ */
+export function contentHash(data: string): string {
+  if (data === lastHashedData) return lastHash;
+
+  lastHash = createHash('sha256').update(data).digest('hex');
+  lastHashedData = data;
+  return lastHash;
+}
+
+function envNumber(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+// Global önbellek (Next.js module re-import sorununu çözmek için)
+declare global {
+  var waMediaCache: MediaCache<any> | undefined;
+}
+
+/**
+ * WhatsApp gönderimlerinin paylaştığı MessageMedia önbelleği
+ * WA_MEDIA_CACHE_MAX_BYTES (varsayılan 200 MB) ve WA_MEDIA_CACHE_TTL_MS (varsayılan 30 dk)
+ */
+export function getMediaCache(): MediaCache<any> {
+  if (!global.waMediaCache) {
+    global.waMediaCache = new MediaCache<any>(
+      envNumber('WA_MEDIA_CACHE_MAX_BYTES', 200 * 1024 * 1024),
+      envNumber('WA_MEDIA_CACHE_TTL_MS', 30 * 60 * 1000)
+    );
+  }
+  return global.waMediaCache;
+}
@@ -0,0 +1,257 @@
+import { createHash, randomUUID } from 'crypto';
+import { createReadStream, createWriteStream, promises as fs } from 'fs';
+import os from 'os';
+import path from 'path';
+import { Readable } from 'stream';
+import { pipeline } from 'stream/promises';
+import { supabase } from './supabase';
+import { getMediaType } from './storage';
+
+const BUCKET_NAME = 'whatsapp-media';
+const CHUNK_DIR = path.join(os.tmpdir(), 'media-uploads');
+// Tamamlanmamış parçalı yüklemeler bu süreden sonra silinir
+const CHUNK_UPLOAD_TTL_MS = 24 * 60 * 60 * 1000;
+
+export const MAX_UPLOAD_BYTES = 50 * 1024 * 1024;
+export const UPLOAD_CHUNK_BYTES = 5 * 1024 * 1024;
+
+/**
+ * İçerik adresli medya kaydı (media_objects satırı)
+ */
+export interface MediaObject {
+  sha256: string;
+  path: string;
+  url: string;
+  size_bytes: number;
+  mime_type: string | null;
+  media_type: 'image' | 'video' | 'document' | 'audio';
+  filename: string | null;
+}
+
+export interface ChunkUpload {
+  id: string;
+  filename: string;
+  mimeType: string;
+  size: number;
+  chunkSize: number;
+  totalChunks: number;
+  received: number[];
+}
+
+export class UploadTooLargeError extends Error {
+  constructor() {
+    super(`Dosya boyutu ${MAX_UPLOAD_BYTES / 1024 / 1024}MB'dan büyük olamaz`);
+  }
+}
+
+export function isSha256(value: string | null | undefined): value is string {
+  return !!value && /^[0-9a-f]{64}$/.test(value);
+}
+
+function contentPath(sha256: string, filename: string): string {
+  const ext = (filename.split('.').pop() || 'bin').toLowerCase().replace(/[^a-z0-9]/g, '') || 'bin';
+  return `media/${sha256.slice(0, 2)}/${sha256}.${ext}`;
+}
+
+/**
+ * Hash ile daha önce yüklenmiş dosyayı bulur
+ */
+export async function findMediaByHash(sha256: string): Promise<MediaObject | null> {
+  const { data, error } = await supabase
+    .from('media_objects')
+    .select('*')
+    .eq('sha256', sha256)
+    .maybeSingle();
+
+  if (error) throw error;
+  return data;
+}
+
+/**
+ * Akışı storage'a yüklerken SHA-256'sını hesaplar, ardından içerik adresli yola taşır.
+ * Aynı içerik zaten varsa geçici nesne silinir ve mevcut kayıt döner.
+ */
+export async function storeMediaStream(
+  body: ReadableStream<Uint8Array>,
+  options: { filename: string; mimeType: string }
+): Promise<MediaObject & { deduplicated: boolean }> {
+  const hash = createHash('sha256');
+  let size = 0;
+
+  const hashing = new TransformStream<Uint8Array, Uint8Array>({
+    transform(chunk, controller) {
+      size += chunk.byteLength;
+      if (size > MAX_UPLOAD_BYTES) {
+        controller.error(new UploadTooLargeError());
+        return;
+      }
+      hash.update(chunk);
+      controller.enqueue(chunk);
+    }
+  });
+
+  const tmpPath = `tmp/${randomUUID()}`;
+  const { error: uploadError } = await supabase.storage
+    .from(BUCKET_NAME)
+    .upload(tmpPath, body.pipeThrough(hashing) as any, {
+      contentType: options.mimeType || 'application/octet-stream',
+      cacheControl: '31536000',
+      upsert: false,
+      duplex: 'half'
+    });
+
+  if (size > MAX_UPLOAD_BYTES) throw new UploadTooLargeError();
+  if (uploadError) throw new Error(`Dosya yükleme hatası: ${uploadError.message}`);
+
+  const sha256 = hash.digest('hex');
+  const existing = await findMediaByHash(sha256);
+  if (existing) {
+    await supabase.storage.from(BUCKET_NAME).remove([tmpPath]);
+    return { ...existing, deduplicated: true };
+  }
+
+  const finalPath = contentPath(sha256, options.filename);
+  const { error: moveError } = await supabase.storage.from(BUCKET_NAME).move(tmpPath, finalPath);
+  if (moveError) {
+    // Aynı içerik eşzamanlı yüklendiyse hedef zaten vardır; geçici kopyayı bırakma
+    await supabase.storage.from(BUCKET_NAME).remove([tmpPath]);
+    if (!/exists/i.test(moveError.message)) {
+      throw new Error(`Dosya yükleme hatası: ${moveError.message}`);
+    }
+  }
+
+  const { data: urlData } = supabase.storage.from(BUCKET_NAME).getPublicUrl(finalPath);
+  const record: MediaObject = {
+    sha256,
+    path: finalPath,
+    url: urlData.publicUrl,
+    size_bytes: size,
+    mime_type: options.mimeType || null,
+    media_type: getMediaType(options.filename),
+    filename: options.filename
+  };
+
+  const { error: insertError } = await supabase
+    .from('media_objects')
+    .upsert(record, { onConflict: 'sha256', ignoreDuplicates: true });
+
+  if (insertError) throw insertError;
+  return { ...record, deduplicated: false };
+}
+
+// --- Parçalı / devam ettirilebilir yükleme -----------------------------------
+
+function chunkDir(id: string): string | null {
+  return /^[0-9a-f-]{36}$/i.test(id) ? path.join(CHUNK_DIR, id) : null;
+}
+
+async function removeExpiredChunkUploads(): Promise<void> {
+  try {
+    const now = Date.now();
+    for (const name of await fs.readdir(CHUNK_DIR)) {
+      const dir = path.join(CHUNK_DIR, name);
+      const stat = await fs.stat(dir);
+      if (now - stat.mtimeMs > CHUNK_UPLOAD_TTL_MS) await fs.rm(dir, { recursive: true, force: true });
+    }
+  } catch {
+    // Klasör henüz yok
+  }
+}
+
+/**
+ * Parçalı yükleme oturumu açar; parçalar sunucu diskinde biriktirilir
+ */
+export async function createChunkUpload(meta: { filename: string; mimeType: string; size: number }): Promise<ChunkUpload> {
+  if (meta.size > MAX_UPLOAD_BYTES) throw new UploadTooLargeError();
+  await removeExpiredChunkUploads();
+
+  const upload: ChunkUpload = {
+    id: randomUUID(),
+    filename: meta.filename,
+    mimeType: meta.mimeType,
+    size: meta.size,
+    chunkSize: UPLOAD_CHUNK_BYTES,
+    totalChunks: Math.max(1, Math.ceil(meta.size / UPLOAD_CHUNK_BYTES)),
+    received: []
+  };
+
+  const dir = chunkDir(upload.id)!;
+  await fs.mkdir(dir, { recursive: true });
+  await fs.writeFile(path.join(dir, 'meta.json'), JSON.stringify(upload));
+  return upload;
+}
+
+/**
+ * Oturum bilgisini ve alınmış parça numaralarını döner (devam ettirmek için)
+ */
+export async function getChunkUpload(id: string): Promise<ChunkUpload | null> {
+  const dir = chunkDir(id);
+  if (!dir) return null;
+
+  try {
+    const upload: ChunkUpload = JSON.parse(await fs.readFile(path.join(dir, 'meta.json'), 'utf8'));
+    const files = await fs.readdir(dir);
+    upload.received = files
+      .filter(name => name.endsWith('.part'))
+      .map(name => parseInt(name, 10))
+      .sort((a, b) => a - b);
+    return upload;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Tek bir parçayı diske yazar; aynı parça tekrar gönderilirse üzerine yazılır
+ */
+export async function writeChunk(id: string, index: number, body: ReadableStream<Uint8Array>): Promise<ChunkUpload> {
+  const upload = await getChunkUpload(id);
+  if (!upload) throw new Error('Yükleme oturumu bulunamadı');
+  if (!Number.isInteger(index) || index < 0 || index >= upload.totalChunks) {
+    throw new Error('Geçersiz parça numarası');
+  }
+
+  const dir = chunkDir(id)!;
+  const partial = path.join(dir, `${index}.tmp`);
+  await pipeline(Readable.fromWeb(body as any), createWriteStream(partial));
+
+  const { size } = await fs.stat(partial);
+  const expected = index === upload.totalChunks - 1
+    ? upload.size - index * upload.chunkSize
+    : upload.chunkSize;
+  if (size !== expected) {
+    await fs.rm(partial, { force: true });
+    throw new Error(`Parça boyutu hatalı (${size}/${expected})`);
+  }
+
+  // Tamamlanan parça atomik olarak görünür olur
+  await fs.rename(partial, path.join(dir, `${index}.part`));
+  return (await getChunkUpload(id))!;
+}
+
+/**
+ * Tüm parçalar geldiyse onları sırayla tek bir akış halinde storage'a yükler
+ */
+export async function completeChunkUpload(id: string): Promise<MediaObject & { deduplicated: boolean }> {
+  const upload = await getChunkUpload(id);
+  if (!upload) throw new Error('Yükleme oturumu bulunamadı');
+  if (upload.received.length !== upload.totalChunks) {
+    throw new Error(`Eksik parçalar var (${upload.received.length}/${upload.totalChunks})`);
+  }
+
+  const dir = chunkDir(id)!;
+  async function* parts() {
+    for (let index = 0; index < upload!.totalChunks; index++) {
+      yield* createReadStream(path.join(dir, `${index}.part`));
+    }
+  }
+
+  const media = await storeMediaStream(
+    Readable.toWeb(Readable.from(parts())) as ReadableStream<Uint8Array>,
+    { filename: upload.filename, mimeType: upload.mimeType }
+  );
+
+  // Hata durumunda parçalar diskte kalır; tamamlama tekrar denenebilir
+  await fs.rm(dir, { recursive: true, force: true });
+  return { ...media, filename: upload.filename };
+}
@@ -0,0 +1,153 @@
+/**
+ * Tarayıcı tarafı medya yükleyici: dosyanın SHA-256'sı hesaplanır, sunucuda aynı
+ * içerik varsa hiç byte gönderilmeden mevcut URL kullanılır. Küçük dosyalar tek
+ * istekte ham gövde olarak, büyük dosyalar devam ettirilebilir parçalar halinde gider.
+ */
+
+export interface UploadedMedia {
+  url: string;
+  type: 'image' | 'video' | 'document' | 'audio';
+  filename: string;
+  sha256?: string;
+  size?: number;
+  deduplicated?: boolean;
+}
+
+export interface MediaUploadOptions {
+  onProgress?: (uploadedBytes: number, totalBytes: number) => void;
+}
+
+// Bu boyutun üzerindeki dosyalar parçalı yüklenir
+const DIRECT_UPLOAD_MAX_BYTES = 8 * 1024 * 1024;
+const CHUNK_MAX_RETRIES = 3;
+const RESUME_KEY_PREFIX = 'media-upload:';
+
+// Aynı sayfa oturumunda aynı dosya ikinci kez yüklenmez (gönderim tekrarları dahil)
+const uploadCache = new Map<string, Promise<UploadedMedia>>();
+
+function fileKey(file: File): string {
+  return `${file.name}:${file.size}:${file.lastModified}`;
+}
+
+async function readJson(response: Response, fallback: string): Promise<any> {
+  const data = await response.json().catch(() => ({}));
+  if (!response.ok) throw new Error(data.error || fallback);
+  return data;
+}
+
+/**
+ * Dosyanın SHA-256 özetini hex olarak döner; Web Crypto yoksa (güvensiz bağlam) null
+ */
+export async function sha256File(file: File): Promise<string | null> {
+  if (typeof crypto === 'undefined' || !crypto.subtle) return null;
+  const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+  return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
+async function uploadDirect(file: File, options: MediaUploadOptions): Promise<UploadedMedia> {
+  const params = new URLSearchParams({ filename: file.name });
+  const response = await fetch(`/api/upload?${params}`, {
+    method: 'POST',
+    headers: { 'Content-Type': file.type || 'application/octet-stream' },
+    body: file,
+  });
+  const data = await readJson(response, 'Yüklenemedi');
+  options.onProgress?.(file.size, file.size);
+  return data;
+}
+
+async function uploadChunked(file: File, sha256: string | null, options: MediaUploadOptions): Promise<UploadedMedia> {
+  const resumeKey = sha256 ? RESUME_KEY_PREFIX + sha256 : null;
+  let upload: { id: string; chunkSize: number; totalChunks: number; received: number[] } | null = null;
+
+  // Yarıda kalmış oturum varsa eksik parçalardan devam et
+  const previousId = resumeKey ? localStorage.getItem(resumeKey) : null;
+  if (previousId) {
+    const response = await fetch(`/api/upload/chunks/${previousId}`);
+    if (response.ok) upload = await response.json();
+    else localStorage.removeItem(resumeKey!);
+  }
+
+  if (!upload) {
+    const response = await fetch('/api/upload/chunks', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ filename: file.name, size: file.size, type: file.type }),
+    });
+    upload = await readJson(response, 'Yükleme başlatılamadı');
+    if (resumeKey) localStorage.setItem(resumeKey, upload!.id);
+  }
+
+  const { id, chunkSize, totalChunks } = upload!;
+  const received = new Set(upload!.received);
+  let uploadedBytes = Math.min(received.size * chunkSize, file.size);
+  options.onProgress?.(uploadedBytes, file.size);
+
+  for (let index = 0; index < totalChunks; index++) {
+    if (received.has(index)) continue;
+    const part = file.slice(index * chunkSize, Math.min((index + 1) * chunkSize, file.size));
+
+    for (let attempt = 1; ; attempt++) {
+      try {
+        const response = await fetch(`/api/upload/chunks/${id}?index=${index}`, { method: 'PUT', body: part });
+        await readJson(response, 'Parça yüklenemedi');
+        break;
+      } catch (error) {
+        if (attempt >= CHUNK_MAX_RETRIES) throw error;
+        await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+      }
+    }
+
+    uploadedBytes += part.size;
+    options.onProgress?.(uploadedBytes, file.size);
+  }
+
+  const response = await fetch(`/api/upload/chunks/${id}`, { method: 'POST' });
+  const data = await readJson(response, 'Yükleme tamamlanamadı');
+  if (resumeKey) localStorage.removeItem(resumeKey);
+  return data;
+}
+
+async function uploadFile(file: File, options: MediaUploadOptions): Promise<UploadedMedia> {
+  const sha256 = await sha256File(file);
+
+  if (sha256) {
+    const params = new URLSearchParams({ sha256, filename: file.name });
+    const lookup = await fetch(`/api/upload?${params}`).then(r => r.json()).catch(() => null);
+    if (lookup?.exists) {
+      options.onProgress?.(file.size, file.size);
+      return lookup;
+    }
+  }
+
+  return file.size > DIRECT_UPLOAD_MAX_BYTES
+    ? uploadChunked(file, sha256, options)
+    : uploadDirect(file, options);
+}
+
+/**
+ * Dosyayı yükler (veya daha önce yüklenmiş kopyasını bulur) ve medya bilgisini döner
+ */
+export function uploadMedia(file: File, options: MediaUploadOptions = {}): Promise<UploadedMedia> {
+  const key = fileKey(file);
+  const cached = uploadCache.get(key);
+  if (cached) return cached;
+
+  const pending = uploadFile(file, options).then(
+    (data) => ({
+      url: data.url,
+      type: data.type,
+      filename: file.name,
+      sha256: data.sha256,
+      size: data.size,
+      deduplicated: data.deduplicated,
+    }),
+    (error) => {
+      uploadCache.delete(key);
+      throw new Error(`${file.name}: ${error.message || 'Yüklenemedi'}`);
+    }
+  );
+
+  uploadCache.set(key, pending);
+  return pending;
+}
@@ -0,0 +1,92 @@
+import { createClient } from './supabase';
+import { formatPhoneNumber } from './utils';
+import { Campaign, Contact } from '@/types';
+
+/**
+ * Kampanya alıcısı (manuel numaralarda id = telefon)
+ */
+export type Recipient = Pick<Contact, 'id' | 'name' | 'surname' | 'phone'> & Partial<Contact>;
+
+export interface RecipientStreamOptions {
+  // Her sayfada dönen en fazla alıcı sayısı
+  pageSize?: number;
+  client?: ReturnType<typeof createClient>;
+}
+
+/**
+ * Tekilleştirme anahtarı: numara +90... biçimine normalize edilir
+ */
+export function recipientKey(phone: string): string {
+  return formatPhoneNumber(phone) || phone;
+}
+
+/**
+ * Kampanyanın hedef kitlesini sayfa sayfa üretir.
+ * Kişiler chunk'lı .in('id') sorgularıyla, gruplar tek bir group_contacts join'i ile
+ * (id üzerinden keyset sayfalama) çekilir; aynı numara birden fazla kez dönmez.
+ * Bellekte sadece mevcut sayfa ve görülen numaraların kümesi tutulur.
+ */
+export async function* streamCampaignRecipients(
+  campaign: Pick<Campaign, 'target_type' | 'target_contacts' | 'target_groups' | 'target_manual_phones'>,
+  options: RecipientStreamOptions = {}
+): AsyncGenerator<Recipient[]> {
+  const supabase = options.client || createClient();
+  const pageSize = options.pageSize || 500;
+  const seen = new Set<string>();
+
+  const unique = (rows: Recipient[]): Recipient[] =>
+    rows.filter(row => {
+      if (!row.phone) return false;
+      const key = recipientKey(row.phone);
+      if (seen.has(key)) return false;
+      seen.add(key);
+      return true;
+    });
+
+  if (campaign.target_type === 'contacts' && campaign.target_contacts) {
+    const ids = Array.from(new Set(campaign.target_contacts));
+    for (let i = 0; i < ids.length; i += pageSize) {
+      const { data, error } = await supabase
+        .from('contacts')
+        .select('*')
+        .in('id', ids.slice(i, i + pageSize));
+
+      if (error) throw error;
+      const page = unique(data || []);
+      if (page.length > 0) yield page;
+    }
+  } else if (campaign.target_type === 'groups' && campaign.target_groups && campaign.target_groups.length > 0) {
+    const groupIds = Array.from(new Set(campaign.target_groups));
+    let lastId: string | null = null;
+
+    while (true) {
+      let query = supabase
+        .from('contacts')
+        .select('*, group_contacts!inner(group_id)')
+        .in('group_contacts.group_id', groupIds)
+        .order('id', { ascending: true })
+        .limit(pageSize);
+      if (lastId) query = query.gt('id', lastId);
+
+      const { data, error } = await query;
+      if (error) throw error;
+      if (!data || data.length === 0) break;
+
+      lastId = data[data.length - 1].id;
+      const page = unique(data.map(({ group_contacts, ...contact }: any) => contact));
+      if (page.length > 0) yield page;
+      if (data.length < pageSize) break;
+    }
+  } else if (campaign.target_type === 'manual' && campaign.target_manual_phones) {
+    const phones = campaign.target_manual_phones;
+    for (let i = 0; i < phones.length; i += pageSize) {
+      const page = unique(phones.slice(i, i + pageSize).map(phone => ({
+        id: phone,
+        phone,
+        name: phone,
+        surname: ''
+      })));
+      if (page.length > 0) yield page;
+    }
+  }
+}
@@ -0,0 +1,592 @@
+import { Campaign, SendJob } from '@/types';
+import { mapWithConcurrency } from './utils';
+import { getSendScheduler, SendScheduler } from './send-scheduler';
+import { planRetry, RetryDecision, SendErrorClass } from './send-retry';
+
+/**
+ * Tek bir job gönderiminin sonucu
+ */
+export interface SendResult {
+  success: boolean;
+  messageId?: string;
+  error?: string;
+  // Kanal hatayı kendisi sınıflandırabiliyorsa; yoksa mesajdan çıkarılır
+  errorClass?: SendErrorClass;
+  // Mesajı fiilen ileten kanal (message_history.channel: whatsapp-web, yoncu, twilio)
+  channel?: string;
+}
+
+/**
+ * Job'u fiilen ileten kanal (WA Web, Yoncu, Twilio veya test için sahte kanal)
+ */
+export interface SendTransport {
+  send(job: SendJob, campaign: Campaign): Promise<SendResult>;
+}
+
+/**
+ * Dispatcher'ın kuyrukla konuştuğu depo (Supabase veya bellek içi)
+ */
+export interface SendJobStore {
+  claimDueJobs(limit: number, workerId: string): Promise<SendJob[]>;
+  completeJob(job: SendJob, campaign: Campaign, result: SendResult, decision?: RetryDecision): Promise<void>;
+  rescheduleJob(job: SendJob, decision: RetryDecision, error?: string): Promise<void>;
+  releaseJob(job: SendJob): Promise<void>;
+  releaseStaleJobs(timeoutSeconds: number): Promise<number>;
+  getCampaign(campaignId: string): Promise<Campaign | null>;
+  markCampaignRunning(campaignId: string): Promise<void>;
+  finalizeCampaign(campaignId: string): Promise<void>;
+}
+
+export interface DispatcherOptions {
+  workerId?: string;
+  batchSize?: number;
+  concurrency?: number;
+  pollIntervalMs?: number;
+  staleTimeoutSeconds?: number;
+  campaignStatusTtlMs?: number;
+  store?: SendJobStore;
+  transport?: SendTransport;
+  // Kampanya hız ayarlarını uygulayan zamanlayıcı (null = sınırsız, test/benchmark için)
+  scheduler?: SendScheduler | null;
+}
+
+export interface DispatcherStats {
+  running: boolean;
+  workerId: string;
+  ticks: number;
+  claimed: number;
+  sent: number;
+  failed: number;
+  retried: number;
+  parked: number;
+  released: number;
+  lastTickAt: string | null;
+  lastError: string | null;
+}
+
+const ACTIVE_CAMPAIGN_STATUSES: Campaign['status'][] = ['scheduled', 'running'];
+
+function envNumber(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+/**
+ * Supabase üzerindeki send_jobs tablosunu kullanan depo
+ */
+export function createSupabaseJobStore(): SendJobStore {
+  return {
+    async claimDueJobs(limit, workerId) {
+      const { claimDueSendJobs } = await import('./db/campaigns');
+      return claimDueSendJobs(limit, workerId);
+    },
+
+    async completeJob(job, campaign, result, decision) {
+      const { updateSendJob } = await import('./db/campaigns');
+      const { createMessageHistory } = await import('./db/message-history');
+      const now = new Date().toISOString();
+
+      await updateSendJob(job.id, result.success
+        ? { status: 'sent', attempts: job.attempts + 1, sent_at: now, claimed_by: null }
+        : {
+            status: 'failed',
+            attempts: decision?.attempts ?? job.attempts + 1,
+            last_error: result.error,
+            last_error_at: now,
+            error_class: decision?.errorClass ?? null,
+            dead_lettered_at: now,
+            claimed_by: null
+          });
+
+      if (result.success) {
+        await createMessageHistory({
+          phone: job.recipient_phone,
+          message: job.message_content,
+          contact_name: job.recipient_name || null,
+          media_url: job.media_url,
+          media_type: job.media_type,
+          status: 'sent',
+          channel: result.channel || (campaign.channel === 'wa_web' ? 'whatsapp-web' : 'yoncu'),
+          campaign_id: campaign.id
+        });
+      }
+    },
+
+    async rescheduleJob(job, decision, error) {
+      const { updateSendJob } = await import('./db/campaigns');
+      await updateSendJob(job.id, {
+        status: 'pending',
+        attempts: decision.attempts,
+        last_error: error,
+        last_error_at: new Date().toISOString(),
+        error_class: decision.errorClass,
+        scheduled_at: decision.scheduledAt,
+        claimed_by: null,
+        claimed_at: null
+      });
+    },
+
+    async releaseJob(job) {
+      const { updateSendJob } = await import('./db/campaigns');
+      await updateSendJob(job.id, { status: 'pending', claimed_by: null, claimed_at: null });
+    },
+
+    async releaseStaleJobs(timeoutSeconds) {
+      const { releaseStaleSendJobs } = await import('./db/campaigns');
+      return releaseStaleSendJobs(timeoutSeconds);
+    },
+
+    async getCampaign(campaignId) {
+      const { getCampaignById } = await import('./db/campaigns');
+      return getCampaignById(campaignId);
+    },
+
+    async markCampaignRunning(campaignId) {
+      const { updateCampaign } = await import('./db/campaigns');
+      await updateCampaign(campaignId, { status: 'running' });
+    },
+
+    async finalizeCampaign(campaignId) {
+      const { countOpenSendJobs, updateCampaign, updateCampaignStats } = await import('./db/campaigns');
+      const open = await countOpenSendJobs(campaignId);
+      if (open === 0) {
+        // Sayaçları trigger'lar tutar; tam sayım yalnızca kampanya biterken bir kez yapılır
+        // (her tick'te mutlak yazım, trigger'ların eş zamanlı artışlarıyla yarışırdı)
+        await updateCampaignStats(campaignId);
+        await updateCampaign(campaignId, {
+          status: 'completed',
+          completed_at: new Date().toISOString()
+        });
+        console.log('[Dispatcher] Kampanya tamamlandı:', campaignId);
+      }
+    }
+  };
+}
+
+/**
+ * Test ve benchmark için bellek içi depo (Postgres gerektirmez)
+ */
+export function createInMemoryJobStore(initial: { jobs: SendJob[]; campaigns: Campaign[] }): SendJobStore & {
+  jobs: SendJob[];
+  campaigns: Map<string, Campaign>;
+} {
+  const jobs = initial.jobs.map(job => ({ ...job }));
+  const campaigns = new Map(initial.campaigns.map(c => [c.id, { ...c }]));
+
+  return {
+    jobs,
+    campaigns,
+
+    async claimDueJobs(limit, workerId) {
+      const now = Date.now();
+      const due = jobs
+        .filter(job => {
+          const campaign = campaigns.get(job.campaign_id);
+          return job.status === 'pending' &&
+            new Date(job.scheduled_at).getTime() <= now &&
+            !!campaign && ACTIVE_CAMPAIGN_STATUSES.includes(campaign.status);
+        })
+        .sort((a, b) => a.scheduled_at.localeCompare(b.scheduled_at))
+        .slice(0, limit);
+
+      const claimedAt = new Date().toISOString();
+      for (const job of due) {
+        job.status = 'processing';
+        job.claimed_by = workerId;
+        job.claimed_at = claimedAt;
+        job.processed_at = claimedAt;
+      }
+      return due.map(job => ({ ...job }));
+    },
+
+    async completeJob(job, _campaign, result, decision) {
+      const stored = jobs.find(j => j.id === job.id);
+      if (!stored) return;
+      stored.attempts = decision?.attempts ?? job.attempts + 1;
+      stored.claimed_by = null;
+      if (result.success) {
+        stored.status = 'sent';
+        stored.sent_at = new Date().toISOString();
+      } else {
+        stored.status = 'failed';
+        stored.last_error = result.error;
+        stored.last_error_at = new Date().toISOString();
+        stored.error_class = decision?.errorClass ?? null;
+        stored.dead_lettered_at = stored.last_error_at;
+      }
+    },
+
+    async rescheduleJob(job, decision, error) {
+      const stored = jobs.find(j => j.id === job.id);
+      if (!stored) return;
+      stored.status = 'pending';
+      stored.attempts = decision.attempts;
+      stored.last_error = error;
+      stored.last_error_at = new Date().toISOString();
+      stored.error_class = decision.errorClass;
+      stored.scheduled_at = decision.scheduledAt!;
+      stored.claimed_by = null;
+    },
+
+    async releaseJob(job) {
+      const stored = jobs.find(j => j.id === job.id);
+      if (!stored) return;
+      stored.status = 'pending';
+      stored.claimed_by = null;
+    },
+
+    async releaseStaleJobs(timeoutSeconds) {
+      const threshold = Date.now() - timeoutSeconds * 1000;
+      let released = 0;
+      for (const job of jobs) {
+        if (job.status === 'processing' && job.claimed_at && new Date(job.claimed_at).getTime() < threshold) {
+          job.status = 'pending';
+          job.claimed_by = null;
+          job.claimed_at = null;
+          released++;
+        }
+      }
+      return released;
+    },
+
+    async getCampaign(campaignId) {
+      const campaign = campaigns.get(campaignId);
+      return campaign ? { ...campaign } : null;
+    },
+
+    async markCampaignRunning(campaignId) {
+      const campaign = campaigns.get(campaignId);
+      if (campaign) campaign.status = 'running';
+    },
+
+    async finalizeCampaign(campaignId) {
+      const campaign = campaigns.get(campaignId);
+      if (!campaign) return;
+      const campaignJobs = jobs.filter(j => j.campaign_id === campaignId);
+      campaign.total_recipients = campaignJobs.length;
+      campaign.sent_count = campaignJobs.filter(j => j.status === 'sent').length;
+      campaign.failed_count = campaignJobs.filter(j => j.status === 'failed').length;
+      if (!campaignJobs.some(j => j.status === 'pending' || j.status === 'processing')) {
+        campaign.status = 'completed';
+        campaign.completed_at = new Date().toISOString();
+      }
+    }
+  };
+}
+
+/**
+ * Test ve benchmark için sahte kanal: gecikme ve hata enjekte eder, gönderilenleri ve
+ * aynı anda süren gönderim sayısını kaydeder. `errorFor` job ve deneme numarasına göre
+ * hata mesajı döndürebilir (ör. 'not registered' -> kalıcı, 'WhatsApp bağlı değil' -> park).
+ */
+export function createFakeTransport(options: {
+  latencyMs?: number;
+  failureRate?: number;
+  errorFor?: (job: SendJob, attempt: number) => string | null | undefined;
+} = {}): SendTransport & {
+  sent: Array<{ jobId: string; phone: string; at: number }>;
+  attempts: Map<string, number>;
+  stats: { inFlight: number; maxInFlight: number };
+} {
+  const sent: Array<{ jobId: string; phone: string; at: number }> = [];
+  const attempts = new Map<string, number>();
+  const stats = { inFlight: 0, maxInFlight: 0 };
+
+  return {
+    sent,
+    attempts,
+    stats,
+    async send(job) {
+      const attempt = (attempts.get(job.id) || 0) + 1;
+      attempts.set(job.id, attempt);
+      stats.inFlight++;
+      stats.maxInFlight = Math.max(stats.maxInFlight, stats.inFlight);
+
+      try {
+        if (options.latencyMs) {
+          await new Promise(resolve => setTimeout(resolve, options.latencyMs));
+        }
+        const error = options.errorFor?.(job, attempt);
+        if (error) return { success: false, error, channel: 'fake' };
+        if (options.failureRate && Math.random() < options.failureRate) {
+          return { success: false, error: 'Fake transport failure', channel: 'fake' };
+        }
+        sent.push({ jobId: job.id, phone: job.recipient_phone, at: Date.now() });
+        return { success: true, messageId: `fake-${job.id}`, channel: 'fake' };
+      } finally {
+        stats.inFlight--;
+      }
+    }
+  };
+}
+
+/**
+ * Kampanya kanalına göre WA Web, Yoncu veya Twilio'ya yönlendiren varsayılan kanal
+ * business_api kampanyaları BUSINESS_API_PROVIDER=twilio ile Twilio'ya gider, varsayılan Yoncu'dur.
+ */
+export function createDefaultTransport(): SendTransport {
+  return {
+    async send(job, campaign) {
+      if (campaign.channel === 'wa_web') {
+        const { sendMessage } = await import('./wa-web-service');
+        const media = job.media_url && job.media_type
+          ? { type: job.media_type, data: job.media_url, caption: job.message_content }
+          : undefined;
+        const result = await sendMessage(job.recipient_phone, job.message_content, media);
+        return { ...result, channel: 'whatsapp-web' };
+      }
+
+      const provider = process.env.BUSINESS_API_PROVIDER === 'twilio' ? 'twilio' : 'yoncu';
+      await getSendScheduler().acquire({ channel: 'business_api', session: provider });
+
+      if (provider === 'twilio') {
+        const { sendTwilioWhatsAppMessage } = await import('./twilio');
+        const phone = job.recipient_phone.startsWith('+') ? job.recipient_phone : `+${job.recipient_phone}`;
+        const msg = await sendTwilioWhatsAppMessage({
+          to: phone,
+          body: job.message_content,
+          mediaUrls: job.media_url ? [job.media_url] : undefined
+        });
+        return { success: true, messageId: msg.sid, channel: 'twilio' };
+      }
+
+      const { getYoncuClient } = await import('./yoncu-api');
+      const client = await getYoncuClient();
+      if (!client) {
+        return { success: false, error: 'API ayarları yapılandırılmamış', channel: 'yoncu' };
+      }
+
+      // Toplu sendBatch yerine tek gönderim: hız limiti ve retry zaten zamanlayıcı/send_jobs'ta
+      const [success, response] = await client.send({
+        Phone: job.recipient_phone,
+        Message: job.message_content,
+        MediaUrl: job.media_url,
+        MediaType: job.media_type
+      });
+      return success
+        ? { success: true, channel: 'yoncu' }
+        : { success: false, error: typeof response === 'string' ? response : 'Mesaj gönderilemedi', channel: 'yoncu' };
+    }
+  };
+}
+
+/**
+ * send_jobs kuyruğunu tarayıcı sekmesinden bağımsız olarak tüketen dispatcher
+ */
+export class SendDispatcher {
+  readonly workerId: string;
+  private readonly batchSize: number;
+  private readonly concurrency: number;
+  private readonly pollIntervalMs: number;
+  private readonly staleTimeoutSeconds: number;
+  private readonly campaignStatusTtlMs: number;
+  private readonly store: SendJobStore;
+  private readonly transport: SendTransport;
+  private readonly scheduler: SendScheduler | null;
+
+  private running = false;
+  private timer: ReturnType<typeof setTimeout> | null = null;
+  private loop: Promise<void> | null = null;
+  private campaignCache = new Map<string, { campaign: Campaign | null; fetchedAt: number }>();
+  private stats: DispatcherStats;
+
+  constructor(options: DispatcherOptions = {}) {
+    this.workerId = options.workerId || `worker-${process.pid}-${Math.random().toString(36).substring(2, 8)}`;
+    this.batchSize = options.batchSize ?? envNumber('SEND_DISPATCHER_BATCH_SIZE', 20);
+    this.concurrency = options.concurrency ?? envNumber('SEND_DISPATCHER_CONCURRENCY', 4);
+    this.pollIntervalMs = options.pollIntervalMs ?? envNumber('SEND_DISPATCHER_POLL_MS', 2000);
+    this.staleTimeoutSeconds = options.staleTimeoutSeconds ?? envNumber('SEND_DISPATCHER_STALE_SECONDS', 300);
+    this.campaignStatusTtlMs = options.campaignStatusTtlMs ?? 2000;
+    this.store = options.store || createSupabaseJobStore();
+    this.transport = options.transport || createDefaultTransport();
+    this.scheduler = options.scheduler === undefined ? getSendScheduler() : options.scheduler;
+    this.stats = {
+      running: false,
+      workerId: this.workerId,
+      ticks: 0,
+      claimed: 0,
+      sent: 0,
+      failed: 0,
+      retried: 0,
+      parked: 0,
+      released: 0,
+      lastTickAt: null,
+      lastError: null
+    };
+  }
+
+  getStats(): DispatcherStats {
+    return { ...this.stats, running: this.running };
+  }
+
+  isRunning(): boolean {
+    return this.running;
+  }
+
+  /**
+   * Dispatcher döngüsünü başlatır (zaten çalışıyorsa bir şey yapmaz)
+   */
+  start(): void {
+    if (this.running) return;
+    this.running = true;
+    console.log('[Dispatcher] Başlatıldı:', this.workerId);
+
+    this.store.releaseStaleJobs(this.staleTimeoutSeconds)
+      .then(released => {
+        if (released > 0) console.log('[Dispatcher] Askıda kalan job kuyruğa geri alındı:', released);
+      })
+      .catch(error => console.error('[Dispatcher] Askıda kalan job temizliği hatası:', error.message))
+      .finally(() => this.schedule(0));
+  }
+
+  /**
+   * Dispatcher'ı durdurur, elindeki batch'in bitmesini bekler
+   */
+  async stop(): Promise<void> {
+    this.running = false;
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    if (this.loop) await this.loop;
+    console.log('[Dispatcher] Durduruldu:', this.workerId);
+  }
+
+  private schedule(delayMs: number): void {
+    if (!this.running) return;
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.loop = this.tick()
+        .then(claimed => {
+          // Batch doluysa kuyrukta iş kalmıştır, beklemeden devam et
+          this.schedule(claimed >= this.batchSize ? 0 : this.pollIntervalMs);
+        })
+        .catch(error => {
+          this.stats.lastError = error.message;
+          console.error('[Dispatcher] Tick hatası:', error.message);
+          this.schedule(this.pollIntervalMs);
+        })
+        .finally(() => {
+          this.loop = null;
+        });
+    }, delayMs);
+  }
+
+  private async getCampaign(campaignId: string, fresh = false): Promise<Campaign | null> {
+    const cached = this.campaignCache.get(campaignId);
+    if (!fresh && cached && Date.now() - cached.fetchedAt < this.campaignStatusTtlMs) {
+      return cached.campaign;
+    }
+    const campaign = await this.store.getCampaign(campaignId);
+    this.campaignCache.set(campaignId, { campaign, fetchedAt: Date.now() });
+    return campaign;
+  }
+
+  /**
+   * Bir batch job alır ve sınırlı paralellikle gönderir. Alınan job sayısını döner.
+   */
+  async tick(): Promise<number> {
+    this.stats.ticks++;
+    this.stats.lastTickAt = new Date().toISOString();
+
+    const jobs = await this.store.claimDueJobs(this.batchSize, this.workerId);
+    if (jobs.length === 0) return 0;
+    this.stats.claimed += jobs.length;
+
+    const campaignIds = Array.from(new Set(jobs.map(job => job.campaign_id)));
+    for (const campaignId of campaignIds) {
+      const campaign = await this.getCampaign(campaignId, true);
+      if (campaign?.status === 'scheduled') {
+        await this.store.markCampaignRunning(campaignId);
+        campaign.status = 'running';
+      }
+    }
+
+    await mapWithConcurrency(jobs, this.concurrency, async (job) => {
+      let campaign = await this.getCampaign(job.campaign_id);
+      if (campaign && this.scheduler && this.running && ACTIVE_CAMPAIGN_STATUSES.includes(campaign.status)) {
+        // Kampanyanın kendi hız ayarları; bekleme sırasında kampanya duraklatılmış olabilir
+        await this.scheduler.acquireCampaign(campaign);
+        campaign = await this.getCampaign(job.campaign_id);
+      }
+
+      // Batch sırasında kampanya duraklatıldıysa job'u kuyruğa geri bırak
+      if (!this.running || !campaign || !ACTIVE_CAMPAIGN_STATUSES.includes(campaign.status)) {
+        await this.store.releaseJob(job);
+        this.stats.released++;
+        return;
+      }
+
+      let result: SendResult;
+      try {
+        result = await this.transport.send(job, campaign);
+      } catch (error: any) {
+        result = { success: false, error: error.message };
+      }
+
+      if (result.success) {
+        await this.store.completeJob(job, campaign, result);
+        this.stats.sent++;
+        return;
+      }
+
+      // Hata sınıfına göre: geçici -> artan beklemeyle tekrar, oturum -> park, kalıcı/tükenmiş -> dead-letter
+      const decision = planRetry(job, result.error, result.errorClass);
+      if (decision.action === 'dead') {
+        await this.store.completeJob(job, campaign, result, decision);
+        this.stats.failed++;
+        console.error('[Dispatcher] Gönderim başarısız (dead-letter):', job.recipient_phone, decision.errorClass, result.error);
+        return;
+      }
+
+      await this.store.rescheduleJob(job, decision, result.error);
+      if (decision.action === 'park') {
+        this.stats.parked++;
+      } else {
+        this.stats.retried++;
+        console.warn('[Dispatcher] Tekrar denenecek:', job.recipient_phone, `(${decision.attempts}. deneme)`, decision.scheduledAt);
+      }
+    });
+
+    for (const campaignId of campaignIds) {
+      await this.store.finalizeCampaign(campaignId);
+    }
+
+    return jobs.length;
+  }
+}
+
+// Global dispatcher (Next.js module re-import sorununu çözmek için)
+declare global {
+  var sendDispatcher: SendDispatcher | undefined;
+}
+
+/**
+ * Süreç içindeki dispatcher'ı getirir
+ */
+export function getDispatcher(): SendDispatcher | null {
+  return global.sendDispatcher || null;
+}
+
+/**
+ * Süreç içi dispatcher'ı başlatır (idempotent)
+ * SEND_DISPATCHER_ENABLED=false ile kapatılabilir.
+ */
+export function startDispatcher(options: DispatcherOptions = {}): SendDispatcher | null {
+  if (process.env.SEND_DISPATCHER_ENABLED === 'false') return null;
+
+  if (!global.sendDispatcher) {
+    global.sendDispatcher = new SendDispatcher(options);
+  }
+  global.sendDispatcher.start();
+  return global.sendDispatcher;
+}
+
+/**
+ * Süreç içi dispatcher'ı durdurur
+ */
+export async function stopDispatcher(): Promise<void> {
+  if (global.sendDispatcher) {
+    await global.sendDispatcher.stop();
+  }
+}
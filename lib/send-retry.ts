@@ -0,0 +1,116 @@
+import { SendJob } from '@/types';
+
+/**
+ * Gönderim hatası sınıfı:
+ * - transient: geçici (ağ, zaman aşımı, sağlayıcı 5xx/429); artan beklemeyle tekrar denenir
+ * - session: oturum/kanal hazır değil; job suçsuzdur, oturum hazır olana kadar park edilir
+ * - permanent: geçersiz numara, kara liste vb.; tekrar denenmez
+ */
+export type SendErrorClass = 'transient' | 'session' | 'permanent';
+
+export interface RetryPolicy {
+  baseDelayMs: number;
+  maxDelayMs: number;
+  parkMs: number;
+}
+
+/**
+ * Başarısız bir job için verilen karar
+ * retry/park: job 'pending' olarak scheduledAt zamanına ertelenir; dead: 'failed' (dead-letter)
+ */
+export interface RetryDecision {
+  action: 'retry' | 'park' | 'dead';
+  errorClass: SendErrorClass;
+  attempts: number;
+  scheduledAt?: string;
+}
+
+// Oturum hazır değil: WA Web bağlantısı yok/koptu, sağlayıcı ayarları eksik veya yetkisiz
+const SESSION_PATTERNS = [
+  /WhatsApp bağlı değil/i,
+  /bağlantısı aktif değil/i,
+  /Tarayıcı bağlantısı koptu/i,
+  /API ayarları yapılandırılmamış/i,
+  /Authentication hatası/i,
+  /eksik \(missing\)/i
+];
+
+// Alıcıya bağlı kalıcı hatalar
+const PERMANENT_PATTERNS = [
+  /invalid wid/i,
+  /not a valid/i,
+  /not registered/i,
+  /No LID for user/i,
+  /geçersiz (telefon|numara)/i,
+  /kara liste/i,
+  /blacklist/i,
+  /engellenmiş/i,
+  /opted out/i,
+  // Sağlayıcı yanıtı anlaşılamadı; mesaj gitmiş olabilir, tekrar göndermek çift mesaj riski taşır
+  /Beklenmeyen YoncuAPI yanıtı/i
+];
+
+function envNumber(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+export function getRetryPolicy(): RetryPolicy {
+  return {
+    baseDelayMs: envNumber('SEND_RETRY_BASE_MS', 30000),
+    maxDelayMs: envNumber('SEND_RETRY_MAX_MS', 30 * 60 * 1000),
+    parkMs: envNumber('SEND_RETRY_PARK_MS', 10 * 60 * 1000)
+  };
+}
+
+/**
+ * Hata mesajından hata sınıfını çıkarır; tanınmayan hatalar geçici sayılır
+ */
+export function classifySendError(error?: string | null): SendErrorClass {
+  if (!error) return 'transient';
+  if (SESSION_PATTERNS.some(pattern => pattern.test(error))) return 'session';
+  if (PERMANENT_PATTERNS.some(pattern => pattern.test(error))) return 'permanent';
+  return 'transient';
+}
+
+/**
+ * Üstel bekleme + jitter: base * 2^(deneme-1), üst sınırda kesilir; sürenin yarısı
+ * rastgeledir ki aynı anda düşen job'lar aynı anda tekrar denenmesin
+ */
+export function retryDelayMs(attempt: number, policy: RetryPolicy): number {
+  const exponential = Math.min(policy.maxDelayMs, policy.baseDelayMs * Math.pow(2, Math.max(0, attempt - 1)));
+  return Math.round(exponential / 2 + Math.random() * (exponential / 2));
+}
+
+/**
+ * Başarısız gönderim için ne yapılacağına karar verir.
+ * Oturum hataları deneme hakkı tüketmez; geçici hatalar max_attempts'e kadar tekrar denenir.
+ */
+export function planRetry(
+  job: Pick<SendJob, 'attempts' | 'max_attempts'>,
+  error: string | undefined,
+  errorClass: SendErrorClass = classifySendError(error),
+  policy: RetryPolicy = getRetryPolicy(),
+  now: number = Date.now()
+): RetryDecision {
+  if (errorClass === 'session') {
+    return {
+      action: 'park',
+      errorClass,
+      attempts: job.attempts,
+      scheduledAt: new Date(now + policy.parkMs).toISOString()
+    };
+  }
+
+  const attempts = job.attempts + 1;
+  if (errorClass === 'permanent' || attempts >= (job.max_attempts || 3)) {
+    return { action: 'dead', errorClass, attempts };
+  }
+
+  return {
+    action: 'retry',
+    errorClass,
+    attempts,
+    scheduledAt: new Date(now + retryDelayMs(attempts, policy)).toISOString()
+  };
+}
@@ -0,0 +1,306 @@
+import { Campaign } from '@/types';
+import { RATE_LIMIT_PROFILES, RateLimitProfile } from './compliance-service';
+import { delay } from './utils';
+
+/**
+ * Tek bir token bucket tanımı. Kova `capacity` kadar token tutar, saniyede
+ * `refill_per_sec` token dolar; gönderim için hiyerarşideki tüm kovalarda en az
+ * bir token olmalıdır. `gap_ms` verilirse kova, son gönderimden sonra bu süre
+ * dolmadan yeni token vermez (profilin delayMin-delayMax aralığından jitter).
+ */
+export interface RateBucketSpec {
+  key: string;
+  capacity: number;
+  refill_per_sec: number;
+  gap_ms?: number;
+}
+
+/**
+ * Kovaların durumunu tutan depo. `take` ya tüm kovalardan birer token alıp 0 döner
+ * ya da hiçbirine dokunmadan beklenmesi gereken süreyi (ms) döner.
+ */
+export interface RateBucketStore {
+  readonly kind: 'database' | 'memory';
+  take(buckets: RateBucketSpec[]): Promise<number>;
+}
+
+export interface RateLimit {
+  perSecond?: number;
+  perMinute?: number;
+}
+
+/**
+ * Gönderimin hangi kanal ve oturumdan yapılacağı (WA Web oturum adı, 'yoncu', 'twilio')
+ */
+export interface SendTarget {
+  channel: Campaign['channel'];
+  session?: string;
+}
+
+export interface SendSchedulerOptions {
+  profile?: RateLimitProfile;
+  session?: RateLimit;
+  channel?: RateLimit;
+  global?: RateLimit;
+  store?: RateBucketStore;
+  // Tek seferde en fazla bu kadar beklenir, sonra kovalar yeniden sorulur
+  maxWaitSliceMs?: number;
+}
+
+export interface SendSchedulerStats {
+  store: RateBucketStore['kind'];
+  profile: RateLimitProfile['name'];
+  limits: { session: RateLimit; channel: RateLimit; global: RateLimit };
+  acquired: number;
+  waits: number;
+  totalWaitMs: number;
+  maxWaitMs: number;
+}
+
+type CampaignPacing = Pick<
+  Campaign,
+  'id' | 'rate_limit_per_second' | 'rate_limit_per_minute' | 'add_random_delay' | 'delay_min_ms' | 'delay_max_ms'
+>;
+
+function envNumber(name: string): number | undefined {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : undefined;
+}
+
+function jitter(min: number, max: number): number {
+  return Math.round(min + Math.random() * Math.max(0, max - min));
+}
+
+/**
+ * Bir seviye için saniyelik ve dakikalık kovaları üretir
+ */
+function bucketsFor(key: string, limit: RateLimit, gapMs?: number): RateBucketSpec[] {
+  const buckets: RateBucketSpec[] = [];
+  if (limit.perSecond) {
+    buckets.push({ key: `${key}:s`, capacity: limit.perSecond, refill_per_sec: limit.perSecond });
+  }
+  if (limit.perMinute) {
+    // Dakikalık kova patlamaya izin vermez (kapasite 1); herhangi bir 60 sn'lik pencerede
+    // en fazla perMinute + 1 mesaj geçer
+    buckets.push({ key: `${key}:m`, capacity: 1, refill_per_sec: limit.perMinute / 60 });
+  }
+  if (gapMs && buckets.length > 0) buckets[0].gap_ms = gapMs;
+  return buckets;
+}
+
+/**
+ * Süreç içi depo (tek süreç, test ve benchmark için; take_send_tokens yoksa yedek)
+ */
+export function createInMemoryBucketStore(now: () => number = Date.now): RateBucketStore {
+  const state = new Map<string, { tokens: number; updatedAt: number; nextAt: number }>();
+
+  return {
+    kind: 'memory',
+
+    async take(buckets) {
+      const at = now();
+      let waitMs = 0;
+
+      const current = buckets.map(spec => {
+        const bucket = state.get(spec.key) || { tokens: spec.capacity, updatedAt: at, nextAt: 0 };
+        const available = Math.min(spec.capacity, bucket.tokens + ((at - bucket.updatedAt) / 1000) * spec.refill_per_sec);
+        if (available < 1) waitMs = Math.max(waitMs, Math.ceil(((1 - available) / spec.refill_per_sec) * 1000));
+        if (bucket.nextAt > at) waitMs = Math.max(waitMs, bucket.nextAt - at);
+        return { spec, bucket, available };
+      });
+
+      if (waitMs > 0) return waitMs;
+
+      for (const { spec, bucket, available } of current) {
+        state.set(spec.key, {
+          tokens: available - 1,
+          updatedAt: at,
+          nextAt: spec.gap_ms ? at + spec.gap_ms : bucket.nextAt
+        });
+      }
+      return 0;
+    }
+  };
+}
+
+/**
+ * Kovaları send_rate_buckets tablosunda tutan depo; take_send_tokens fonksiyonu satırları
+ * kilitleyerek tüm kovaları tek işlemde kontrol eder, böylece birden çok Node süreci
+ * aynı limiti paylaşır. Fonksiyon yoksa (migration çalıştırılmamış) süreç içi depoya düşer.
+ * Geçici hatalarda token yerelde verilmez (diğer süreçlerin limitini aşabilirdi); artan bir
+ * bekleme süresi döner ve zamanlayıcı RPC'yi tekrar dener.
+ */
+export function createSupabaseBucketStore(): RateBucketStore {
+  const fallback = createInMemoryBucketStore();
+  const maxBackoffMs = envNumber('SEND_RATE_RPC_MAX_BACKOFF_MS') || 5000;
+  let unavailable = false;
+  let failures = 0;
+
+  const backoff = (message: string): number => {
+    failures++;
+    const waitMs = Math.min(maxBackoffMs, 250 * 2 ** (failures - 1));
+    console.error(`[Scheduler] Kova kontrolü hatası (${failures}. deneme, ${waitMs} ms sonra tekrar):`, message);
+    return waitMs;
+  };
+
+  return {
+    get kind() {
+      return unavailable ? 'memory' : 'database';
+    },
+
+    async take(buckets) {
+      if (unavailable) return fallback.take(buckets);
+
+      let result;
+      try {
+        const { supabase } = await import('./supabase');
+        result = await supabase.rpc('take_send_tokens', { p_buckets: buckets });
+      } catch (error: any) {
+        return backoff(error.message);
+      }
+
+      const { data, error } = result;
+      if (error) {
+        if (error.code === 'PGRST202' || error.code === '42883') {
+          unavailable = true;
+          console.warn('[Scheduler] take_send_tokens bulunamadı, hız limitleri yalnızca bu süreçte uygulanacak');
+          return fallback.take(buckets);
+        }
+        return backoff(error.message);
+      }
+
+      failures = 0;
+      return typeof data === 'number' ? data : 0;
+    }
+  };
+}
+
+/**
+ * Hiyerarşik token bucket zamanlayıcısı: global -> kanal -> oturum.
+ * Oturum limiti seçilen RATE_LIMIT_PROFILES profilinden gelir, mesajlar arası süre
+ * profilin delayMin-delayMax aralığından rastgele seçilir. Kanal ve global limitler
+ * varsayılan olarak profilin 5 ve 10 katıdır (çok oturumlu toplam üst sınır).
+ */
+export class SendScheduler {
+  readonly profile: RateLimitProfile;
+  private readonly sessionLimit: RateLimit;
+  private readonly channelLimit: RateLimit;
+  private readonly globalLimit: RateLimit;
+  private readonly store: RateBucketStore;
+  private readonly maxWaitSliceMs: number;
+  private stats = { acquired: 0, waits: 0, totalWaitMs: 0, maxWaitMs: 0 };
+
+  constructor(options: SendSchedulerOptions = {}) {
+    this.profile = options.profile || RATE_LIMIT_PROFILES.low;
+    this.sessionLimit = options.session || {
+      perSecond: this.profile.perSecond,
+      perMinute: this.profile.perMinute
+    };
+    this.channelLimit = options.channel || {
+      perSecond: this.profile.perSecond * 5,
+      perMinute: this.profile.perMinute * 5
+    };
+    this.globalLimit = options.global || {
+      perSecond: this.profile.perSecond * 10,
+      perMinute: this.profile.perMinute * 10
+    };
+    this.store = options.store || createInMemoryBucketStore();
+    this.maxWaitSliceMs = options.maxWaitSliceMs ?? 5000;
+  }
+
+  getStats(): SendSchedulerStats {
+    return {
+      ...this.stats,
+      store: this.store.kind,
+      profile: this.profile.name,
+      limits: { session: this.sessionLimit, channel: this.channelLimit, global: this.globalLimit }
+    };
+  }
+
+  /**
+   * Hedef oturum için gönderim hakkı alır; limit doluysa hak açılana kadar bekler.
+   * Beklenen süreyi (ms) döner.
+   */
+  acquire(target: SendTarget): Promise<number> {
+    return this.waitFor(() => [
+      ...bucketsFor('global', this.globalLimit),
+      ...bucketsFor(`channel:${target.channel}`, this.channelLimit),
+      ...(target.session
+        ? bucketsFor(
+            `session:${target.channel}:${target.session}`,
+            this.sessionLimit,
+            jitter(this.profile.delayMin, this.profile.delayMax)
+          )
+        : [])
+    ]);
+  }
+
+  /**
+   * Kampanyanın kendi hız ayarlarını (rate_limit_per_*, delay_*_ms) uygular
+   */
+  acquireCampaign(campaign: CampaignPacing): Promise<number> {
+    const delayMin = campaign.delay_min_ms || 0;
+    const gapMs = campaign.add_random_delay
+      ? jitter(delayMin, campaign.delay_max_ms || delayMin)
+      : delayMin;
+
+    return this.waitFor(() => bucketsFor(
+      `campaign:${campaign.id}`,
+      { perSecond: campaign.rate_limit_per_second, perMinute: campaign.rate_limit_per_minute },
+      gapMs
+    ));
+  }
+
+  private async waitFor(buildBuckets: () => RateBucketSpec[]): Promise<number> {
+    const startedAt = Date.now();
+    let waited = false;
+
+    while (true) {
+      const buckets = buildBuckets();
+      if (buckets.length === 0) break;
+
+      const waitMs = await this.store.take(buckets);
+      if (waitMs <= 0) break;
+
+      waited = true;
+      // Aynı anda uyanan worker'lar aynı anda sormasın diye küçük jitter eklenir
+      await delay(Math.min(waitMs, this.maxWaitSliceMs) + jitter(0, 50));
+    }
+
+    const totalMs = Date.now() - startedAt;
+    this.stats.acquired++;
+    if (waited) {
+      this.stats.waits++;
+      this.stats.totalWaitMs += totalMs;
+      this.stats.maxWaitMs = Math.max(this.stats.maxWaitMs, totalMs);
+    }
+    return totalMs;
+  }
+}
+
+// Global zamanlayıcı (Next.js module re-import sorununu çözmek için)
+declare global {
+  var sendScheduler: SendScheduler | undefined;
+}
+
+/**
+ * Süreç içi paylaşılan zamanlayıcıyı getirir (ilk çağrıda ortam değişkenlerinden kurulur)
+ * SEND_RATE_PROFILE=low|medium|high, SEND_RATE_SHARED=false ile kovalar yalnızca bu süreçte tutulur.
+ */
+export function getSendScheduler(): SendScheduler {
+  if (!global.sendScheduler) {
+    const profile = RATE_LIMIT_PROFILES[process.env.SEND_RATE_PROFILE || ''] || RATE_LIMIT_PROFILES.low;
+    const sessionPerMinute = envNumber('WA_SESSION_RATE_PER_MINUTE');
+    const channelPerMinute = envNumber('SEND_RATE_CHANNEL_PER_MINUTE');
+    const globalPerMinute = envNumber('SEND_RATE_GLOBAL_PER_MINUTE');
+
+    global.sendScheduler = new SendScheduler({
+      profile,
+      session: { perSecond: profile.perSecond, perMinute: sessionPerMinute || profile.perMinute },
+      channel: channelPerMinute ? { perSecond: profile.perSecond * 5, perMinute: channelPerMinute } : undefined,
+      global: globalPerMinute ? { perSecond: profile.perSecond * 10, perMinute: globalPerMinute } : undefined,
+      store: process.env.SEND_RATE_SHARED === 'false' ? createInMemoryBucketStore() : createSupabaseBucketStore()
+    });
+  }
+  return global.sendScheduler;
+}
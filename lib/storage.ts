@@ -82,6 +82,11 @@ export function validateFileSize(file: File, maxSizeMB: number = 50): boolean {
 
 // Dosya tipi kontrolü
 export function validateFileType(file: File): boolean {
+  return isAllowedMimeType(file.type)
+}
+
+// MIME tipi kontrolü (akışla yüklemelerde dosya nesnesi olmadan kullanılır)
+export function isAllowedMimeType(type: string): boolean {
   const allowedTypes = [
     // Images
     'image/jpeg',
@@ -116,7 +121,7 @@ export function validateFileType(file: File): boolean {
     'audio/m4a',
   ]
 
-  return allowedTypes.includes(file.type) || file.type.startsWith('application/')
+  return allowedTypes.includes(type) || type.startsWith('application/')
 }
 
 // Format dosya boyutunu okunabilir hale getir
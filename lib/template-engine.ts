@@ -0,0 +1,126 @@
+/**
+ * Mesaj şablonu motoru: şablon bir kez segment planına derlenir,
+ * her alıcı tek geçişte render edilir.
+ *
+ * Not: Bu dosya hem sunucu hem istemci tarafında kullanılır, Node'a özel import içermemelidir.
+ */
+
+// Değeri olmasa da boş string ile doldurulan yerleşik alanlar
+export const BUILTIN_TEMPLATE_FIELDS = ['name', 'surname', 'email', 'address', 'company'] as const;
+
+const BUILTIN_FIELD_SET = new Set<string>(BUILTIN_TEMPLATE_FIELDS);
+const PLACEHOLDER_REGEX = /\{([a-zA-Z_][a-zA-Z0-9_]*)\}/g;
+const CACHE_LIMIT = 100;
+
+export type TemplateSegment =
+  | { kind: 'text'; value: string }
+  | { kind: 'field'; field: string; raw: string; builtin: boolean };
+
+export type TemplateValues = Record<string, any> & {
+  custom_fields?: Record<string, any> | null;
+};
+
+export interface CompiledTemplate {
+  source: string;
+  segments: TemplateSegment[];
+  fields: string[];
+  render: (values: TemplateValues) => string;
+}
+
+function resolveField(values: TemplateValues, field: string): any {
+  const value = values[field];
+  if (value !== undefined && value !== null) return value;
+  return values.custom_fields ? values.custom_fields[field] : undefined;
+}
+
+/**
+ * Şablonu metin ve placeholder segmentlerine ayırır.
+ * {name}, {surname}, {email}, {address}, {company} değer yoksa boş string olur;
+ * diğer {alan} placeholder'ları kişideki (veya custom_fields içindeki) alanla doldurulur,
+ * alan yoksa olduğu gibi bırakılır.
+ */
+export function compileTemplate(template: string): CompiledTemplate {
+  const source = template || '';
+  const segments: TemplateSegment[] = [];
+  const fields = new Set<string>();
+  let lastIndex = 0;
+
+  for (const match of source.matchAll(PLACEHOLDER_REGEX)) {
+    const index = match.index || 0;
+    if (index > lastIndex) segments.push({ kind: 'text', value: source.slice(lastIndex, index) });
+
+    const field = match[1];
+    segments.push({ kind: 'field', field, raw: match[0], builtin: BUILTIN_FIELD_SET.has(field) });
+    fields.add(field);
+    lastIndex = index + match[0].length;
+  }
+  if (lastIndex < source.length) segments.push({ kind: 'text', value: source.slice(lastIndex) });
+
+  const render = (values: TemplateValues): string => {
+    let out = '';
+    for (let i = 0; i < segments.length; i++) {
+      const segment = segments[i];
+      if (segment.kind === 'text') {
+        out += segment.value;
+        continue;
+      }
+      const value = resolveField(values, segment.field);
+      if (value !== undefined && value !== null) out += String(value);
+      else if (!segment.builtin) out += segment.raw;
+    }
+    return out;
+  };
+
+  return { source, segments, fields: Array.from(fields), render };
+}
+
+// Son kullanılan şablonların derlenmiş halleri
+const compiledCache = new Map<string, CompiledTemplate>();
+
+/**
+ * Şablonu önbellekten alır veya derler
+ */
+export function getCompiledTemplate(template: string): CompiledTemplate {
+  const cached = compiledCache.get(template);
+  if (cached) return cached;
+
+  const compiled = compileTemplate(template);
+  compiledCache.set(template, compiled);
+  if (compiledCache.size > CACHE_LIMIT) {
+    compiledCache.delete(compiledCache.keys().next().value as string);
+  }
+  return compiled;
+}
+
+/**
+ * Mesajdaki placeholder'ları doldurur
+ */
+export function renderTemplate(template: string, values: TemplateValues): string {
+  return getCompiledTemplate(template).render(values);
+}
+
+/**
+ * Alıcı listesini sırayla render eder (tüm mesajları belleğe almadan)
+ */
+export function* renderEach<T extends TemplateValues>(
+  template: string,
+  recipients: Iterable<T>
+): Generator<{ recipient: T; message: string }> {
+  const compiled = getCompiledTemplate(template);
+  for (const recipient of recipients) {
+    yield { recipient, message: compiled.render(recipient) };
+  }
+}
+
+/**
+ * Sayfa sayfa gelen alıcı akışını render eder (ör. streamCampaignRecipients)
+ */
+export async function* renderRecipientPages<T extends TemplateValues>(
+  template: string,
+  pages: AsyncIterable<T[]>
+): AsyncGenerator<Array<{ recipient: T; message: string }>> {
+  const compiled = getCompiledTemplate(template);
+  for await (const page of pages) {
+    yield page.map(recipient => ({ recipient, message: compiled.render(recipient) }));
+  }
+}
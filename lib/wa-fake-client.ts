@@ -0,0 +1,259 @@
+import { EventEmitter } from 'events';
+
+/**
+ * whatsapp-web.js Client yerine geçen simüle edilmiş istemci (WA_WEB_TRANSPORT=fake).
+ * Telefon / Chromium olmadan qr, ready, disconnected olaylarını üretir; sentetik kişi ve
+ * gruplar döner; her çağrıya gecikme, jitter ve Protocol error / Session closed hataları ekler.
+ *
+ * Ayarlar (ortam değişkenleri):
+ *   WA_FAKE_CONTACTS            sentetik kişi sayısı (varsayılan 1000)
+ *   WA_FAKE_GROUPS              sentetik grup sayısı (varsayılan 20)
+ *   WA_FAKE_GROUP_SIZE          grup başına katılımcı (varsayılan 50)
+ *   WA_FAKE_LATENCY_MS          çağrı başına ortalama gecikme (varsayılan 50)
+ *   WA_FAKE_JITTER_MS           gecikmeye eklenen ± rastgele sapma (varsayılan 25)
+ *   WA_FAKE_PROTOCOL_ERROR_RATE çağrının 'Protocol error' ile düşme olasılığı (0-1, bağlantı açık kalır)
+ *   WA_FAKE_SESSION_CLOSED_RATE çağrının 'Session closed' ile düşüp oturumu kapatma olasılığı (0-1)
+ *   WA_FAKE_READY_MS            initialize -> ready süresi (varsayılan 1000)
+ */
+
+const FAKE_PHONE_PREFIX = '90555';
+
+function envNumber(name: string, fallback: number): number {
+  const value = parseFloat(process.env[name] || '');
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+function fakePhone(index: number): string {
+  return FAKE_PHONE_PREFIX + String(index).padStart(7, '0');
+}
+
+function wid(user: string, server: 'c.us' | 'g.us') {
+  return { user, server, _serialized: `${user}@${server}` };
+}
+
+interface FakeOptions {
+  contacts: number;
+  groups: number;
+  groupSize: number;
+  latencyMs: number;
+  jitterMs: number;
+  protocolErrorRate: number;
+  sessionClosedRate: number;
+  readyMs: number;
+}
+
+function readOptions(): FakeOptions {
+  return {
+    contacts: Math.floor(envNumber('WA_FAKE_CONTACTS', 1000)),
+    groups: Math.floor(envNumber('WA_FAKE_GROUPS', 20)),
+    groupSize: Math.floor(envNumber('WA_FAKE_GROUP_SIZE', 50)),
+    latencyMs: envNumber('WA_FAKE_LATENCY_MS', 50),
+    jitterMs: envNumber('WA_FAKE_JITTER_MS', 25),
+    protocolErrorRate: envNumber('WA_FAKE_PROTOCOL_ERROR_RATE', 0),
+    sessionClosedRate: envNumber('WA_FAKE_SESSION_CLOSED_RATE', 0),
+    readyMs: envNumber('WA_FAKE_READY_MS', 1000)
+  };
+}
+
+// Daha önce "QR okutulmuş" clientId'ler (LocalAuth gibi: ikinci bağlantıda QR istenmez)
+const authenticatedClients = new Set<string>();
+
+/**
+ * LocalAuth yerine geçen kimlik stratejisi
+ */
+export class FakeLocalAuth {
+  clientId: string;
+
+  constructor(options: { clientId?: string; dataPath?: string } = {}) {
+    this.clientId = options.clientId || 'default';
+  }
+
+  async afterBrowserInitialized(): Promise<void> {}
+}
+
+/**
+ * MessageMedia yerine geçen medya nesnesi
+ */
+export class FakeMessageMedia {
+  constructor(
+    public mimetype: string,
+    public data: string,
+    public filename?: string | null
+  ) {}
+
+  static async fromUrl(url: string): Promise<FakeMessageMedia> {
+    const options = readOptions();
+    await sleep(options.latencyMs);
+    const filename = url.split('/').pop() || 'file';
+    return new FakeMessageMedia('application/octet-stream', Buffer.from(url).toString('base64'), filename);
+  }
+}
+
+export class FakeWaClient extends EventEmitter {
+  info: { wid: ReturnType<typeof wid>; pushname: string } | null = null;
+
+  private readonly options = readOptions();
+  private readonly clientId: string;
+  private readonly authStrategy?: FakeLocalAuth;
+  private state: string | null = null;
+  private closed = false;
+  private sentCount = 0;
+  private contactsCache: any[] | null = null;
+  private chatsCache: any[] | null = null;
+  private readyTimer: ReturnType<typeof setTimeout> | null = null;
+
+  constructor(config: { authStrategy?: FakeLocalAuth } = {}) {
+    super();
+    this.authStrategy = config.authStrategy;
+    this.clientId = config.authStrategy?.clientId || 'default';
+  }
+
+  async initialize(): Promise<void> {
+    this.closed = false;
+    this.state = 'OPENING';
+    await this.delay();
+    // Gerçek client gibi: "tarayıcı" açıldıktan sonra kimlik stratejisine haber ver
+    await this.authStrategy?.afterBrowserInitialized();
+
+    const needsQR = !authenticatedClients.has(this.clientId);
+    if (needsQR) {
+      this.emit('qr', `fake-qr:${this.clientId}:${Date.now()}`);
+    }
+
+    // QR "okutulmuş" gibi bir süre sonra bağlan
+    this.readyTimer = setTimeout(() => {
+      if (this.closed) return;
+      authenticatedClients.add(this.clientId);
+      this.state = 'CONNECTED';
+      this.info = { wid: wid(fakePhone(9000000 + authenticatedClients.size), 'c.us'), pushname: `Fake ${this.clientId}` };
+      this.emit('authenticated');
+      this.emit('change_state', 'CONNECTED');
+      this.emit('ready');
+    }, needsQR ? this.options.readyMs : Math.min(this.options.readyMs, 200));
+  }
+
+  async getState(): Promise<string | null> {
+    await this.call();
+    return this.state;
+  }
+
+  async sendMessage(chatId: string, content: any, options: any = {}): Promise<any> {
+    await this.call();
+    this.sentCount++;
+    return {
+      id: { fromMe: true, remote: chatId, id: `FAKE${this.sentCount}`, _serialized: `true_${chatId}_FAKE${this.sentCount}` },
+      body: typeof content === 'string' ? content : options.caption || '',
+      hasMedia: typeof content !== 'string',
+      timestamp: Math.floor(Date.now() / 1000)
+    };
+  }
+
+  async getContacts(): Promise<any[]> {
+    await this.call();
+    return this.contacts();
+  }
+
+  async getContactById(contactId: string): Promise<any> {
+    await this.call();
+    const user = contactId.split('@')[0];
+    const index = parseInt(user.slice(FAKE_PHONE_PREFIX.length), 10);
+    return {
+      id: wid(user, 'c.us'),
+      name: Number.isFinite(index) && index < this.options.contacts ? `Fake Kişi ${index}` : undefined,
+      pushname: `Fake ${user.slice(-4)}`,
+      isGroup: false
+    };
+  }
+
+  async getChats(): Promise<any[]> {
+    await this.call();
+    return this.chats();
+  }
+
+  async getChatById(chatId: string): Promise<any> {
+    await this.call();
+    const chat = this.chats().find(c => c.id._serialized === chatId);
+    if (!chat) throw new Error(`Chat bulunamadı: ${chatId}`);
+    return chat;
+  }
+
+  async logout(): Promise<void> {
+    authenticatedClients.delete(this.clientId);
+    await this.destroy();
+  }
+
+  async destroy(): Promise<void> {
+    this.closed = true;
+    this.state = null;
+    if (this.readyTimer) clearTimeout(this.readyTimer);
+    this.readyTimer = null;
+  }
+
+  /**
+   * Gecikme + hata enjeksiyonu; her sayfa (CDP) çağrısının karşılığı
+   */
+  private async call(): Promise<void> {
+    if (this.closed) {
+      throw new Error('Protocol error (Runtime.callFunctionOn): Session closed. Most likely the page has been closed.');
+    }
+
+    await this.delay();
+
+    const roll = Math.random();
+    if (roll < this.options.sessionClosedRate) {
+      this.closed = true;
+      this.state = null;
+      setImmediate(() => this.emit('disconnected', 'SIMULATED_SESSION_CLOSED'));
+      throw new Error('Protocol error (Runtime.callFunctionOn): Session closed. Most likely the page has been closed.');
+    }
+    if (roll < this.options.sessionClosedRate + this.options.protocolErrorRate) {
+      throw new Error('Protocol error (Runtime.callFunctionOn): Target closed.');
+    }
+  }
+
+  private delay(): Promise<void> {
+    const { latencyMs, jitterMs } = this.options;
+    const ms = Math.max(0, latencyMs + (Math.random() * 2 - 1) * jitterMs);
+    return ms > 0 ? sleep(ms) : Promise.resolve();
+  }
+
+  private contacts(): any[] {
+    if (!this.contactsCache) {
+      this.contactsCache = Array.from({ length: this.options.contacts }, (_, i) => ({
+        id: wid(fakePhone(i), 'c.us'),
+        name: `Fake Kişi ${i}`,
+        pushname: `Fake ${i}`,
+        isGroup: false,
+        isMyContact: true
+      }));
+    }
+    return this.contactsCache;
+  }
+
+  private chats(): any[] {
+    if (!this.chatsCache) {
+      const { contacts, groups, groupSize } = this.options;
+      const size = Math.min(groupSize, contacts);
+
+      this.chatsCache = Array.from({ length: groups }, (_, g) => {
+        // Gruplar kişi listesinden kaydırılmış (çakışan) dilimler alır
+        const start = contacts > 0 ? (g * 997) % contacts : 0;
+        return {
+          id: wid(`120363${String(g).padStart(12, '0')}`, 'g.us'),
+          name: `Fake Grup ${g}`,
+          isGroup: true,
+          participants: Array.from({ length: size }, (_, k) => ({
+            id: wid(fakePhone((start + k) % contacts), 'c.us'),
+            isAdmin: k === 0,
+            isSuperAdmin: k === 0
+          }))
+        };
+      });
+    }
+    return this.chatsCache;
+  }
+}
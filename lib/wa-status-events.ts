@@ -0,0 +1,202 @@
+/**
+ * WhatsApp Web oturum durumları için SSE yayın kanalı.
+ * wa-web-service'teki qr / ready / change_state / disconnected olayları buraya yazılır;
+ * aboneler sadece değişen alanları (delta) alır, QR kodu her yenilendiğinde bir kez gönderilir.
+ * Her delta bir kez encode edilip tüm abonelere aynı byte'lar olarak dağıtılır.
+ */
+
+export interface WaSessionStatusEvent {
+  sessionName: string;
+  status?: string;
+  state?: string | null;
+  connected?: boolean;
+  phone?: string | null;
+  qrCode?: string | null;
+}
+
+interface Subscriber {
+  id: number;
+  sessionName: string | null;
+  controller: ReadableStreamDefaultController<Uint8Array>;
+}
+
+interface StatusBus {
+  // Son yayınlanan tam durum (yeni abonelere ilk snapshot olarak gönderilir)
+  current: Map<string, WaSessionStatusEvent>;
+  // Henüz yayınlanmamış, birleştirilmiş değişiklikler
+  dirty: Map<string, WaSessionStatusEvent>;
+  removed: Set<string>;
+  subscribers: Map<number, Subscriber>;
+  nextId: number;
+  flushTimer: ReturnType<typeof setTimeout> | null;
+  heartbeatTimer: ReturnType<typeof setInterval> | null;
+}
+
+// Global bus (Next.js module re-import sorununu çözmek için)
+declare global {
+  var waStatusBus: StatusBus | undefined;
+}
+
+const encoder = new TextEncoder();
+const HEARTBEAT_MS = 25000;
+// Bir abonenin okumadığı en fazla olay sayısı; aşılırsa bağlantı kapatılır
+const MAX_QUEUED_EVENTS = 100;
+
+function envNumber(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+function getBus(): StatusBus {
+  if (!global.waStatusBus) {
+    global.waStatusBus = {
+      current: new Map(),
+      dirty: new Map(),
+      removed: new Set(),
+      subscribers: new Map(),
+      nextId: 1,
+      flushTimer: null,
+      heartbeatTimer: null
+    };
+  }
+  return global.waStatusBus;
+}
+
+function encodeEvent(event: string, data: unknown): Uint8Array {
+  return encoder.encode(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+}
+
+function send(subscriber: Subscriber, chunk: Uint8Array): void {
+  try {
+    // Okumayan (yavaş) istemcilerin kuyruğu büyümesin
+    if ((subscriber.controller.desiredSize ?? 0) <= -MAX_QUEUED_EVENTS) {
+      throw new Error('backpressure');
+    }
+    subscriber.controller.enqueue(chunk);
+  } catch (e) {
+    unsubscribe(subscriber.id);
+    try {
+      subscriber.controller.close();
+    } catch (closeError) {
+      // ignore
+    }
+  }
+}
+
+function fanOut(sessionName: string, chunk: Uint8Array): void {
+  const bus = getBus();
+  for (const subscriber of Array.from(bus.subscribers.values())) {
+    if (subscriber.sessionName && subscriber.sessionName !== sessionName) continue;
+    send(subscriber, chunk);
+  }
+}
+
+function flush(): void {
+  const bus = getBus();
+  bus.flushTimer = null;
+
+  for (const sessionName of Array.from(bus.removed)) {
+    fanOut(sessionName, encodeEvent('removed', { sessionName }));
+  }
+  bus.removed.clear();
+
+  for (const delta of Array.from(bus.dirty.values())) {
+    fanOut(delta.sessionName, encodeEvent('status', delta));
+  }
+  bus.dirty.clear();
+}
+
+/**
+ * Oturum durumunu yayınlar. Sadece önceki duruma göre değişen alanlar abonelere gider;
+ * kısa aralıktaki değişiklikler tek bir delta halinde birleştirilir.
+ */
+export function publishSessionStatus(update: WaSessionStatusEvent): void {
+  const bus = getBus();
+  const previous = bus.current.get(update.sessionName) || { sessionName: update.sessionName };
+  const next: WaSessionStatusEvent = { ...previous };
+  const delta: WaSessionStatusEvent = bus.dirty.get(update.sessionName) || { sessionName: update.sessionName };
+  let changed = false;
+
+  (['status', 'state', 'connected', 'phone', 'qrCode'] as const).forEach(key => {
+    const value = update[key];
+    if (value === undefined || previous[key] === value) return;
+    (next as any)[key] = value;
+    (delta as any)[key] = value;
+    changed = true;
+  });
+
+  bus.removed.delete(update.sessionName);
+  bus.current.set(update.sessionName, next);
+  if (!changed || bus.subscribers.size === 0) return;
+
+  bus.dirty.set(update.sessionName, delta);
+  if (!bus.flushTimer) {
+    bus.flushTimer = setTimeout(flush, envNumber('WA_STATUS_SSE_COALESCE_MS', 250));
+  }
+}
+
+/**
+ * Havuzdan çıkarılan oturumu bildirir
+ */
+export function publishSessionRemoved(sessionName: string): void {
+  const bus = getBus();
+  bus.current.delete(sessionName);
+  bus.dirty.delete(sessionName);
+  if (bus.subscribers.size === 0) return;
+
+  bus.removed.add(sessionName);
+  if (!bus.flushTimer) {
+    bus.flushTimer = setTimeout(flush, envNumber('WA_STATUS_SSE_COALESCE_MS', 250));
+  }
+}
+
+function unsubscribe(id: number): void {
+  const bus = getBus();
+  bus.subscribers.delete(id);
+
+  if (bus.subscribers.size === 0 && bus.heartbeatTimer) {
+    clearInterval(bus.heartbeatTimer);
+    bus.heartbeatTimer = null;
+  }
+}
+
+/**
+ * Yeni bir SSE aboneliği açar. Bağlantı sınırı (WA_STATUS_SSE_MAX_CONNECTIONS) doluysa null döner.
+ */
+export function subscribeSessionStatus(sessionName: string | null): ReadableStream<Uint8Array> | null {
+  const bus = getBus();
+  if (bus.subscribers.size >= envNumber('WA_STATUS_SSE_MAX_CONNECTIONS', 50)) {
+    return null;
+  }
+
+  const id = bus.nextId++;
+
+  return new ReadableStream<Uint8Array>({
+    start(controller) {
+      const subscriber: Subscriber = { id, sessionName, controller };
+      bus.subscribers.set(id, subscriber);
+
+      // İlk bağlantıda mevcut durumun tamamı (QR dahil) bir kez gönderilir
+      const sessions = Array.from(bus.current.values())
+        .filter(status => !sessionName || status.sessionName === sessionName);
+      send(subscriber, encodeEvent('snapshot', { sessions }));
+
+      if (!bus.heartbeatTimer) {
+        const heartbeat = encoder.encode(': ping\n\n');
+        bus.heartbeatTimer = setInterval(() => {
+          Array.from(getBus().subscribers.values()).forEach(s => send(s, heartbeat));
+        }, HEARTBEAT_MS);
+      }
+    },
+    cancel() {
+      unsubscribe(id);
+    }
+  });
+}
+
+/**
+ * Açık SSE bağlantı sayısı
+ */
+export function getStatusSubscriberCount(): number {
+  return getBus().subscribers.size;
+}
@@ -1,56 +1,761 @@
+import { execFile } from 'child_process';
+import { readdir } from 'fs/promises';
+import { promisify } from 'util';
 import QRCode from 'qrcode';
+import { contentHash, getMediaCache } from './media-cache';
+import { mapWithConcurrency } from './utils';
+import { publishSessionRemoved, publishSessionStatus } from './wa-status-events';
+import { getSendScheduler } from './send-scheduler';
+import { getInboundQueue } from './inbound-ingest';
 
-// whatsapp-web.js dynamic import
+// Transport: whatsapp-web.js (varsayılan) veya simüle edilmiş istemci (WA_WEB_TRANSPORT=fake)
 let Client: any;
 let LocalAuth: any;
+let MessageMedia: any;
+
+export function getTransportName(): 'whatsapp-web' | 'fake' {
+  return process.env.WA_WEB_TRANSPORT === 'fake' ? 'fake' : 'whatsapp-web';
+}
 
 async function loadWhatsAppWeb() {
-  if (!Client) {
-    const waweb = await import('whatsapp-web.js');
-    Client = waweb.Client;
-    LocalAuth = waweb.LocalAuth;
+  if (Client) return;
+
+  if (getTransportName() === 'fake') {
+    const fake = await import('./wa-fake-client');
+    Client = fake.FakeWaClient;
+    LocalAuth = fake.FakeLocalAuth;
+    MessageMedia = fake.FakeMessageMedia;
+    console.log('[WA] Fake transport kullanılıyor (WA_WEB_TRANSPORT=fake)');
+    return;
   }
+
+  const waweb = await import('whatsapp-web.js');
+  Client = waweb.Client;
+  LocalAuth = waweb.LocalAuth;
+  MessageMedia = waweb.MessageMedia;
+}
+
+export const DEFAULT_SESSION = 'default';
+
+const AUTH_DATA_PATH = './.wwebjs_auth';
+
+/**
+ * Havuzdaki tek bir WhatsApp Web oturumu.
+ * Her oturumun kendi Chromium'u, LocalAuth clientId'si, gönderim şeridi ve hız bütçesi vardır.
+ */
+interface WaSession {
+  name: string;
+  client: any;
+  isReady: boolean;
+  lastQR: string | null;
+  connectedPhone: string | null;
+  // change_state / disconnected olayları ve arka plan probu ile beslenen bağlantı durumu
+  state: string | null;
+  stateCheckedAt: number;
+  healthTimer: ReturnType<typeof setInterval> | null;
+  // Mesaj başına CDP (Puppeteer evaluate) çağrısı ölçümü; gelen mesajlardaki @lid çözümlemeleri
+  // gönderime ait olmadığından cdpCalls'a değil inboundLookups'a sayılır
+  metrics: { messages: number; cdpCalls: number; inboundLookups: number };
+  // Gönderim şeridi: bu oturumdaki gönderimler sırayla çalışır
+  lane: Promise<void>;
+  pending: number;
+  // Tarayıcı denetimi: bu Chromium açıldığından beri gönderilen mesaj ve bellek kullanımı
+  launchedAt: number;
+  messagesAtLaunch: number;
+  rssBytes: number | null;
+  // Devam eden yeniden başlatma (şeritte sıradaki gönderimler bunu bekler)
+  recycling: Promise<void> | null;
+  recycles: number;
+  phases: LaunchPhases | null;
+}
+
+/**
+ * Client açılış aşamaları: initializeClient çağrısından itibaren geçen süre (ms).
+ * browser: Chromium açıldı, page: WhatsApp Web sayfası yüklendi, auth: kimlik doğrulandı, ready: hazır
+ */
+interface LaunchPhases {
+  startedAt: number;
+  browserMs: number | null;
+  pageMs: number | null;
+  authMs: number | null;
+  readyMs: number | null;
 }
 
+type MediaInput = {
+  type: 'image' | 'video' | 'document' | 'audio';
+  data: string; // base64 data veya URL
+  filename?: string;
+  caption?: string;
+};
+
 // Global state (Next.js module re-import sorununu çözmek için)
 declare global {
-  var waClient: any;
-  var waIsReady: boolean;
-  var waLastQR: string | null;
-  var waConnectedPhone: string | null;
+  var waSessions: Map<string, WaSession>;
 }
 
 // Initialize globals
-if (typeof global.waClient === 'undefined') global.waClient = null;
-if (typeof global.waIsReady === 'undefined') global.waIsReady = false;
-if (typeof global.waLastQR === 'undefined') global.waLastQR = null;
-if (typeof global.waConnectedPhone === 'undefined') global.waConnectedPhone = null;
+if (typeof global.waSessions === 'undefined') global.waSessions = new Map();
+
+// Kişi bilgisi çözümlemede aynı anda yapılacak en fazla getContactById çağrısı
+function getContactResolveConcurrency(): number {
+  const value = parseInt(process.env.WA_CONTACT_RESOLVE_CONCURRENCY || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : 8;
+}
+
+function getHealthProbeIntervalMs(): number {
+  const value = parseInt(process.env.WA_HEALTH_PROBE_INTERVAL_MS || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : 30000;
+}
+
+function envNumber(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+// Gönderim için gerekmeyen istekler: profil fotoğrafları, fontlar ve statik resimler.
+// data:/blob: adresleri ağa çıkmadığı için medya gönderimi ve yüklemesi (mmg.whatsapp.net) etkilenmez.
+const DEFAULT_BLOCKED_URLS = [
+  '*://pps.whatsapp.net/*',
+  '*.woff',
+  '*.woff2',
+  '*.ttf',
+  '*.otf',
+  '*.png',
+  '*.jpg',
+  '*.jpeg',
+  '*.gif',
+  '*.webp'
+];
+
+function getBlockedUrls(): string[] {
+  const raw = process.env.WA_BROWSER_BLOCKED_URLS;
+  if (raw === undefined) return DEFAULT_BLOCKED_URLS;
+  return raw.split(',').map(pattern => pattern.trim()).filter(Boolean);
+}
+
+/**
+ * Üretim tarayıcı profili: headless, eklenti/arka plan servisleri kapalı, küçük disk
+ * önbelleği ve sınırlı JS heap (WA_BROWSER_HEADLESS=false ile pencere açılır)
+ */
+function getPuppeteerOptions(executablePath?: string) {
+  const diskCacheBytes = envNumber('WA_BROWSER_DISK_CACHE_MB', 32) * 1024 * 1024;
+  const jsHeapMb = envNumber('WA_BROWSER_JS_HEAP_MB', 512);
+
+  return {
+    headless: process.env.WA_BROWSER_HEADLESS !== 'false',
+    executablePath,
+    args: [
+      '--no-sandbox',
+      '--disable-setuid-sandbox',
+      '--disable-gpu',
+      '--disable-dev-shm-usage',
+      '--disable-extensions',
+      '--disable-background-networking',
+      '--disable-component-update',
+      '--disable-default-apps',
+      '--disable-sync',
+      '--disable-features=Translate,MediaRouter,OptimizationHints',
+      '--no-first-run',
+      '--no-default-browser-check',
+      '--mute-audio',
+      `--disk-cache-size=${diskCacheBytes}`,
+      `--media-cache-size=${diskCacheBytes}`,
+      `--js-flags=--max-old-space-size=${jsHeapMb}`
+    ]
+  };
+}
+
+// Engelleme listesi uygulanmış sayfalar (qr ve ready olaylarında tekrar uygulanmasın)
+const blockedPages = new WeakSet<object>();
+
+/**
+ * İstek engelleme listesini CDP Network.setBlockedURLs ile uygular. Puppeteer request
+ * interception'ın aksine her istek Node'a uğramaz ve sayfa önbelleği kapanmaz.
+ */
+async function applyRequestBlocklist(session: WaSession, client: any): Promise<void> {
+  const page = client.pupPage;
+  const urls = getBlockedUrls();
+  if (!page || urls.length === 0 || blockedPages.has(page)) return;
+  blockedPages.add(page);
+
+  try {
+    const cdpSession = await page.target().createCDPSession();
+    await cdpSession.send('Network.enable');
+    await cdpSession.send('Network.setBlockedURLs', { urls });
+  } catch (error: any) {
+    console.error(`[WA:${session.name}] İstek engelleme listesi uygulanamadı:`, error.message);
+  }
+}
+
+interface RecycleThresholds {
+  checkIntervalMs: number;
+  maxRssBytes: number;
+  maxMessages: number;
+  readyTimeoutMs: number;
+}
+
+/**
+ * Client yeniden başlatma eşikleri (0 = o eşik kapalı; aralık 0 ise denetçi çalışmaz)
+ */
+function getRecycleThresholds(): RecycleThresholds {
+  return {
+    checkIntervalMs: envNumber('WA_RECYCLE_CHECK_INTERVAL_MS', 60000),
+    maxRssBytes: envNumber('WA_RECYCLE_MAX_RSS_MB', 1536) * 1024 * 1024,
+    maxMessages: envNumber('WA_RECYCLE_MAX_MESSAGES', 5000),
+    readyTimeoutMs: envNumber('WA_RECYCLE_READY_TIMEOUT_MS', 120000)
+  };
+}
+
+function getOrCreateSession(sessionName: string): WaSession {
+  let session = global.waSessions.get(sessionName);
+  if (!session) {
+    session = {
+      name: sessionName,
+      client: null,
+      isReady: false,
+      lastQR: null,
+      connectedPhone: null,
+      state: null,
+      stateCheckedAt: 0,
+      healthTimer: null,
+      metrics: { messages: 0, cdpCalls: 0, inboundLookups: 0 },
+      lane: Promise.resolve(),
+      pending: 0,
+      launchedAt: 0,
+      messagesAtLaunch: 0,
+      rssBytes: null,
+      recycling: null,
+      recycles: 0,
+      phases: null
+    };
+    global.waSessions.set(sessionName, session);
+  }
+  return session;
+}
+
+function resetSessionState(session: WaSession): void {
+  stopHealthProbe(session);
+  session.client = null;
+  session.isReady = false;
+  session.lastQR = null;
+  session.connectedPhone = null;
+  session.state = null;
+}
+
+/**
+ * Kopmuş client'ı kapatır (tarayıcı süreci açık kalmasın; hata yutulur) ve oturumu sıfırlar
+ */
+async function discardClient(session: WaSession, client: any): Promise<void> {
+  try {
+    await client.destroy();
+  } catch (e) {
+    // ignore
+  }
+  if (session.client === client) {
+    resetSessionState(session);
+  }
+}
+
+/**
+ * Sayfaya giden (CDP) bir client çağrısını sayarak çalıştırır
+ */
+function cdp<T>(session: WaSession, call: () => Promise<T>): Promise<T> {
+  session.metrics.cdpCalls++;
+  return call();
+}
+
+/**
+ * getState() ile bağlantıyı yoklar ve önbellekteki durumu günceller.
+ * Yoklama başarısızsa oturum kopmuş sayılır ve sıfırlanır.
+ */
+async function probeState(session: WaSession): Promise<string | null> {
+  const client = session.client;
+  if (!client) return null;
+
+  try {
+    const state = await cdp(session, () => client.getState());
+    if (session.client !== client) return null;
+
+    session.state = state;
+    session.stateCheckedAt = Date.now();
+    if (state !== 'CONNECTED') {
+      session.isReady = false;
+    }
+    return state;
+  } catch (error: any) {
+    if (session.client !== client) return null;
+
+    console.error(`[WA:${session.name}] State kontrol hatası:`, error.message);
+    await discardClient(session, client);
+    mirrorSessionStatus(session.name, 'disconnected', null);
+    return null;
+  }
+}
+
+/**
+ * Arka planda belirli aralıklarla bağlantı durumunu yoklar (WA_HEALTH_PROBE_INTERVAL_MS, 0 = kapalı)
+ */
+function startHealthProbe(session: WaSession): void {
+  stopHealthProbe(session);
+
+  const intervalMs = getHealthProbeIntervalMs();
+  if (intervalMs === 0) return;
+
+  session.healthTimer = setInterval(() => {
+    // Şeritte gönderim varken probe'a gerek yok; gönderimler zaten bağlantıyı kullanıyor
+    if (session.pending === 0) {
+      probeState(session);
+    }
+  }, intervalMs);
+}
+
+function stopHealthProbe(session: WaSession): void {
+  if (session.healthTimer) {
+    clearInterval(session.healthTimer);
+    session.healthTimer = null;
+  }
+}
+
+/**
+ * Önbellekteki duruma göre oturum gönderime hazır mı?
+ */
+function isSessionUsable(session: WaSession): boolean {
+  return !!session.client && session.isReady && session.state === 'CONNECTED';
+}
+
+/**
+ * Oturum yaşam döngüsünü wa_web_sessions tablosuna yansıtır (hata gönderimi engellemez)
+ * ve SSE abonelerine yayınlar
+ */
+function mirrorSessionStatus(
+  sessionName: string,
+  status: string,
+  qrCode?: string | null,
+  phoneNumber?: string
+): void {
+  const session = global.waSessions.get(sessionName);
+  publishSessionStatus({
+    sessionName,
+    status,
+    state: session?.state ?? null,
+    connected: !!session?.isReady,
+    phone: phoneNumber ?? session?.connectedPhone ?? null,
+    qrCode
+  });
+
+  import('./db/wa-web-sessions')
+    .then(({ updateSessionStatus }) => updateSessionStatus(sessionName, status, qrCode, phoneNumber))
+    .catch((error) => console.error(`[WA:${sessionName}] Session durumu kaydedilemedi:`, error.message));
+}
+
+/**
+ * İsimle oturum getirir; isim yoksa varsayılan oturumu, o da hazır değilse hazır olan ilk oturumu döner
+ */
+function resolveSession(sessionName?: string): WaSession | null {
+  if (sessionName) {
+    return global.waSessions.get(sessionName) || null;
+  }
+
+  const defaultSession = global.waSessions.get(DEFAULT_SESSION);
+  if (defaultSession?.isReady) return defaultSession;
+
+  return getReadySessions()[0] || defaultSession || null;
+}
+
+/**
+ * Gönderim için oturum seçer; isim verilmemişse kuyruğu en kısa hazır oturumu seçer
+ */
+function pickSendSession(sessionName?: string): WaSession | null {
+  if (sessionName) {
+    return global.waSessions.get(sessionName) || null;
+  }
+
+  const sendable = getSendableSessions();
+  if (sendable.length === 0) return null;
+  return sendable.reduce((best, s) => (s.pending < best.pending ? s : best));
+}
+
+function getReadySessions(): WaSession[] {
+  return Array.from(global.waSessions.values()).filter(isSessionUsable);
+}
+
+/**
+ * Gönderim alabilecek oturumlar: hazır oturumlar, hiç yoksa yeniden başlatılmakta olanlar
+ * (gönderimler şeritte sıraya girer ve yeni client hazır olunca gönderilir)
+ */
+function getSendableSessions(): WaSession[] {
+  const ready = getReadySessions();
+  if (ready.length > 0) return ready;
+  return Array.from(global.waSessions.values()).filter(s => !!s.recycling);
+}
+
+/**
+ * Oturum gönderim kabul ediyor mu? (yeniden başlatma sırasında da kabul eder)
+ */
+function acceptsSends(session: WaSession | null | undefined): session is WaSession {
+  return !!session && (!!session.recycling || (!!session.client && session.isReady));
+}
+
+/**
+ * Görevi oturumun gönderim şeridinde sıraya koyar
+ */
+function runInLane<T>(session: WaSession, task: () => Promise<T>): Promise<T> {
+  session.pending++;
+  const run = session.lane.then(async () => {
+    try {
+      return await task();
+    } finally {
+      session.pending--;
+    }
+  });
+  session.lane = run.then(() => undefined, () => undefined);
+  return run;
+}
+
+const execFileAsync = promisify(execFile);
+
+/**
+ * Chromium süreç ağacının (browser + renderer/GPU alt süreçleri) toplam RSS'i (byte)
+ */
+async function getBrowserRssBytes(client: any): Promise<number | null> {
+  const pid = client?.pupBrowser?.process?.()?.pid;
+  if (!pid) return null;
+
+  try {
+    const { stdout } = await execFileAsync('ps', ['-A', '-o', 'pid=,ppid=,rss=']);
+    const children = new Map<number, number[]>();
+    const rss = new Map<number, number>();
+
+    for (const line of stdout.split('\n')) {
+      const [childPid, parentPid, rssKb] = line.trim().split(/\s+/).map(Number);
+      if (!childPid) continue;
+      rss.set(childPid, rssKb || 0);
+      if (!children.has(parentPid)) children.set(parentPid, []);
+      children.get(parentPid)!.push(childPid);
+    }
+
+    let totalKb = 0;
+    const stack = [pid];
+    while (stack.length > 0) {
+      const current = stack.pop()!;
+      totalKb += rss.get(current) || 0;
+      stack.push(...(children.get(current) || []));
+    }
+    return totalKb * 1024;
+  } catch (error: any) {
+    console.error('[WA] Chromium bellek kullanımı okunamadı:', error.message);
+    return null;
+  }
+}
+
+/**
+ * Kayıtlı oturum verisiyle açılan client'ın hazır olmasını bekler; QR istenirse
+ * (oturum verisi geçersiz) veya süre dolarsa hata fırlatır
+ */
+async function waitForReady(session: WaSession, timeoutMs: number): Promise<void> {
+  const startedAt = Date.now();
+
+  while (!session.isReady) {
+    if (session.lastQR) {
+      throw new Error('Oturum verisi geçersiz, QR kodu okutulması gerekiyor');
+    }
+    if (!session.client) {
+      throw new Error('Client kapandı');
+    }
+    if (Date.now() - startedAt > timeoutMs) {
+      throw new Error('Client zamanında hazır olmadı');
+    }
+    await new Promise(resolve => setTimeout(resolve, 250));
+  }
+}
+
+/**
+ * Client'ı kapatıp aynı LocalAuth verisiyle yeniden açar (QR gerekmez) ve hazır olmasını bekler
+ */
+async function restartClient(session: WaSession, readyTimeoutMs: number): Promise<void> {
+  const tag = `[WA:${session.name}]`;
+  const startedAt = Date.now();
+
+  if (session.client) {
+    try {
+      await session.client.destroy();
+    } catch (e) {
+      // ignore
+    }
+  }
+  resetSessionState(session);
+
+  const result = await initializeClient(session.name);
+  if (!result.success) {
+    throw new Error(result.error || 'Client başlatılamadı');
+  }
+
+  await waitForReady(session, readyTimeoutMs);
+  session.recycles++;
+  console.log(tag, `Client yeniden başlatıldı (${Date.now() - startedAt} ms)`);
+}
+
+/**
+ * Client'ı şeritte sıraya girerek yeniden başlatır: öncesinde kuyruğa alınmış gönderimler
+ * eski client ile tamamlanır, sonradan gelenler yeni client hazır olunca gönderilir.
+ * Yeniden başlatma başarısız olursa bekleyen gönderimler "WhatsApp bağlı değil" ile
+ * döner (kampanya job'ları park edilir, oturum hazır olunca tekrar denenir).
+ */
+function recycleSession(session: WaSession, reason: string): Promise<void> {
+  if (session.recycling) return session.recycling;
+
+  console.log(`[WA:${session.name}] Client yeniden başlatılacak:`, reason);
+  const { readyTimeoutMs } = getRecycleThresholds();
+
+  const recycling = runInLane(session, () => restartClient(session, readyTimeoutMs))
+    .catch((error) => {
+      console.error(`[WA:${session.name}] Client yeniden başlatılamadı:`, error.message);
+    })
+    .finally(() => {
+      session.recycling = null;
+    });
+  session.recycling = recycling;
+  return recycling;
+}
+
+/**
+ * Hazır oturumların Chromium belleğini ve gönderilen mesaj sayısını kontrol eder,
+ * eşiği aşanları yeniden başlatır
+ */
+async function superviseSessions(): Promise<void> {
+  const thresholds = getRecycleThresholds();
+
+  for (const session of Array.from(global.waSessions.values())) {
+    if (!isSessionUsable(session) || session.recycling) continue;
+
+    session.rssBytes = await getBrowserRssBytes(session.client);
+    const messages = session.metrics.messages - session.messagesAtLaunch;
+
+    if (thresholds.maxRssBytes > 0 && session.rssBytes !== null && session.rssBytes >= thresholds.maxRssBytes) {
+      recycleSession(session, `bellek ${Math.round(session.rssBytes / 1024 / 1024)} MB`);
+    } else if (thresholds.maxMessages > 0 && messages >= thresholds.maxMessages) {
+      recycleSession(session, `${messages} mesaj gönderildi`);
+    }
+  }
+}
+
+// Global denetçi zamanlayıcısı (Next.js module re-import sorununu çözmek için)
+declare global {
+  var waRecycleTimer: ReturnType<typeof setInterval> | undefined;
+}
+
+function startRecycleSupervisor(): void {
+  if (global.waRecycleTimer) return;
+
+  const { checkIntervalMs } = getRecycleThresholds();
+  if (checkIntervalMs === 0) return;
+
+  let running = false;
+  global.waRecycleTimer = setInterval(() => {
+    if (running) return;
+    running = true;
+    superviseSessions()
+      .catch((error) => console.error('[WA] Oturum denetimi hatası:', error.message))
+      .finally(() => {
+        running = false;
+      });
+  }, checkIntervalMs);
+}
+
+/**
+ * Açılış aşamasının süresini kaydeder (her aşama client başına bir kez)
+ */
+function markPhase(session: WaSession, phase: Exclude<keyof LaunchPhases, 'startedAt'>): void {
+  if (session.phases && session.phases[phase] === null) {
+    session.phases[phase] = Date.now() - session.phases.startedAt;
+  }
+}
+
+/**
+ * Açılışta kayıtlı oturumların geri yüklenmesi (instrumentation.ts, WA_RESTORE_ON_BOOT=true)
+ */
+interface BootRestore {
+  startedAt: number;
+  finishedAt: number | null;
+  sessions: string[];
+  // Oturum başına sonuç: true = hazır, false = QR gerekiyor / başlatılamadı
+  results: Map<string, Promise<boolean>>;
+  listed: Promise<void>;
+  anyReady: Promise<void>;
+  done: Promise<void>;
+}
+
+declare global {
+  var waBootRestore: BootRestore | undefined;
+}
+
+/**
+ * ./.wwebjs_auth altındaki LocalAuth klasörlerinden oturum adlarını çıkarır
+ * ('session' varsayılan oturum, 'session-<ad>' diğerleri)
+ */
+async function listSavedSessionNames(): Promise<string[]> {
+  try {
+    const entries = await readdir(AUTH_DATA_PATH, { withFileTypes: true });
+    return entries
+      .filter(entry => entry.isDirectory())
+      .map(entry => (entry.name === 'session' ? DEFAULT_SESSION : entry.name.replace(/^session-/, '')))
+      .filter(name => name !== '' && /^[a-zA-Z0-9_-]+$/.test(name));
+  } catch (error: any) {
+    if (error.code !== 'ENOENT') {
+      console.error('[WA] Kayıtlı oturumlar okunamadı:', error.message);
+    }
+    return [];
+  }
+}
+
+async function restoreSession(sessionName: string): Promise<boolean> {
+  const tag = `[WA:${sessionName}]`;
+  const result = await initializeClient(sessionName);
+  if (!result.success) return false;
+
+  try {
+    await waitForReady(getOrCreateSession(sessionName), envNumber('WA_BOOT_READY_TIMEOUT_MS', 180000));
+    return true;
+  } catch (error: any) {
+    console.error(tag, 'Oturum geri yüklenemedi:', error.message);
+    return false;
+  }
+}
+
+/**
+ * Kayıtlı tüm oturumları paralel olarak açar. Tekrar çağrılırsa aynı işlemi döner.
+ * Sunucu açılışını bekletmemek için sonucu beklenmeden çağrılabilir.
+ */
+export function restoreSavedSessions(): Promise<void> {
+  if (global.waBootRestore) return global.waBootRestore.done;
+
+  let resolveAnyReady!: () => void;
+  const boot: BootRestore = {
+    startedAt: Date.now(),
+    finishedAt: null,
+    sessions: [],
+    results: new Map(),
+    listed: Promise.resolve(),
+    anyReady: new Promise<void>(resolve => {
+      resolveAnyReady = resolve;
+    }),
+    done: Promise.resolve()
+  };
+  global.waBootRestore = boot;
+
+  boot.listed = listSavedSessionNames().then(names => {
+    boot.sessions = names;
+    console.log('[WA] Kayıtlı oturumlar geri yükleniyor:', names.length > 0 ? names.join(', ') : '(yok)');
+    for (const name of names) {
+      boot.results.set(name, restoreSession(name)
+        .catch(() => false)
+        .then(ready => {
+          if (ready) resolveAnyReady();
+          return ready;
+        }));
+    }
+  });
+
+  boot.done = boot.listed
+    .then(() => Promise.all(Array.from(boot.results.values())))
+    .then(results => {
+      boot.finishedAt = Date.now();
+      resolveAnyReady();
+      console.log(
+        `[WA] Oturum geri yükleme tamamlandı (${boot.finishedAt - boot.startedAt} ms):`,
+        `${results.filter(Boolean).length}/${results.length} hazır`
+      );
+    });
+
+  return boot.done;
+}
+
+/**
+ * Açılışta oturumlar geri yükleniyorsa istenen oturum (isim yoksa herhangi biri) hazır
+ * olana, geri yükleme bitene veya WA_BOOT_WAIT_TIMEOUT_MS dolana kadar bekler.
+ * Geri yükleme yoksa veya bittiyse hemen döner; route'lar "bağlı değil" hatası yerine bekler.
+ */
+export async function whenSessionsRestored(sessionName?: string): Promise<void> {
+  const boot = global.waBootRestore;
+  if (!boot || boot.finishedAt !== null) return;
+
+  const session = sessionName ? global.waSessions.get(sessionName) : pickSendSession();
+  if (session?.isReady) return;
+
+  const target = sessionName
+    ? boot.listed.then(() => boot.results.get(sessionName)).then(() => undefined)
+    : boot.anyReady;
+
+  let timer: ReturnType<typeof setTimeout> | undefined;
+  await Promise.race([
+    target,
+    new Promise<void>(resolve => {
+      timer = setTimeout(resolve, envNumber('WA_BOOT_WAIT_TIMEOUT_MS', 60000));
+    })
+  ]);
+  clearTimeout(timer);
+}
+
+/**
+ * Açılış geri yüklemesinin durumu ve oturum başına açılış aşaması süreleri
+ */
+export function getBootStatus(): {
+  restoring: boolean;
+  startedAt: string | null;
+  durationMs: number | null;
+  sessions: Array<{ sessionName: string; connected: boolean; phases: Omit<LaunchPhases, 'startedAt'> | null }>;
+} {
+  const boot = global.waBootRestore;
+  return {
+    restoring: !!boot && boot.finishedAt === null,
+    startedAt: boot ? new Date(boot.startedAt).toISOString() : null,
+    durationMs: boot?.finishedAt ? boot.finishedAt - boot.startedAt : null,
+    sessions: (boot?.sessions || []).map(name => {
+      const session = global.waSessions.get(name);
+      return { sessionName: name, connected: !!session?.isReady, phases: phaseDurations(session) };
+    })
+  };
+}
+
+function phaseDurations(session?: WaSession): Omit<LaunchPhases, 'startedAt'> | null {
+  if (!session?.phases) return null;
+  const { startedAt, ...durations } = session.phases;
+  return durations;
+}
 
 /**
  * WhatsApp Web Client'ı başlat
  */
-export async function initializeClient(): Promise<{ success: boolean; error?: string }> {
+export async function initializeClient(
+  sessionName: string = DEFAULT_SESSION
+): Promise<{ success: boolean; error?: string }> {
   await loadWhatsAppWeb();
 
+  if (!/^[a-zA-Z0-9_-]+$/.test(sessionName)) {
+    return { success: false, error: 'Session adı sadece harf, rakam, - ve _ içerebilir' };
+  }
+
+  const session = getOrCreateSession(sessionName);
+  const tag = `[WA:${sessionName}]`;
+
   // Zaten bağlı mı?
-  if (global.waClient && global.waIsReady) {
-    console.log('[WA] Zaten bağlı');
+  if (session.client && session.isReady) {
+    console.log(tag, 'Zaten bağlı');
     return { success: true };
   }
 
   // Eski client varsa kapat
-  if (global.waClient) {
+  if (session.client) {
     try {
-      await global.waClient.destroy();
+      await session.client.destroy();
     } catch (e) {
       // ignore
     }
-    global.waClient = null;
-    global.waIsReady = false;
-    global.waLastQR = null;
+    resetSessionState(session);
   }
 
-  console.log('[WA] Client başlatılıyor...');
+  console.log(tag, 'Client başlatılıyor...');
+  mirrorSessionStatus(sessionName, 'connecting');
 
   // Apple Silicon için system Chrome kullan
   const isMacArm = process.platform === 'darwin' && process.arch === 'arm64';
@@ -59,67 +764,148 @@ export async function initializeClient(): Promise<{ success: boolean; error?: st
     : undefined;
 
   if (isMacArm) {
-    console.log('[WA] Apple Silicon - System Chrome kullanılıyor');
+    console.log(tag, 'Apple Silicon - System Chrome kullanılıyor');
   }
 
-  global.waClient = new Client({
-    authStrategy: new LocalAuth({ dataPath: './.wwebjs_auth' }),
-    puppeteer: {
-      headless: false,
-      executablePath: chromePath,
-      args: ['--no-sandbox', '--disable-setuid-sandbox', '--disable-gpu']
-    }
+  session.phases = { startedAt: Date.now(), browserMs: null, pageMs: null, authMs: null, readyMs: null };
+
+  // Varsayılan oturum clientId'siz kalır ki mevcut ./.wwebjs_auth/session verisi kullanılmaya devam etsin
+  const authStrategy = new LocalAuth({
+    dataPath: AUTH_DATA_PATH,
+    clientId: sessionName === DEFAULT_SESSION ? undefined : sessionName
   });
 
+  // Chromium açılıp sayfa oluşturulduktan sonra, WhatsApp Web yüklenmeden önce çağrılır:
+  // açılış aşamaları ölçülür ve istek engelleme listesi ilk yüklemeden itibaren uygulanır
+  const afterBrowserInitialized = authStrategy.afterBrowserInitialized?.bind(authStrategy);
+  authStrategy.afterBrowserInitialized = async () => {
+    markPhase(session, 'browserMs');
+    client.pupPage?.once('load', () => markPhase(session, 'pageMs'));
+    await applyRequestBlocklist(session, client);
+    if (afterBrowserInitialized) await afterBrowserInitialized();
+  };
+
+  const client = new Client({
+    authStrategy,
+    puppeteer: getPuppeteerOptions(chromePath)
+  });
+  session.client = client;
+  session.launchedAt = Date.now();
+  session.messagesAtLaunch = session.metrics.messages;
+  session.rssBytes = null;
+  startRecycleSupervisor();
+
   // QR kodu
-  global.waClient.on('qr', async (qr: string) => {
-    console.log('[WA] QR kodu oluşturuldu');
+  client.on('qr', async (qr: string) => {
+    console.log(tag, 'QR kodu oluşturuldu');
+    applyRequestBlocklist(session, client);
     try {
-      global.waLastQR = await QRCode.toDataURL(qr);
-      console.log('[WA] QR base64 hazır, uzunluk:', global.waLastQR?.length);
+      session.lastQR = await QRCode.toDataURL(qr);
+      console.log(tag, 'QR base64 hazır, uzunluk:', session.lastQR?.length);
+      mirrorSessionStatus(sessionName, 'qr_pending', session.lastQR);
     } catch (e) {
-      console.error('[WA] QR base64 hatası:', e);
+      console.error(tag, 'QR base64 hatası:', e);
     }
   });
 
   // Bağlantı hazır
-  global.waClient.on('ready', () => {
-    console.log('[WA] Bağlantı hazır!');
-    global.waIsReady = true;
-    global.waLastQR = null;
+  client.on('ready', () => {
+    console.log(tag, 'Bağlantı hazır!');
+    applyRequestBlocklist(session, client);
+    markPhase(session, 'readyMs');
+    console.log(tag, 'Açılış süreleri (ms):', phaseDurations(session));
+    session.isReady = true;
+    session.lastQR = null;
+    session.state = 'CONNECTED';
+    session.stateCheckedAt = Date.now();
+    startHealthProbe(session);
 
     try {
-      const info = global.waClient.info;
-      global.waConnectedPhone = info?.wid?.user || null;
-      console.log('[WA] Bağlı telefon:', global.waConnectedPhone);
+      const info = client.info;
+      session.connectedPhone = info?.wid?.user || null;
+      console.log(tag, 'Bağlı telefon:', session.connectedPhone);
     } catch (e) {
-      console.error('[WA] Telefon bilgisi alınamadı:', e);
+      console.error(tag, 'Telefon bilgisi alınamadı:', e);
     }
+
+    mirrorSessionStatus(sessionName, 'connected', null, session.connectedPhone || undefined);
+
+    // Oturum hatasıyla park edilmiş kampanya job'ları beklemeden tekrar denensin
+    import('./db/campaigns')
+      .then(({ resumeParkedSendJobs }) => resumeParkedSendJobs())
+      .then((count) => {
+        if (count > 0) console.log(tag, 'Park edilmiş job kuyruğa geri alındı:', count);
+      })
+      .catch((error) => console.error(tag, 'Park edilmiş job\'lar kuyruğa alınamadı:', error.message));
   });
 
   // Authenticated
-  global.waClient.on('authenticated', () => {
-    console.log('[WA] Authenticated');
+  client.on('authenticated', () => {
+    console.log(tag, 'Authenticated');
+    markPhase(session, 'authMs');
+  });
+
+  // Gelen mesaj: yalnızca kuyruğa eklenir (kayıt ve STOP/İPTAL işlemleri toplu yapılır)
+  client.on('message', async (msg: any) => {
+    if (msg.fromMe || msg.isStatus || typeof msg.from !== 'string' || msg.from.endsWith('@g.us')) return;
+
+    // @lid kimlikleri numara taşımaz; STOP/İPTAL'in blacklist'e düşmesi için numarayı kişiden çöz
+    let from = msg.from;
+    if (from.endsWith('@lid')) {
+      try {
+        session.metrics.inboundLookups++;
+        const contact = await msg.getContact();
+        if (contact?.number) from = `${contact.number}@c.us`;
+      } catch (error: any) {
+        console.warn(tag, 'Gönderen numarası çözülemedi:', msg.from, error.message);
+      }
+    }
+
+    getInboundQueue().enqueue({
+      channel: 'wa_web',
+      from,
+      to: session.connectedPhone,
+      body: msg.body,
+      externalId: msg.id?._serialized,
+      sessionName,
+      numMedia: msg.hasMedia ? 1 : 0,
+      receivedAt: msg.timestamp ? msg.timestamp * 1000 : undefined
+    });
+  });
+
+  // Bağlantı durumu değişti
+  client.on('change_state', (state: string) => {
+    console.log(tag, 'Bağlantı durumu:', state);
+    session.state = state;
+    session.stateCheckedAt = Date.now();
+    if (state === 'CONNECTED') {
+      session.isReady = true;
+    } else if (state !== 'OPENING' && state !== 'PAIRING') {
+      session.isReady = false;
+    }
+    publishSessionStatus({ sessionName, state, connected: session.isReady });
   });
 
   // Bağlantı koptu
-  global.waClient.on('disconnected', (reason: string) => {
-    console.log('[WA] Bağlantı koptu:', reason);
-    global.waIsReady = false;
-    global.waConnectedPhone = null;
-    global.waLastQR = null;
-    global.waClient = null;
+  client.on('disconnected', (reason: string) => {
+    console.log(tag, 'Bağlantı koptu:', reason);
+    if (session.client === client) {
+      resetSessionState(session);
+    }
+    mirrorSessionStatus(sessionName, 'disconnected', null);
   });
 
   // Initialize
   try {
-    await global.waClient.initialize();
-    console.log('[WA] Initialize tamamlandı');
+    await client.initialize();
+    console.log(tag, 'Initialize tamamlandı');
     return { success: true };
   } catch (error: any) {
-    console.error('[WA] Initialize hatası:', error.message);
-    global.waClient = null;
-    global.waIsReady = false;
+    console.error(tag, 'Initialize hatası:', error.message);
+    if (session.client === client) {
+      resetSessionState(session);
+    }
+    mirrorSessionStatus(sessionName, 'disconnected', null);
     return { success: false, error: error.message };
   }
 }
@@ -127,56 +913,148 @@ export async function initializeClient(): Promise<{ success: boolean; error?: st
 /**
  * Bağlantı durumunu getir
  */
-export function getStatus(): { 
-  connected: boolean; 
-  phone: string | null; 
+export function getStatus(sessionName: string = DEFAULT_SESSION): {
+  connected: boolean;
+  phone: string | null;
   hasQR: boolean;
   qrCode: string | null;
 } {
+  const session = global.waSessions.get(sessionName);
   return {
-    connected: global.waIsReady,
-    phone: global.waConnectedPhone,
-    hasQR: !!global.waLastQR,
-    qrCode: global.waLastQR
+    connected: !!session?.isReady,
+    phone: session?.connectedPhone || null,
+    hasQR: !!session?.lastQR,
+    qrCode: session?.lastQR || null
   };
 }
 
 /**
- * Mesaj gönder (metin veya medya)
+ * Havuzdaki tüm oturumların durumunu getir
  */
-export async function sendMessage(
-  phone: string, 
-  message: string,
-  media?: {
-    type: 'image' | 'video' | 'document' | 'audio';
-    data: string; // base64 data veya URL
-    filename?: string;
-    caption?: string;
+export function listSessions(): Array<{
+  sessionName: string;
+  connected: boolean;
+  phone: string | null;
+  hasQR: boolean;
+  pending: number;
+  state: string | null;
+  messages: number;
+  cdpCalls: number;
+  cdpCallsPerMessage: number;
+  inboundLookups: number;
+  messagesSinceLaunch: number;
+  rssBytes: number | null;
+  recycling: boolean;
+  recycles: number;
+  phases: Omit<LaunchPhases, 'startedAt'> | null;
+}> {
+  return Array.from(global.waSessions.values()).map(session => ({
+    sessionName: session.name,
+    connected: session.isReady,
+    phone: session.connectedPhone,
+    hasQR: !!session.lastQR,
+    pending: session.pending,
+    state: session.state,
+    messages: session.metrics.messages,
+    cdpCalls: session.metrics.cdpCalls,
+    cdpCallsPerMessage: session.metrics.messages > 0
+      ? Math.round((session.metrics.cdpCalls / session.metrics.messages) * 100) / 100
+      : 0,
+    inboundLookups: session.metrics.inboundLookups,
+    messagesSinceLaunch: session.metrics.messages - session.messagesAtLaunch,
+    rssBytes: session.rssBytes,
+    recycling: !!session.recycling,
+    recycles: session.recycles,
+    phases: phaseDurations(session)
+  }));
+}
+
+/**
+ * MessageMedia nesnesini URL veya içerik hash'ine göre önbellekten getirir, yoksa oluşturur
+ */
+async function buildMessageMedia(media: MediaInput): Promise<any> {
+  await loadWhatsAppWeb();
+
+  if (media.data.startsWith('http://') || media.data.startsWith('https://')) {
+    // URL'den medya oluştur
+    return getMediaCache().getOrLoad(
+      `url:${media.data}`,
+      () => {
+        console.log('[WA] URL\'den medya yükleniyor:', media.data);
+        return MessageMedia.fromUrl(media.data, { unsafeMime: true });
+      },
+      (m: any) => m.data?.length || 0
+    );
+  }
+
+  // Base64'ten medya oluştur
+  const mimeTypes: Record<string, string> = {
+    image: 'image/jpeg',
+    video: 'video/mp4',
+    audio: 'audio/mpeg',
+    document: 'application/pdf'
+  };
+
+  // Base64 prefix'i kaldır
+  let base64Data = media.data;
+  const commaIndex = base64Data.indexOf(',');
+  if (commaIndex !== -1) {
+    base64Data = base64Data.substring(commaIndex + 1);
   }
+
+  const mimeType = mimeTypes[media.type] || 'application/octet-stream';
+  const filename = media.filename || `file.${media.type === 'image' ? 'jpg' : media.type === 'video' ? 'mp4' : 'pdf'}`;
+
+  return getMediaCache().getOrLoad(
+    `b64:${contentHash(base64Data)}:${mimeType}:${filename}`,
+    async () => new MessageMedia(mimeType, base64Data, filename),
+    (m: any) => m.data?.length || 0
+  );
+}
+
+/**
+ * Medya önbelleği istatistikleri (bellek takibi için)
+ */
+export function getMediaCacheStats() {
+  return getMediaCache().getStats();
+}
+
+/**
+ * Puppeteer bağlantısının koptuğunu gösteren hata mı?
+ */
+function isTransportError(error: any): boolean {
+  const message = error?.message || '';
+  return message.includes('Protocol error') ||
+    message.includes('Session closed') ||
+    message.includes('Target closed');
+}
+
+/**
+ * Şeritte çalışan asıl gönderim (şerit dışından çağrılmamalı)
+ */
+async function sendOnSession(
+  session: WaSession,
+  phone: string,
+  message: string,
+  media?: MediaInput
 ): Promise<{ success: boolean; messageId?: string; error?: string }> {
-  console.log('[WA] sendMessage çağrıldı, isReady:', global.waIsReady, 'hasMedia:', !!media);
-  
-  if (!global.waClient || !global.waIsReady) {
+  const tag = `[WA:${session.name}]`;
+  console.log(tag, 'sendMessage çağrıldı, isReady:', session.isReady, 'hasMedia:', !!media);
+
+  if (!session.client || !session.isReady) {
     return { success: false, error: 'WhatsApp bağlı değil' };
   }
 
+  // Client state kontrolü: önbellekteki durum okunur, sayfaya gidilmez
+  if (!isSessionUsable(session)) {
+    return { success: false, error: 'WhatsApp bağlantısı aktif değil. Lütfen tekrar bağlanın.' };
+  }
+
+  const client = session.client;
+
   try {
-    // Client state kontrolü
-    try {
-      const state = await global.waClient.getState();
-      console.log('[WA] Client state:', state);
-      
-      if (state !== 'CONNECTED') {
-        global.waIsReady = false;
-        return { success: false, error: 'WhatsApp bağlantısı aktif değil. Lütfen tekrar bağlanın.' };
-      }
-    } catch (stateError: any) {
-      console.error('[WA] State kontrol hatası:', stateError.message);
-      // State kontrolü başarısız olduysa bağlantı kopmuş demektir
-      global.waIsReady = false;
-      global.waClient = null;
-      return { success: false, error: 'WhatsApp bağlantısı kopmuş. Lütfen sayfayı kapatıp tekrar bağlanın.' };
-    }
+    // Oturum, kanal ve global hız limitleri (süreçler arası paylaşılan token bucket)
+    await getSendScheduler().acquire({ channel: 'wa_web', session: session.name });
 
     // Telefon numarasını formatla
     let formattedPhone = phone.replace(/\D/g, '');
@@ -187,126 +1065,136 @@ export async function sendMessage(
     let result;
 
     if (media) {
-      // Medya gönder
-      const { MessageMedia } = await import('whatsapp-web.js');
-      
-      let mediaObj;
-      
-      if (media.data.startsWith('http://') || media.data.startsWith('https://')) {
-        // URL'den medya oluştur
-        console.log('[WA] URL\'den medya yükleniyor:', media.data);
-        mediaObj = await MessageMedia.fromUrl(media.data, { unsafeMime: true });
-      } else {
-        // Base64'ten medya oluştur
-        const mimeTypes: Record<string, string> = {
-          image: 'image/jpeg',
-          video: 'video/mp4',
-          audio: 'audio/mpeg',
-          document: 'application/pdf'
-        };
-        
-        // Base64 prefix'i kaldır
-        let base64Data = media.data;
-        if (base64Data.includes(',')) {
-          base64Data = base64Data.split(',')[1];
-        }
-        
-        mediaObj = new MessageMedia(
-          mimeTypes[media.type] || 'application/octet-stream',
-          base64Data,
-          media.filename || `file.${media.type === 'image' ? 'jpg' : media.type === 'video' ? 'mp4' : 'pdf'}`
-        );
-      }
+      // Medya gönder (önbellekten; aynı medya her alıcı için yeniden üretilmez)
+      const mediaObj = await buildMessageMedia(media);
+
+      console.log(tag, 'Medya gönderiliyor:', formattedPhone, media.type);
 
-      console.log('[WA] Medya gönderiliyor:', formattedPhone, media.type);
-      
       // Medya ile birlikte mesaj gönder
-      result = await global.waClient.sendMessage(formattedPhone, mediaObj, {
+      session.metrics.messages++;
+      result = await cdp(session, () => client.sendMessage(formattedPhone, mediaObj, {
         caption: media.caption || message || undefined
-      });
+      }));
     } else {
       // Sadece metin gönder
-      console.log('[WA] Metin gönderiliyor:', formattedPhone);
-      result = await global.waClient.sendMessage(formattedPhone, message);
+      console.log(tag, 'Metin gönderiliyor:', formattedPhone);
+      session.metrics.messages++;
+      result = await cdp(session, () => client.sendMessage(formattedPhone, message));
     }
 
-    console.log('[WA] Mesaj gönderildi:', result.id._serialized);
+    console.log(tag, 'Mesaj gönderildi:', result.id._serialized);
     return { success: true, messageId: result.id._serialized };
   } catch (error: any) {
-    console.error('[WA] Mesaj gönderme hatası:', error.message);
-    console.error('[WA] Hata stack:', error.stack);
-    
-    // Protocol hatası veya session kapandı ise
-    if (error.message.includes('Protocol error') || 
-        error.message.includes('Session closed') ||
-        error.message.includes('Target closed')) {
-      console.log('[WA] Puppeteer bağlantısı koptu, state sıfırlanıyor...');
-      global.waIsReady = false;
-      global.waClient = null;
-      global.waLastQR = null;
-      global.waConnectedPhone = null;
-      return { 
-        success: false, 
-        error: 'Tarayıcı bağlantısı koptu. Lütfen WhatsApp Web sayfasını kapatın ve "Bağlan" butonuna tekrar tıklayın.' 
+    console.error(tag, 'Mesaj gönderme hatası:', error.message);
+    console.error(tag, 'Hata stack:', error.stack);
+
+    // Protocol hatası veya session kapandı ise: bağlantıyı yeniden yokla
+    if (isTransportError(error)) {
+      const state = await probeState(session);
+      if (state === 'CONNECTED') {
+        return { success: false, error: error.message };
+      }
+
+      console.log(tag, 'Puppeteer bağlantısı koptu, state sıfırlanıyor...');
+      if (session.client === client) {
+        await discardClient(session, client);
+        mirrorSessionStatus(session.name, 'disconnected', null);
+      }
+      return {
+        success: false,
+        error: 'Tarayıcı bağlantısı koptu. Lütfen WhatsApp Web sayfasını kapatın ve "Bağlan" butonuna tekrar tıklayın.'
       };
     }
-    
+
     return { success: false, error: error.message };
   }
 }
 
+/**
+ * Mesaj gönder (metin veya medya)
+ * sessionName verilmezse kuyruğu en kısa hazır oturum kullanılır.
+ */
+export async function sendMessage(
+  phone: string,
+  message: string,
+  media?: MediaInput,
+  sessionName?: string
+): Promise<{ success: boolean; messageId?: string; error?: string }> {
+  await whenSessionsRestored(sessionName);
+  const session = pickSendSession(sessionName);
+
+  if (!acceptsSends(session)) {
+    return { success: false, error: 'WhatsApp bağlı değil' };
+  }
+
+  return runInLane(session, () => sendOnSession(session, phone, message, media));
+}
+
 /**
  * Toplu mesaj gönder
+ * Numaralar hazır oturumlara dağıtılır; her oturum kendi şeridinde sırayla gönderir.
  */
 export async function sendBulkMessages(
   phones: string[],
   message: string,
-  media?: {
-    type: 'image' | 'video' | 'document' | 'audio';
-    data: string;
-    filename?: string;
-    caption?: string;
-  },
-  delayMs: number = 3000 // Mesajlar arası bekleme süresi (ban önleme)
-): Promise<{ 
-  success: boolean; 
-  sent: number; 
-  failed: number; 
-  results: Array<{ phone: string; success: boolean; error?: string }> 
+  media?: MediaInput,
+  delayMs: number = 0, // Ek bekleme; asıl hız zamanlayıcının profilinden gelir
+  sessionNames?: string[]
+): Promise<{
+  success: boolean;
+  sent: number;
+  failed: number;
+  results: Array<{ phone: string; success: boolean; error?: string }>
 }> {
-  if (!global.waClient || !global.waIsReady) {
+  await whenSessionsRestored(sessionNames?.length === 1 ? sessionNames[0] : undefined);
+  const sessions = sessionNames && sessionNames.length > 0
+    ? sessionNames
+        .map(name => global.waSessions.get(name))
+        .filter(acceptsSends)
+    : getSendableSessions();
+
+  if (sessions.length === 0) {
     return { success: false, sent: 0, failed: phones.length, results: [] };
   }
 
-  const results: Array<{ phone: string; success: boolean; error?: string }> = [];
+  const results: Array<{ phone: string; success: boolean; error?: string }> = new Array(phones.length);
   let sent = 0;
   let failed = 0;
 
-  for (let i = 0; i < phones.length; i++) {
-    const phone = phones[i];
-    
-    try {
-      const result = await sendMessage(phone, message, media);
-      
-      if (result.success) {
-        sent++;
-        results.push({ phone, success: true });
-      } else {
+  // Round-robin dağıtım: her oturum kendi dilimini paralel olarak gönderir
+  await Promise.all(sessions.map(async (session, sessionIndex) => {
+    const indexes: number[] = [];
+    for (let i = sessionIndex; i < phones.length; i += sessions.length) {
+      indexes.push(i);
+    }
+
+    for (let k = 0; k < indexes.length; k++) {
+      const i = indexes[k];
+      const phone = phones[i];
+
+      try {
+        const result = await runInLane(session, () => sendOnSession(session, phone, message, media));
+
+        if (result.success) {
+          sent++;
+          results[i] = { phone, success: true };
+        } else {
+          failed++;
+          results[i] = { phone, success: false, error: result.error };
+        }
+      } catch (error: any) {
         failed++;
-        results.push({ phone, success: false, error: result.error });
+        results[i] = { phone, success: false, error: error.message };
       }
-    } catch (error: any) {
-      failed++;
-      results.push({ phone, success: false, error: error.message });
-    }
 
-    // Mesajlar arası bekleme (son mesaj hariç)
-    if (i < phones.length - 1) {
-      await new Promise(resolve => setTimeout(resolve, delayMs));
+      // Ek bekleme (son mesaj hariç)
+      if (delayMs > 0 && k < indexes.length - 1) {
+        await new Promise(resolve => setTimeout(resolve, delayMs));
+      }
     }
-  }
+  }));
 
-  console.log(`[WA] Toplu gönderim tamamlandı: ${sent} başarılı, ${failed} başarısız`);
+  console.log(`[WA] Toplu gönderim tamamlandı (${sessions.length} oturum): ${sent} başarılı, ${failed} başarısız`);
   return { success: true, sent, failed, results };
 }
 
@@ -317,17 +1205,16 @@ export async function sendBulkMessages(
 export async function sendMessageWithMultipleMedia(
   phone: string,
   message: string,
-  mediaItems: Array<{
-    type: 'image' | 'video' | 'document' | 'audio';
-    data: string; // URL veya base64
-    filename?: string;
-    caption?: string;
-  }>,
-  delayBetweenMessages: number = 2000
+  mediaItems: MediaInput[],
+  delayBetweenMessages: number = 2000,
+  sessionName?: string
 ): Promise<{ success: boolean; messageIds?: string[]; error?: string }> {
   console.log('[WA] sendMessageWithMultipleMedia çağrıldı, medya sayısı:', mediaItems.length);
-  
-  if (!global.waClient || !global.waIsReady) {
+
+  await whenSessionsRestored(sessionName);
+  const session = pickSendSession(sessionName);
+
+  if (!acceptsSends(session)) {
     return { success: false, error: 'WhatsApp bağlı değil' };
   }
 
@@ -335,95 +1222,87 @@ export async function sendMessageWithMultipleMedia(
     return { success: false, error: 'En az bir medya gerekli' };
   }
 
-  try {
-    // Client state kontrolü
+  // Aynı alıcının medyaları araya başka mesaj girmeden tek şerit görevinde gönderilir
+  return runInLane(session, async () => {
+    const tag = `[WA:${session.name}]`;
+
     try {
-      const state = await global.waClient.getState();
-      if (state !== 'CONNECTED') {
-        global.waIsReady = false;
+      // Client state kontrolü (önbellekten)
+      if (!isSessionUsable(session)) {
         return { success: false, error: 'WhatsApp bağlantısı aktif değil.' };
       }
-    } catch (stateError: any) {
-      global.waIsReady = false;
-      global.waClient = null;
-      return { success: false, error: 'WhatsApp bağlantısı kopmuş.' };
-    }
 
-    // Telefon numarasını formatla
-    let formattedPhone = phone.replace(/\D/g, '');
-    if (!formattedPhone.endsWith('@c.us')) {
-      formattedPhone = formattedPhone + '@c.us';
-    }
+      const messageIds: string[] = [];
 
-    const messageIds: string[] = [];
+      // İlk medyayı ana mesaj ile gönder
+      const firstResult = await sendOnSession(session, phone, message, mediaItems[0]);
 
-    // İlk medyayı ana mesaj ile gönder
-    const firstResult = await sendMessage(
-      phone,
-      message,
-      mediaItems[0]
-    );
+      if (!firstResult.success) {
+        return { success: false, error: firstResult.error };
+      }
 
-    if (!firstResult.success) {
-      return { success: false, error: firstResult.error };
-    }
+      if (firstResult.messageId) {
+        messageIds.push(firstResult.messageId);
+      }
 
-    if (firstResult.messageId) {
-      messageIds.push(firstResult.messageId);
-    }
+      // Kalan medyaları sırayla gönder
+      for (let i = 1; i < mediaItems.length; i++) {
+        // Mesajlar arası bekleme (ban önleme)
+        await new Promise(resolve => setTimeout(resolve, delayBetweenMessages));
+
+        const result = await sendOnSession(session, phone, '', mediaItems[i]);
 
-    // Kalan medyaları sırayla gönder
-    for (let i = 1; i < mediaItems.length; i++) {
-      // Mesajlar arası bekleme (ban önleme)
-      await new Promise(resolve => setTimeout(resolve, delayBetweenMessages));
+        if (result.success && result.messageId) {
+          messageIds.push(result.messageId);
+          console.log(tag, `Medya ${i + 1}/${mediaItems.length} gönderildi`);
+        } else {
+          console.error(tag, `Medya ${i + 1}/${mediaItems.length} gönderilemedi:`, result.error);
+        }
+      }
 
-      const caption = mediaItems[i].caption || `${i + 1}/${mediaItems.length}`;
-      const result = await sendMessage(phone, '', mediaItems[i]);
+      console.log(tag, 'Çoklu medya gönderimi tamamlandı:', messageIds.length, '/', mediaItems.length);
+      return { success: true, messageIds };
+    } catch (error: any) {
+      console.error(tag, 'Çoklu medya gönderme hatası:', error.message);
 
-      if (result.success && result.messageId) {
-        messageIds.push(result.messageId);
-        console.log(`[WA] Medya ${i + 1}/${mediaItems.length} gönderildi`);
-      } else {
-        console.error(`[WA] Medya ${i + 1}/${mediaItems.length} gönderilemedi:`, result.error);
+      if (isTransportError(error) && (await probeState(session)) !== 'CONNECTED') {
+        return {
+          success: false,
+          error: 'Tarayıcı bağlantısı koptu. Lütfen tekrar bağlanın.'
+        };
       }
-    }
 
-    console.log('[WA] Çoklu medya gönderimi tamamlandı:', messageIds.length, '/', mediaItems.length);
-    return { success: true, messageIds };
-  } catch (error: any) {
-    console.error('[WA] Çoklu medya gönderme hatası:', error.message);
-    
-    if (error.message.includes('Protocol error') || 
-        error.message.includes('Session closed') ||
-        error.message.includes('Target closed')) {
-      global.waIsReady = false;
-      global.waClient = null;
-      return { 
-        success: false, 
-        error: 'Tarayıcı bağlantısı koptu. Lütfen tekrar bağlanın.' 
-      };
+      return { success: false, error: error.message };
     }
-    
-    return { success: false, error: error.message };
-  }
+  });
 }
 
 /**
  * Client'ı kapat
  */
-export async function destroyClient(): Promise<void> {
-  if (global.waClient) {
+export async function destroyClient(sessionName: string = DEFAULT_SESSION): Promise<void> {
+  const session = global.waSessions.get(sessionName);
+  if (!session) return;
+
+  if (session.client) {
     try {
-      await global.waClient.destroy();
+      await session.client.destroy();
     } catch (e) {
       // ignore
     }
   }
-  global.waClient = null;
-  global.waIsReady = false;
-  global.waLastQR = null;
-  global.waConnectedPhone = null;
-  console.log('[WA] Client kapatıldı');
+  resetSessionState(session);
+  publishSessionStatus({ sessionName, status: 'disconnected', state: null, connected: false, qrCode: null });
+  console.log(`[WA:${sessionName}] Client kapatıldı`);
+}
+
+/**
+ * Oturumu kapatıp havuzdan çıkarır
+ */
+export async function removeSession(sessionName: string): Promise<void> {
+  await destroyClient(sessionName);
+  global.waSessions.delete(sessionName);
+  publishSessionRemoved(sessionName);
 }
 
 /**
@@ -431,21 +1310,23 @@ export async function destroyClient(): Promise<void> {
  * TR: logoutWaWeb adı eski route'larla uyumluluk sağlar.
  * EN: Kept for backward compatibility with existing routes.
  */
-export async function logoutWaWeb(): Promise<void> {
-  await destroyClient();
+export async function logoutWaWeb(sessionName: string = DEFAULT_SESSION): Promise<void> {
+  await destroyClient(sessionName);
 }
 
 /**
  * Kişileri getir
  */
-export async function getContacts(): Promise<any[]> {
-  if (!global.waClient || !global.waIsReady) {
+export async function getContacts(sessionName?: string): Promise<any[]> {
+  await whenSessionsRestored(sessionName);
+  const session = resolveSession(sessionName);
+  if (!session || !session.client || !session.isReady) {
     return [];
   }
 
   try {
-    const contacts = await global.waClient.getContacts();
-    
+    const contacts = await session.client.getContacts();
+
     // isMyContact kontrolü sorunlu, sadece geçerli kişileri filtrele
     return contacts
       .filter((c: any) => {
@@ -463,16 +1344,43 @@ export async function getContacts(): Promise<any[]> {
   }
 }
 
+/**
+ * Kişileri dışa aktarma için sayfa sayfa üretir; filtre/eşleme tembel yapılır,
+ * ara diziler oluşturulmaz
+ */
+export async function* iterateContactPages(sessionName?: string, pageSize = 500): AsyncGenerator<Array<{ id: string; name: string; phone: string }>> {
+  await whenSessionsRestored(sessionName);
+  const session = resolveSession(sessionName);
+  if (!session || !session.client || !session.isReady) {
+    throw new Error('WhatsApp bağlı değil');
+  }
+
+  const contacts = await session.client.getContacts();
+  let page: Array<{ id: string; name: string; phone: string }> = [];
+
+  for (const c of contacts) {
+    if (c.isGroup || !c.id || !c.id.user || c.id.user.length <= 5) continue;
+    page.push({ id: c.id._serialized, name: c.name || c.pushname || c.id.user, phone: c.id.user });
+    if (page.length >= pageSize) {
+      yield page;
+      page = [];
+    }
+  }
+  if (page.length > 0) yield page;
+}
+
 /**
  * Grupları getir
  */
-export async function getGroups(): Promise<any[]> {
-  if (!global.waClient || !global.waIsReady) {
+export async function getGroups(sessionName?: string): Promise<any[]> {
+  await whenSessionsRestored(sessionName);
+  const session = resolveSession(sessionName);
+  if (!session || !session.client || !session.isReady) {
     return [];
   }
 
   try {
-    const chats = await global.waClient.getChats();
+    const chats = await session.client.getChats();
     return chats
       .filter((c: any) => c.isGroup)
       .map((c: any) => ({
@@ -489,25 +1397,31 @@ export async function getGroups(): Promise<any[]> {
 /**
  * Belirli bir grubun üyelerini getir
  */
-export async function getGroupParticipants(groupId: string): Promise<any[]> {
-  if (!global.waClient || !global.waIsReady) {
+export async function getGroupParticipants(groupId: string, sessionName?: string): Promise<any[]> {
+  await whenSessionsRestored(sessionName);
+  const session = resolveSession(sessionName);
+  if (!session || !session.client || !session.isReady) {
     return [];
   }
 
+  const client = session.client;
+
   try {
-    const chat = await global.waClient.getChatById(groupId);
-    
+    const chat = await client.getChatById(groupId);
+
     if (!chat.isGroup) {
       return [];
     }
 
     const participants = chat.participants || [];
-    
-    // Her katılımcı için detaylı bilgi al
-    const participantDetails = await Promise.all(
-      participants.map(async (participant: any) => {
+
+    // Her katılımcı için detaylı bilgi al (sınırlı paralellikle)
+    const participantDetails = await mapWithConcurrency(
+      participants,
+      getContactResolveConcurrency(),
+      async (participant: any) => {
         try {
-          const contact = await global.waClient.getContactById(participant.id._serialized);
+          const contact = await client.getContactById(participant.id._serialized);
           return {
             id: participant.id._serialized,
             phone: participant.id.user,
@@ -525,7 +1439,7 @@ export async function getGroupParticipants(groupId: string): Promise<any[]> {
             isSuperAdmin: false
           };
         }
-      })
+      }
     );
 
     return participantDetails;
@@ -538,27 +1452,28 @@ export async function getGroupParticipants(groupId: string): Promise<any[]> {
 /**
  * Tüm grupları üyeleriyle birlikte getir
  */
-export async function getGroupsWithParticipants(): Promise<any[]> {
-  if (!global.waClient || !global.waIsReady) {
+export async function getGroupsWithParticipants(sessionName?: string): Promise<any[]> {
+  await whenSessionsRestored(sessionName);
+  const session = resolveSession(sessionName);
+  if (!session || !session.client || !session.isReady) {
     return [];
   }
 
   try {
-    const chats = await global.waClient.getChats();
+    const chats = await session.client.getChats();
     const groups = chats.filter((c: any) => c.isGroup);
 
-    const groupsWithParticipants = await Promise.all(
-      groups.map(async (group: any) => {
-        const participants = await getGroupParticipants(group.id._serialized);
-        
-        return {
-          id: group.id._serialized,
-          name: group.name,
-          participantCount: participants.length,
-          participants: participants
-        };
-      })
-    );
+    // Gruplar sırayla işlenir; her grubun katılımcıları sınırlı paralellikle çözülür
+    const groupsWithParticipants = await mapWithConcurrency(groups, 1, async (group: any) => {
+      const participants = await getGroupParticipants(group.id._serialized, session.name);
+
+      return {
+        id: group.id._serialized,
+        name: group.name,
+        participantCount: participants.length,
+        participants: participants
+      };
+    });
 
     return groupsWithParticipants;
   } catch (error) {
@@ -566,3 +1481,65 @@ export async function getGroupsWithParticipants(): Promise<any[]> {
     return [];
   }
 }
+
+/**
+ * Grupları katılımcı numaralarıyla birlikte getirir (kişi bilgisi çözülmez, sayfaya ek çağrı yapılmaz)
+ */
+export async function getGroupSummaries(sessionName?: string): Promise<Array<{
+  id: string;
+  name: string;
+  participants: Array<{ id: string; phone: string; isAdmin: boolean; isSuperAdmin: boolean }>;
+}>> {
+  await whenSessionsRestored(sessionName);
+  const session = resolveSession(sessionName);
+  if (!session || !session.client || !session.isReady) {
+    return [];
+  }
+
+  try {
+    const chats = await session.client.getChats();
+    return chats
+      .filter((c: any) => c.isGroup)
+      .map((c: any) => ({
+        id: c.id._serialized,
+        name: c.name,
+        participants: (c.participants || []).map((p: any) => ({
+          id: p.id._serialized,
+          phone: p.id.user,
+          isAdmin: p.isAdmin || false,
+          isSuperAdmin: p.isSuperAdmin || false
+        }))
+      }));
+  } catch (error) {
+    console.error('[WA] Gruplar alınamadı:', error);
+    return [];
+  }
+}
+
+/**
+ * Verilen WhatsApp id'leri için kişi isimlerini sınırlı paralellikle çözer
+ */
+export async function resolveContactNames(
+  contactIds: string[],
+  sessionName?: string
+): Promise<Map<string, string>> {
+  const names = new Map<string, string>();
+  await whenSessionsRestored(sessionName);
+  const session = resolveSession(sessionName);
+  if (!session || !session.client || !session.isReady) {
+    return names;
+  }
+
+  const client = session.client;
+  await mapWithConcurrency(contactIds, getContactResolveConcurrency(), async (contactId) => {
+    try {
+      const contact = await client.getContactById(contactId);
+      const name = contact.name || contact.pushname;
+      if (name) names.set(contactId, name);
+    } catch (error) {
+      console.error('[WA] Katılımcı bilgisi alınamadı:', contactId);
+    }
+  });
+
+  return names;
+}
@@ -1,158 +1,437 @@
+import http from 'http'
+import https from 'https'
 import { YoncuSendRequest, YoncuStatusResponse, YoncuQueueResponse } from '@/types'
+import { delay, mapWithConcurrency } from './utils'
 
 const YONCU_API_BASE_URL = process.env.YONCU_API_BASE_URL || 'https://www.yoncu.com'
+const AUTH_ERROR = 'Authentication hatası. Lütfen Service ID ve Authorization Token bilgilerinizi kontrol edin.'
+// Ayarlar başka bir süreçten değiştirilirse en geç bu süre sonra yeniden okunur
+const SETTINGS_TTL_MS = 60 * 1000
+const LATENCY_WINDOW = 1000
 
 export interface YoncuApiConfig {
   serviceId: string
   authToken: string
 }
 
-export async function sendMessage(
-  config: YoncuApiConfig,
+export interface YoncuClientOptions {
+  baseUrl?: string
+  timeoutMs?: number
+  maxSockets?: number
+}
+
+export interface YoncuBatchOptions {
+  concurrency?: number
+  maxRetries?: number
+  baseDelayMs?: number
+  maxDelayMs?: number
+}
+
+export interface YoncuBatchResult {
   request: YoncuSendRequest
-): Promise<[boolean, any]> {
-  // Authorization token zaten "Basic " ile başlıyorsa ekleme
-  const authHeader = config.authToken.startsWith('Basic ') 
-    ? config.authToken 
-    : `Basic ${config.authToken}`
+  success: boolean
+  response?: any
+  error?: string
+  attempts: number
+  latencyMs: number
+}
 
-  try {
-    // Media varsa, request'e ekle
-    const payload: any = {
-      Phone: request.Phone,
-      Message: request.Message,
-    }
+export interface YoncuMetrics {
+  requests: number
+  errors: number
+  retries: number
+  latencyMs: { avg: number; p50: number; p95: number; p99: number; max: number }
+}
 
-    // Media desteği - YoncuAPI'ye göre uyarla
-    if (request.MediaUrl) {
-      if (request.MediaType === 'image') {
-        payload.MediaUrl = request.MediaUrl
-      } else if (request.MediaType === 'video') {
-        payload.VideoUrl = request.MediaUrl
-      } else if (request.MediaType === 'document') {
-        payload.DocumentUrl = request.MediaUrl
-      } else if (request.MediaType === 'audio') {
-        payload.AudioUrl = request.MediaUrl
-      }
-    }
+interface RawResponse {
+  status: number
+  headers: http.IncomingHttpHeaders
+  body: any
+}
 
-    const response = await fetch(
-      `${YONCU_API_BASE_URL}/API/WhatsApp/${config.serviceId}/Send`,
-      {
-        method: 'POST',
-        headers: {
-          'Accept': 'application/json',
-          'Content-Type': 'application/json',
-          'Authorization': authHeader,
-          'User-Agent': 'WhatsApp-Yoncu-Panel',
-        },
-        body: JSON.stringify(payload),
-        redirect: 'manual',
-        cache: 'no-store',
-      }
-    )
+/**
+ * Tekrar denenebilir hata (429, 5xx veya ağ hatası); Retry-After varsa bekleme süresini taşır
+ */
+class YoncuRetryableError extends Error {
+  constructor(message: string, public retryAfterMs?: number) {
+    super(message)
+  }
+}
 
-    // 303 ve diğer redirect'leri handle et
-    if (response.status === 303 || response.status === 302 || response.status === 301) {
-      throw new Error('Authentication hatası. Lütfen Service ID ve Authorization Token bilgilerinizi kontrol edin.')
-    }
+/**
+ * Yanıt beklenen [başarılı, veri] biçiminde değil (HTML hata sayfası, boş gövde vb.).
+ * Mesajın iletilip iletilmediği bilinmediğinden tekrar denenmez.
+ */
+class YoncuResponseError extends Error {}
 
-    if (!response.ok && response.status !== 200) {
-      throw new Error(`API Error: ${response.status} ${response.statusText}`)
-    }
+function expectTuple<T>(body: any): [boolean, T] {
+  if (Array.isArray(body) && body.length >= 1 && typeof body[0] === 'boolean') {
+    return body as [boolean, T]
+  }
+  const preview = typeof body === 'string' ? body.slice(0, 200) : JSON.stringify(body)
+  throw new YoncuResponseError(`Beklenmeyen YoncuAPI yanıtı: ${preview}`)
+}
 
-    const data = await response.json()
-    return data
-  } catch (error: any) {
-    if (error.message.includes('Authentication')) {
-      throw error
+function parseRetryAfter(value: string | string[] | undefined): number | undefined {
+  const header = Array.isArray(value) ? value[0] : value
+  if (!header) return undefined
+
+  const seconds = Number(header)
+  if (Number.isFinite(seconds)) return Math.max(0, seconds * 1000)
+
+  const date = Date.parse(header)
+  return Number.isFinite(date) ? Math.max(0, date - Date.now()) : undefined
+}
+
+function percentile(sorted: number[], pct: number): number {
+  if (sorted.length === 0) return 0
+  return sorted[Math.max(0, Math.ceil((pct / 100) * sorted.length) - 1)]
+}
+
+function buildPayload(request: YoncuSendRequest): any {
+  const payload: any = {
+    Phone: request.Phone,
+    Message: request.Message,
+  }
+
+  // Media desteği - YoncuAPI'ye göre uyarla
+  if (request.MediaUrl) {
+    if (request.MediaType === 'image') {
+      payload.MediaUrl = request.MediaUrl
+    } else if (request.MediaType === 'video') {
+      payload.VideoUrl = request.MediaUrl
+    } else if (request.MediaType === 'document') {
+      payload.DocumentUrl = request.MediaUrl
+    } else if (request.MediaType === 'audio') {
+      payload.AudioUrl = request.MediaUrl
     }
-    throw new Error(`Bağlantı hatası: ${error.message}`)
   }
+
+  return payload
 }
 
-export async function getServiceStatus(
-  config: YoncuApiConfig
-): Promise<[boolean, YoncuStatusResponse]> {
-  // Authorization token zaten "Basic " ile başlıyorsa ekleme
-  const authHeader = config.authToken.startsWith('Basic ') 
-    ? config.authToken 
-    : `Basic ${config.authToken}`
+/**
+ * YoncuAPI istemcisi: yapılandırmayı ve keep-alive bağlantı havuzunu tutar,
+ * toplu gönderimde retry / exponential backoff / Retry-After uygular ve gecikme ölçer.
+ */
+export class YoncuClient {
+  private readonly authHeader: string
+  private readonly baseUrl: URL
+  private readonly agent: http.Agent
+  private readonly timeoutMs: number
+  private latencies: number[] = []
+  private counters = { requests: 0, errors: 0, retries: 0 }
 
-  try {
-    const response = await fetch(
-      `${YONCU_API_BASE_URL}/API/WhatsApp/${config.serviceId}/Status`,
-      {
-        method: 'GET',
-        headers: {
-          'Accept': 'application/json',
-          'Authorization': authHeader,
-          'User-Agent': 'WhatsApp-Yoncu-Panel',
-        },
-        redirect: 'manual', // Manuel redirect handling
-        cache: 'no-store',
+  constructor(public readonly config: YoncuApiConfig, options: YoncuClientOptions = {}) {
+    // Authorization token zaten "Basic " ile başlıyorsa ekleme
+    this.authHeader = config.authToken.startsWith('Basic ')
+      ? config.authToken
+      : `Basic ${config.authToken}`
+    this.baseUrl = new URL(options.baseUrl || YONCU_API_BASE_URL)
+    this.timeoutMs = options.timeoutMs || 30000
+
+    const agentOptions = { keepAlive: true, maxSockets: options.maxSockets || 16 }
+    this.agent = this.baseUrl.protocol === 'http:'
+      ? new http.Agent(agentOptions)
+      : new https.Agent(agentOptions)
+  }
+
+  /**
+   * Tek mesaj gönderir (hata durumunda tekrar denemez)
+   */
+  async send(request: YoncuSendRequest): Promise<[boolean, any]> {
+    const response = await this.request('POST', 'Send', buildPayload(request))
+    return expectTuple(response.body)
+  }
+
+  async getStatus(): Promise<[boolean, YoncuStatusResponse]> {
+    const response = await this.request('GET', 'Status')
+    return expectTuple(response.body)
+  }
+
+  async getQueue(): Promise<[boolean, YoncuQueueResponse | string]> {
+    const response = await this.request('GET', 'Queue')
+    return expectTuple(response.body)
+  }
+
+  /**
+   * Mesajları sınırlı paralellikle gönderir. 429 / 5xx / ağ hatalarında exponential backoff
+   * (jitter'lı) ile tekrar dener; sunucu Retry-After döndüyse o süre beklenir.
+   * Sonuçlar istek sırasıyla döner.
+   *
+   * Kampanya trafiği bunu kullanmaz: dispatcher her job'u tek tek sahiplenir, hız limitini
+   * zamanlayıcıdan (lib/send-scheduler) alır ve denemeleri send_jobs'ta saklar. Buradaki
+   * süreç içi retry'lar zamanlayıcıyı atlar ve deneme sayısını kaybeder; bu yüzden dispatcher
+   * send() çağırır; sendBatch kuyruğu kullanmayan toplu gönderimler içindir.
+   */
+  async sendBatch(requests: YoncuSendRequest[], options: YoncuBatchOptions = {}): Promise<YoncuBatchResult[]> {
+    const maxRetries = options.maxRetries ?? 3
+    const baseDelayMs = options.baseDelayMs ?? 500
+    const maxDelayMs = options.maxDelayMs ?? 30000
+
+    return mapWithConcurrency(requests, options.concurrency || 4, async (request) => {
+      const started = Date.now()
+      let attempts = 0
+
+      while (true) {
+        attempts++
+        try {
+          const [success, response] = await this.send(request)
+          return { request, success, response, attempts, latencyMs: Date.now() - started }
+        } catch (error: any) {
+          if (!(error instanceof YoncuRetryableError) || attempts > maxRetries) {
+            return { request, success: false, error: error.message, attempts, latencyMs: Date.now() - started }
+          }
+
+          const backoff = Math.min(maxDelayMs, baseDelayMs * 2 ** (attempts - 1))
+          const wait = error.retryAfterMs ?? backoff / 2 + Math.random() * (backoff / 2)
+          this.counters.retries++
+          console.log(`[Yoncu] ${request.Phone} tekrar denenecek (${attempts}/${maxRetries}), ${Math.round(wait)} ms sonra:`, error.message)
+          await delay(Math.min(wait, maxDelayMs))
+        }
       }
-    )
+    })
+  }
 
-    // 303 ve diğer redirect'leri handle et
-    if (response.status === 303 || response.status === 302 || response.status === 301) {
-      // Redirect durumunda authentication başarısız olabilir
-      throw new Error('Authentication hatası. Lütfen Service ID ve Authorization Token bilgilerinizi kontrol edin.')
+  getMetrics(): YoncuMetrics {
+    const sorted = [...this.latencies].sort((a, b) => a - b)
+    const total = sorted.reduce((sum, value) => sum + value, 0)
+    return {
+      ...this.counters,
+      latencyMs: {
+        avg: sorted.length > 0 ? Math.round(total / sorted.length) : 0,
+        p50: percentile(sorted, 50),
+        p95: percentile(sorted, 95),
+        p99: percentile(sorted, 99),
+        max: sorted[sorted.length - 1] || 0,
+      },
     }
+  }
 
-    if (!response.ok && response.status !== 200) {
-      throw new Error(`API Error: ${response.status} ${response.statusText}`)
+  destroy(): void {
+    this.agent.destroy()
+  }
+
+  private recordLatency(ms: number): void {
+    this.latencies.push(ms)
+    if (this.latencies.length > LATENCY_WINDOW) {
+      this.latencies.splice(0, this.latencies.length - LATENCY_WINDOW)
     }
+  }
 
-    const data = await response.json()
-    return data
-  } catch (error: any) {
-    if (error.message.includes('Authentication')) {
-      throw error
+  private async request(method: 'GET' | 'POST', action: string, payload?: any): Promise<RawResponse> {
+    const started = Date.now()
+    this.counters.requests++
+
+    try {
+      const response = await this.rawRequest(method, action, payload)
+
+      // 303 ve diğer redirect'leri handle et
+      if (response.status === 303 || response.status === 302 || response.status === 301) {
+        throw new Error(AUTH_ERROR)
+      }
+
+      if (response.status === 429 || response.status >= 500) {
+        throw new YoncuRetryableError(
+          `Bağlantı hatası: API Error: ${response.status}`,
+          parseRetryAfter(response.headers['retry-after'])
+        )
+      }
+
+      if (response.status < 200 || response.status >= 300) {
+        throw new Error(`API Error: ${response.status}`)
+      }
+
+      return response
+    } catch (error: any) {
+      this.counters.errors++
+      if (error.message === AUTH_ERROR || error instanceof YoncuRetryableError) {
+        throw error
+      }
+      if (error.message.startsWith('API Error')) {
+        throw new Error(`Bağlantı hatası: ${error.message}`)
+      }
+      // Ağ hataları (ECONNRESET, zaman aşımı vb.) tekrar denenebilir
+      throw new YoncuRetryableError(`Bağlantı hatası: ${error.message}`)
+    } finally {
+      this.recordLatency(Date.now() - started)
     }
-    throw new Error(`Bağlantı hatası: ${error.message}. YoncuAPI servisinin aktif olduğundan emin olun.`)
   }
-}
 
-export async function getQueueStatus(
-  config: YoncuApiConfig
-): Promise<[boolean, YoncuQueueResponse | string]> {
-  // Authorization token zaten "Basic " ile başlıyorsa ekleme
-  const authHeader = config.authToken.startsWith('Basic ') 
-    ? config.authToken 
-    : `Basic ${config.authToken}`
+  private rawRequest(method: 'GET' | 'POST', action: string, payload?: any): Promise<RawResponse> {
+    const url = new URL(`/API/WhatsApp/${this.config.serviceId}/${action}`, this.baseUrl)
+    const body = payload !== undefined ? JSON.stringify(payload) : undefined
+    const transport = url.protocol === 'http:' ? http : https
 
-  try {
-    const response = await fetch(
-      `${YONCU_API_BASE_URL}/API/WhatsApp/${config.serviceId}/Queue`,
-      {
-        method: 'GET',
+    return new Promise((resolve, reject) => {
+      const req = transport.request(url, {
+        method,
+        agent: this.agent,
+        timeout: this.timeoutMs,
         headers: {
           'Accept': 'application/json',
-          'Authorization': authHeader,
+          'Authorization': this.authHeader,
           'User-Agent': 'WhatsApp-Yoncu-Panel',
+          ...(body ? { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(body) } : {}),
         },
-        redirect: 'manual',
-        cache: 'no-store',
+      }, (res) => {
+        const chunks: Buffer[] = []
+        res.on('data', (chunk) => chunks.push(chunk))
+        res.on('end', () => {
+          const text = Buffer.concat(chunks).toString('utf8')
+          let parsed: any = text
+          try {
+            parsed = text ? JSON.parse(text) : null
+          } catch (e) {
+            // JSON değilse metin olarak bırak
+          }
+          resolve({ status: res.statusCode || 0, headers: res.headers, body: parsed })
+        })
+        res.on('error', reject)
+      })
+
+      req.on('timeout', () => req.destroy(new Error('İstek zaman aşımına uğradı')))
+      req.on('error', reject)
+      if (body) req.write(body)
+      req.end()
+    })
+  }
+}
+
+// Global client (Next.js module re-import sorununu çözmek için)
+declare global {
+  var yoncuClientCache: { client: YoncuClient | null; loadedAt: number; loading: Promise<YoncuClient | null> | null } | undefined
+}
+
+function getClientCache() {
+  if (!global.yoncuClientCache) {
+    global.yoncuClientCache = { client: null, loadedAt: 0, loading: null }
+  }
+  return global.yoncuClientCache
+}
+
+/**
+ * Ayarlardan oluşturulmuş paylaşılan YoncuClient'ı döner (ayar yoksa null).
+ * Ayarlar önbelleğe alınır; /api/settings değiştiğinde invalidateYoncuClient ile sıfırlanır.
+ */
+export async function getYoncuClient(): Promise<YoncuClient | null> {
+  const cache = getClientCache()
+  if (cache.client && Date.now() - cache.loadedAt < SETTINGS_TTL_MS) return cache.client
+  if (cache.loading) return cache.loading
+
+  cache.loading = (async () => {
+    try {
+      const { getSettings } = await import('./db/settings')
+      const settings = await getSettings()
+      const previous = cache.client
+
+      if (!settings || !settings.service_id || !settings.auth_token) {
+        cache.client = null
+      } else if (
+        !previous ||
+        previous.config.serviceId !== settings.service_id ||
+        previous.config.authToken !== settings.auth_token
+      ) {
+        cache.client = new YoncuClient({ serviceId: settings.service_id, authToken: settings.auth_token })
       }
-    )
 
-    // 303 ve diğer redirect'leri handle et
-    if (response.status === 303 || response.status === 302 || response.status === 301) {
-      throw new Error('Authentication hatası. Lütfen Service ID ve Authorization Token bilgilerinizi kontrol edin.')
+      if (previous && previous !== cache.client) previous.destroy()
+      cache.loadedAt = Date.now()
+      return cache.client
+    } finally {
+      cache.loading = null
     }
+  })()
+
+  return cache.loading
+}
 
-    if (!response.ok && response.status !== 200) {
-      throw new Error(`API Error: ${response.status} ${response.statusText}`)
+/**
+ * Ayarlar değiştiğinde önbellekteki client'ı bırakır
+ */
+export function invalidateYoncuClient(): void {
+  const cache = getClientCache()
+  cache.client?.destroy()
+  cache.client = null
+  cache.loadedAt = 0
+}
+
+/**
+ * Paylaşılan client'ın gecikme ve hata metrikleri
+ */
+export function getYoncuMetrics(): YoncuMetrics | null {
+  return getClientCache().client?.getMetrics() || null
+}
+
+/**
+ * Kuyruk yanıtını sayı ve telefon listesine çevirir. Yanıt string olarak da gelebilir:
+ * "Toplam 1 Mesaj Bulundu:\n+905354406577" veya "Mesaj Bulunamadı"
+ */
+export function parseYoncuQueue(queueData: YoncuQueueResponse | string): { count: number; phones: string[]; message?: string } {
+  if (typeof queueData !== 'string') {
+    return { count: queueData.adet || 0, phones: queueData.Phones || [] }
+  }
+
+  const lower = queueData.toLowerCase()
+  if (lower.includes('bulunamadı') || lower.includes('bulunamadi')) {
+    return { count: 0, phones: [], message: queueData }
+  }
+
+  const phones: string[] = []
+  let count = 0
+
+  queueData.split('\n').filter(line => line.trim()).forEach(line => {
+    // "Toplam X Mesaj Bulundu:" satırından count'u al
+    if (line.toLowerCase().includes('toplam') && line.toLowerCase().includes('mesaj')) {
+      const match = line.match(/(\d+)/)
+      if (match) {
+        count = parseInt(match[1])
+      }
+    }
+    // Telefon numarası gibi görünen satırları al
+    else if (line.trim().match(/^\+?\d+$/)) {
+      phones.push(line.trim())
     }
+  })
+
+  return { count: count || phones.length, phones, message: queueData }
+}
+
+// Eski fonksiyon imzaları: verilen yapılandırma için geçici client kullanır
+
+export async function sendMessage(
+  config: YoncuApiConfig,
+  request: YoncuSendRequest
+): Promise<[boolean, any]> {
+  const client = new YoncuClient(config)
+  try {
+    return await client.send(request)
+  } finally {
+    client.destroy()
+  }
+}
 
-    const data = await response.json()
-    return data
+export async function getServiceStatus(
+  config: YoncuApiConfig
+): Promise<[boolean, YoncuStatusResponse]> {
+  const client = new YoncuClient(config)
+  try {
+    return await client.getStatus()
   } catch (error: any) {
-    if (error.message.includes('Authentication')) {
-      throw error
-    }
-    throw new Error(`Bağlantı hatası: ${error.message}`)
+    if (error.message === AUTH_ERROR) throw error
+    throw new Error(`${error.message}. YoncuAPI servisinin aktif olduğundan emin olun.`)
+  } finally {
+    client.destroy()
   }
 }
 
+export async function getQueueStatus(
+  config: YoncuApiConfig
+): Promise<[boolean, YoncuQueueResponse | string]> {
+  const client = new YoncuClient(config)
+  try {
+    return await client.getQueue()
+  } finally {
+    client.destroy()
+  }
+}
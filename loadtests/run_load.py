@@ -0,0 +1,390 @@
+"""Asyncio load and latency benchmark for the Next.js API routes.
+
+Runs scripted scenarios against a locally running app (``npm run dev`` or
+``npm start`` on http://localhost:3000, the same target as testsprite_tests)
+and writes p50/p95/p99 latency, throughput and error rate per endpoint to a
+JSON file with stable keys, so two runs can be diffed between commits.
+
+Everything stays offline: the app should point at a local Supabase/Postgres
+(``supabase start``) and run with the simulated WhatsApp client, then be
+connected once (POST /api/wa-web/connect) before the send scenarios:
+
+    WA_WEB_TRANSPORT=fake WA_FAKE_LATENCY_MS=80 NEXT_PUBLIC_SUPABASE_URL=http://localhost:54321 npm run dev
+
+Test data uses the 90599 phone prefix and every campaign the benchmark
+creates is deleted afterwards. ``send_burst`` and ``campaign_send`` refuse to run
+unless GET /api/wa-web/status reports the fake transport; ``--allow-real-send``
+overrides this and really messages those numbers from the connected session.
+
+Every WA Web send waits for the send scheduler, so ``send_burst`` latency
+includes the active rate profile's pacing (the default ``low`` profile allows
+about 20 messages per minute per session with 2-5 s gaps, which turns a burst
+of 200 into timeouts). For benchmark runs start the app with a permissive
+profile and high per-session/channel/global budgets, e.g.
+
+    SEND_RATE_PROFILE=high SEND_RATE_SHARED=false WA_SESSION_RATE_PER_MINUTE=100000 \
+    SEND_RATE_CHANNEL_PER_MINUTE=100000 SEND_RATE_GLOBAL_PER_MINUTE=100000
+
+The profile still spaces sends on one session by its 0.5-2 s gap, so keep
+``--burst`` small or compare only runs whose report ``parameters.send_scheduler``
+(profile, store and limits, read from GET /api/dispatcher) match.
+
+    python loadtests/run_load.py                                  # all scenarios, defaults
+    python loadtests/run_load.py -s dashboards --users 100 --duration 60
+    python loadtests/run_load.py -s preview --recipients 10000 --out loadtests/results/preview.json
+
+Only the Python standard library is used.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASE_URL = os.environ.get("LOADTEST_BASE_URL", "http://localhost:3000")
+PHONE_PREFIX = "90599"
+# Scenarios that deliver messages through the app's WhatsApp transport
+SEND_SCENARIOS = {"send_burst", "campaign_send"}
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+class Recorder:
+    """Collects one sample per request, grouped by endpoint label."""
+
+    def __init__(self):
+        self.samples = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def add(self, label, latency_ms, status):
+        self.samples.setdefault(label, []).append((latency_ms, status))
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        endpoints = {}
+        for label, samples in sorted(self.samples.items()):
+            latencies = sorted(s[0] for s in samples)
+            errors = sum(1 for s in samples if not (200 <= s[1] < 300))
+            codes = {}
+            for _, status in samples:
+                codes[str(status)] = codes.get(str(status), 0) + 1
+            endpoints[label] = {
+                "requests": len(samples),
+                "errors": errors,
+                "error_rate": round(errors / len(samples), 4),
+                "throughput_rps": round(len(samples) / elapsed, 2) if elapsed > 0 else 0,
+                "latency_ms": {
+                    "p50": percentile(latencies, 50),
+                    "p95": percentile(latencies, 95),
+                    "p99": percentile(latencies, 99),
+                    "max": round(latencies[-1], 1),
+                    "mean": round(sum(latencies) / len(latencies), 1),
+                },
+                "status_codes": dict(sorted(codes.items())),
+            }
+        return {"elapsed_seconds": round(elapsed, 2), "endpoints": endpoints}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return round(sorted_values[rank - 1], 1)
+
+
+class Client:
+    """Minimal JSON HTTP client; blocking urllib calls run on a thread pool.
+
+    Latency is measured in ``call`` from the moment the request is issued, so time
+    spent waiting for a free pool worker counts against the endpoint instead of
+    being hidden when the pool saturates.
+    """
+
+    def __init__(self, base_url, workers, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def _request(self, method, path, body):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"} if data else {},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            payload = error.read()
+            status = error.code
+        except (urllib.error.URLError, OSError):
+            payload = b""
+            status = 0
+        return status, payload
+
+    async def call(self, recorder, label, method, path, body=None):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        status, payload = await loop.run_in_executor(
+            self.executor, self._request, method, path, body
+        )
+        latency_ms = (time.perf_counter() - started) * 1000
+        try:
+            parsed = json.loads(payload) if payload else None
+        except ValueError:
+            parsed = None
+        if recorder is not None:
+            recorder.add(label, latency_ms, status)
+        return status, parsed
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def fake_phones(count, offset=0):
+    return [f"{PHONE_PREFIX}{offset + i:07d}" for i in range(count)]
+
+
+async def create_manual_campaign(client, name, recipients):
+    status, body = await client.call(None, None, "POST", "/api/campaigns", {
+        "name": name,
+        "channel": "wa_web",
+        "message_template": "Merhaba {name}, yük testi mesajı.",
+        "target_type": "manual",
+        "target_manual_phones": fake_phones(recipients),
+        "require_consent": False,
+        # Stored as given (0 = no per-campaign gap); only the send scheduler paces sends
+        "delay_min_ms": 0,
+        "delay_max_ms": 0,
+    })
+    if status != 200 or not body or not body.get("success"):
+        raise RuntimeError(f"campaign could not be created (HTTP {status}): {body}")
+    return body["campaign"]["id"]
+
+
+async def delete_campaign(client, campaign_id):
+    await client.call(None, None, "DELETE", f"/api/campaigns/{campaign_id}")
+
+
+async def run_for(duration, users, interval, action):
+    """Run ``action(user_index)`` in ``users`` loops every ``interval`` seconds for ``duration``."""
+    deadline = time.perf_counter() + duration
+
+    async def pause(seconds):
+        await asyncio.sleep(max(0, min(seconds, deadline - time.perf_counter())))
+
+    async def user_loop(index):
+        # Spread the first requests so users do not poll in lock-step
+        await pause(interval * index / max(users, 1))
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await action(index)
+            await pause(interval - (time.perf_counter() - started))
+
+    await asyncio.gather(*(user_loop(i) for i in range(users)))
+
+
+# --- Scenarios -------------------------------------------------------------
+
+async def scenario_dashboards(client, args):
+    """N open dashboards polling WA status (2 s) and message history (30 s)."""
+    recorder = Recorder()
+
+    async def poll_status(_):
+        await client.call(recorder, "GET /api/wa-web/status", "GET", "/api/wa-web/status")
+
+    async def poll_history(_):
+        await client.call(recorder, "GET /api/message-history", "GET", "/api/message-history")
+
+    await asyncio.gather(
+        run_for(args.duration, args.users, args.poll_interval, poll_status),
+        run_for(args.duration, args.users, 30, poll_history),
+    )
+    recorder.stop()
+    return recorder
+
+
+async def scenario_history(client, args):
+    """Concurrent readers of the message history list."""
+    recorder = Recorder()
+
+    async def read(_):
+        await client.call(recorder, "GET /api/message-history", "GET", "/api/message-history")
+
+    await run_for(args.duration, args.users, 0, read)
+    recorder.stop()
+    return recorder
+
+
+async def scenario_preview(client, args):
+    """Concurrent previews of one large manual-recipient campaign."""
+    campaign_id = await create_manual_campaign(client, "loadtest-preview", args.recipients)
+    recorder = Recorder()
+    path = f"/api/campaigns/{campaign_id}/preview"
+
+    async def preview(_):
+        await client.call(recorder, "POST /api/campaigns/[id]/preview", "POST", path)
+
+    try:
+        await run_for(args.duration, min(args.users, 10), 0, preview)
+    finally:
+        recorder.stop()
+        await delete_campaign(client, campaign_id)
+    return recorder
+
+
+async def scenario_send_burst(client, args):
+    """A burst of single WA Web sends to fake numbers."""
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.users)
+
+    async def send(phone):
+        async with semaphore:
+            await client.call(recorder, "POST /api/wa-web/send", "POST", "/api/wa-web/send", {
+                "phone": phone,
+                "message": "Yük testi mesajı",
+            })
+
+    await asyncio.gather(*(send(phone) for phone in fake_phones(args.burst, offset=5_000_000)))
+    recorder.stop()
+    return recorder
+
+
+async def scenario_campaign_send(client, args):
+    """Enqueueing a large campaign (recipient resolution + send_jobs insert)."""
+    recorder = Recorder()
+    for round_index in range(args.rounds):
+        campaign_id = await create_manual_campaign(client, f"loadtest-send-{round_index}", args.recipients)
+        try:
+            await client.call(
+                recorder, "POST /api/campaigns/[id]/send", "POST", f"/api/campaigns/{campaign_id}/send"
+            )
+            await client.call(
+                None, None, "POST", f"/api/campaigns/{campaign_id}/pause"
+            )
+        finally:
+            await delete_campaign(client, campaign_id)
+    recorder.stop()
+    return recorder
+
+
+SCENARIOS = {
+    "dashboards": scenario_dashboards,
+    "history": scenario_history,
+    "preview": scenario_preview,
+    "send_burst": scenario_send_burst,
+    "campaign_send": scenario_campaign_send,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    client = Client(args.base_url, workers=max(args.users, 4) * 2, timeout=args.timeout)
+    names = list(SCENARIOS) if args.scenario == ["all"] else args.scenario
+    report = {
+        "base_url": args.base_url,
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "parameters": {
+            "users": args.users,
+            "duration": args.duration,
+            "poll_interval": args.poll_interval,
+            "recipients": args.recipients,
+            "burst": args.burst,
+            "rounds": args.rounds,
+        },
+        "scenarios": {},
+    }
+
+    status, wa_status = await client.call(None, None, "GET", "/api/wa-web/status")
+    if status == 0:
+        client.close()
+        raise SystemExit(f"{args.base_url} is not reachable; start the app first.")
+
+    transport = (wa_status or {}).get("transport")
+    report["parameters"]["wa_transport"] = transport
+    if SEND_SCENARIOS.intersection(names) and transport != "fake" and not args.allow_real_send:
+        client.close()
+        raise SystemExit(
+            f"The app uses the {transport or 'unknown'} WhatsApp transport; {', '.join(sorted(SEND_SCENARIOS))} "
+            "would message real numbers. Restart it with WA_WEB_TRANSPORT=fake or pass --allow-real-send."
+        )
+
+    _, dispatcher = await client.call(None, None, "GET", "/api/dispatcher")
+    scheduler = (dispatcher or {}).get("scheduler") or {}
+    report["parameters"]["send_scheduler"] = {
+        key: scheduler.get(key) for key in ("profile", "store", "limits")
+    }
+
+    try:
+        for name in names:
+            print(f"▶ {name} ...", flush=True)
+            try:
+                recorder = await SCENARIOS[name](client, args)
+                report["scenarios"][name] = recorder.summary()
+            except Exception as error:
+                report["scenarios"][name] = {"error": str(error)}
+                print(f"  ✗ {error}")
+                continue
+            for label, stats in report["scenarios"][name]["endpoints"].items():
+                latency = stats["latency_ms"]
+                print(
+                    f"  {label:<36} {stats['requests']:>6} req  {stats['throughput_rps']:>8} rps  "
+                    f"p50 {latency['p50']:>7} ms  p95 {latency['p95']:>7} ms  p99 {latency['p99']:>7} ms  "
+                    f"err {stats['error_rate'] * 100:.1f}%"
+                )
+    finally:
+        client.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-s", "--scenario", nargs="+", default=["all"], choices=["all", *SCENARIOS])
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per timed scenario")
+    parser.add_argument("--poll-interval", type=float, default=2, help="dashboard status poll interval")
+    parser.add_argument("--recipients", type=int, default=10000, help="recipients in generated campaigns")
+    parser.add_argument("--burst", type=int, default=200, help="number of sends in send_burst")
+    parser.add_argument("--rounds", type=int, default=3, help="campaigns enqueued in campaign_send")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument(
+        "--allow-real-send",
+        action="store_true",
+        help="run send scenarios even when the app is not on the fake WhatsApp transport",
+    )
+    parser.add_argument("--out", default=str(RESULTS_DIR / "latest.json"), help="JSON report path")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False) + "\n")
+    print(f"\nReport written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 const nextConfig = {
   reactStrictMode: true,
   output: 'standalone', // Docker için standalone output
+  experimental: {
+    instrumentationHook: true, // instrumentation.ts: açılışta dispatcher ve WA oturumlarını geri yükleme
+  },
   images: {
     domains: [],
   },
@@ -0,0 +1,97 @@
+// Kişi senkronizasyonu benchmark'ı: eski (kişi başına select + update/insert)
+// ve yeni (lib/contact-sync.ts, chunk'lı .in() + upsert) yöntemlerin DB istek sayısını
+// ve süresini karşılaştırır.
+//
+// Yerel Supabase (supabase start -> yerel Postgres) üzerinde çalıştırın.
+// TypeScript modülünü doğrudan yüklemek için Node 22.6+ gerekir:
+//   NEXT_PUBLIC_SUPABASE_URL=http://localhost:54321 \
+//   NEXT_PUBLIC_SUPABASE_ANON_KEY=<anon key> \
+//   node --experimental-strip-types scripts/bench-contact-sync.mjs 8000
+//
+// Not: database-migration-contacts-phone-unique.sql uygulanmış olmalıdır.
+
+import { createClient } from "@supabase/supabase-js";
+import { splitName, syncWaContacts } from "../lib/contact-sync.ts";
+
+const COUNT = parseInt(process.argv[2] || "2000", 10);
+const CHUNK_SIZE = 500;
+// Benchmark kayıtlarını gerçek verilerden ayırmak için numara öneki
+const PREFIX = "90599";
+
+let roundTrips = 0;
+const countingFetch = (...args) => {
+  roundTrips++;
+  return fetch(...args);
+};
+
+const supabase = createClient(
+  process.env.NEXT_PUBLIC_SUPABASE_URL,
+  process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY,
+  { global: { fetch: countingFetch } }
+);
+
+function syntheticContacts(count, suffix) {
+  return Array.from({ length: count }, (_, i) => ({
+    name: `Bench${suffix} Kişi ${i}`,
+    phone: `${PREFIX}${String(i).padStart(7, "0")}`
+  }));
+}
+
+// Eski yöntem: sync-contacts route'undaki kişi başına döngü
+async function legacySync(contacts) {
+  for (const contact of contacts) {
+    const { name, surname } = splitName(contact.name);
+    const { data: existing } = await supabase
+      .from("contacts")
+      .select("id")
+      .eq("phone", contact.phone)
+      .single();
+
+    if (existing) {
+      await supabase.from("contacts").update({ name, surname }).eq("id", existing.id);
+    } else {
+      await supabase.from("contacts").insert({ name, surname, phone: contact.phone });
+    }
+  }
+}
+
+// Yeni yöntem: lib/contact-sync.ts'deki gerçek senkronizasyon motoru (sayaçlı client ile)
+async function chunkedSync(contacts) {
+  const progress = await syncWaContacts(contacts, { client: supabase, chunkSize: CHUNK_SIZE });
+  if (progress.errors > 0) throw new Error(`${progress.errors} kişi yazılamadı`);
+}
+
+async function cleanup() {
+  await supabase.from("contacts").delete().like("phone", `${PREFIX}%`);
+}
+
+async function measure(label, fn) {
+  roundTrips = 0;
+  const started = Date.now();
+  await fn();
+  const result = { label, roundTrips, ms: Date.now() - started };
+  console.log(`${label.padEnd(28)} ${String(result.roundTrips).padStart(7)} istek  ${String(result.ms).padStart(8)} ms`);
+  return result;
+}
+
+async function main() {
+  console.log(`📊 Kişi senkronizasyonu benchmark'ı (${COUNT} kişi)\n`);
+  await cleanup();
+
+  const results = [];
+  results.push(await measure("eski: ilk senkron", () => legacySync(syntheticContacts(COUNT, "A"))));
+  results.push(await measure("eski: tekrar (güncelleme)", () => legacySync(syntheticContacts(COUNT, "B"))));
+  await cleanup();
+
+  results.push(await measure("yeni: ilk senkron", () => chunkedSync(syntheticContacts(COUNT, "A"))));
+  results.push(await measure("yeni: tekrar (güncelleme)", () => chunkedSync(syntheticContacts(COUNT, "B"))));
+  results.push(await measure("yeni: tekrar (değişiklik yok)", () => chunkedSync(syntheticContacts(COUNT, "B"))));
+  await cleanup();
+
+  console.log("\n" + JSON.stringify({ count: COUNT, chunkSize: CHUNK_SIZE, results }, null, 2));
+}
+
+main().catch((error) => {
+  console.error("❌ Benchmark hatası:", error.message);
+  process.exit(1);
+});
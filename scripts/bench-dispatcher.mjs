@@ -0,0 +1,174 @@
+// Dispatcher sürücüsü: SendDispatcher'ı bellek içi depo ve sahte kanal ile çalıştırır
+// (Supabase ve WhatsApp gerekmez). Job'ların sahiplenme (claim), kampanyanın
+// scheduled -> running -> completed geçişi, sınırlı paralellik ve hata sınıflarına göre
+// retry / park / dead-letter geçişleri sayılır ve sonda doğrulanır.
+//
+// lib/send-dispatcher.ts '@/types' ve uzantısız göreli import'lar kullandığından
+// --experimental-strip-types ile değil, tsconfig path'lerini çözen tsx ile çalıştırılır:
+//   npx tsx scripts/bench-dispatcher.mjs 2000 8
+//   (argümanlar: job sayısı, eşzamanlı gönderim; varsayılan 1000 ve 4)
+//
+// Sahte kanalın hata senaryosu (alıcı sırasına göre):
+//   her 10.'da 3: ilk denemede geçici hata (ETIMEDOUT) -> retry, sonra gönderilir
+//   her 25.'te 9: ilk denemede "WhatsApp bağlı değil" -> park (deneme hakkı yemez), sonra gönderilir
+//   her 50.'de 7: her denemede geçici hata -> max_attempts (3) sonunda dead-letter
+//   her 100.'de 11: "not registered" -> ilk denemede dead-letter (kalıcı)
+
+// Bekleme süreleri kısaltılır ki retry/park geçişleri birkaç saniyede tamamlansın
+process.env.SEND_RETRY_BASE_MS ||= "20";
+process.env.SEND_RETRY_MAX_MS ||= "100";
+process.env.SEND_RETRY_PARK_MS ||= "50";
+// Modül zinciri (send-scheduler -> compliance-service -> db/blacklist) yüklenirken Supabase
+// istemcisi oluşturulur; bağlantı kurulmaz, bu yüzden yer tutucu adres yeterlidir
+process.env.NEXT_PUBLIC_SUPABASE_URL ||= "http://localhost:54321";
+process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY ||= "bench";
+
+const { SendDispatcher, createInMemoryJobStore, createFakeTransport } = await import("../lib/send-dispatcher.ts");
+
+const COUNT = parseInt(process.argv[2] || "1000", 10);
+const CONCURRENCY = parseInt(process.argv[3] || "4", 10);
+const BATCH_SIZE = 50;
+const LATENCY_MS = 5;
+const TIMEOUT_MS = 60000;
+
+const now = new Date().toISOString();
+const campaign = {
+  id: "bench-campaign",
+  name: "Dispatcher benchmark",
+  channel: "wa_web",
+  message_template: "Merhaba {name}",
+  target_type: "manual",
+  rate_limit_per_second: 0,
+  rate_limit_per_minute: 0,
+  add_random_delay: false,
+  delay_min_ms: 0,
+  delay_max_ms: 0,
+  require_consent: false,
+  content_quality_check: false,
+  status: "scheduled",
+  total_recipients: COUNT,
+  sent_count: 0,
+  failed_count: 0,
+  created_at: now,
+  updated_at: now
+};
+
+const jobs = Array.from({ length: COUNT }, (_, i) => ({
+  id: `job-${i}`,
+  campaign_id: campaign.id,
+  recipient_phone: `90599${String(i).padStart(7, "0")}`,
+  message_content: `Merhaba Kişi ${i}`,
+  status: "pending",
+  attempts: 0,
+  max_attempts: 3,
+  scheduled_at: new Date(Date.now() + i).toISOString(),
+  created_at: now
+}));
+
+const indexOf = job => parseInt(job.id.slice(4), 10);
+const expected = { sent: 0, dead: 0, retried: 0, parked: 0 };
+for (let i = 0; i < COUNT; i++) {
+  if (i % 100 === 11) expected.dead++;
+  else if (i % 50 === 7) { expected.dead++; expected.retried += 2; }
+  else if (i % 25 === 9) { expected.sent++; expected.parked++; }
+  else if (i % 10 === 3) { expected.sent++; expected.retried++; }
+  else expected.sent++;
+}
+
+const transport = createFakeTransport({
+  latencyMs: LATENCY_MS,
+  errorFor(job, attempt) {
+    const i = indexOf(job);
+    if (i % 100 === 11) return "Phone number is not registered";
+    if (i % 50 === 7) return "ETIMEDOUT";
+    if (i % 25 === 9 && attempt === 1) return "WhatsApp bağlı değil";
+    if (i % 10 === 3 && attempt === 1) return "ETIMEDOUT";
+    return null;
+  }
+});
+
+// Depo çağrılarını sayarak geçişleri görünür kıl
+const store = createInMemoryJobStore({ jobs, campaigns: [campaign] });
+const transitions = { claimed: 0, sent: 0, dead: 0, retry: 0, park: 0, released: 0, running: 0 };
+const counted = {
+  ...store,
+  async claimDueJobs(limit, workerId) {
+    const claimed = await store.claimDueJobs(limit, workerId);
+    transitions.claimed += claimed.length;
+    return claimed;
+  },
+  async completeJob(job, c, result, decision) {
+    transitions[result.success ? "sent" : "dead"]++;
+    return store.completeJob(job, c, result, decision);
+  },
+  async rescheduleJob(job, decision, error) {
+    transitions[decision.action]++;
+    return store.rescheduleJob(job, decision, error);
+  },
+  async releaseJob(job) {
+    transitions.released++;
+    return store.releaseJob(job);
+  },
+  async markCampaignRunning(campaignId) {
+    transitions.running++;
+    return store.markCampaignRunning(campaignId);
+  }
+};
+
+const dispatcher = new SendDispatcher({
+  workerId: "bench-worker",
+  store: counted,
+  transport,
+  scheduler: null,
+  batchSize: BATCH_SIZE,
+  concurrency: CONCURRENCY,
+  pollIntervalMs: 10
+});
+
+// Job başına retry/dead-letter logları özeti boğmasın
+const { log, warn, error } = console;
+console.log = console.warn = console.error = () => {};
+const restoreConsole = () => Object.assign(console, { log, warn, error });
+
+const started = performance.now();
+dispatcher.start();
+while (store.campaigns.get(campaign.id).status !== "completed") {
+  if (performance.now() - started > TIMEOUT_MS) {
+    await dispatcher.stop();
+    restoreConsole();
+    console.error("Zaman aşımı: kampanya tamamlanmadı", dispatcher.getStats());
+    process.exit(1);
+  }
+  await new Promise(resolve => setTimeout(resolve, 10));
+}
+await dispatcher.stop();
+const elapsedMs = performance.now() - started;
+restoreConsole();
+
+const final = store.campaigns.get(campaign.id);
+const byStatus = {};
+for (const job of store.jobs) byStatus[job.status] = (byStatus[job.status] || 0) + 1;
+const uniqueSent = new Set(transport.sent.map(s => s.jobId)).size;
+
+console.log(`Dispatcher: ${COUNT} job, batch ${BATCH_SIZE}, eşzamanlılık ${CONCURRENCY}, gönderim gecikmesi ${LATENCY_MS} ms`);
+console.log(`  süre           ${elapsedMs.toFixed(0)} ms (${(COUNT / (elapsedMs / 1000)).toFixed(0)} job/sn)`);
+console.log(`  sahiplenilen   ${transitions.claimed} (tekrar denemeler dahil), tick: ${dispatcher.getStats().ticks}`);
+console.log(`  en çok paralel ${transport.stats.maxInFlight} / ${CONCURRENCY}`);
+console.log(`  geçişler       gönderildi ${transitions.sent}, retry ${transitions.retry}, park ${transitions.park}, dead-letter ${transitions.dead}, geri bırakıldı ${transitions.released}`);
+console.log(`  beklenen       gönderildi ${expected.sent}, retry ${expected.retried}, park ${expected.parked}, dead-letter ${expected.dead}`);
+console.log(`  job durumları  ${JSON.stringify(byStatus)}; kampanya ${final.status} (sent ${final.sent_count}, failed ${final.failed_count})`);
+
+const problems = [];
+if (transitions.running !== 1) problems.push(`kampanya ${transitions.running} kez running yapıldı`);
+if (transport.stats.maxInFlight > CONCURRENCY) problems.push("eşzamanlılık sınırı aşıldı");
+if (uniqueSent !== transport.sent.length) problems.push("aynı job birden fazla kez gönderildi");
+if (transitions.sent !== expected.sent || byStatus.sent !== expected.sent) problems.push("gönderilen sayısı beklenenden farklı");
+if (transitions.dead !== expected.dead || byStatus.failed !== expected.dead) problems.push("dead-letter sayısı beklenenden farklı");
+if (transitions.retry !== expected.retried) problems.push("retry sayısı beklenenden farklı");
+if (transitions.park !== expected.parked) problems.push("park sayısı beklenenden farklı");
+
+if (problems.length > 0) {
+  console.error("HATA:", problems.join("; "));
+  process.exit(1);
+}
+console.log("  tüm geçişler beklendiği gibi");
@@ -0,0 +1,80 @@
+// Şablon render benchmark'ı: eski zincirleme regex .replace yöntemi ile
+// lib/template-engine.ts'deki derlenmiş segment planını karşılaştırır.
+//
+// TypeScript modülünü doğrudan yüklemek için Node 22.6+ gerekir:
+//   node --experimental-strip-types scripts/bench-template-render.mjs 100000
+
+import { compileTemplate } from "../lib/template-engine.ts";
+
+const COUNT = parseInt(process.argv[2] || "100000", 10);
+const ROUNDS = 5;
+
+const TEMPLATE =
+  "Merhaba {name} {surname}! 🎉\n\n" +
+  "{company} ailesi olarak size özel kampanyamızı duyurmak isteriz. " +
+  "Siparişleriniz {address} adresine ücretsiz kargo ile gönderilecektir.\n\n" +
+  "Detaylı bilgi için {email} adresinize bir e-posta gönderdik. " +
+  "İyi günler dileriz {name}!";
+
+// Eski yöntem: campaign send/preview route'larındaki renderMessage
+function legacyRender(template, contact) {
+  return template
+    .replace(/\{name\}/g, contact.name || "")
+    .replace(/\{surname\}/g, contact.surname || "")
+    .replace(/\{email\}/g, contact.email || "")
+    .replace(/\{address\}/g, contact.address || "")
+    .replace(/\{company\}/g, contact.company || "");
+}
+
+const recipients = Array.from({ length: COUNT }, (_, i) => ({
+  name: `Ad${i}`,
+  surname: `Soyad${i}`,
+  email: `kisi${i}@ornek.com`,
+  address: `Mahalle ${i % 500}, İstanbul`,
+  company: i % 3 === 0 ? "" : `Firma ${i % 97}`
+}));
+
+function measure(label, render) {
+  // Isınma turu
+  for (let i = 0; i < Math.min(COUNT, 10000); i++) render(recipients[i]);
+
+  const timings = [];
+  let checksum = 0;
+  for (let round = 0; round < ROUNDS; round++) {
+    const started = process.hrtime.bigint();
+    for (let i = 0; i < COUNT; i++) checksum += render(recipients[i]).length;
+    timings.push(Number(process.hrtime.bigint() - started) / 1e6);
+  }
+
+  timings.sort((a, b) => a - b);
+  const median = timings[Math.floor(timings.length / 2)];
+  const result = {
+    label,
+    medianMs: Math.round(median * 10) / 10,
+    rendersPerSecond: Math.round(COUNT / (median / 1000)),
+    checksum
+  };
+  console.log(
+    `${label.padEnd(24)} ${String(result.medianMs).padStart(9)} ms  ` +
+    `${String(result.rendersPerSecond).padStart(10)} render/sn`
+  );
+  return result;
+}
+
+const compiled = compileTemplate(TEMPLATE);
+
+// İki yöntemin aynı çıktıyı ürettiğini doğrula
+for (let i = 0; i < 1000; i++) {
+  if (legacyRender(TEMPLATE, recipients[i]) !== compiled.render(recipients[i])) {
+    console.error("❌ Çıktılar farklı:", i);
+    process.exit(1);
+  }
+}
+
+console.log(`📊 Şablon render benchmark'ı (${COUNT} alıcı, ${ROUNDS} tur, medyan)\n`);
+const results = [
+  measure("eski: regex zinciri", (contact) => legacyRender(TEMPLATE, contact)),
+  measure("yeni: derlenmiş plan", (contact) => compiled.render(contact))
+];
+console.log(`\nHızlanma: ${(results[0].medianMs / results[1].medianMs).toFixed(2)}x`);
+console.log("\n" + JSON.stringify({ count: COUNT, rounds: ROUNDS, results }, null, 2));
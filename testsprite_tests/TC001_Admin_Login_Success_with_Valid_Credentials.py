@@ -2,27 +2,13 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
+from harness import BASE_URL, run_standalone, settle
+
+async def run_test(browser):
     context = None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
+        # Create an isolated browser context on the shared browser
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
@@ -30,7 +16,7 @@ async def run_test():
         page = await context.new_page()
         
         # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
+        await page.goto(BASE_URL, wait_until="commit", timeout=10000)
         
         # Wait for the main page to reach DOMContentLoaded state (optional for stability)
         try:
@@ -50,43 +36,42 @@ async def run_test():
         frame = context.pages[-1]
         # Input admin username
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
+        await elem.wait_for(state="visible"); await elem.fill('admin')
         
 
         frame = context.pages[-1]
         # Input admin password
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
+        await elem.wait_for(state="visible"); await elem.fill('admin123')
         
 
         frame = context.pages[-1]
         # Click the login button to submit credentials
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Verify session is maintained securely by checking session token or session expiration handling
         frame = context.pages[-1]
         # Navigate to WA Web Oturumu page to check session status and controls
         elem = frame.locator('xpath=html/body/div/aside/div/nav/a[8]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Check /api/wa-web/status endpoint for 200 response to verify backend session status
-        await page.goto('http://localhost:3000/api/wa-web/status', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/api/wa-web/status', timeout=10000)
         
 
         # -> Return to dashboard page to check session token storage and session expiration handling
-        await page.goto('http://localhost:3000/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/dashboard', timeout=10000)
+        await settle(page)
         
 
         # -> Check browser storage (cookies/localStorage) for session tokens or authentication data to verify secure session maintenance
         frame = context.pages[-1]
         # Click 'Çıkış Yap' button to test session termination and logout
         elem = frame.locator('xpath=html/body/div/aside/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # --> Assertions to verify final state
@@ -96,15 +81,11 @@ async def run_test():
         await expect(frame.locator('text=Kullanıcı Adı').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Şifre').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Giriş Yap').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
     
     finally:
         if context:
             await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
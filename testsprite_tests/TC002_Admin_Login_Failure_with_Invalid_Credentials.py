@@ -2,27 +2,13 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
+from harness import BASE_URL, run_standalone, settle
+
+async def run_test(browser):
     context = None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
+        # Create an isolated browser context on the shared browser
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
@@ -30,7 +16,7 @@ async def run_test():
         page = await context.new_page()
         
         # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
+        await page.goto(BASE_URL, wait_until="commit", timeout=10000)
         
         # Wait for the main page to reach DOMContentLoaded state (optional for stability)
         try:
@@ -50,33 +36,29 @@ async def run_test():
         frame = context.pages[-1]
         # Input invalid username
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('wronguser')
+        await elem.wait_for(state="visible"); await elem.fill('wronguser')
         
 
         frame = context.pages[-1]
         # Input invalid password
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('wrongpass')
+        await elem.wait_for(state="visible"); await elem.fill('wrongpass')
         
 
         frame = context.pages[-1]
         # Click the login button to attempt login with invalid credentials
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # --> Assertions to verify final state
         frame = context.pages[-1]
         await expect(frame.locator('text=Giriş Yap').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
     
     finally:
         if context:
             await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
@@ -2,27 +2,13 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
+from harness import BASE_URL, run_standalone, settle
+
+async def run_test(browser):
     context = None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
+        # Create an isolated browser context on the shared browser
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
@@ -30,7 +16,7 @@ async def run_test():
         page = await context.new_page()
         
         # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
+        await page.goto(BASE_URL, wait_until="commit", timeout=10000)
         
         # Wait for the main page to reach DOMContentLoaded state (optional for stability)
         try:
@@ -50,81 +36,80 @@ async def run_test():
         frame = context.pages[-1]
         # Input username admin
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
+        await elem.wait_for(state="visible"); await elem.fill('admin')
         
 
         frame = context.pages[-1]
         # Input password admin123
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
+        await elem.wait_for(state="visible"); await elem.fill('admin123')
         
 
         frame = context.pages[-1]
         # Click login button to submit credentials
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Click on 'WA Web Oturumu' link in the sidebar to navigate to WhatsApp Web Session page.
         frame = context.pages[-1]
         # Click on WA Web Oturumu link to go to WhatsApp Web Session page
         elem = frame.locator('xpath=html/body/div/aside/div/nav/a[8]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Click 'Bağlan' button to initiate WhatsApp Web session and trigger QR code generation.
         frame = context.pages[-1]
         # Click 'Bağlan' button to start WhatsApp Web session and generate QR code
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Click 'Yenile' button to refresh the session and check if QR code appears after refresh.
         frame = context.pages[-1]
         # Click 'Yenile' button to refresh WhatsApp Web session and attempt to generate QR code
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Check if the /api/wa-web/status endpoint returns 200 to verify backend status for WhatsApp Web session.
-        await page.goto('http://localhost:3000/api/wa-web/status', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/api/wa-web/status', timeout=10000)
         
 
         # -> Navigate back to WhatsApp Web Oturumu page to verify UI elements and attempt to trigger QR code generation again.
-        await page.goto('http://localhost:3000/wa-web-oturumu', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/wa-web-oturumu', timeout=10000)
+        await settle(page)
         
 
         # -> Navigate back to the main dashboard or home page to find a valid navigation link to the WhatsApp Web Session page or related section.
-        await page.goto('http://localhost:3000', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}', timeout=10000)
+        await settle(page)
         
 
         # -> Navigate back to the main dashboard or home page to find a valid navigation link to the WhatsApp Web Session page or related section.
-        await page.goto('http://localhost:3000', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}', timeout=10000)
+        await settle(page)
         
 
         # -> Click on 'WA Web Oturumu' link in the sidebar to navigate to WhatsApp Web Session page and verify QR code generation and visibility.
         frame = context.pages[-1]
         # Click on WA Web Oturumu link in sidebar to go to WhatsApp Web Session page
         elem = frame.locator('xpath=html/body/div/aside/div/nav/a[8]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Click 'Bağlan' button to initiate WhatsApp Web session and trigger QR code generation.
         frame = context.pages[-1]
         # Click 'Bağlan' button to start WhatsApp Web session and generate QR code
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Click 'Yenile' button to refresh the session and check again for QR code visibility.
         frame = context.pages[-1]
         # Click 'Yenile' button to refresh WhatsApp Web session and attempt to generate QR code
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # --> Assertions to verify final state
@@ -133,15 +118,11 @@ async def run_test():
             await expect(frame.locator('text=QR Code Successfully Connected').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test failed: QR code generation, display, or dynamic update did not occur as expected in the WhatsApp Web session connection.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
             await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
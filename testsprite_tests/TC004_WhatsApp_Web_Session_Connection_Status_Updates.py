@@ -2,27 +2,13 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
+from harness import BASE_URL, run_standalone, settle
+
+async def run_test(browser):
     context = None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
+        # Create an isolated browser context on the shared browser
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
@@ -30,7 +16,7 @@ async def run_test():
         page = await context.new_page()
         
         # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
+        await page.goto(BASE_URL, wait_until="commit", timeout=10000)
         
         # Wait for the main page to reach DOMContentLoaded state (optional for stability)
         try:
@@ -50,98 +36,94 @@ async def run_test():
         frame = context.pages[-1]
         # Input username admin
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
+        await elem.wait_for(state="visible"); await elem.fill('admin')
         
 
         frame = context.pages[-1]
         # Input password admin123
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
+        await elem.wait_for(state="visible"); await elem.fill('admin123')
         
 
         frame = context.pages[-1]
         # Click login button
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Navigate to WA Web Oturumu page to check connection status elements
         frame = context.pages[-1]
         # Click WA Web Oturumu menu item to open WhatsApp Web session page
         elem = frame.locator('xpath=html/body/div/aside/div/nav/a[8]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Check /api/wa-web/status endpoint for 200 response to verify backend status
-        await page.goto('http://localhost:3000/api/wa-web/status', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/api/wa-web/status', timeout=10000)
         
 
         # -> Return to WhatsApp Web Oturumu page to check UI elements for connection initiation
-        await page.goto('http://localhost:3000/wa-web-oturumu', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/wa-web-oturumu', timeout=10000)
+        await settle(page)
         
 
         # -> Return to dashboard or main page and try to find alternative navigation or verify if the WA Web Oturumu page URL or menu item is correct
-        await page.goto('http://localhost:3000/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/dashboard', timeout=10000)
+        await settle(page)
         
 
         # -> Click WA Web Oturumu menu item to open WhatsApp Web Oturumu page and verify connection status elements
         frame = context.pages[-1]
         # Click WA Web Oturumu menu item
         elem = frame.locator('xpath=html/body/div/aside/div/nav/a[8]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Click 'Bağlan' button to simulate connection initiation and observe status change
         frame = context.pages[-1]
         # Click 'Bağlan' button to initiate connection
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Poll /api/wa-web/status endpoint to verify connection status update after initiation
-        await page.goto('http://localhost:3000/api/wa-web/status', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/api/wa-web/status', timeout=10000)
         
 
         # -> Return to WhatsApp Web Oturumu page to verify UI status text and buttons reflect current connection state
-        await page.goto('http://localhost:3000/wa-web-oturumu', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/wa-web-oturumu', timeout=10000)
+        await settle(page)
         
 
         # -> Return to dashboard and check for any other UI elements or buttons related to connection status or reconnection options
-        await page.goto('http://localhost:3000/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/dashboard', timeout=10000)
+        await settle(page)
         
 
         # -> Click 'WA Web Oturumu' menu item to verify connection status UI elements and buttons
         frame = context.pages[-1]
         # Click WA Web Oturumu menu item
         elem = frame.locator('xpath=html/body/div/aside/div/nav/a[8]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Click 'Bağlan' button to simulate connection initiation and observe status change
         frame = context.pages[-1]
         # Click 'Bağlan' button to initiate connection
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Poll /api/wa-web/status endpoint to check for updated connection status after initiation
-        await page.goto('http://localhost:3000/api/wa-web/status', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/api/wa-web/status', timeout=10000)
         
 
-        await page.goto('http://localhost:3000/api/wa-web/status', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/api/wa-web/status', timeout=10000)
         
 
         # -> Simulate dropped connection or reconnecting state if possible, or conclude test due to inability to change status further
-        await page.goto('http://localhost:3000/wa-web-oturumu', timeout=10000)
-        await asyncio.sleep(3)
+        await page.goto(f'{BASE_URL}/wa-web-oturumu', timeout=10000)
+        await settle(page)
         
 
         # --> Assertions to verify final state
@@ -150,15 +132,11 @@ async def run_test():
             await expect(frame.locator('text=Connection Established Successfully').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test failed: The connection status did not update correctly after scanning the QR code and simulating connection changes as per the test plan.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
             await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
@@ -2,27 +2,13 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
+from harness import BASE_URL, run_standalone, settle
+
+async def run_test(browser):
     context = None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
+        # Create an isolated browser context on the shared browser
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
@@ -30,7 +16,7 @@ async def run_test():
         page = await context.new_page()
         
         # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
+        await page.goto(BASE_URL, wait_until="commit", timeout=10000)
         
         # Wait for the main page to reach DOMContentLoaded state (optional for stability)
         try:
@@ -50,77 +36,77 @@ async def run_test():
         frame = context.pages[-1]
         # Input username admin
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
+        await elem.wait_for(state="visible"); await elem.fill('admin')
         
 
         frame = context.pages[-1]
         # Input password admin123
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
+        await elem.wait_for(state="visible"); await elem.fill('admin123')
         
 
         frame = context.pages[-1]
         # Click login button
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Click on 'Kampanyalar' (Campaigns) menu to go to campaigns page
         frame = context.pages[-1]
         # Click on Kampanyalar (Campaigns) menu
         elem = frame.locator('xpath=html/body/div/aside/div/nav/a[9]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Click on 'Yeni Kampanya' button to start creating a new campaign
         frame = context.pages[-1]
         # Click on Yeni Kampanya button to create a new campaign
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Input campaign name, define message template with placeholders, and attach media file under 50MB
         frame = context.pages[-1]
         # Input campaign name as 'Yeni Ürün Tanıtımı'
         elem = frame.locator('xpath=html/body/div[4]/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Yeni Ürün Tanıtımı')
+        await elem.wait_for(state="visible"); await elem.fill('Yeni Ürün Tanıtımı')
         
 
         frame = context.pages[-1]
         # Input message template with placeholder {name}
         elem = frame.locator('xpath=html/body/div[4]/div[2]/div[3]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Merhaba {name}, bu yeni ürünümüzü inceleyin!')
+        await elem.wait_for(state="visible"); await elem.fill('Merhaba {name}, bu yeni ürünümüzü inceleyin!')
         
 
         frame = context.pages[-1]
         # Ensure 'WhatsApp Web/Desktop' is selected as sending channel
         elem = frame.locator('xpath=html/body/div[4]/div[2]/div[2]/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         frame = context.pages[-1]
         # Select 'Kayıtlı Kişiler' as target audience
         elem = frame.locator('xpath=html/body/div[4]/div[2]/div[4]/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         frame = context.pages[-1]
         # Select 'Düşük Hız (Güvenli, Önerilen)' as sending speed profile
         elem = frame.locator('xpath=html/body/div[4]/div[2]/div[5]/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # -> Attach a media file under 50MB to the campaign
         frame = context.pages[-1]
         # Click on message template textarea to focus for media attachment
         elem = frame.locator('xpath=html/body/div[4]/div[2]/div[3]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         frame = context.pages[-1]
         # Click 'Kampanya Oluştur' button to create campaign without media (media attachment UI not visible, need to check if media attachment is possible here)
         elem = frame.locator('xpath=html/body/div[4]/div[2]/div[6]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await elem.wait_for(state="visible"); await elem.click(timeout=5000)
         
 
         # --> Assertions to verify final state
@@ -129,15 +115,11 @@ async def run_test():
             await expect(frame.locator('text=Campaign successfully deleted').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test plan execution failed: Campaign CRUD operations including creation with placeholders, media attachment up to 50MB, preview with personalized content, pause, resume, and delete did not complete successfully.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
             await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
@@ -0,0 +1,44 @@
+"""Shared helpers for the TestSprite Playwright scripts.
+
+Each TC script exposes ``run_test(browser)`` and only owns its own browser
+context, so ``run_suite.py`` can run many of them against one Chromium
+instance.  Running a script directly still works through ``run_standalone``.
+"""
+import os
+
+from playwright import async_api
+
+BASE_URL = os.environ.get("TESTSPRITE_BASE_URL", "http://localhost:3000")
+
+# Upper bound for "wait until the page has settled"; pages with an open SSE
+# stream (/api/wa-web/events) never reach network idle, so this must stay short.
+NETWORK_IDLE_TIMEOUT_MS = int(os.environ.get("TESTSPRITE_NETWORK_IDLE_TIMEOUT_MS", "2000"))
+
+LAUNCH_ARGS = [
+    "--window-size=1280,720",         # Set the browser window size
+    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+]
+
+
+async def launch_browser(pw, headless=True):
+    """Launch the Chromium instance shared by every test context."""
+    return await pw.chromium.launch(headless=headless, args=LAUNCH_ARGS)
+
+
+async def settle(page, timeout=NETWORK_IDLE_TIMEOUT_MS):
+    """Wait for the page to finish loading instead of sleeping a fixed time."""
+    try:
+        await page.wait_for_load_state("load")
+        await page.wait_for_load_state("networkidle", timeout=timeout)
+    except async_api.Error:
+        pass
+
+
+async def run_standalone(run_test, headless=True):
+    """Run a single TC script with its own Playwright and browser."""
+    async with async_api.async_playwright() as pw:
+        browser = await launch_browser(pw, headless=headless)
+        try:
+            await run_test(browser)
+        finally:
+            await browser.close()
@@ -0,0 +1,125 @@
+"""Run the TestSprite TC scripts concurrently against one shared Chromium.
+
+Every test gets its own browser context; at most ``--concurrency`` tests run
+at the same time.  Per-test wall time and total suite time are printed and can
+be written to a JSON file.
+
+    python testsprite_tests/run_suite.py                 # all TC*.py, one per core
+    python testsprite_tests/run_suite.py -k TC003 -j 2   # filter, 2 at a time
+    python testsprite_tests/run_suite.py --json tmp/suite_timings.json
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from playwright import async_api
+
+TESTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TESTS_DIR))
+
+from harness import launch_browser  # noqa: E402
+
+
+def discover(pattern=None):
+    paths = sorted(TESTS_DIR.glob("TC*.py"))
+    if pattern:
+        paths = [p for p in paths if pattern.lower() in p.stem.lower()]
+    return paths
+
+
+def load_test(path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.run_test
+
+
+async def run_one(path, browser, semaphore, timeout):
+    async with semaphore:
+        started = time.perf_counter()
+        result = {"test": path.stem, "status": "passed", "error": None}
+        try:
+            run_test = load_test(path)
+            await asyncio.wait_for(run_test(browser), timeout=timeout)
+        except asyncio.TimeoutError:
+            result["status"] = "failed"
+            result["error"] = f"timed out after {timeout}s"
+        except Exception as error:
+            result["status"] = "failed"
+            result["error"] = f"{type(error).__name__}: {error}".strip()
+            result["traceback"] = traceback.format_exc()
+        result["seconds"] = round(time.perf_counter() - started, 2)
+
+        mark = "PASS" if result["status"] == "passed" else "FAIL"
+        print(f"[{mark}] {result['test']} ({result['seconds']}s)", flush=True)
+        return result
+
+
+async def run_suite(paths, concurrency, timeout, headless):
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+
+    async with async_api.async_playwright() as pw:
+        browser = await launch_browser(pw, headless=headless)
+        try:
+            results = await asyncio.gather(
+                *(run_one(path, browser, semaphore, timeout) for path in paths)
+            )
+        finally:
+            await browser.close()
+
+    total = round(time.perf_counter() - started, 2)
+    return {
+        "concurrency": concurrency,
+        "total_seconds": total,
+        "sum_test_seconds": round(sum(r["seconds"] for r in results), 2),
+        "passed": sum(1 for r in results if r["status"] == "passed"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "tests": list(results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-j", "--concurrency", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("-k", "--pattern", help="only run tests whose file name contains this text")
+    parser.add_argument("--timeout", type=float, default=120, help="per-test timeout in seconds")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--json", help="write the timing report to this file")
+    args = parser.parse_args()
+
+    paths = discover(args.pattern)
+    if not paths:
+        print("No tests matched.")
+        return 1
+
+    concurrency = max(1, min(args.concurrency, len(paths)))
+    print(f"Running {len(paths)} tests, {concurrency} at a time\n", flush=True)
+    report = asyncio.run(run_suite(paths, concurrency, args.timeout, not args.headed))
+
+    print()
+    for result in sorted(report["tests"], key=lambda r: -r["seconds"]):
+        line = f"{result['seconds']:>8.2f}s  {result['status']:<6}  {result['test']}"
+        if result["error"]:
+            line += f"\n{'':>18}{result['error'].splitlines()[0]}"
+        print(line)
+    print(
+        f"\n{report['passed']} passed, {report['failed']} failed in {report['total_seconds']}s "
+        f"(sum of test times {report['sum_test_seconds']}s)"
+    )
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -148,6 +148,9 @@ export interface Campaign {
   total_recipients: number;
   sent_count: number;
   failed_count: number;
+  pending_count?: number;
+  processing_count?: number;
+  blocked_count?: number;
   
   created_at: string;
   updated_at: string;
@@ -170,12 +173,32 @@ export interface SendJob {
   max_attempts: number;
   last_error?: string;
   last_error_at?: string;
+  // Son hatanın sınıfı (lib/send-retry) ve dead-letter'a düştüğü zaman
+  error_class?: 'transient' | 'session' | 'permanent' | null;
+  dead_lettered_at?: string | null;
+  claimed_by?: string | null;
+  claimed_at?: string | null;
   scheduled_at: string;
   processed_at?: string;
   sent_at?: string;
   created_at: string;
 }
 
+// Gelen mesaj (WA Web 'message' olayı veya Twilio webhook)
+export interface InboundMessage {
+  id?: string;
+  channel: 'wa_web' | 'twilio';
+  phone: string;
+  to_phone?: string | null;
+  body: string;
+  external_id?: string | null;
+  session_name?: string | null;
+  num_media: number;
+  is_opt_out: boolean;
+  received_at: string;
+  created_at?: string;
+}
+
 export interface Blacklist {
   id: string;
   phone: string;
@@ -226,11 +249,13 @@ export interface CampaignPreview {
 export interface CampaignReport {
   campaign: Campaign;
   jobs: SendJob[];
+  next_cursor: string | null;
   summary: {
     total: number;
     sent: number;
     failed: number;
     pending: number;
+    processing: number;
     blocked: number;
     success_rate: number;
   };